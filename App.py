@@ -1,11 +1,11 @@
 """
-Aplicación GUI para comparar dos enfoques de regresión sobre pares (x, y):
-1. Regresión Lineal (scikit-learn)
-2. Regresión Exponencial y = a * e^{b x}  (linealizando con ln(y))
+Aplicación GUI para comparar familias de regresión sobre pares (x, y):
+las registradas en ModelsApp.FAMILIAS (Lineal, Exponencial, Potencial,
+Logarítmica, Polinomial de grado 2), ajustadas con numpy.
 
 Funciones:
 - Ingresar X e y
-- Calcular ambos modelos y mostrar métricas (R2, MSE, RMSE)
+- Calcular todos los modelos y mostrar métricas (R2, MSE, RMSE)
 - Seleccionar modelo y graficar
 - Resaltar el de menor RMSE
 """
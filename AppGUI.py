@@ -3,18 +3,31 @@ Módulo de interfaz gráfica para la aplicación de regresión.
 Contiene todas las funciones relacionadas con la interfaz de usuario.
 """
 
+import hashlib
+import threading
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox, ttk
 import numpy as np
 import matplotlib
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+import ComparisonApp
+import DiagnosticsApp
+import ExportApp
+import ModelsApp
 import OperationsApp
+import Profiling
 import Queries
 
 matplotlib.use("TkAgg")
 
+# Tamaño (bytes) a partir del cual un modelo guardado se carga en la tabla paginada
+UMBRAL_PAGINADO = 200_000
+
+# Cantidad de pares a partir de la cual un modelo se guarda en la tabla de puntos
+UMBRAL_TABLA_PUNTOS = 5000
+
 
 class ScrollableFrame(tk.Frame):
     """
@@ -53,7 +66,665 @@ class ScrollableFrame(tk.Frame):
         self.canvas.yview_scroll(delta, "units")
 
 
-def search_models(container, txt_x, txt_y, id_session_var, btn_editar):
+class TablaPaginada(tk.Frame):
+    """
+    Tabla de pares (x, y) que solo dibuja las filas visibles.
+
+    Los datos viven en arrays numpy; editar una celda modifica el array
+    directamente, sin pasar todos los valores por texto. Mientras está
+    activa reemplaza a los campos de texto de X e Y dentro del mismo contenedor.
+    """
+
+    def __init__(self, master, vistas_texto, filas_visibles=15):
+        super().__init__(master)
+        self.vistas_texto = vistas_texto
+        self.filas_visibles = filas_visibles
+        self.xs = np.empty(0)
+        self.ys = np.empty(0)
+        self.inicio = 0
+        self.activa = False
+        # Aumenta con cada carga o edición (ver DatosSesion)
+        self.version = 0
+
+        self.lbl_estado = tk.Label(self, anchor="w", font=("Arial", 10))
+        self.lbl_estado.pack(fill="x")
+        self.tree = ttk.Treeview(
+            self, columns=("idx", "x", "y"), show="headings", height=filas_visibles
+        )
+        for col, titulo in (("idx", "#"), ("x", "X"), ("y", "y")):
+            self.tree.heading(col, text=titulo)
+        self.tree.column("idx", width=80, anchor="e")
+        self.scroll = tk.Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="right", fill="y")
+
+        self.tree.bind("<Double-1>", self._editar_celda)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._desplazar(-3))
+        self.tree.bind("<Button-5>", lambda e: self._desplazar(3))
+
+    def activar(self, xs, ys):
+        """Carga los arrays y muestra la tabla en lugar de los campos de texto."""
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.inicio = 0
+        self.version += 1
+        if not self.activa:
+            for vista in self.vistas_texto:
+                vista.pack_forget()
+            self.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+            self.activa = True
+        self._render()
+
+    def desactivar(self):
+        """Libera los arrays y vuelve a mostrar los campos de texto."""
+        self.xs = np.empty(0)
+        self.ys = np.empty(0)
+        if self.activa:
+            self.pack_forget()
+            for vista in self.vistas_texto:
+                vista.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+            self.activa = False
+
+    def _render(self):
+        """Dibuja únicamente la ventana visible de filas."""
+        n = self.xs.size
+        fin = min(self.inicio + self.filas_visibles, n)
+        self.tree.delete(*self.tree.get_children())
+        for i in range(self.inicio, fin):
+            self.tree.insert(
+                "",
+                "end",
+                iid=str(i),
+                values=(i, f"{self.xs[i]:.10g}", f"{self.ys[i]:.10g}"),
+            )
+        if n:
+            self.scroll.set(self.inicio / n, fin / n)
+        self.lbl_estado.config(
+            text=f"{n} pares (filas {self.inicio + 1}-{fin}). Doble clic para editar."
+        )
+
+    def _desplazar(self, filas):
+        max_inicio = max(self.xs.size - self.filas_visibles, 0)
+        self.inicio = min(max(self.inicio + filas, 0), max_inicio)
+        self._render()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self._desplazar(int(-3 * (event.delta / 120)))
+
+    def _on_scroll(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self._desplazar(int(float(cantidad) * self.xs.size) - self.inicio)
+        else:
+            paso = self.filas_visibles if unidad == "pages" else 1
+            self._desplazar(int(cantidad) * paso)
+
+    def _editar_celda(self, event):
+        """Abre un Entry sobre la celda para editar un único valor."""
+        fila = self.tree.identify_row(event.y)
+        columna = self.tree.identify_column(event.x)
+        if not fila or columna not in ("#2", "#3"):
+            return
+        i = int(fila)
+        destino = self.xs if columna == "#2" else self.ys
+        x, y, ancho, alto = self.tree.bbox(fila, columna)
+        entry = tk.Entry(self.tree)
+        entry.insert(0, f"{destino[i]:.17g}")
+        entry.place(x=x, y=y, width=ancho, height=alto)
+        entry.focus()
+        entry.select_range(0, tk.END)
+
+        def confirmar(_=None):
+            try:
+                destino[i] = float(entry.get())
+            except ValueError:
+                messagebox.showerror("Error", f"Valor inválido: {entry.get()}")
+                return
+            self.version += 1
+            entry.destroy()
+            self._render()
+
+        entry.bind("<Return>", confirmar)
+        entry.bind("<Escape>", lambda e: entry.destroy())
+        entry.bind("<FocusOut>", lambda e: entry.destroy())
+
+
+def _huella(texto):
+    """Huella (longitud, hash) del contenido de un campo de texto."""
+    return len(texto), hashlib.blake2b(texto.encode(), digest_size=16).digest()
+
+
+def _es_separador(caracter):
+    return caracter.isspace() or caracter in ",;"
+
+
+def _sufijo_agregado(texto, huella_previa):
+    """
+    Si texto es el contenido previo (huella_previa) con valores agregados al
+    final, retorna solo el texto agregado; si no, retorna None.
+    """
+    n = huella_previa[0]
+    if len(texto) < n or _huella(texto[:n]) != huella_previa:
+        return None
+    # El último valor previo no debe continuar en el texto agregado ("3" -> "34")
+    if 0 < n < len(texto) and not (
+        _es_separador(texto[n - 1]) or _es_separador(texto[n])
+    ):
+        return None
+    return texto[n:]
+
+
+class DatosSesion:
+    """
+    Conjunto (x, y) de la sesión, parseado una sola vez.
+
+    Los campos de texto se parsean a arrays la primera vez que un callback
+    los pide y los mismos arrays (de solo lectura) se reutilizan al calcular,
+    graficar, guardar y editar. Los eventos <<Modified>> solo marcan los
+    datos como sucios: al pedirlos se compara la huella (longitud y hash)
+    del texto, de modo que si el contenido no cambió no se vuelve a parsear,
+    y si solo se agregaron valores al final se parsean únicamente esos.
+    Con la tabla paginada activa, sus arrays son los datos de la sesión.
+
+    Los resultados del último cálculo se reutilizan mientras los datos no
+    cambien, y si solo se agregaron puntos se actualizan a partir de ellos
+    (ver OperationsApp.calcular_modelos_incremental).
+    """
+
+    def __init__(self, txt_x, txt_y, tabla):
+        self.txt_x = txt_x
+        self.txt_y = txt_y
+        self.tabla = tabla
+        self.version = 0
+        self._xs = None
+        self._ys = None
+        self._huellas = None
+        self._sucio = True
+        self._version_tabla = None
+        # Último cálculo: resultados, versión de los datos, estadísticos y
+        # cantidad de puntos iniciales que no cambiaron desde entonces
+        self._resultados = None
+        self._version_resultados = None
+        self._estadisticos = None
+        self._puntos_estables = 0
+        for txt in (txt_x, txt_y):
+            txt.edit_modified(False)
+            txt.bind("<<Modified>>", self._al_modificar, add="+")
+
+    def _al_modificar(self, event):
+        # Bajar la marca de modificado para recibir el próximo cambio
+        event.widget.edit_modified(False)
+        self._sucio = True
+
+    def invalidar(self):
+        """Fuerza a volver a parsear todo y a recalcular los modelos."""
+        self._huellas = None
+        self._sucio = True
+
+    def _cambiaron_datos(self, agregados):
+        """Registra una nueva versión de los datos (agregados: solo al final)."""
+        self.version += 1
+        if not agregados:
+            self._puntos_estables = 0
+
+    def arrays(self):
+        """
+        Retorna (xs, ys) como arrays numpy.
+
+        Raises:
+            ValueError: Si algún valor del texto no es un número
+        """
+        if self.tabla.activa:
+            if self._version_tabla != self.tabla.version:
+                self._version_tabla = self.tabla.version
+                self._cambiaron_datos(False)
+            return self.tabla.xs, self.tabla.ys
+        if self._version_tabla is not None:
+            # Se volvió de la tabla a los campos de texto
+            self._version_tabla = None
+            self.invalidar()
+        if self._sucio:
+            self._releer()
+        return self._xs, self._ys
+
+    def _releer(self):
+        """Vuelve a leer los campos y parsea solo lo que cambió."""
+        textos = (self.txt_x.get("1.0", "end-1c"), self.txt_y.get("1.0", "end-1c"))
+        huellas = tuple(_huella(t) for t in textos)
+        if huellas == self._huellas:
+            self._sucio = False
+            Profiling.count("AppGUI.datos_reutilizados")
+            return
+
+        sufijos = [None, None]
+        if self._huellas is not None:
+            sufijos = [_sufijo_agregado(t, h) for t, h in zip(textos, self._huellas)]
+        arrays = []
+        for texto, sufijo, previo in zip(textos, sufijos, (self._xs, self._ys)):
+            if sufijo is None:
+                nuevo = OperationsApp.parse_array(texto)
+            else:
+                nuevo = np.concatenate((previo, OperationsApp.parse_array(sufijo)))
+            # Compartidos entre callbacks: nadie debe modificarlos en el lugar
+            nuevo.setflags(write=False)
+            arrays.append(nuevo)
+
+        self._xs, self._ys = arrays
+        self._huellas = huellas
+        self._sucio = False
+        self._cambiaron_datos(all(sufijo is not None for sufijo in sufijos))
+
+    def modelos(self):
+        """
+        Resultados de todos los modelos para los datos actuales.
+
+        Reutiliza el último cálculo si los datos no cambiaron. Si solo se
+        agregaron puntos al final, lo actualiza con los puntos nuevos (sin
+        y_pred); si no, llama a OperationsApp.calcular_todos_modelos.
+
+        Returns:
+            Diccionario con los resultados de cada modelo (no modificar)
+
+        Raises:
+            ValueError: Si algún valor del texto no es un número
+        """
+        xs, ys = self.arrays()
+        if self._resultados is not None and self._version_resultados == self.version:
+            Profiling.count("AppGUI.modelos_reutilizados")
+            return self._resultados
+        n_previo = self._puntos_estables
+        if self._estadisticos is not None and 0 < n_previo < len(xs):
+            self._estadisticos, resultados = OperationsApp.calcular_modelos_incremental(
+                self._estadisticos, xs, ys, n_previo
+            )
+            Profiling.count("AppGUI.modelos_incrementales")
+        else:
+            resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+            self._estadisticos = OperationsApp.calcular_estadisticos_suficientes(xs, ys)
+        self._resultados = resultados
+        self._version_resultados = self.version
+        self._puntos_estables = len(xs)
+        return resultados
+
+
+class PanelRendimiento(tk.Toplevel):
+    """
+    Ventana con los tiempos por etapa registrados por Profiling.
+
+    Permite activar o desactivar el perfilado en caliente, reiniciar los
+    datos y exportarlos como JSON o como traza de Chrome. La tabla se
+    refresca periódicamente mientras la ventana está abierta.
+    """
+
+    COLUMNAS = (
+        ("categoria", "Categoría", 80),
+        ("llamadas", "Llamadas", 70),
+        ("total", "Total (ms)", 90),
+        ("media", "Media (ms)", 90),
+        ("maximo", "Máx. (ms)", 90),
+    )
+
+    def __init__(self, master, intervalo_ms=1000):
+        super().__init__(master)
+        self.title("Rendimiento")
+        self.geometry("640x400")
+        self.intervalo_ms = intervalo_ms
+        self.activo = tk.BooleanVar(value=Profiling.is_enabled())
+
+        frame_btns = tk.Frame(self)
+        frame_btns.pack(fill="x", padx=5, pady=5)
+        tk.Checkbutton(
+            frame_btns,
+            text="Perfilado activo",
+            variable=self.activo,
+            command=self._alternar,
+        ).pack(side="left", padx=5)
+        tk.Button(frame_btns, text="Reiniciar", command=self._reiniciar).pack(
+            side="left", padx=5
+        )
+        tk.Button(
+            frame_btns, text="Exportar Chrome trace", command=self._exportar_traza
+        ).pack(side="right", padx=5)
+        tk.Button(frame_btns, text="Exportar JSON", command=self._exportar_json).pack(
+            side="right", padx=5
+        )
+
+        self.tree = ttk.Treeview(
+            self, columns=[c for c, _, _ in self.COLUMNAS], show="tree headings"
+        )
+        self.tree.heading("#0", text="Etapa")
+        self.tree.column("#0", width=220)
+        for col, titulo, ancho in self.COLUMNAS:
+            self.tree.heading(col, text=titulo)
+            self.tree.column(col, width=ancho, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=5)
+
+        self.lbl_contadores = tk.Label(self, anchor="w", justify="left")
+        self.lbl_contadores.pack(fill="x", padx=5, pady=5)
+        self._refrescar()
+
+    def _alternar(self):
+        if self.activo.get():
+            Profiling.enable()
+        else:
+            Profiling.disable()
+
+    def _reiniciar(self):
+        Profiling.reset()
+        self._refrescar(programar=False)
+
+    def _refrescar(self, programar=True):
+        """Vuelve a dibujar el resumen por etapa y los contadores."""
+        self.tree.delete(*self.tree.get_children())
+        for nombre, e in Profiling.summary().items():
+            self.tree.insert(
+                "",
+                "end",
+                text=nombre,
+                values=(
+                    e["category"],
+                    e["count"],
+                    f"{e['total_ms']:.2f}",
+                    f"{e['mean_ms']:.3f}",
+                    f"{e['max_ms']:.3f}",
+                ),
+            )
+        contadores = Profiling.counters()
+        self.lbl_contadores.config(
+            text="\n".join(f"{k}: {v}" for k, v in contadores.items())
+            or "Sin contadores registrados."
+        )
+        if programar:
+            self.after(self.intervalo_ms, self._refrescar)
+
+    def _exportar(self, exportador, extension, descripcion):
+        ruta = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=extension,
+            filetypes=[(descripcion, f"*{extension}")],
+        )
+        if not ruta:
+            return
+        try:
+            exportador(ruta)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo exportar: {e}", parent=self)
+
+    def _exportar_json(self):
+        self._exportar(Profiling.export_json, ".json", "JSON")
+
+    def _exportar_traza(self):
+        self._exportar(Profiling.export_chrome_trace, ".json", "Chrome trace")
+
+
+class VentanaComparacion(tk.Toplevel):
+    """
+    Compara varios modelos guardados.
+
+    Los modelos seleccionados se ajustan en paralelo en un pool de procesos
+    (ComparisonApp.comparar_modelos) desde un hilo aparte, para no bloquear
+    la interfaz. Muestra una grilla con R² y RMSE de cada familia por modelo
+    y superpone en una sola gráfica la curva elegida de cada uno, con una
+    muestra reducida de sus puntos.
+    """
+
+    def __init__(self, master, workers=None):
+        super().__init__(master)
+        self.title("Comparar Modelos")
+        self.geometry("1000x780")
+        self.workers = workers
+        self.nombres = {}
+        self.comparaciones = []
+        self._ids = []
+        self._resultado = None
+
+        frame_sel = tk.LabelFrame(self, text="Modelos guardados")
+        frame_sel.pack(fill="x", padx=10, pady=5)
+        self.filtro = tk.StringVar()
+        self.filtro.trace_add("write", self._filtrar)
+        tk.Entry(frame_sel, textvariable=self.filtro, font=("Arial", 11)).pack(
+            fill="x", padx=5, pady=5
+        )
+        frame_lista = tk.Frame(frame_sel)
+        frame_lista.pack(fill="x", padx=5)
+        self.lista = tk.Listbox(frame_lista, selectmode=tk.EXTENDED, height=8)
+        scroll_lista = tk.Scrollbar(
+            frame_lista, orient="vertical", command=self.lista.yview
+        )
+        self.lista.configure(yscrollcommand=scroll_lista.set)
+        self.lista.pack(side="left", fill="x", expand=True)
+        scroll_lista.pack(side="right", fill="y")
+
+        frame_btns = tk.Frame(frame_sel)
+        frame_btns.pack(fill="x", padx=5, pady=5)
+        self.btn_comparar = tk.Button(
+            frame_btns,
+            text="Comparar seleccionados",
+            command=self._comparar,
+            bg="#2e86de",
+            fg="white",
+        )
+        self.btn_comparar.pack(side="left")
+        self.lbl_estado = tk.Label(frame_btns, anchor="w")
+        self.lbl_estado.pack(side="left", fill="x", expand=True, padx=10)
+
+        familias = list(ModelsApp.FAMILIAS)
+        self.grilla = ttk.Treeview(
+            self, columns=["n"] + familias + ["mejor"], show="tree headings", height=8
+        )
+        self.grilla.heading("#0", text="Modelo")
+        self.grilla.column("#0", width=180)
+        self.grilla.heading("n", text="n")
+        self.grilla.column("n", width=70, anchor="e")
+        for familia in familias:
+            self.grilla.heading(familia, text=f"{familia} (R² | RMSE)")
+            self.grilla.column(familia, width=130, anchor="e")
+        self.grilla.heading("mejor", text="Mejor")
+        self.grilla.column("mejor", width=90)
+        self.grilla.pack(fill="x", padx=10, pady=5)
+
+        frame_graf = tk.Frame(self)
+        frame_graf.pack(fill="both", expand=True, padx=10, pady=5)
+        frame_familia = tk.Frame(frame_graf)
+        frame_familia.pack(fill="x")
+        tk.Label(frame_familia, text="Curva:").pack(side="left")
+        self.familia = tk.StringVar(value="Mejor")
+        selector = ttk.Combobox(
+            frame_familia,
+            textvariable=self.familia,
+            values=["Mejor"] + familias,
+            state="readonly",
+        )
+        selector.pack(side="left", padx=5)
+        selector.bind("<<ComboboxSelected>>", lambda e: self._dibujar())
+        fig = Figure(figsize=(8, 4), dpi=100)
+        self.ax = fig.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(fig, master=frame_graf)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        self._filtrar()
+
+    def _filtrar(self, *_):
+        """Lista los modelos guardados cuyo nombre coincide con el filtro."""
+        self.lista.delete(0, tk.END)
+        self._ids = []
+        for model_id, nombre in Queries.search_models(self.filtro.get()):
+            self._ids.append(model_id)
+            self.nombres[model_id] = nombre
+            self.lista.insert(tk.END, f"{nombre} (ID {model_id})")
+
+    def _comparar(self):
+        ids = [self._ids[i] for i in self.lista.curselection()]
+        if not ids:
+            messagebox.showwarning(
+                "Advertencia", "Seleccione al menos un modelo.", parent=self
+            )
+            return
+        self.btn_comparar.config(state=tk.DISABLED)
+        self.lbl_estado.config(text=f"Ajustando {len(ids)} modelos...")
+        self._resultado = None
+        threading.Thread(target=self._ajustar, args=(ids,), daemon=True).start()
+        self.after(100, self._esperar)
+
+    def _ajustar(self, ids):
+        """Se ejecuta en un hilo aparte; no toca widgets."""
+        try:
+            self._resultado = ComparisonApp.comparar_modelos(ids, self.workers)
+        except Exception as e:
+            self._resultado = e
+
+    def _esperar(self):
+        if self._resultado is None:
+            self.after(100, self._esperar)
+            return
+        self.btn_comparar.config(state=tk.NORMAL)
+        if isinstance(self._resultado, Exception):
+            self.lbl_estado.config(text="")
+            messagebox.showerror(
+                "Error", f"No se pudo comparar: {self._resultado}", parent=self
+            )
+            return
+        self.comparaciones = [c for c in self._resultado if c is not None]
+        self.lbl_estado.config(text=f"{len(self.comparaciones)} modelos comparados.")
+        self._llenar_grilla()
+        self._dibujar()
+
+    def _llenar_grilla(self):
+        self.grilla.delete(*self.grilla.get_children())
+        for c in self.comparaciones:
+            celdas = []
+            for familia in ModelsApp.FAMILIAS:
+                r = c["resultados"].get(familia)
+                if r is None or r.get("rmse") is None:
+                    celdas.append("-")
+                else:
+                    celdas.append(f"{r['r2']:.4f} | {r['rmse']:.4g}")
+            mejor = ComparisonApp.mejor_familia(c["resultados"]) or "-"
+            self.grilla.insert(
+                "",
+                "end",
+                text=self.nombres.get(c["id"], f"ID {c['id']}"),
+                values=[c["n"]] + celdas + [mejor],
+            )
+
+    def _dibujar(self):
+        """Superpone la muestra reducida y la curva elegida de cada modelo."""
+        self.ax.clear()
+        for i, c in enumerate(self.comparaciones):
+            color = f"C{i % 10}"
+            nombre = self.nombres.get(c["id"], f"ID {c['id']}")
+            familia = self.familia.get()
+            if familia == "Mejor":
+                familia = ComparisonApp.mejor_familia(c["resultados"])
+            mx, my = c["muestra"]
+            self.ax.scatter(mx, my, s=6, color=color, alpha=0.35)
+            puntos = ComparisonApp.curva(c, familia) if familia else None
+            if puntos is not None:
+                self.ax.plot(*puntos, color=color, label=f"{nombre}: {familia}")
+        self.ax.set_title("Comparación de modelos")
+        self.ax.set_xlabel("X")
+        self.ax.set_ylabel("y")
+        if 0 < len(self.comparaciones) <= 15:
+            self.ax.legend(fontsize=8)
+        with Profiling.timer("AppGUI.comparacion.draw", "plot"):
+            self.canvas.draw()
+
+
+class VentanaDiagnostico(tk.Toplevel):
+    """
+    Diagnóstico de residuos de los modelos calculados.
+
+    Muestra para la familia elegida los residuos o los residuos
+    estandarizados frente a los valores ajustados, o la palanca o la
+    distancia de Cook por observación, junto con el estadístico de
+    Durbin-Watson. Cada vista se calcula al mostrarla por primera vez
+    (DiagnosticsApp.Diagnosticos, para todas las familias a la vez) y los
+    puntos dibujados se reducen con ComparisonApp.reducir_puntos.
+    """
+
+    VISTAS = (
+        ("residuos", "Residuos"),
+        ("estandarizados", "Estandarizados"),
+        ("palanca", "Palanca"),
+        ("cook", "Distancia de Cook"),
+    )
+
+    def __init__(self, master, xs, ys, resultados, familia=None):
+        super().__init__(master)
+        self.title("Diagnóstico de residuos")
+        self.geometry("900x600")
+        self.diagnosticos = DiagnosticsApp.Diagnosticos(xs, ys, resultados)
+        familias = self.diagnosticos.familias
+
+        frame_sel = tk.Frame(self)
+        frame_sel.pack(fill="x", padx=10, pady=5)
+        tk.Label(frame_sel, text="Familia:").pack(side="left")
+        self.familia = tk.StringVar(
+            value=familia if familia in familias else familias[0]
+        )
+        selector = ttk.Combobox(
+            frame_sel, textvariable=self.familia, values=familias, state="readonly"
+        )
+        selector.pack(side="left", padx=5)
+        selector.bind("<<ComboboxSelected>>", lambda e: self._dibujar())
+        self.vista = tk.StringVar(value="residuos")
+        for valor, texto in self.VISTAS:
+            tk.Radiobutton(
+                frame_sel,
+                text=texto,
+                value=valor,
+                variable=self.vista,
+                command=self._dibujar,
+            ).pack(side="left", padx=5)
+
+        fig = Figure(figsize=(8, 4), dpi=100)
+        self.ax = fig.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(fig, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10)
+        self.lbl_info = tk.Label(self, anchor="w", justify="left")
+        self.lbl_info.pack(fill="x", padx=10, pady=5)
+        self._dibujar()
+
+    def _dibujar(self):
+        familia, vista = self.familia.get(), self.vista.get()
+        d = self.diagnosticos
+        valores = d.obtener(vista, familia)
+        self.ax.clear()
+        if vista in ("residuos", "estandarizados"):
+            x = d.ajustados(familia)
+            self.ax.set_xlabel("Valor ajustado")
+            self.ax.axhline(0.0, color="#7f8c8d", linewidth=1)
+        else:
+            x = np.arange(d.n)
+            self.ax.set_xlabel("Observación")
+            p = len(ModelsApp.FAMILIAS[familia].BASE)
+            umbral = 4.0 / d.n if vista == "cook" else 2.0 * p / d.n
+            self.ax.axhline(umbral, color="#e74c3c", linewidth=1, linestyle="--")
+        mx, my = ComparisonApp.reducir_puntos(x, valores)
+        self.ax.scatter(mx, my, s=8, color="#2980b9")
+        titulo = dict(self.VISTAS)[vista]
+        self.ax.set_title(f"{titulo} - {familia}")
+        self.ax.set_ylabel(titulo)
+        with Profiling.timer("AppGUI.diagnostico.draw", "plot"):
+            self.canvas.draw()
+
+        info = f"Durbin-Watson: {d.obtener('durbin_watson', familia):.4f}"
+        if vista == "cook":
+            influyentes = int(np.count_nonzero(valores > 4.0 / d.n))
+            info += f" | Puntos con D > 4/n: {influyentes}"
+        self.lbl_info.config(text=info)
+
+
+def search_models(
+    container,
+    txt_x,
+    txt_y,
+    id_session_var,
+    btn_editar,
+    preview_callback=None,
+    tabla_paginada=None,
+):
     """
     Crea la UI de búsqueda de modelos en la base de datos.
 
@@ -63,9 +734,13 @@ def search_models(container, txt_x, txt_y, id_session_var, btn_editar):
         txt_y: Widget de texto para valores Y
         id_session_var: Variable IntVar para guardar el ID del modelo seleccionado
         btn_editar: Botón de editar que se habilitará al seleccionar un modelo
+        preview_callback: Función opcional (id, nombre) para la vista previa
+            del modelo a partir de su resumen, sin cargar todos los datos
+        tabla_paginada: TablaPaginada opcional donde se cargan los modelos grandes
 
     Returns:
-        Tupla (frame_search, entry_search) con el frame y el entry de búsqueda
+        Tupla (frame_search, entry_search, update_search_results) con el
+        frame, el entry de búsqueda y la función que actualiza los resultados
     """
     frame_search = tk.LabelFrame(container, text="Buscar Modelo en Base de Datos")
     frame_search.pack(fill="x", padx=10, pady=5)
@@ -131,26 +806,44 @@ def search_models(container, txt_x, txt_y, id_session_var, btn_editar):
 
             def use_model(mid=model_id, mname=model_name):
                 """Carga el modelo seleccionado en los campos X e Y."""
-                xy_data = Queries.get_model_xy_by_id(mid)
-                if xy_data:
+                tamano = Queries.get_model_payload_size(mid)
+                if not tamano:
+                    messagebox.showerror("Error", "No se pudo cargar el modelo.")
+                    return
+
+                if tabla_paginada is not None and max(tamano) > UMBRAL_PAGINADO:
+                    # Modelo grande: se lee por bloques y se muestra paginado
+                    try:
+                        xs, ys = OperationsApp.cargar_arrays_modelo(mid)
+                    except ValueError as e:
+                        messagebox.showerror("Error", str(e))
+                        return
+                    txt_x.delete("1.0", tk.END)
+                    txt_y.delete("1.0", tk.END)
+                    tabla_paginada.activar(xs, ys)
+                else:
+                    xy_data = Queries.get_model_xy_by_id(mid)
+                    if not xy_data:
+                        messagebox.showerror("Error", "No se pudo cargar el modelo.")
+                        return
+                    if tabla_paginada is not None:
+                        tabla_paginada.desactivar()
                     x_str, y_str = xy_data
                     txt_x.delete("1.0", tk.END)
                     txt_x.insert("1.0", x_str)
                     txt_y.delete("1.0", tk.END)
                     txt_y.insert("1.0", y_str)
 
-                    # Guardar ID en variable de sesión
-                    id_session_var.set(mid)
+                # Guardar ID en variable de sesión
+                id_session_var.set(mid)
 
-                    # Habilitar botón editar
-                    btn_editar.config(state=tk.NORMAL)
+                # Habilitar botón editar
+                btn_editar.config(state=tk.NORMAL)
 
-                    messagebox.showinfo(
-                        "Modelo Cargado",
-                        f"Modelo '{mname}' (ID: {mid}) cargado exitosamente.",
-                    )
-                else:
-                    messagebox.showerror("Error", "No se pudo cargar el modelo.")
+                messagebox.showinfo(
+                    "Modelo Cargado",
+                    f"Modelo '{mname}' (ID: {mid}) cargado exitosamente.",
+                )
 
             def delete_model(mid=model_id, mname=model_name):
                 """Elimina el modelo de la base de datos con confirmación."""
@@ -171,6 +864,8 @@ def search_models(container, txt_x, txt_y, id_session_var, btn_editar):
                                 btn_editar.config(state=tk.DISABLED)
                                 txt_x.delete("1.0", tk.END)
                                 txt_y.delete("1.0", tk.END)
+                                if tabla_paginada is not None:
+                                    tabla_paginada.desactivar()
 
                             messagebox.showinfo(
                                 "Éxito",
@@ -206,10 +901,23 @@ def search_models(container, txt_x, txt_y, id_session_var, btn_editar):
             )
             btn_use.pack(side="right", padx=2)
 
+            if preview_callback is not None:
+                btn_preview = tk.Button(
+                    frame_result,
+                    text="Vista previa",
+                    command=lambda mid=model_id, mname=model_name: preview_callback(
+                        mid, mname
+                    ),
+                    bg="#8e44ad",
+                    fg="white",
+                    width=10,
+                )
+                btn_preview.pack(side="right", padx=2)
+
     # Vincular evento de escritura al entry
     entry_search.bind("<KeyRelease>", update_search_results)
 
-    return frame_search, entry_search
+    return frame_search, entry_search, update_search_results
 
 
 def crear_titulo(container):
@@ -264,6 +972,10 @@ def crear_botones(
     limpiar_callback,
     guardar_callback,
     editar_callback,
+    rendimiento_callback=None,
+    comparar_callback=None,
+    exportar_callback=None,
+    diagnostico_callback=None,
 ):
     """
     Crea los botones de la aplicación.
@@ -275,6 +987,11 @@ def crear_botones(
         limpiar_callback: Función a llamar al presionar "Limpiar"
         guardar_callback: Función a llamar al presionar "Guardar"
         editar_callback: Función a llamar al presionar "Editar"
+        rendimiento_callback: Función a llamar al presionar "Rendimiento" (opcional)
+        comparar_callback: Función a llamar al presionar "Comparar" (opcional)
+        exportar_callback: Función a llamar al presionar "Exportar" (opcional)
+        diagnostico_callback: Función a llamar al presionar "Diagnóstico"
+            (opcional)
 
     Returns:
         Tupla (btn_guardar, btn_editar) con los botones de base de datos
@@ -302,6 +1019,26 @@ def crear_botones(
         frame_btns, text="Limpiar", command=limpiar_callback, bg="#c0392b", fg="white"
     ).pack(side="left", padx=5)
 
+    if comparar_callback is not None:
+        tk.Button(frame_btns, text="Comparar", command=comparar_callback).pack(
+            side="left", padx=5
+        )
+
+    if diagnostico_callback is not None:
+        tk.Button(frame_btns, text="Diagnóstico", command=diagnostico_callback).pack(
+            side="left", padx=5
+        )
+
+    if exportar_callback is not None:
+        tk.Button(frame_btns, text="Exportar", command=exportar_callback).pack(
+            side="left", padx=5
+        )
+
+    if rendimiento_callback is not None:
+        tk.Button(frame_btns, text="Rendimiento", command=rendimiento_callback).pack(
+            side="left", padx=5
+        )
+
     # Botones de base de datos a la derecha
     btn_editar = tk.Button(
         frame_btns,
@@ -343,11 +1080,8 @@ def crear_tabla_metodos(container, metodo_seleccionado):
 
     rows = {}
     nombres = [
-        ("Lineal", "Regresión Lineal"),
-        ("Exponencial", "Regresión Exponencial"),
-        ("Potencial", "Regresión Potencial"),
-        ("Logaritmica", "Regresión Logarítmica"),
-        ("Polinomial_2", "Regresión Polinomial Grado 2"),
+        (clave, f"Regresión {clase.ETIQUETA}")
+        for clave, clase in ModelsApp.FAMILIAS.items()
     ]
 
     for i, (key, name) in enumerate(nombres, start=1):
@@ -443,20 +1177,8 @@ def actualizar_tabla(rows, resultados):
             comps["rmse"].config(text=f"{r['rmse']:.4f}")
             comps["mse"].config(text=f"{r['mse']:.4f}")
 
-            if key == "Lineal":
-                comps["formula"].config(
-                    text=f"y = {r['intercept']:.4f} + {r['coef']:.4f}x"
-                )
-            elif key == "Exponencial":
-                comps["formula"].config(text=f"y = {r['a']:.4f} * e^{r['b']:.4f}x")
-            elif key == "Potencial":
-                comps["formula"].config(text=f"y = {r['a']:.4f} * x^{r['b']:.4f}")
-            elif key == "Logaritmica":
-                comps["formula"].config(text=f"y = {r['a']:.4f} + {r['b']:.4f}*ln(x)")
-            elif key == "Polinomial_2":
-                comps["formula"].config(
-                    text=f"y = {r['a']:.4f} + {r['b']:.4f}x + {r['c']:.4f}x²"
-                )
+            modelo = ModelsApp.modelo_desde_resultado(key, r)
+            comps["formula"].config(text=modelo.formula(decimales=4))
 
             comps["name"].config(fg="green" if key == mejor_key else "black")
         else:
@@ -467,6 +1189,7 @@ def actualizar_tabla(rows, resultados):
             comps["name"].config(fg="black")
 
 
+@Profiling.timed("plot")
 def mostrar_grafico(ax, canvas, lbl_info, metodo, resultados, xs, ys):
     """
     Muestra el gráfico del modelo seleccionado junto con su información.
@@ -484,8 +1207,8 @@ def mostrar_grafico(ax, canvas, lbl_info, metodo, resultados, xs, ys):
         messagebox.showerror("Error", "Primero calcule los modelos.")
         return False
 
-    X = np.array(xs)
-    y = np.array(ys)
+    X = np.asarray(xs, dtype=float)
+    y = np.asarray(ys, dtype=float)
     r = resultados[metodo]
 
     ax.clear()
@@ -495,23 +1218,11 @@ def mostrar_grafico(ax, canvas, lbl_info, metodo, resultados, xs, ys):
     x_min, x_max = X.min(), X.max()
     X_grid = np.linspace(x_min, x_max, 200)
 
-    if metodo == "Lineal":
-        y_line = r["intercept"] + r["coef"] * X_grid
-        formula = f"y = {r['intercept']:.6f} + {r['coef']:.6f}x"
-    elif metodo == "Exponencial":
-        y_line = r["a"] * np.exp(r["b"] * X_grid)
-        formula = f"y = {r['a']:.6f} * e^{r['b']:.6f}x"
-    elif metodo == "Potencial":
-        y_line = r["a"] * np.power(X_grid, r["b"])
-        formula = f"y = {r['a']:.6f} * x^{r['b']:.6f}"
-    elif metodo == "Logaritmica":
-        y_line = r["a"] + r["b"] * np.log(X_grid)
-        formula = f"y = {r['a']:.6f} + {r['b']:.6f}*ln(x)"
-    elif metodo == "Polinomial_2":
-        y_line = r["a"] + r["b"] * X_grid + r["c"] * X_grid**2
-        formula = f"y = {r['a']:.6f} + {r['b']:.6f}x + {r['c']:.6f}x²"
-
-    ax.plot(X_grid, y_line, color="#e74c3c", label="Modelo")  # type: ignore
+    modelo = ModelsApp.modelo_desde_resultado(metodo, r)
+    y_line = modelo.predict(X_grid)
+    formula = modelo.formula()
+
+    ax.plot(X_grid, y_line, color="#e74c3c", label="Modelo")
 
     ax.set_title("Modelo Seleccionado")
     ax.set_xlabel("X")
@@ -522,17 +1233,67 @@ def mostrar_grafico(ax, canvas, lbl_info, metodo, resultados, xs, ys):
     if y.max() / max(y.min(), 1e-9) > 100:  # heurística
         ax.set_yscale("log")
 
-    canvas.draw()
+    with Profiling.timer("AppGUI.canvas.draw", "plot"):
+        canvas.draw()
 
     info = (
         f"Método: {metodo}\n"
-        f"Fórmula: {formula}\n"  # type: ignore
+        f"Fórmula: {formula}\n"
         f"R2: {r['r2']:.6f} | MSE: {r['mse']:.6f} | RMSE: {r['rmse']:.6f}"
     )
     lbl_info.config(text=info)
     return True
 
 
+@Profiling.timed("plot")
+def mostrar_resumen(ax, canvas, lbl_info, nombre, resumen):
+    """
+    Muestra la vista previa de un modelo guardado usando solo su resumen.
+
+    Grafica la muestra de reservorio y la recta lineal obtenida de los
+    estadísticos suficientes; las métricas son las rápidas del resumen.
+
+    Args:
+        ax: Ejes del gráfico matplotlib
+        canvas: Canvas de matplotlib
+        lbl_info: Label donde se mostrará la información
+        nombre: Nombre del modelo guardado
+        resumen: Diccionario retornado por OperationsApp.calcular_resumen
+    """
+    mx = np.asarray(resumen["muestra"]["x"], dtype=float)
+    my = np.asarray(resumen["muestra"]["y"], dtype=float)
+    rapidos = OperationsApp.calcular_modelos_desde_resumen(resumen)
+    r = rapidos["Lineal"]
+    lineal = ModelsApp.modelo_desde_resultado("Lineal", r)
+
+    ax.clear()
+    ax.scatter(
+        mx, my, color="#2980b9", s=8, label=f"Muestra ({mx.size} de {resumen['n']})"
+    )
+    X_grid = np.linspace(resumen["x"]["min"], resumen["x"]["max"], 200)
+    ax.plot(X_grid, lineal.predict(X_grid), color="#e74c3c", label="Lineal")
+    ax.set_title(f"Vista previa: {nombre}")
+    ax.set_xlabel("X")
+    ax.set_ylabel("y")
+    ax.legend()
+    with Profiling.timer("AppGUI.canvas.draw", "plot"):
+        canvas.draw()
+
+    validos = {
+        k: v for k, v in rapidos.items() if v is not None and v["rmse"] is not None
+    }
+    mejor = min(validos, key=lambda k: validos[k]["rmse"])
+    info = (
+        f"Vista previa: {nombre} ({resumen['n']} pares)\n"
+        f"X: [{resumen['x']['min']:.4f}, {resumen['x']['max']:.4f}] | "
+        f"y: [{resumen['y']['min']:.4f}, {resumen['y']['max']:.4f}] | "
+        f"mediana y: {resumen['y']['cuantiles'][resumen['cuantiles'].index(0.5)]:.4f}\n"
+        f"Lineal: {lineal.formula()} | R2: {r['r2']:.6f} | "
+        f"Mejor (RMSE estimado): {mejor}"
+    )
+    lbl_info.config(text=info)
+
+
 def limpiar_interfaz(txt_x, txt_y, rows, ax, canvas, lbl_info, lbl_titulo, resultados):
     """
     Limpia todos los datos de la interfaz.
@@ -597,6 +1358,8 @@ def inicializar_interfaz(master):
 
     # Crear inputs primero (necesarios para search_models)
     txt_x, txt_y, frame_inputs = crear_inputs(container)
+    tabla_datos = TablaPaginada(frame_inputs, (txt_x.master, txt_y.master))
+    datos_sesion = DatosSesion(txt_x, txt_y, tabla_datos)
 
     # Crear placeholder para btn_editar
     btn_editar = None
@@ -604,8 +1367,7 @@ def inicializar_interfaz(master):
     # Definir callbacks que usan OperationsApp
     def calcular_modelos_callback():
         try:
-            xs = OperationsApp.parse_numbers(txt_x.get("1.0", tk.END))
-            ys = OperationsApp.parse_numbers(txt_y.get("1.0", tk.END))
+            xs, ys = datos_sesion.arrays()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
             return
@@ -620,17 +1382,15 @@ def inicializar_interfaz(master):
         n = len(xs)
         lbl_titulo.config(text=f"Modelos ({n} pares de datos)")
 
-        # Calcular todos los modelos usando OperationsApp
-        resultados_calc = OperationsApp.calcular_todos_modelos(xs, ys)
+        # Reutiliza o actualiza el último cálculo si los datos no cambiaron
+        resultados_calc = datos_sesion.modelos()
 
         # Mostrar advertencias para los modelos que no son aplicables
-        advertencias = []
-        if resultados_calc["Exponencial"] is None:
-            advertencias.append("Exponencial (todos los y deben ser > 0)")
-        if resultados_calc["Potencial"] is None:
-            advertencias.append("Potencial (todos los x e y deben ser > 0)")
-        if resultados_calc["Logaritmica"] is None:
-            advertencias.append("Logarítmica (todos los x deben ser > 0)")
+        advertencias = [
+            clase.advertencia()
+            for clave, clase in ModelsApp.FAMILIAS.items()
+            if resultados_calc.get(clave) is None
+        ]
 
         if advertencias:
             mensaje = "Métodos omitidos:\n- " + "\n- ".join(advertencias)
@@ -644,8 +1404,7 @@ def inicializar_interfaz(master):
     def mostrar_grafica_callback():
         metodo = metodo_seleccionado.get()
         try:
-            xs = OperationsApp.parse_numbers(txt_x.get("1.0", tk.END))
-            ys = OperationsApp.parse_numbers(txt_y.get("1.0", tk.END))
+            xs, ys = datos_sesion.arrays()
         except ValueError as e:
             messagebox.showerror("Error", str(e))
             return
@@ -655,10 +1414,69 @@ def inicializar_interfaz(master):
 
         mostrar_grafico(ax, canvas, lbl_info, metodo, resultados, xs, ys)
 
+    def diagnostico_callback():
+        """Abre el diagnóstico de residuos de los modelos calculados."""
+        if not resultados:
+            messagebox.showerror("Error", "Primero calcule los modelos.")
+            return
+        try:
+            xs, ys = datos_sesion.arrays()
+            VentanaDiagnostico(
+                master, xs, ys, datos_sesion.modelos(), metodo_seleccionado.get()
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+
+    def exportar_callback():
+        """Exporta datos, predicciones, residuos y métricas en segundo plano."""
+        if not resultados:
+            messagebox.showerror("Error", "Primero calcule los modelos.")
+            return
+        ruta = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"),
+                ("JSON", "*.json"),
+                ("NumPy NPZ", "*.npz"),
+            ],
+        )
+        if not ruta:
+            return
+        try:
+            xs, ys = datos_sesion.arrays()
+            # Mismos datos que los ajustes (se recalculan si cambiaron)
+            exportacion = ExportApp.exportar_en_segundo_plano(
+                ruta, xs, ys, datos_sesion.modelos()
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        def esperar():
+            if not exportacion.terminada():
+                filas, total = exportacion.progreso()
+                if total:
+                    lbl_info.config(text=f"Exportando... {100 * filas // total}%")
+                master.after(200, esperar)
+                return
+            try:
+                informe = exportacion.resultado()
+            except (OSError, ValueError) as e:
+                lbl_info.config(text="")
+                messagebox.showerror("Error", f"No se pudo exportar: {e}")
+                return
+            lbl_info.config(text=f"Exportado: {informe['ruta']}")
+            messagebox.showinfo(
+                "Éxito", f"{informe['filas']} filas exportadas a {informe['ruta']}."
+            )
+
+        esperar()
+
     def limpiar_callback():
         limpiar_interfaz(
             txt_x, txt_y, rows, ax, canvas, lbl_info, lbl_titulo, resultados
         )
+        tabla_datos.desactivar()
         # Limpiar id_session y deshabilitar botón editar
         id_session.set(0)
         if btn_editar:
@@ -668,8 +1486,7 @@ def inicializar_interfaz(master):
         """Guarda un nuevo modelo en la base de datos."""
         # Obtener valores actuales de X e Y
         try:
-            xs = OperationsApp.parse_numbers(txt_x.get("1.0", tk.END))
-            ys = OperationsApp.parse_numbers(txt_y.get("1.0", tk.END))
+            xs, ys = datos_sesion.arrays()
         except ValueError as e:
             messagebox.showerror("Error", f"Datos inválidos: {e}")
             return
@@ -704,12 +1521,16 @@ def inicializar_interfaz(master):
                 return
 
             try:
-                # Convertir listas a strings separados por comas
-                x_str = ",".join(str(x) for x in xs)
-                y_str = ",".join(str(y) for y in ys)
-
-                # Insertar nuevo modelo
-                new_id = Queries.insert_model(model_name, x_str, y_str)
+                # Insertar nuevo modelo junto con su resumen. Los conjuntos
+                # grandes van a la tabla de puntos (ediciones por diferencias)
+                resumen = OperationsApp.calcular_resumen(xs, ys)
+                new_id = Queries.insert_model(
+                    model_name,
+                    xs,
+                    ys,
+                    resumen,
+                    store_points=len(xs) > UMBRAL_TABLA_PUNTOS,
+                )
 
                 # Actualizar id_session con el nuevo ID
                 id_session.set(new_id)
@@ -761,8 +1582,7 @@ def inicializar_interfaz(master):
 
         # Obtener valores actuales de X e Y
         try:
-            xs = OperationsApp.parse_numbers(txt_x.get("1.0", tk.END))
-            ys = OperationsApp.parse_numbers(txt_y.get("1.0", tk.END))
+            xs, ys = datos_sesion.arrays()
         except ValueError as e:
             messagebox.showerror("Error", f"Datos inválidos: {e}")
             return
@@ -779,12 +1599,9 @@ def inicializar_interfaz(master):
             return
 
         try:
-            # Convertir listas a strings separados por comas
-            x_str = ",".join(str(x) for x in xs)
-            y_str = ",".join(str(y) for y in ys)
-
-            # Actualizar modelo existente
-            success = Queries.update_model_xy(current_id, x_str, y_str)
+            # Actualizar modelo existente y su resumen
+            resumen = OperationsApp.calcular_resumen(xs, ys)
+            success = Queries.update_model_xy(current_id, xs, ys, resumen)
 
             if success:
                 messagebox.showinfo(
@@ -797,6 +1614,23 @@ def inicializar_interfaz(master):
         except Exception as e:
             messagebox.showerror("Error", f"Error al actualizar: {e}")
 
+    def vista_previa_callback(model_id, model_name):
+        """Muestra la vista previa de un modelo guardado desde su resumen."""
+        try:
+            resumen = Queries.get_model_summary_by_id(model_id)
+            if resumen is None:
+                # Modelos guardados antes de existir el resumen: se calcula una vez
+                xs, ys = OperationsApp.cargar_arrays_modelo(model_id)
+                if xs.size == 0:
+                    messagebox.showerror("Error", "No se pudo cargar el modelo.")
+                    return
+                resumen = OperationsApp.calcular_resumen(xs, ys)
+                Queries.update_model_summary(model_id, resumen)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo obtener el resumen: {e}")
+            return
+        mostrar_resumen(ax, canvas, lbl_info, model_name, resumen)
+
     # Crear botones (retorna los botones de DB)
     btn_guardar, btn_editar = crear_botones(
         container,
@@ -805,11 +1639,21 @@ def inicializar_interfaz(master):
         limpiar_callback,
         guardar_callback,
         editar_callback,
+        lambda: PanelRendimiento(master),
+        lambda: VentanaComparacion(master),
+        exportar_callback,
+        diagnostico_callback,
     )
 
     # Ahora crear la búsqueda (necesita btn_editar y los txt_x, txt_y)
-    frame_search, entry_search = search_models(
-        container, txt_x, txt_y, id_session, btn_editar
+    frame_search, entry_search, buscar_callback = search_models(
+        container,
+        txt_x,
+        txt_y,
+        id_session,
+        btn_editar,
+        vista_previa_callback,
+        tabla_datos,
     )
 
     # Reordenar: búsqueda debe estar después del título y antes de los inputs
@@ -829,6 +1673,8 @@ def inicializar_interfaz(master):
         "metodo_seleccionado": metodo_seleccionado,
         "txt_x": txt_x,
         "txt_y": txt_y,
+        "tabla_datos": tabla_datos,
+        "datos_sesion": datos_sesion,
         "rows": rows,
         "fig": fig,
         "ax": ax,
@@ -838,4 +1684,9 @@ def inicializar_interfaz(master):
         "id_session": id_session,
         "btn_editar": btn_editar,
         "btn_guardar": btn_guardar,
+        "entry_search": entry_search,
+        # Callbacks de los botones y de la búsqueda (p. ej. para medir latencias)
+        "calcular_callback": calcular_modelos_callback,
+        "graficar_callback": mostrar_grafica_callback,
+        "buscar_callback": buscar_callback,
     }
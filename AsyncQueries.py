@@ -0,0 +1,273 @@
+"""
+asyncio variant of the Queries API.
+
+Every call is queued to one dedicated database thread, so coroutines (the
+HTTP service, batch jobs) can overlap database access with fitting without
+blocking the event loop or spawning a thread per query. Functions keep the
+names and arguments of their Queries counterpart and return awaitables:
+
+    xy = await AsyncQueries.get_model_xy_by_id(model_id)
+
+Adjacent reads of model payloads waiting in the queue are coalesced: a run
+of get_model_xy_by_id (or get_model_xy_binary) requests is served with one
+Queries.get_models_xy call, one connection and one IN (...) query.
+iter_models_xy keeps the next payloads queued while the caller works on
+the current one.
+
+Calls taking a conn argument (see Queries.transaction) cannot receive one
+here: sqlite3 connections belong to the thread that created them.
+"""
+
+import asyncio
+import functools
+import queue
+import threading
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+import Profiling
+import Queries
+
+# Requests taken from the queue in one pass of the database thread
+MAX_BATCH = 64
+
+# Read functions whose adjacent requests are served by one batched call,
+# mapped to the keyword arguments of Queries.get_models_xy
+_BATCHED = {
+    Queries.get_model_xy_by_id: {"binary": False},
+    Queries.get_model_xy_binary: {"binary": True},
+}
+
+
+def _batchable(request) -> bool:
+    """True for a read called with only a model id, which can be merged."""
+    func, args, kwargs = request[:3]
+    return func in _BATCHED and len(args) == 1 and not kwargs
+
+
+def _resolve(future: asyncio.Future, result=None, error=None) -> None:
+    """Complete a future on its event loop unless it is already done."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _deliver(request, result=None, error=None) -> None:
+    """
+    Hand a result (or error) to the event loop of a request. If that loop
+    was closed meanwhile (e.g. its caller timed out and asyncio.run ended),
+    nobody is waiting and the result is dropped.
+    """
+    try:
+        request[3].call_soon_threadsafe(_resolve, request[4], result, error)
+    except RuntimeError:
+        pass
+
+
+class DatabaseThread:
+    """
+    Single thread running Queries calls taken from a request queue.
+
+    Requests carry the future and event loop of their caller, so one thread
+    serves any number of event loops; results for loops that have closed
+    are dropped. The thread starts on the first submit and stops with
+    close(); if it ever dies, the next submit starts a new one.
+    """
+
+    def __init__(self, max_batch: int = MAX_BATCH):
+        self.max_batch = max_batch
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs) -> asyncio.Future:
+        """
+        Queue func(*args, **kwargs) for the database thread.
+        Must be called from a running event loop; returns a future of it.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="queries-db", daemon=True
+                )
+                self._thread.start()
+            self._queue.put((func, args, kwargs, loop, future))
+        return future
+
+    def close(self) -> None:
+        """Serve the requests already queued, then stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(None)
+        thread.join()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                request = self._queue.get()
+                if request is None:
+                    return
+                batch = [request]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        request = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if request is None:
+                        stop = True
+                        break
+                    batch.append(request)
+                try:
+                    self._serve(batch)
+                except Exception as error:
+                    # A failure outside the calls themselves: fail the batch
+                    # (requests already answered are skipped) and go on
+                    for request in batch:
+                        _deliver(request, error=error)
+                if stop:
+                    return
+        finally:
+            with self._lock:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+    def _serve(self, batch) -> None:
+        """Run a batch in order, merging adjacent batchable reads."""
+        start = 0
+        while start < len(batch):
+            func = batch[start][0]
+            end = start + 1
+            if _batchable(batch[start]):
+                while (
+                    end < len(batch)
+                    and batch[end][0] is func
+                    and _batchable(batch[end])
+                ):
+                    end += 1
+            group = [r for r in batch[start:end] if not r[4].cancelled()]
+            if len(group) > 1:
+                Profiling.count("AsyncQueries.batched_reads", len(group))
+                self._complete(
+                    group,
+                    Queries.get_models_xy,
+                    ([r[1][0] for r in group],),
+                    _BATCHED[func],
+                )
+            else:
+                for request in group:
+                    self._complete([request], *request[:3])
+            start = end
+
+    @staticmethod
+    def _complete(requests, func, args, kwargs) -> None:
+        """Run one call and hand its result (or error) to each request."""
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            for request in requests:
+                _deliver(request, error=error)
+            return
+        results = result if len(requests) > 1 else [result]
+        for request, value in zip(requests, results):
+            _deliver(request, value)
+
+
+_default = DatabaseThread()
+
+
+def shutdown() -> None:
+    """Stop the shared database thread (it restarts on the next call)."""
+    _default.close()
+
+
+def _async_variant(func):
+    """Coroutine function running func on the shared database thread."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await _default.submit(func, *args, **kwargs)
+
+    return wrapper
+
+
+search_models = _async_variant(Queries.search_models)
+list_models = _async_variant(Queries.list_models)
+get_model_xy_by_id = _async_variant(Queries.get_model_xy_by_id)
+get_model_xy_binary = _async_variant(Queries.get_model_xy_binary)
+get_models_xy = _async_variant(Queries.get_models_xy)
+get_model_summary_by_id = _async_variant(Queries.get_model_summary_by_id)
+get_model_payload_size = _async_variant(Queries.get_model_payload_size)
+get_points_range = _async_variant(Queries.get_points_range)
+get_model_point_count = _async_variant(Queries.get_model_point_count)
+get_fitted_models = _async_variant(Queries.get_fitted_models)
+insert_model = _async_variant(Queries.insert_model)
+insert_models = _async_variant(Queries.insert_models)
+update_model_xy = _async_variant(Queries.update_model_xy)
+update_models = _async_variant(Queries.update_models)
+update_model_summary = _async_variant(Queries.update_model_summary)
+update_points = _async_variant(Queries.update_points)
+delete_model = _async_variant(Queries.delete_model)
+delete_models = _async_variant(Queries.delete_models)
+save_fitted_models = _async_variant(Queries.save_fitted_models)
+
+
+async def iter_models_xy(
+    model_ids: Iterable[int], depth: int = 4, binary: bool = False
+) -> AsyncIterator[Tuple[int, Optional[tuple]]]:
+    """
+    Yield (model_id, xy) in order, keeping up to depth reads queued ahead so
+    the next payloads load while the caller processes the current one.
+    xy is as returned by get_model_xy_by_id (get_model_xy_binary with
+    binary=True), None for missing models.
+    Raises ValueError if depth < 1.
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1.")
+    read = get_model_xy_binary if binary else get_model_xy_by_id
+    pending = []
+    ids = iter(model_ids)
+    try:
+        for model_id in ids:
+            pending.append((model_id, asyncio.ensure_future(read(model_id))))
+            if len(pending) >= depth:
+                model_id, task = pending.pop(0)
+                yield model_id, await task
+        while pending:
+            model_id, task = pending.pop(0)
+            yield model_id, await task
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+__all__ = [
+    "DatabaseThread",
+    "shutdown",
+    "iter_models_xy",
+    "search_models",
+    "list_models",
+    "get_model_xy_by_id",
+    "get_model_xy_binary",
+    "get_models_xy",
+    "get_model_summary_by_id",
+    "get_model_payload_size",
+    "get_points_range",
+    "get_model_point_count",
+    "get_fitted_models",
+    "insert_model",
+    "insert_models",
+    "update_model_xy",
+    "update_models",
+    "update_model_summary",
+    "update_points",
+    "delete_model",
+    "delete_models",
+    "save_fitted_models",
+]
@@ -0,0 +1,144 @@
+"""
+Compact binary interchange format for numeric columns (datasets and results).
+
+Layout (little-endian):
+    24-byte header: magic b"LRMB", version (u8), dtype code (u8), reserved (u16),
+                    number of columns (u32), metadata length (u32), rows (u64)
+    metadata:       optional UTF-8 JSON, zero-padded to a multiple of 8 bytes
+    columns:        one contiguous block of `rows` values per column
+
+Columns are decoded with numpy.frombuffer, so reading never copies the
+values, and encode_parts() exposes the column buffers without copying them
+for writers that accept a sequence of buffers (sockets, asyncio writers).
+"""
+
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+MAGIC = b"LRMB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBHIIQ")
+HEADER_SIZE = _HEADER.size
+
+# Supported dtypes and their codes in the header
+DTYPES = {1: np.dtype("<f8"), 2: np.dtype("<f4")}
+_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def is_binary(data: Any) -> bool:
+    """
+    True if data is a buffer that starts with the binary format magic.
+    """
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        return False
+    return bytes(data[:4]) == MAGIC
+
+
+def _padded(meta: bytes) -> bytes:
+    return meta + b"\0" * (-len(meta) % 8)
+
+
+def encode_parts(
+    columns: Sequence, meta: Optional[Dict[str, Any]] = None, dtype="<f8"
+) -> List[Buffer]:
+    """
+    Encode equally long numeric columns as a list of buffers: the header
+    (plus metadata) followed by one buffer per column. Columns that are
+    already contiguous arrays of the requested dtype are not copied.
+    Raises ValueError if the columns have different lengths.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in _CODES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    arrays = [np.ascontiguousarray(c, dtype=dtype).ravel() for c in columns]
+    rows = arrays[0].size if arrays else 0
+    if any(a.size != rows for a in arrays):
+        raise ValueError("All columns must have the same length.")
+    meta_bytes = _padded(json.dumps(meta).encode()) if meta is not None else b""
+    header = _HEADER.pack(
+        MAGIC, VERSION, _CODES[dtype], 0, len(arrays), len(meta_bytes), rows
+    )
+    return [header + meta_bytes] + [memoryview(a).cast("B") for a in arrays]
+
+
+def encode(
+    columns: Sequence, meta: Optional[Dict[str, Any]] = None, dtype="<f8"
+) -> bytes:
+    """
+    Encode equally long numeric columns (and optional JSON metadata) as a
+    single bytes object, e.g. to store it as a BLOB.
+    """
+    return b"".join(encode_parts(columns, meta, dtype))
+
+
+def read_header(data: Buffer) -> Tuple[np.dtype, int, int, int]:
+    """
+    Parse the header of a binary buffer.
+    Returns (dtype, columns, rows, offset of the first column).
+    Raises ValueError if the buffer is not in the binary format.
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Buffer too short for the binary format header.")
+    magic, version, code, _, ncols, meta_len, rows = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a binary format buffer.")
+    if version != VERSION or code not in DTYPES:
+        raise ValueError(f"Unsupported binary format (v{version}, dtype {code}).")
+    return DTYPES[code], ncols, rows, HEADER_SIZE + meta_len
+
+
+def decode(data: Buffer) -> Tuple[List[np.ndarray], Optional[Dict[str, Any]]]:
+    """
+    Decode a binary buffer into (columns, metadata). The columns are
+    read-only numpy views over data (no copy); metadata is None if absent.
+    Raises ValueError if the buffer is malformed or truncated.
+    """
+    dtype, ncols, rows, offset = read_header(data)
+    meta_bytes = bytes(data[HEADER_SIZE:offset]).rstrip(b"\0")
+    meta = json.loads(meta_bytes) if meta_bytes else None
+    if len(data) < offset + ncols * rows * dtype.itemsize:
+        raise ValueError("Truncated binary format buffer.")
+    columns = [
+        np.frombuffer(
+            data, dtype=dtype, count=rows, offset=offset + i * rows * dtype.itemsize
+        )
+        for i in range(ncols)
+    ]
+    return columns, meta
+
+
+def encode_xy(xs, ys, dtype="<f8") -> bytes:
+    """
+    Encode an (x, y) dataset as a two-column binary buffer.
+    """
+    return encode([xs, ys], dtype=dtype)
+
+
+def decode_xy(data: Buffer) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a two-column binary buffer into (xs, ys) views.
+    Raises ValueError if the buffer does not hold exactly two columns.
+    """
+    columns, _ = decode(data)
+    if len(columns) != 2:
+        raise ValueError("Expected a two-column (x, y) buffer.")
+    return columns[0], columns[1]
+
+
+__all__ = [
+    "MAGIC",
+    "HEADER_SIZE",
+    "is_binary",
+    "encode_parts",
+    "encode",
+    "read_header",
+    "decode",
+    "encode_xy",
+    "decode_xy",
+]
@@ -0,0 +1,170 @@
+"""
+Comparación de varios modelos guardados.
+
+Ajusta todas las familias de N modelos de regression_model en paralelo en
+un pool de procesos (cada proceso lee la base por su cuenta) y prepara lo
+necesario para dibujarlos juntos: métricas por familia, rango de X y una
+muestra reducida de puntos por serie para que la gráfica no dependa del
+tamaño de los datos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import ModelsApp
+import OperationsApp
+import Profiling
+import Queries
+
+# Puntos máximos que se dibujan por serie en la gráfica de comparación
+MAX_PUNTOS_SERIE = 500
+
+# Puntos de la grilla de X de cada curva
+PUNTOS_CURVA = 200
+
+
+def reducir_puntos(xs, ys, max_puntos=MAX_PUNTOS_SERIE):
+    """
+    Reduce una serie a lo sumo max_puntos conservando su envolvente.
+
+    Los puntos se ordenan por X y se agrupan en max_puntos / 2 tramos; de
+    cada tramo se conservan el punto de menor y el de mayor valor de y, de
+    modo que los picos siguen visibles en la gráfica.
+
+    Args:
+        xs: Valores X
+        ys: Valores y
+        max_puntos: Cantidad máxima de puntos a conservar
+
+    Returns:
+        Tupla (xs, ys) de arrays ordenados por X
+    """
+    x = np.asarray(xs, dtype=float).ravel()
+    y = np.asarray(ys, dtype=float).ravel()
+    orden = np.argsort(x, kind="stable")
+    if x.size <= max_puntos:
+        return x[orden], y[orden]
+    tramos = max(max_puntos // 2, 1)
+    limites = np.linspace(0, x.size, tramos + 1).astype(int)
+    indices = []
+    for inicio, fin in zip(limites[:-1], limites[1:]):
+        tramo = orden[inicio:fin]
+        extremos = sorted({np.argmin(y[tramo]), np.argmax(y[tramo])})
+        indices.extend(tramo[extremos])
+    indices = np.array(indices)
+    return x[indices], y[indices]
+
+
+@Profiling.timed("fit")
+def ajustar_modelo_guardado(model_id, max_puntos=MAX_PUNTOS_SERIE):
+    """
+    Ajusta todas las familias de un modelo guardado y prepara su serie.
+
+    Los coeficientes y métricas salen de OperationsApp.calcular_modelos_en_bd;
+    la muestra a dibujar, de la muestra de reservorio del resumen (que se
+    calcula y guarda si el modelo aún no lo tiene).
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        max_puntos: Puntos máximos de la muestra a dibujar
+
+    Returns:
+        Diccionario con id, n, resultados, x_min, x_max y muestra (xs, ys),
+        o None si el modelo no existe
+    """
+    resultados = OperationsApp.calcular_modelos_en_bd(model_id)
+    if resultados is None:
+        return None
+    resumen = Queries.get_model_summary_by_id(model_id)
+    if resumen is None:
+        xs, ys = OperationsApp.cargar_arrays_modelo(model_id)
+        resumen = OperationsApp.calcular_resumen(xs, ys)
+        Queries.update_model_summary(model_id, resumen)
+    return {
+        "id": model_id,
+        "n": resumen["n"],
+        "resultados": resultados,
+        "x_min": resumen["x"]["min"],
+        "x_max": resumen["x"]["max"],
+        "muestra": reducir_puntos(
+            resumen["muestra"]["x"], resumen["muestra"]["y"], max_puntos
+        ),
+    }
+
+
+def _ajustar_en_proceso(db_path, model_id, max_puntos):
+    """Punto de entrada de los procesos del pool (usan la misma base)."""
+    Queries.DB_PATH = db_path
+    return ajustar_modelo_guardado(model_id, max_puntos)
+
+
+def comparar_modelos(
+    model_ids, workers=None, executor=None, max_puntos=MAX_PUNTOS_SERIE
+):
+    """
+    Ajusta varios modelos guardados en paralelo.
+
+    Args:
+        model_ids: IDs de los modelos a comparar
+        workers: Procesos del pool (None: uno por núcleo)
+        executor: Executor a usar en lugar de crear un ProcessPoolExecutor
+        max_puntos: Puntos máximos de la muestra de cada serie
+
+    Returns:
+        Lista con el resultado de ajustar_modelo_guardado de cada ID, en el
+        mismo orden (None para los que no existen)
+    """
+    ids = list(model_ids)
+    if not ids:
+        return []
+    propio = executor is None
+    if propio:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        with Profiling.timer("ComparisonApp.comparar_modelos", "fit"):
+            return list(
+                executor.map(
+                    _ajustar_en_proceso,
+                    [Queries.DB_PATH] * len(ids),
+                    ids,
+                    [max_puntos] * len(ids),
+                )
+            )
+    finally:
+        if propio:
+            executor.shutdown()
+
+
+def mejor_familia(resultados):
+    """
+    Familia con menor RMSE entre las aplicables.
+
+    Returns:
+        Clave de la familia o None si ninguna es aplicable
+    """
+    validos = {
+        k: r["rmse"]
+        for k, r in resultados.items()
+        if r is not None and r.get("rmse") is not None
+    }
+    return min(validos, key=validos.get) if validos else None
+
+
+def curva(comparacion, familia, puntos=PUNTOS_CURVA):
+    """
+    Curva de una familia sobre el rango de X de un modelo comparado.
+
+    Args:
+        comparacion: Elemento retornado por ajustar_modelo_guardado
+        familia: Clave de la familia
+        puntos: Puntos de la grilla de X
+
+    Returns:
+        Tupla (x_grid, y) o None si la familia no es aplicable al modelo
+    """
+    r = comparacion["resultados"].get(familia)
+    if r is None:
+        return None
+    x_grid = np.linspace(comparacion["x_min"], comparacion["x_max"], puntos)
+    return x_grid, ModelsApp.modelo_desde_resultado(familia, r).predict(x_grid)
@@ -0,0 +1,454 @@
+"""
+Compressed container for binary format payloads (see BinaryFormat).
+
+Layout (little-endian):
+    28-byte header: magic b"LRMZ", version (u8), codec code (u8), dtype code
+                    (u8), reserved (u8), number of columns (u32), rows (u64),
+                    rows per chunk (u32), metadata length (u32)
+    metadata:       the BinaryFormat JSON metadata (zero-padded to 8 bytes)
+    chunk table:    compressed size (u32) of every chunk, column by column
+    chunks:         each column split into chunks of `rows per chunk` values,
+                    every chunk compressed on its own
+
+Codecs (see CODECS) trade CPU for size:
+    zlib   deflate of the raw values, fast and general
+    lzma   smaller than zlib on most data, several times slower
+    delta  difference of consecutive values' bit patterns, byte-shuffled,
+           then deflate: best on evenly spaced or slowly changing series
+    xor    XOR of consecutive values' bit patterns (Gorilla-style),
+           byte-shuffled, then deflate: best on smooth series whose sign and
+           exponent rarely change
+
+Chunks are independent, so decoding streams (iter_decode) with bounded
+memory, reads rows at random positions (Reader) and writes straight into
+preallocated numpy arrays (decode(out=...)).
+
+Benchmark (ratio and throughput per codec):
+    python3 Compression.py [--rows 1000000] [--db regressionModel.db]
+"""
+
+import argparse
+import io
+import json
+import lzma
+import os
+import struct
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import BinaryFormat
+
+MAGIC = b"LRMZ"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sBBBBIQII")
+HEADER_SIZE = _HEADER.size
+
+# Codec names and their codes in the header
+CODECS = {"zlib": 1, "lzma": 2, "delta": 3, "xor": 4}
+_NAMES = {code: name for name, code in CODECS.items()}
+
+# Values per compressed chunk (512 KiB of float64)
+CHUNK_ROWS = 1 << 16
+
+ZLIB_LEVEL = 6
+LZMA_PRESET = 6
+
+# Unsigned integer views of the float dtypes, for delta/XOR on bit patterns
+_BITS = {np.dtype("<f8"): np.dtype("<u8"), np.dtype("<f4"): np.dtype("<u4")}
+_DTYPE_CODES = {dtype: code for code, dtype in BinaryFormat.DTYPES.items()}
+
+
+def is_compressed(data: Any) -> bool:
+    """True if data is a buffer that starts with the compressed container magic."""
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        return False
+    return bytes(data[:4]) == MAGIC
+
+
+def codec_of(data: Any) -> Optional[str]:
+    """Codec name of a compressed payload (only its first 6 bytes are needed)."""
+    if not is_compressed(data) or len(data) < 6:
+        return None
+    return _NAMES.get(data[5])
+
+
+def _shuffle(values: np.ndarray) -> bytes:
+    """Group byte i of every value together (byte-plane transpose)."""
+    planes = values.view(np.uint8).reshape(values.size, values.itemsize)
+    return planes.T.tobytes()
+
+
+def _unshuffle(raw: bytes, out: np.ndarray) -> None:
+    planes = np.frombuffer(raw, dtype=np.uint8).reshape(out.itemsize, out.size)
+    out.view(np.uint8).reshape(out.size, out.itemsize)[...] = planes.T
+
+
+def _encode_chunk(codec: int, values: np.ndarray) -> bytes:
+    if codec == CODECS["zlib"]:
+        return zlib.compress(values.tobytes(), ZLIB_LEVEL)
+    if codec == CODECS["lzma"]:
+        return lzma.compress(
+            values.tobytes(), preset=LZMA_PRESET, check=lzma.CHECK_NONE
+        )
+    bits = values.view(_BITS[values.dtype])
+    residual = bits.copy()
+    if codec == CODECS["delta"]:
+        np.subtract(bits[1:], bits[:-1], out=residual[1:])
+    else:
+        np.bitwise_xor(bits[1:], bits[:-1], out=residual[1:])
+    return zlib.compress(_shuffle(residual), ZLIB_LEVEL)
+
+
+def _decode_chunk(codec: int, data: bytes, out: np.ndarray) -> None:
+    """Decompress one chunk into out (a contiguous array of its length)."""
+    try:
+        if codec == CODECS["lzma"]:
+            raw = lzma.decompress(data)
+        else:
+            raw = zlib.decompress(data)
+    except (lzma.LZMAError, zlib.error) as e:
+        raise ValueError(f"Corrupt compressed chunk: {e}") from None
+    if len(raw) != out.nbytes:
+        raise ValueError("Corrupt compressed chunk.")
+    if codec in (CODECS["zlib"], CODECS["lzma"]):
+        out.view(np.uint8)[...] = np.frombuffer(raw, dtype=np.uint8)
+        return
+    bits = out.view(_BITS[out.dtype])
+    _unshuffle(raw, bits)
+    if codec == CODECS["delta"]:
+        # Unsigned addition wraps, undoing the wrapped subtraction exactly
+        np.cumsum(bits, out=bits)
+    else:
+        np.bitwise_xor.accumulate(bits, out=bits)
+
+
+def compress_columns(
+    columns: Sequence,
+    codec: str = "zlib",
+    meta: Optional[Dict[str, Any]] = None,
+    dtype="<f8",
+    chunk_rows: int = CHUNK_ROWS,
+) -> bytes:
+    """
+    Compress equally long numeric columns (and optional JSON metadata).
+    Raises ValueError for an unknown codec or dtype, a chunk_rows below 1 or
+    columns of different lengths.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec: {codec}")
+    dtype = np.dtype(dtype)
+    if dtype not in _DTYPE_CODES:
+        raise ValueError(f"Unsupported dtype: {dtype}")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1.")
+    arrays = [np.ascontiguousarray(c, dtype=dtype).ravel() for c in columns]
+    rows = arrays[0].size if arrays else 0
+    if any(a.size != rows for a in arrays):
+        raise ValueError("All columns must have the same length.")
+    code = CODECS[codec]
+    chunks = [
+        _encode_chunk(code, a[start : start + chunk_rows])
+        for a in arrays
+        for start in range(0, rows, chunk_rows)
+    ]
+    meta_bytes = json.dumps(meta).encode() if meta is not None else b""
+    meta_bytes += b"\0" * (-len(meta_bytes) % 8)
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        code,
+        _DTYPE_CODES[dtype],
+        0,
+        len(arrays),
+        rows,
+        chunk_rows,
+        len(meta_bytes),
+    )
+    table = np.array([len(c) for c in chunks], dtype="<u4").tobytes()
+    return b"".join([header, meta_bytes, table] + chunks)
+
+
+def compress(
+    data: BinaryFormat.Buffer, codec: str = "zlib", chunk_rows: int = CHUNK_ROWS
+) -> bytes:
+    """
+    Compress a binary format buffer (see BinaryFormat.encode), keeping its
+    dtype and metadata.
+    """
+    columns, meta = BinaryFormat.decode(data)
+    dtype = BinaryFormat.read_header(data)[0]
+    return compress_columns(columns, codec, meta, dtype, chunk_rows)
+
+
+def read_header(data: bytes) -> Tuple[str, np.dtype, int, int, int, int]:
+    """
+    Parse the header of a compressed payload.
+    Returns (codec, dtype, number of columns, rows, rows per chunk,
+    metadata length).
+    Raises ValueError if the buffer is not a supported compressed payload.
+    """
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Buffer too short for a compressed payload header.")
+    magic, version, codec, dtype_code, _, ncols, rows, chunk_rows, meta_len = (
+        _HEADER.unpack_from(data)
+    )
+    if magic != MAGIC:
+        raise ValueError("Not a compressed payload (bad magic).")
+    if version != VERSION:
+        raise ValueError(f"Unsupported compressed payload version: {version}")
+    if codec not in _NAMES or dtype_code not in BinaryFormat.DTYPES:
+        raise ValueError("Unknown codec or dtype in compressed payload.")
+    return (
+        _NAMES[codec],
+        BinaryFormat.DTYPES[dtype_code],
+        ncols,
+        rows,
+        chunk_rows,
+        meta_len,
+    )
+
+
+def _chunk_counts(rows: int, chunk_rows: int) -> List[int]:
+    """Rows of each chunk of one column."""
+    return [min(chunk_rows, rows - start) for start in range(0, rows, chunk_rows)]
+
+
+class Reader:
+    """
+    Random access to a compressed payload through a file-like object with
+    seek/read (an sqlite3.Blob, or io.BytesIO for in-memory buffers). Only
+    the header, the chunk table and the chunks actually needed are read.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        f.seek(0)
+        header = f.read(HEADER_SIZE)
+        codec, self.dtype, self.columns, self.rows, self.chunk_rows, meta_len = (
+            read_header(header)
+        )
+        self.codec = codec
+        meta = f.read(meta_len).rstrip(b"\0")
+        self.meta = json.loads(meta) if meta else None
+        self._counts = _chunk_counts(self.rows, self.chunk_rows)
+        n_chunks = len(self._counts) * self.columns
+        sizes = np.frombuffer(f.read(4 * n_chunks), dtype="<u4")
+        if sizes.size != n_chunks:
+            raise ValueError("Truncated compressed payload.")
+        start = HEADER_SIZE + meta_len + 4 * n_chunks
+        self._offsets = start + np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
+        self._cache = {}
+
+    def _chunk(self, column: int, k: int, out: Optional[np.ndarray] = None):
+        """Decode chunk k of a column (into out when given)."""
+        index = column * len(self._counts) + k
+        self._f.seek(int(self._offsets[index]))
+        data = self._f.read(int(self._offsets[index + 1] - self._offsets[index]))
+        if out is None:
+            out = np.empty(self._counts[k], dtype=self.dtype)
+        _decode_chunk(CODECS[self.codec], data, out)
+        return out
+
+    def read_column(self, column: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Decode a whole column, chunk by chunk, into out (or a new array)."""
+        if out is None:
+            out = np.empty(self.rows, dtype=self.dtype)
+        elif out.shape != (self.rows,) or out.dtype != self.dtype:
+            raise ValueError("out must be a 1-D array of the payload rows and dtype.")
+        for k in range(len(self._counts)):
+            start = k * self.chunk_rows
+            self._chunk(column, k, out[start : start + self._counts[k]])
+        return out
+
+    def read_rows(self, start: int, count: int) -> np.ndarray:
+        """
+        Rows [start, start + count) of every column as a (count, columns)
+        array; the last decoded chunk of each column is kept for the next
+        call, so sequential reads decode every chunk once.
+        """
+        count = max(0, min(count, self.rows - start))
+        out = np.empty((count, self.columns), dtype=self.dtype)
+        for column in range(self.columns):
+            row = start
+            while row < start + count:
+                k = row // self.chunk_rows
+                cached = self._cache.get(column)
+                if cached is None or cached[0] != k:
+                    cached = (k, self._chunk(column, k))
+                    self._cache[column] = cached
+                first = row - k * self.chunk_rows
+                take = min(self._counts[k] - first, start + count - row)
+                out[row - start : row - start + take, column] = cached[1][
+                    first : first + take
+                ]
+                row += take
+        return out
+
+
+def decode(
+    data: bytes, out: Optional[Sequence[np.ndarray]] = None
+) -> Tuple[List[np.ndarray], Optional[Dict[str, Any]]]:
+    """
+    Decode a compressed payload into one array per column, as
+    BinaryFormat.decode does for uncompressed buffers. With out (one
+    preallocated array per column) the values are written there, chunk by
+    chunk, without intermediate copies of whole columns.
+    Raises ValueError for malformed payloads or out arrays of the wrong shape.
+    """
+    reader = Reader(io.BytesIO(data))
+    if out is not None and len(out) != reader.columns:
+        raise ValueError("out must have one array per column.")
+    columns = [
+        reader.read_column(c, None if out is None else out[c])
+        for c in range(reader.columns)
+    ]
+    return columns, reader.meta
+
+
+def decompress(data: bytes) -> bytes:
+    """Uncompressed binary format buffer (see BinaryFormat) of a payload."""
+    columns, meta = decode(data)
+    dtype = read_header(data)[1]
+    return BinaryFormat.encode(columns, meta, dtype)
+
+
+def iter_decode(chunks: Iterator[bytes]) -> Iterator[np.ndarray]:
+    """
+    Stream the values of a compressed payload given as consecutive pieces
+    of its bytes (e.g. incremental blob reads), yielding each decoded chunk
+    in storage order (column by column). At most one compressed chunk is
+    buffered at a time.
+    Raises ValueError for malformed or truncated payloads.
+    """
+    pending = bytearray()
+    pieces = iter(chunks)
+
+    def _need(size):
+        while len(pending) < size:
+            piece = next(pieces, None)
+            if piece is None:
+                raise ValueError("Truncated compressed payload.")
+            pending.extend(piece)
+
+    _need(HEADER_SIZE)
+    codec, dtype, ncols, rows, chunk_rows, meta_len = read_header(bytes(pending))
+    counts = _chunk_counts(rows, chunk_rows)
+    table_start = HEADER_SIZE + meta_len
+    _need(table_start + 4 * len(counts) * ncols)
+    sizes = np.frombuffer(
+        bytes(pending[table_start : table_start + 4 * len(counts) * ncols]),
+        dtype="<u4",
+    ).tolist()
+    del pending[: table_start + 4 * len(counts) * ncols]
+    for index, size in enumerate(sizes):
+        _need(size)
+        out = np.empty(counts[index % len(counts)], dtype=dtype)
+        _decode_chunk(CODECS[codec], bytes(pending[:size]), out)
+        del pending[:size]
+        yield out
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+
+def sample_datasets(rows: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Synthetic columns like the ones the application stores: an evenly
+    spaced x grid, a smooth curve, the same curve with measurement noise,
+    and integer counts.
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.5, 50.0, rows)
+    smooth = 1.5 * np.exp(0.05 * x) + np.sin(x)
+    return {
+        "x_grid": x,
+        "smooth": smooth,
+        "noisy": smooth + rng.normal(0.0, 0.1, rows),
+        "counts": rng.poisson(20.0, rows).astype(float),
+    }
+
+
+def benchmark(
+    datasets: Dict[str, np.ndarray],
+    codecs: Sequence[str] = tuple(CODECS),
+    repeats: int = 3,
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Compression ratio and best-of-repeats throughput (MB/s of uncompressed
+    values) of each codec on each dataset.
+    Returns {dataset: {codec: {"ratio", "compress_mb_s", "decompress_mb_s"}}}.
+    """
+    report = {}
+    for name, values in datasets.items():
+        values = np.ascontiguousarray(values, dtype="<f8")
+        megabytes = values.nbytes / 1e6
+        out = np.empty_like(values)
+        report[name] = {}
+        for codec in codecs:
+            compress_s = decompress_s = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                packed = compress_columns([values], codec)
+                compress_s = min(compress_s, time.perf_counter() - start)
+                start = time.perf_counter()
+                decode(packed, out=[out])
+                decompress_s = min(decompress_s, time.perf_counter() - start)
+            if not np.array_equal(out, values, equal_nan=True):
+                raise AssertionError(f"{codec} did not round-trip {name}")
+            report[name][codec] = {
+                "ratio": values.nbytes / len(packed),
+                "compress_mb_s": megabytes / max(compress_s, 1e-9),
+                "decompress_mb_s": megabytes / max(decompress_s, 1e-9),
+            }
+    return report
+
+
+def _stored_datasets(db_path: str, models: int) -> Dict[str, np.ndarray]:
+    """Columns of the largest saved models of a database."""
+    import Queries
+
+    Queries.DB_PATH = db_path
+    largest = sorted(Queries.list_models(), key=lambda m: -m[2])[:models]
+    datasets = {}
+    for model_id, name, _, _ in largest:
+        xy = Queries.get_model_xy_binary(model_id)
+        for label, payload in zip(("x", "y"), xy):
+            for c, column in enumerate(BinaryFormat.decode(payload)[0]):
+                suffix = f"{label}{c}" if label == "x" and c else label
+                datasets[f"{model_id}:{name[:20]}:{suffix}"] = column
+    return datasets
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ratio and throughput of the payload compression codecs"
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--db", default=None, help="also measure saved models")
+    parser.add_argument("--models", type=int, default=5)
+    args = parser.parse_args()
+
+    datasets = sample_datasets(args.rows)
+    if args.db is not None:
+        if not os.path.exists(args.db):
+            parser.error(f"No such database: {args.db}")
+        datasets.update(_stored_datasets(args.db, args.models))
+    report = benchmark(datasets, repeats=args.repeats)
+    print(f"{'dataset':<34}{'codec':<7}{'ratio':>8}{'comp MB/s':>12}{'dec MB/s':>11}")
+    for name, by_codec in report.items():
+        for codec, r in by_codec.items():
+            print(
+                f"{name:<34}{codec:<7}{r['ratio']:>8.2f}"
+                f"{r['compress_mb_s']:>12.1f}{r['decompress_mb_s']:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Diagnóstico de residuos de los modelos ajustados.
+
+Para cada familia aplicable calcula los residuos (y - y_pred), la palanca
+h_ii, los residuos estandarizados, la distancia de Cook y el estadístico de
+Durbin-Watson. Todas las familias se procesan juntas: las predicciones se
+apilan en una matriz (familias x n) y cada bloque de filas se recorre una
+sola vez para todos los diagnósticos pedidos.
+
+La palanca usa el diseño lineal de cada familia (columnas BASE de ModelsApp,
+centradas si incluyen la constante). Las columnas de todas las familias
+forman un solo diseño; la matriz de Gram se calcula una vez y la de cada
+familia es un bloque de ella. Para Exponencial y Potencial es la palanca del
+ajuste linealizado (en ln y), mientras que los residuos están en el espacio
+original de y.
+
+Los diagnósticos se calculan al pedirlos (Diagnosticos.obtener), así que la
+interfaz solo calcula lo que muestra; calcular() obtiene varios en un solo
+recorrido.
+
+Uso:
+    resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+    diagnosticos = DiagnosticsApp.Diagnosticos(xs, ys, resultados)
+    diagnosticos.obtener("cook", "Lineal")
+    diagnosticos.resumen()
+"""
+
+import numpy as np
+
+import ModelsApp
+import OperationsApp
+import Profiling
+
+# Diagnósticos disponibles; los cuatro primeros son arrays por observación
+ITEMS = ("residuos", "palanca", "estandarizados", "cook", "durbin_watson")
+
+# Diagnósticos que necesitan la palanca
+_CON_PALANCA = ("palanca", "estandarizados", "cook")
+
+# Filas por bloque del recorrido
+TAMANO_BLOQUE = 1 << 16
+
+
+class Diagnosticos:
+    """
+    Diagnósticos de residuos de todas las familias ajustadas, calculados al
+    pedirlos y guardados para los pedidos siguientes.
+
+    Args:
+        xs: Valores X
+        ys: Valores y
+        resultados: Diccionario retornado por calcular_todos_modelos (las
+                    familias sin y_pred se predicen por bloques)
+        tamano_bloque: Filas por bloque del recorrido
+
+    Raises:
+        ValueError: Si X e y no tienen la misma cantidad de valores
+    """
+
+    def __init__(self, xs, ys, resultados, tamano_bloque=TAMANO_BLOQUE):
+        self.columnas, aplicables = OperationsApp.calcular_columnas(xs, ys)
+        self.clases = [c for c in aplicables if resultados.get(c.FAMILIA) is not None]
+        self.familias = [c.FAMILIA for c in self.clases]
+        self.resultados = resultados
+        self.n = self.columnas["x"].size
+        self.tamano_bloque = tamano_bloque
+        self._valores = {}
+        self._modelos = {
+            f: ModelsApp.modelo_desde_resultado(f, resultados[f])
+            for f in self.familias
+            if resultados[f].get("y_pred") is None
+        }
+
+    def obtener(self, item, familia):
+        """
+        Retorna un diagnóstico de una familia, calculándolo si hace falta
+        (para todas las familias a la vez).
+
+        Args:
+            item: Uno de ITEMS
+            familia: Familia ajustada ("Lineal", "Exponencial", ...)
+
+        Returns:
+            Array de n valores; un float para "durbin_watson"
+
+        Raises:
+            ValueError: Si el diagnóstico no existe o la familia no tiene
+                        ajuste
+        """
+        if familia not in self.familias:
+            raise ValueError(f"Familia sin ajuste: {familia}")
+        self.calcular([item])
+        valor = self._valores[item][self.familias.index(familia)]
+        return float(valor) if item == "durbin_watson" else valor
+
+    def calculados(self):
+        """Diagnósticos ya calculados."""
+        return [item for item in ITEMS if item in self._valores]
+
+    def ajustados(self, familia):
+        """Valores ajustados (y_pred) de una familia."""
+        if familia not in self.familias:
+            raise ValueError(f"Familia sin ajuste: {familia}")
+        if familia in self._modelos:
+            return self._modelos[familia].predict(self.columnas["x"])
+        return np.asarray(self.resultados[familia]["y_pred"], dtype=float)
+
+    def resumen(self):
+        """
+        Resumen por familia: durbin_watson, cook_max, influyentes (puntos
+        con distancia de Cook mayor que 4 / n) y palanca_max.
+        """
+        self.calcular(["cook", "palanca", "durbin_watson"])
+        resumen = {}
+        for i, familia in enumerate(self.familias):
+            cook = self._valores["cook"][i]
+            resumen[familia] = {
+                "durbin_watson": float(self._valores["durbin_watson"][i]),
+                "cook_max": float(np.nanmax(cook)) if self.n else float("nan"),
+                "influyentes": int(np.count_nonzero(cook > 4.0 / max(self.n, 1))),
+                "palanca_max": (
+                    float(self._valores["palanca"][i].max()) if self.n else 0.0
+                ),
+            }
+        return resumen
+
+    @Profiling.timed("fit")
+    def calcular(self, items=ITEMS):
+        """
+        Calcula en un solo recorrido por bloques los diagnósticos pedidos que
+        aún no se calcularon, para todas las familias.
+
+        Raises:
+            ValueError: Si algún diagnóstico no es uno de ITEMS
+        """
+        desconocidos = [item for item in items if item not in ITEMS]
+        if desconocidos:
+            raise ValueError(f"Diagnóstico desconocido: {desconocidos[0]}")
+        pendientes = [item for item in ITEMS if item in items]
+        pendientes = [item for item in pendientes if item not in self._valores]
+        if not pendientes:
+            return
+        f, n = len(self.familias), self.n
+        salidas = {
+            item: np.empty((f, n)) for item in pendientes if item != "durbin_watson"
+        }
+        con_palanca = any(item in _CON_PALANCA for item in pendientes)
+        if con_palanca:
+            palanca = _Palanca(self.columnas, self.clases)
+            p = np.array([len(c.BASE) for c in self.clases], dtype=float)[:, None]
+            sse = np.array([self.resultados[fam]["mse"] * n for fam in self.familias])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                s2 = (sse / (n - p[:, 0]))[:, None] if n else sse[:, None]
+        dw_num = np.zeros(f)
+        dw_den = np.zeros(f)
+        anterior = None
+        y = self.columnas["y"]
+        for inicio in range(0, n, self.tamano_bloque):
+            fin = min(inicio + self.tamano_bloque, n)
+            residuos = y[inicio:fin] - self._predicciones(inicio, fin)
+            if "residuos" in salidas:
+                salidas["residuos"][:, inicio:fin] = residuos
+            if "durbin_watson" in pendientes:
+                dw_den += np.einsum("fm,fm->f", residuos, residuos)
+                saltos = np.diff(residuos, axis=1)
+                dw_num += np.einsum("fm,fm->f", saltos, saltos)
+                if anterior is not None:
+                    dw_num += (residuos[:, 0] - anterior) ** 2
+                anterior = residuos[:, -1]
+            if not con_palanca:
+                continue
+            h = palanca.bloque(inicio, fin)
+            if "palanca" in salidas:
+                salidas["palanca"][:, inicio:fin] = h
+            with np.errstate(divide="ignore", invalid="ignore"):
+                estandarizados = residuos / np.sqrt(s2 * (1.0 - h))
+                if "estandarizados" in salidas:
+                    salidas["estandarizados"][:, inicio:fin] = estandarizados
+                if "cook" in salidas:
+                    salidas["cook"][:, inicio:fin] = (
+                        estandarizados**2 * h / (p * (1.0 - h))
+                    )
+        if "durbin_watson" in pendientes:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                salidas["durbin_watson"] = dw_num / dw_den
+        self._valores.update(salidas)
+
+    def _predicciones(self, inicio, fin):
+        """Matriz (familias x filas) de predicciones de un bloque."""
+        x = self.columnas["x"][inicio:fin]
+        predicciones = np.empty((len(self.familias), fin - inicio))
+        for i, familia in enumerate(self.familias):
+            if familia in self._modelos:
+                predicciones[i] = self._modelos[familia].predict(x)
+            else:
+                predicciones[i] = self.resultados[familia]["y_pred"][inicio:fin]
+        return predicciones
+
+
+class _Palanca:
+    """
+    Palanca de varias familias sobre un diseño común.
+
+    Las columnas BASE (sin la constante) de todas las familias se estandarizan
+    y se calcula su matriz de Gram una vez, centrada (familias con constante)
+    y sin centrar (las demás). Para cada familia se guarda la pseudoinversa
+    de su bloque, embebida en una matriz del diseño común; la palanca de un
+    bloque de filas B es entonces la diagonal de B M B' para todas las
+    familias en una sola multiplicación por lotes (más 1 / n con constante).
+    """
+
+    def __init__(self, columnas, clases):
+        self.variables = list(
+            dict.fromkeys(c for clase in clases for c in clase.BASE if c != "1")
+        )
+        self.columnas = [columnas[v] for v in self.variables]
+        self.n = columnas["x"].size
+        self.centrada = np.array(["1" in clase.BASE for clase in clases])
+        k = len(self.variables)
+        self.medias = np.array([c.mean() for c in self.columnas])
+        escalas = np.array([c.std() for c in self.columnas])
+        self.escalas = np.where(escalas > 0, escalas, 1.0)
+
+        gram_centrada = np.zeros((k, k))
+        gram = np.zeros((k, k))
+        for inicio in range(0, self.n, TAMANO_BLOQUE):
+            centrado, crudo = self._disenos(inicio, inicio + TAMANO_BLOQUE)
+            gram_centrada += centrado.T @ centrado
+            gram += crudo.T @ crudo
+        self.inversas = np.zeros((len(clases), k, k))
+        for i, clase in enumerate(clases):
+            indices = [self.variables.index(v) for v in clase.BASE if v != "1"]
+            bloque = np.ix_(indices, indices)
+            base = gram_centrada if self.centrada[i] else gram
+            self.inversas[i][bloque] = np.linalg.pinv(base[bloque])
+
+    def _disenos(self, inicio, fin):
+        """Bloque del diseño común estandarizado: (centrado, sin centrar)."""
+        crudo = np.empty((min(fin, self.n) - inicio, len(self.variables)))
+        for j, columna in enumerate(self.columnas):
+            crudo[:, j] = columna[inicio:fin]
+        crudo /= self.escalas
+        return crudo - self.medias / self.escalas, crudo
+
+    def bloque(self, inicio, fin):
+        """Palanca (familias x filas) de las filas [inicio, fin)."""
+        centrado, crudo = self._disenos(inicio, fin)
+        h = np.empty((len(self.centrada), centrado.shape[0]))
+        for mascara, diseno in ((self.centrada, centrado), (~self.centrada, crudo)):
+            if mascara.any():
+                # (familias, filas, k) @ diseño: diag(B M B') de cada familia
+                h[mascara] = np.einsum(
+                    "fmk,mk->fm", diseno @ self.inversas[mascara], diseno
+                )
+        h[self.centrada] += 1.0 / max(self.n, 1)
+        return h
+
+
+def calcular_diagnosticos(xs, ys, resultados, items=ITEMS):
+    """
+    Calcula varios diagnósticos de todas las familias en un solo recorrido.
+
+    Args:
+        xs: Valores X
+        ys: Valores y
+        resultados: Diccionario retornado por calcular_todos_modelos
+        items: Diagnósticos a calcular (ver ITEMS)
+
+    Returns:
+        Diccionario {familia: {item: valor}}; None en las familias sin ajuste
+    """
+    diagnosticos = Diagnosticos(xs, ys, resultados)
+    diagnosticos.calcular(items)
+    return {
+        familia: (
+            {item: diagnosticos.obtener(item, familia) for item in items}
+            if familia in diagnosticos.familias
+            else None
+        )
+        for familia in resultados
+    }
@@ -0,0 +1,464 @@
+"""
+Exportación de resultados a CSV, JSON o NPZ.
+
+Escribe por bloques de filas los datos de entrada, la predicción y el
+residuo de cada familia ajustada (ver OperationsApp.calcular_todos_modelos)
+y las métricas por familia, sin armar el archivo completo en memoria:
+
+- CSV: una fila por observación (x, y, y_pred_<familia>, residuo_<familia>)
+  y las métricas en un segundo archivo <nombre>_metricas.csv.
+- JSON: {"n", "columnas", "metricas", "filas"}, con una lista por fila
+  (nan e inf se escriben como null).
+- NPZ: "datos" (matriz n x columnas float64, escrita directamente dentro
+  del zip), "columnas" y "metricas" (texto JSON). Se lee con np.load.
+
+Las predicciones que faltan (p. ej. modelos guardados, cuyos resultados no
+traen y_pred) se calculan bloque por bloque con ModelsApp, así que la
+memoria solo depende de filas_por_bloque. Exportacion corre cualquiera de
+las exportaciones en un hilo aparte, con progreso y cancelación.
+
+Uso:
+    resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+    ExportApp.exportar("ajuste.csv", xs, ys, resultados)
+
+    exportacion = ExportApp.exportar_modelo_en_segundo_plano(model_id, "m.npz")
+    exportacion.progreso()  # (filas escritas, total)
+    informe = exportacion.resultado()
+"""
+
+import csv
+import json
+import math
+import os
+import threading
+import zipfile
+from concurrent.futures import Future
+
+import numpy as np
+
+import ModelsApp
+import OperationsApp
+import Profiling
+import Queries
+
+# Formatos aceptados (el formato se deduce de la extensión si no se indica)
+FORMATOS = ("csv", "json", "npz")
+
+# Filas escritas por bloque
+FILAS_POR_BLOQUE = 1 << 16
+
+# Sufijo del archivo de métricas que acompaña a un CSV
+SUFIJO_METRICAS = "_metricas"
+
+
+def formato_de_ruta(ruta):
+    """
+    Deduce el formato de exportación de la extensión del archivo.
+
+    Raises:
+        ValueError: Si la extensión no es la de ninguno de FORMATOS
+    """
+    formato = os.path.splitext(ruta)[1].lower().lstrip(".")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación desconocido: {formato or ruta}")
+    return formato
+
+
+def ruta_metricas(ruta):
+    """Archivo de métricas que acompaña a un CSV exportado."""
+    base, extension = os.path.splitext(ruta)
+    return f"{base}{SUFIJO_METRICAS}{extension}"
+
+
+def columnas_exportadas(resultados):
+    """
+    Nombres de las columnas exportadas para unos resultados.
+
+    Args:
+        resultados: Diccionario retornado por calcular_todos_modelos
+
+    Returns:
+        Lista: "x", "y" y, por familia aplicable, "y_pred_<familia>" y
+        "residuo_<familia>"
+    """
+    columnas = ["x", "y"]
+    for familia in _familias(resultados):
+        columnas += [f"y_pred_{familia}", f"residuo_{familia}"]
+    return columnas
+
+
+def metricas_exportadas(resultados):
+    """
+    Coeficientes y métricas por familia, como floats (None en las familias
+    no aplicables); es la misma información que la tabla de la interfaz.
+    """
+    return {
+        familia: (
+            None
+            if r is None
+            else {k: float(v) for k, v in r.items() if k != "y_pred" and v is not None}
+        )
+        for familia, r in resultados.items()
+    }
+
+
+def _familias(resultados):
+    """Familias aplicables, en el orden de ModelsApp.FAMILIAS."""
+    return [f for f in ModelsApp.FAMILIAS if resultados.get(f) is not None]
+
+
+def _bloques_arrays(xs, ys, resultados, filas):
+    """
+    Bloques (filas x columnas) de unos datos en memoria; usa los y_pred de
+    los resultados o predice con el modelo de cada familia.
+    """
+    familias = _familias(resultados)
+    modelos = {
+        f: ModelsApp.modelo_desde_resultado(f, resultados[f])
+        for f in familias
+        if resultados[f].get("y_pred") is None
+    }
+    for inicio in range(0, xs.size, filas):
+        fin = min(inicio + filas, xs.size)
+        yield _armar_bloque(
+            xs[inicio:fin],
+            ys[inicio:fin],
+            familias,
+            lambda f, x: (
+                modelos[f].predict(x)
+                if f in modelos
+                else resultados[f]["y_pred"][inicio:fin]
+            ),
+        )
+
+
+def _bloques_modelo(model_id, resultados, filas):
+    """Bloques de un modelo guardado, leído con Queries.iter_model_rows."""
+    familias = _familias(resultados)
+    modelos = {f: ModelsApp.modelo_desde_resultado(f, resultados[f]) for f in familias}
+    for X, y in Queries.iter_model_rows(model_id, filas):
+        if X.shape[1] != 1:
+            raise ValueError("Solo se exportan modelos con X de una columna")
+        yield _armar_bloque(X[:, 0], y, familias, lambda f, x: modelos[f].predict(x))
+
+
+def _armar_bloque(x, y, familias, predecir):
+    """Matriz de un bloque: x, y y la predicción y el residuo por familia."""
+    bloque = np.empty((x.size, 2 + 2 * len(familias)))
+    bloque[:, 0] = x
+    bloque[:, 1] = y
+    for i, familia in enumerate(familias):
+        prediccion = bloque[:, 2 + 2 * i]
+        prediccion[:] = predecir(familia, x)
+        np.subtract(y, prediccion, out=bloque[:, 3 + 2 * i])
+    return bloque
+
+
+# ----------------------------------------------------------------------
+# Escritores: abren un archivo temporal, reciben bloques y lo cierran
+# ----------------------------------------------------------------------
+class _EscritorCSV:
+    def __init__(self, ruta, columnas, metricas, n):
+        self.archivo = open(ruta, "w", newline="", encoding="utf-8")
+        self.archivo.write(",".join(columnas) + "\n")
+
+    def escribir(self, bloque):
+        # repr da el float más corto que se vuelve a leer sin pérdida
+        self.archivo.write(
+            "".join(",".join(map(repr, fila)) + "\n" for fila in bloque.tolist())
+        )
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class _EscritorJSON:
+    def __init__(self, ruta, columnas, metricas, n):
+        self.archivo = open(ruta, "w", encoding="utf-8")
+        self.primero = True
+        cabecera = json.dumps(
+            {"n": n, "columnas": columnas, "metricas": _json_finito(metricas)},
+            ensure_ascii=False,
+        )
+        # Se abre la lista de filas dentro del mismo objeto
+        self.archivo.write(cabecera[:-1] + ', "filas": [')
+
+    def escribir(self, bloque):
+        filas = bloque.tolist()
+        if not np.isfinite(bloque).all():
+            filas = _json_finito(filas)
+        texto = json.dumps(filas)[1:-1]
+        if texto:
+            self.archivo.write(texto if self.primero else ", " + texto)
+            self.primero = False
+
+    def cerrar(self):
+        self.archivo.write("]}")
+        self.archivo.close()
+
+
+class _EscritorNPZ:
+    def __init__(self, ruta, columnas, metricas, n):
+        self.zip = zipfile.ZipFile(ruta, "w", zipfile.ZIP_STORED, allowZip64=True)
+        with self.zip.open("columnas.npy", "w") as f:
+            np.lib.format.write_array(f, np.array(columnas))
+        with self.zip.open("metricas.npy", "w") as f:
+            np.lib.format.write_array(
+                f, np.array(json.dumps(_json_finito(metricas), ensure_ascii=False))
+            )
+        self.n = n
+        self.filas = 0
+        self.archivo = self.zip.open("datos.npy", "w", force_zip64=True)
+        np.lib.format.write_array_header_1_0(
+            self.archivo,
+            {
+                "descr": np.lib.format.dtype_to_descr(np.dtype("<f8")),
+                "fortran_order": False,
+                "shape": (n, len(columnas)),
+            },
+        )
+
+    def escribir(self, bloque):
+        self.filas += len(bloque)
+        if self.filas > self.n:
+            raise ValueError(f"El modelo tiene más filas que las {self.n} esperadas")
+        self.archivo.write(np.ascontiguousarray(bloque, dtype="<f8").tobytes())
+
+    def cerrar(self):
+        self.archivo.close()
+        self.zip.close()
+
+
+_ESCRITORES = {"csv": _EscritorCSV, "json": _EscritorJSON, "npz": _EscritorNPZ}
+
+
+def _json_finito(valor):
+    """Reemplaza nan e inf (que JSON no admite) por None."""
+    if isinstance(valor, float):
+        return valor if math.isfinite(valor) else None
+    if isinstance(valor, dict):
+        return {k: _json_finito(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_json_finito(v) for v in valor]
+    return valor
+
+
+def _escribir_metricas_csv(ruta, metricas):
+    """Una fila por familia con sus coeficientes y métricas."""
+    claves = []
+    for r in metricas.values():
+        claves += [k for k in (r or {}) if k not in claves]
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["familia"] + claves)
+        for familia, r in metricas.items():
+            escritor.writerow(
+                [familia] + [repr(r[k]) if r and k in r else "" for k in claves]
+            )
+
+
+@Profiling.timed("export")
+def _escribir(ruta, formato, columnas, metricas, n, bloques, progreso, cancelado):
+    """
+    Escribe los bloques en un archivo temporal que reemplaza a ruta al
+    terminar; con un error o una cancelación no queda ningún archivo.
+    """
+    formato = formato or formato_de_ruta(ruta)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    destinos = [ruta] + ([ruta_metricas(ruta)] if formato == "csv" else [])
+    temporales = [f"{d}.tmp" for d in destinos]
+    filas = 0
+    try:
+        escritor = _ESCRITORES[formato](temporales[0], columnas, metricas, n)
+        try:
+            for bloque in bloques:
+                if cancelado is not None and cancelado.is_set():
+                    return None
+                escritor.escribir(bloque)
+                filas += len(bloque)
+                Profiling.count("ExportApp.filas", len(bloque))
+                if progreso is not None:
+                    progreso(filas, n)
+        finally:
+            escritor.cerrar()
+        if filas != n:
+            raise ValueError(f"Se escribieron {filas} filas de las {n} esperadas")
+        if formato == "csv":
+            _escribir_metricas_csv(temporales[1], metricas)
+        for temporal, destino in zip(temporales, destinos):
+            os.replace(temporal, destino)
+    finally:
+        for temporal in temporales:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+    return {
+        "ruta": ruta,
+        "formato": formato,
+        "filas": filas,
+        "columnas": columnas,
+        "bytes": sum(os.path.getsize(d) for d in destinos),
+    }
+
+
+def exportar(
+    ruta,
+    xs,
+    ys,
+    resultados,
+    formato=None,
+    filas_por_bloque=FILAS_POR_BLOQUE,
+    progreso=None,
+    cancelado=None,
+):
+    """
+    Exporta datos en memoria y sus resultados.
+
+    Args:
+        ruta: Archivo de salida
+        xs: Valores X
+        ys: Valores y
+        resultados: Diccionario retornado por calcular_todos_modelos (los
+                    y_pred que falten se calculan por bloques)
+        formato: "csv", "json" o "npz" (None lo deduce de la extensión)
+        filas_por_bloque: Filas calculadas y escritas a la vez
+        progreso: Función progreso(filas_escritas, total) tras cada bloque
+        cancelado: threading.Event que detiene la exportación
+
+    Returns:
+        dict con ruta, formato, filas, columnas y bytes; None si se canceló
+
+    Raises:
+        ValueError: Si el formato es desconocido o X e y no tienen la misma
+                    cantidad de valores
+        OSError: Si no se puede escribir el archivo
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    if xs.shape != ys.shape or xs.ndim != 1:
+        raise ValueError("X e y deben ser listas de la misma cantidad de valores")
+    if filas_por_bloque < 1:
+        raise ValueError("Se necesita al menos una fila por bloque")
+    return _escribir(
+        ruta,
+        formato,
+        columnas_exportadas(resultados),
+        metricas_exportadas(resultados),
+        xs.size,
+        _bloques_arrays(xs, ys, resultados, filas_por_bloque),
+        progreso,
+        cancelado,
+    )
+
+
+def exportar_modelo(
+    model_id,
+    ruta,
+    formato=None,
+    filas_por_bloque=FILAS_POR_BLOQUE,
+    progreso=None,
+    cancelado=None,
+    resultados=None,
+):
+    """
+    Exporta un modelo guardado sin cargar sus datos completos: los ajustes
+    salen de calcular_modelos_en_bd (o de resultados) y los datos se leen y
+    predicen por bloques.
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        ruta, formato, filas_por_bloque, progreso, cancelado: Ver exportar
+        resultados: Resultados ya calculados del modelo (opcional)
+
+    Returns:
+        dict de exportar; None si se canceló
+
+    Raises:
+        ValueError: Si el modelo no existe, su X tiene varias columnas o el
+                    formato es desconocido
+        OSError: Si no se puede escribir el archivo
+    """
+    n = Queries.get_model_n_points(model_id)
+    if n is None:
+        raise ValueError(f"No existe el modelo {model_id}")
+    if filas_por_bloque < 1:
+        raise ValueError("Se necesita al menos una fila por bloque")
+    if resultados is None:
+        resultados = OperationsApp.calcular_modelos_en_bd(model_id) or {}
+    return _escribir(
+        ruta,
+        formato,
+        columnas_exportadas(resultados),
+        metricas_exportadas(resultados),
+        n,
+        _bloques_modelo(model_id, resultados, filas_por_bloque),
+        progreso,
+        cancelado,
+    )
+
+
+class Exportacion:
+    """
+    Exportación (exportar o exportar_modelo) en un hilo aparte.
+
+    El hilo no es daemon: al cerrar el programa, las exportaciones en curso
+    terminan de escribir su archivo.
+
+    Args:
+        funcion: exportar o exportar_modelo
+        *args, **kwargs: Argumentos de la función (sin progreso ni cancelado)
+    """
+
+    def __init__(self, funcion, *args, **kwargs):
+        self.filas = 0
+        self.total = None
+        self.futuro = Future()
+        self._cancelado = threading.Event()
+        kwargs.update(progreso=self._al_avanzar, cancelado=self._cancelado)
+        self._hilo = threading.Thread(
+            target=self._ejecutar, args=(funcion, args, kwargs), name="exportacion"
+        )
+        self.futuro.set_running_or_notify_cancel()
+        self._hilo.start()
+
+    def _ejecutar(self, funcion, args, kwargs):
+        try:
+            self.futuro.set_result(funcion(*args, **kwargs))
+        except Exception as e:
+            self.futuro.set_exception(e)
+
+    def _al_avanzar(self, filas, total):
+        self.filas, self.total = filas, total
+
+    def progreso(self):
+        """Tupla (filas escritas, total); total es None antes del primer bloque."""
+        return self.filas, self.total
+
+    def cancelar(self):
+        """Detiene la exportación en el próximo bloque (no deja archivo)."""
+        self._cancelado.set()
+
+    def terminada(self):
+        return self.futuro.done()
+
+    def resultado(self, timeout=None):
+        """
+        Espera el final de la exportación.
+
+        Returns:
+            dict de exportar; None si se canceló
+
+        Raises:
+            La excepción de la exportación, si falló
+        """
+        return self.futuro.result(timeout)
+
+
+def exportar_en_segundo_plano(ruta, xs, ys, resultados, **opciones):
+    """exportar en un hilo aparte; retorna la Exportacion en curso."""
+    return Exportacion(exportar, ruta, xs, ys, resultados, **opciones)
+
+
+def exportar_modelo_en_segundo_plano(model_id, ruta, **opciones):
+    """exportar_modelo en un hilo aparte; retorna la Exportacion en curso."""
+    return Exportacion(exportar_modelo, model_id, ruta, **opciones)
@@ -0,0 +1,83 @@
+"""
+Herramienta de migración y compactación de regressionModel.db.
+
+Aplica las migraciones pendientes del esquema (ver Queries._MIGRATIONS); la
+versión 5 separa el catálogo (nombre, nombre en minúsculas, cantidad de
+puntos y fechas de creación/actualización) de los datos x/y, que pasan a la
+tabla regression_payload. Después reconstruye el archivo con VACUUM
+(ver Queries.compact_database) para liberar el espacio de la tabla anterior.
+
+La aplicación migra la base al abrirla, así que esta herramienta sirve para
+hacerlo antes (bases grandes) y para compactar periódicamente.
+
+Ejecución:
+    python3 MigrationApp.py [--db ruta] [--page-size 8192] [--sin-vacuum]
+"""
+
+import argparse
+
+import Queries
+
+
+def _tamano(n_bytes):
+    """Tamaño legible en KiB/MiB."""
+    if n_bytes >= 1 << 20:
+        return f"{n_bytes / (1 << 20):.1f} MiB"
+    return f"{n_bytes / 1024:.1f} KiB"
+
+
+def migrar(ruta=None, page_size=None, vacuum=True):
+    """
+    Migra (y opcionalmente compacta) una base de datos.
+
+    Args:
+        ruta: Archivo de la base; None usa Queries.DB_PATH
+        page_size: Tamaño de página para la reconstrucción (None lo conserva)
+        vacuum: Si es False solo se aplican las migraciones
+
+    Returns:
+        dict: version_anterior, version, modelos y, con vacuum,
+              bytes_antes y bytes_despues
+    """
+    original = Queries.DB_PATH
+    try:
+        if ruta is not None:
+            Queries.DB_PATH = ruta
+        anterior, actual = Queries.migrate_database()
+        informe = {
+            "version_anterior": anterior,
+            "version": actual,
+            "modelos": len(Queries.list_models()),
+        }
+        if vacuum:
+            antes, despues = Queries.compact_database(page_size=page_size)
+            informe["bytes_antes"] = antes
+            informe["bytes_despues"] = despues
+        return informe
+    finally:
+        Queries.DB_PATH = original
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migra y compacta la base de datos de modelos"
+    )
+    parser.add_argument("--db", default=Queries.DB_PATH)
+    parser.add_argument("--page-size", type=int, default=None)
+    parser.add_argument("--sin-vacuum", action="store_true")
+    args = parser.parse_args()
+
+    informe = migrar(args.db, args.page_size, not args.sin_vacuum)
+    print(
+        f"Esquema: versión {informe['version_anterior']} -> {informe['version']} "
+        f"({informe['modelos']} modelos)"
+    )
+    if "bytes_antes" in informe:
+        print(
+            f"VACUUM: {_tamano(informe['bytes_antes'])} -> "
+            f"{_tamano(informe['bytes_despues'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""
+Familias de regresión y modelos ajustados con predicción vectorizada por lotes.
+
+Cada familia de regresión es una clase registrada en FAMILIAS que declara
+su dominio, las columnas transformadas de su ajuste lineal (ver
+TRANSFORMACIONES), cómo pasar de la solución lineal a sus coeficientes, su
+fórmula y un método predict() que evalúa arrays grandes por bloques (memoria
+acotada), escribiendo en un buffer out= opcional y, si se pide, en varios
+hilos (las ufuncs de numpy liberan el GIL). OperationsApp ajusta todas las
+familias registradas a partir de esas declaraciones, de modo que agregar una
+familia es definir su clase con @registrar_familia. Los modelos ajustados se
+guardan en la tabla fitted_model para puntuar datos nuevos sin volver a ajustar.
+"""
+
+import abc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import OperationsApp
+import Profiling
+import Queries
+
+# Elementos por bloque de predict(); 64K float64 = 512 KB por bloque
+TAMANO_BLOQUE = 1 << 16
+
+# Claves de métricas que se guardan junto con los coeficientes
+METRICAS = ("r2", "mse", "rmse")
+
+# Columnas disponibles sin transformar: constante, x e y
+COLUMNAS_BASE = ("1", "x", "y")
+
+# Columnas derivadas de x e y que pueden usar las familias en BASE y OBJETIVO,
+# además de COLUMNAS_BASE. Cada función recibe el diccionario de
+# columnas ya calculadas; OperationsApp calcula cada una una sola vez y solo
+# si alguna familia aplicable la usa.
+TRANSFORMACIONES = {
+    "x2": lambda c: c["x"] * c["x"],
+    "lx": lambda c: np.log(c["x"]),
+    "ly": lambda c: np.log(c["y"]),
+}
+
+# Expresión SQL de cada transformación sobre las columnas {x} e {y} de la
+# tabla de puntos, para agregar los estadísticos dentro de SQLite (ver
+# OperationsApp.especificacion_sql). Una transformación sin expresión hace
+# que los modelos se ajusten leyendo los datos; las que no están definidas
+# en un punto deben dar NULL (ln de un valor <= 0 en SQLite).
+TRANSFORMACIONES_SQL = {
+    "x2": "{x} * {x}",
+    "lx": "ln({x})",
+    "ly": "ln({y})",
+}
+
+# Familias registradas con registrar_familia, en orden de registro
+FAMILIAS = {}
+
+
+def _valor(v):
+    """float para un escalar; array float64 si es un valor por ventana."""
+    v = np.asarray(v, dtype=float)
+    return float(v) if v.ndim == 0 else v
+
+
+def registrar_familia(clase):
+    """
+    Registra una familia de regresión (se usa como decorador de la clase).
+
+    Args:
+        clase: Subclase de ModeloAjustado con FAMILIA, COEFICIENTES, BASE y
+               OBJETIVO definidos
+
+    Returns:
+        La misma clase
+
+    Raises:
+        ValueError: Si no define _evaluar() o formula(), o usa una columna
+                    que no existe en TRANSFORMACIONES
+    """
+    if clase.__abstractmethods__:
+        faltantes = ", ".join(sorted(clase.__abstractmethods__))
+        raise ValueError(f"{clase.FAMILIA} no define: {faltantes}")
+    desconocidas = set(clase.transformaciones()) - set(TRANSFORMACIONES)
+    if desconocidas:
+        raise ValueError(
+            f"Columnas desconocidas en {clase.FAMILIA}: {', '.join(sorted(desconocidas))}"
+        )
+    FAMILIAS[clase.FAMILIA] = clase
+    return clase
+
+
+class ModeloAjustado(abc.ABC):
+    """
+    Modelo de regresión ajustado de una familia.
+
+    Las subclases definen FAMILIA, COEFICIENTES (nombres en el orden de los
+    resultados de OperationsApp), _evaluar() y formula(), y declaran cómo se
+    ajustan: la familia es un ajuste lineal por mínimos cuadrados de la
+    columna OBJETIVO sobre las columnas BASE, cuya solución se convierte en
+    coeficientes con desde_lineales(). Las familias cuyo OBJETIVO no es "y"
+    minimizan el error de la columna transformada; las que además tienen
+    REFINABLE (forma a·e^(b·u), con u = BASE[1]) se refinan en el espacio
+    original de y (ver OperationsApp.refinar_no_lineal).
+
+    Args:
+        metricas: Diccionario opcional con r2, mse y rmse del ajuste
+        **coeficientes: Valores de cada nombre de COEFICIENTES
+    """
+
+    FAMILIA = None
+    COEFICIENTES = ()
+    # Nombre para mostrar en la interfaz
+    ETIQUETA = None
+    # Variables que deben ser > 0 en todos los puntos ("x", "y")
+    POSITIVOS = ()
+    # Columnas del ajuste lineal ("1", "x", "y" o una de TRANSFORMACIONES)
+    BASE = ()
+    OBJETIVO = "y"
+    REFINABLE = False
+
+    def __init__(self, metricas=None, **coeficientes):
+        faltantes = set(self.COEFICIENTES) - set(coeficientes)
+        if faltantes:
+            raise ValueError(
+                f"Faltan coeficientes de {self.FAMILIA}: {', '.join(sorted(faltantes))}"
+            )
+        self.coeficientes = {k: float(coeficientes[k]) for k in self.COEFICIENTES}
+        self.metricas = dict(metricas) if metricas else None
+
+    @classmethod
+    def transformaciones(cls):
+        """Columnas derivadas (ver TRANSFORMACIONES) que usa la familia."""
+        return tuple(
+            c
+            for c in dict.fromkeys(cls.BASE + (cls.OBJETIVO,))
+            if c not in COLUMNAS_BASE
+        )
+
+    @classmethod
+    def aplicable(cls, dominio):
+        """
+        Indica si la familia se puede ajustar.
+
+        Args:
+            dominio: Diccionario {"x": bool, "y": bool} que indica si todos
+                     los valores de cada variable son > 0
+        """
+        return all(dominio[v] for v in cls.POSITIVOS)
+
+    @classmethod
+    def advertencia(cls):
+        """Motivo por el que la familia se omite cuando no es aplicable."""
+        return f"{cls.ETIQUETA} (todos los {' e '.join(cls.POSITIVOS)} deben ser > 0)"
+
+    @classmethod
+    def desde_lineales(cls, solucion):
+        """
+        Coeficientes de la familia a partir de la solución del ajuste lineal
+        (un valor por columna de BASE, o un array por columna con una
+        solución por ventana; ver OperationsApp.calcular_modelos_ventana).
+        Por defecto son la misma solución.
+        """
+        return {k: _valor(v) for k, v in zip(cls.COEFICIENTES, solucion)}
+
+    def __getattr__(self, nombre):
+        coeficientes = self.__dict__.get("coeficientes", {})
+        if nombre in coeficientes:
+            return coeficientes[nombre]
+        raise AttributeError(nombre)
+
+    def __repr__(self):
+        valores = ", ".join(f"{k}={v:.6g}" for k, v in self.coeficientes.items())
+        return f"{type(self).__name__}({valores})"
+
+    @abc.abstractmethod
+    def _evaluar(self, x, out):
+        """Escribe en out la predicción para x (arrays 1-D del mismo tamaño)."""
+
+    @abc.abstractmethod
+    def formula(self, decimales=6):
+        """Fórmula del modelo con sus coeficientes redondeados a decimales."""
+
+    def predict(self, x, out=None, tamano_bloque=TAMANO_BLOQUE, hilos=1):
+        """
+        Predice y para los valores x.
+
+        Args:
+            x: Valores X (escalar, lista o array de cualquier forma)
+            out: Array float64 C-contiguo de la misma forma donde escribir
+                 el resultado (opcional; se reserva uno nuevo si es None)
+            tamano_bloque: Elementos evaluados por bloque
+            hilos: Hilos que evalúan bloques en paralelo (1: secuencial)
+
+        Returns:
+            Array con las predicciones (out si se indicó). Los x fuera del
+            dominio de la familia (x <= 0 en Potencial y Logarítmica) dan nan.
+
+        Raises:
+            ValueError: Si out no tiene la forma o el tipo adecuados
+        """
+        x = np.asarray(x, dtype=float)
+        if out is None:
+            out = np.empty(x.shape)
+        elif (
+            out.shape != x.shape
+            or out.dtype != np.float64
+            or not out.flags.c_contiguous
+        ):
+            raise ValueError(
+                "out debe ser un array float64 C-contiguo de la forma de x"
+            )
+        planos = np.ravel(x), out.reshape(-1)
+        n = planos[0].size
+        tamano_bloque = max(int(tamano_bloque), 1)
+        bloques = [(i, min(i + tamano_bloque, n)) for i in range(0, n, tamano_bloque)]
+
+        def evaluar(bloque):
+            inicio, fin = bloque
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self._evaluar(planos[0][inicio:fin], planos[1][inicio:fin])
+
+        with Profiling.timer(f"ModelsApp.predict.{self.FAMILIA}", "predict"):
+            if hilos > 1 and len(bloques) > 1:
+                with ThreadPoolExecutor(hilos) as pool:
+                    list(pool.map(evaluar, bloques))
+            else:
+                for bloque in bloques:
+                    evaluar(bloque)
+        Profiling.count("ModelsApp.valores_predichos", n)
+        return out
+
+    def a_dict(self):
+        """Representación serializable: familia, coeficientes y métricas."""
+        return {
+            "familia": self.FAMILIA,
+            "coeficientes": dict(self.coeficientes),
+            "metricas": self.metricas,
+        }
+
+
+@registrar_familia
+class ModeloLineal(ModeloAjustado):
+    """y = intercept + coef * x"""
+
+    FAMILIA = "Lineal"
+    COEFICIENTES = ("intercept", "coef")
+    ETIQUETA = "Lineal"
+    BASE = ("1", "x")
+
+    def _evaluar(self, x, out):
+        np.multiply(x, self.coef, out=out)
+        out += self.intercept
+
+    def formula(self, decimales=6):
+        d = decimales
+        return f"y = {self.intercept:.{d}f} + {self.coef:.{d}f}x"
+
+
+@registrar_familia
+class ModeloExponencial(ModeloAjustado):
+    """y = a * e^(b * x), linealizado como ln(y) = ln(a) + b * x"""
+
+    FAMILIA = "Exponencial"
+    COEFICIENTES = ("a", "b")
+    ETIQUETA = "Exponencial"
+    POSITIVOS = ("y",)
+    BASE = ("1", "x")
+    OBJETIVO = "ly"
+    REFINABLE = True
+
+    @classmethod
+    def desde_lineales(cls, solucion):
+        return {"a": _valor(np.exp(solucion[0])), "b": _valor(solucion[1])}
+
+    def _evaluar(self, x, out):
+        np.multiply(x, self.b, out=out)
+        np.exp(out, out=out)
+        out *= self.a
+
+    def formula(self, decimales=6):
+        d = decimales
+        return f"y = {self.a:.{d}f} * e^{self.b:.{d}f}x"
+
+
+@registrar_familia
+class ModeloPotencial(ModeloAjustado):
+    """y = a * x^b, linealizado como ln(y) = ln(a) + b * ln(x)"""
+
+    FAMILIA = "Potencial"
+    COEFICIENTES = ("a", "b")
+    ETIQUETA = "Potencial"
+    POSITIVOS = ("x", "y")
+    BASE = ("1", "lx")
+    OBJETIVO = "ly"
+    REFINABLE = True
+
+    @classmethod
+    def desde_lineales(cls, solucion):
+        return {"a": _valor(np.exp(solucion[0])), "b": _valor(solucion[1])}
+
+    def _evaluar(self, x, out):
+        np.power(x, self.b, out=out)
+        out *= self.a
+        out[x <= 0] = np.nan
+
+    def formula(self, decimales=6):
+        d = decimales
+        return f"y = {self.a:.{d}f} * x^{self.b:.{d}f}"
+
+
+@registrar_familia
+class ModeloLogaritmico(ModeloAjustado):
+    """y = a + b * ln(x)"""
+
+    FAMILIA = "Logaritmica"
+    COEFICIENTES = ("a", "b")
+    ETIQUETA = "Logarítmica"
+    POSITIVOS = ("x",)
+    BASE = ("1", "lx")
+
+    def _evaluar(self, x, out):
+        np.log(x, out=out)
+        out *= self.b
+        out += self.a
+        out[x <= 0] = np.nan
+
+    def formula(self, decimales=6):
+        d = decimales
+        return f"y = {self.a:.{d}f} + {self.b:.{d}f}*ln(x)"
+
+
+@registrar_familia
+class ModeloPolinomial2(ModeloAjustado):
+    """y = a + b * x + c * x² (evaluado con Horner)"""
+
+    FAMILIA = "Polinomial_2"
+    COEFICIENTES = ("a", "b", "c")
+    ETIQUETA = "Polinomial Grado 2"
+    BASE = ("1", "x", "x2")
+
+    def _evaluar(self, x, out):
+        np.multiply(x, self.c, out=out)
+        out += self.b
+        out *= x
+        out += self.a
+
+    def formula(self, decimales=6):
+        d = decimales
+        return f"y = {self.a:.{d}f} + {self.b:.{d}f}x + {self.c:.{d}f}x²"
+
+
+def modelo_desde_resultado(familia, resultado):
+    """
+    Construye el modelo ajustado a partir del resultado de una familia.
+
+    Args:
+        familia: Clave de la familia ("Lineal", "Exponencial", ...)
+        resultado: Diccionario de resultados de OperationsApp para esa familia
+
+    Returns:
+        Instancia de la clase de la familia
+
+    Raises:
+        ValueError: Si la familia no existe o faltan coeficientes
+    """
+    if familia not in FAMILIAS:
+        raise ValueError(f"Familia desconocida: {familia}")
+    metricas = {
+        k: float(resultado[k]) for k in METRICAS if resultado.get(k) is not None
+    }
+    coeficientes = {k: resultado[k] for k in FAMILIAS[familia].COEFICIENTES}
+    return FAMILIAS[familia](metricas or None, **coeficientes)
+
+
+def modelos_desde_resultados(resultados):
+    """
+    Construye los modelos de todas las familias aplicables.
+
+    Args:
+        resultados: Diccionario retornado por calcular_todos_modelos (o
+                    calcular_modelos_desde_estadisticos)
+
+    Returns:
+        Diccionario {familia: ModeloAjustado}, sin las familias no aplicables
+    """
+    return {
+        familia: modelo_desde_resultado(familia, r)
+        for familia, r in resultados.items()
+        if r is not None
+    }
+
+
+def modelo_desde_dict(datos):
+    """
+    Reconstruye un modelo desde ModeloAjustado.a_dict().
+
+    Raises:
+        ValueError: Si la familia no existe o faltan coeficientes
+    """
+    if datos.get("familia") not in FAMILIAS:
+        raise ValueError(f"Familia desconocida: {datos.get('familia')}")
+    return FAMILIAS[datos["familia"]](datos.get("metricas"), **datos["coeficientes"])
+
+
+def guardar_modelos_ajustados(model_id, modelos, conn=None):
+    """
+    Guarda los modelos ajustados de un modelo de la base de datos,
+    reemplazando los anteriores.
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        modelos: Diccionario {familia: ModeloAjustado}
+        conn: Conexión de una transacción en curso (opcional)
+
+    Returns:
+        Cantidad de modelos guardados
+    """
+    return Queries.save_fitted_models(
+        model_id,
+        ((m.FAMILIA, m.coeficientes, m.metricas) for m in modelos.values()),
+        conn=conn,
+    )
+
+
+def cargar_modelos_ajustados(model_id, ajustar_si_falta=True):
+    """
+    Carga los modelos ajustados de un modelo guardado.
+
+    Si no hay modelos guardados (nunca se ajustó o sus datos cambiaron) y
+    ajustar_si_falta es True, se ajusta con calcular_modelos_en_bd y se
+    guarda el resultado para las próximas cargas.
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        ajustar_si_falta: Ajustar y guardar si no hay modelos guardados
+
+    Returns:
+        Diccionario {familia: ModeloAjustado}; vacío si el modelo no existe
+    """
+    guardados = Queries.get_fitted_models(model_id)
+    if guardados:
+        return {
+            familia: FAMILIAS[familia](g["metrics"], **g["coefficients"])
+            for familia, g in guardados.items()
+            if familia in FAMILIAS
+        }
+    if not ajustar_si_falta:
+        return {}
+    resultados = OperationsApp.calcular_modelos_en_bd(model_id)
+    if resultados is None:
+        return {}
+    modelos = modelos_desde_resultados(resultados)
+    guardar_modelos_ajustados(model_id, modelos)
+    return modelos
@@ -3,11 +3,49 @@ Módulo de operaciones matemáticas para regresión lineal y exponencial.
 Contiene todas las funciones de cálculo de modelos y métricas.
 """
 
+import collections
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
+
+import BinaryFormat
+import ModelsApp
+import Profiling
+import Queries
+import SharedDataset
+
+# Precisiones aceptadas por calcular_todos_modelos
+PRECISIONES = ("float64", "float32")
+
+# Elementos por bloque al acumular en float64 los datos guardados en float32
+TAMANO_BLOQUE_FLOAT32 = 1 << 16
+
+# Refinamiento por mínimos cuadrados no lineales de Exponencial y Potencial
+# (ver refinar_no_lineal): activo por defecto, máximo de iteraciones, tolerancia
+# relativa del paso y presupuesto de tiempo en segundos por ajuste
+REFINAR_NO_LINEAL = True
+MAX_ITER_REFINAMIENTO = 50
+TOL_REFINAMIENTO = 1e-8
+TIEMPO_MAX_REFINAMIENTO = 2.0
+
+# Elementos por bloque al evaluar las sumas del refinamiento sobre arrays
+TAMANO_BLOQUE_REFINAMIENTO = 1 << 16
+
+# Puntos a partir de los cuales calcular_todos_modelos ajusta las familias en
+# varios hilos (con menos datos el costo del pool supera la ganancia)
+MIN_PUNTOS_PARALELO = 1 << 15
+
+# Regresión múltiple (ver calcular_regresion_multiple): filas por bloque al
+# acumular la matriz de Gram o los factores R, y métodos de resolución
+TAMANO_BLOQUE_MULTIPLE = 1 << 14
+METODOS_MULTIPLE = ("cholesky", "qr")
 
 
+@Profiling.timed("parse")
 def parse_numbers(text):
     """
     Parsea una cadena de texto que contiene números separados por comas, espacios o saltos de línea.
@@ -36,9 +74,178 @@ def parse_numbers(text):
     return vals
 
 
+@Profiling.timed("parse")
+def parse_array(text):
+    """
+    Igual que parse_numbers pero retorna directamente un array float64,
+    sin la lista intermedia de floats de Python.
+
+    Args:
+        text: Cadena de texto con números
+
+    Returns:
+        Array numpy de valores flotantes
+
+    Raises:
+        ValueError: Si algún valor no puede ser convertido a número
+    """
+    tokens = text.replace("\n", " ").replace(";", " ").replace(",", " ").split()
+    try:
+        return np.array(tokens, dtype=float)
+    except ValueError:
+        # parse_numbers indica cuál es el valor inválido
+        return np.array(parse_numbers(text), dtype=float)
+
+
+@Profiling.timed("parse")
+def parse_matrix(text):
+    """
+    Parsea una matriz de X con varias variables: una fila por línea (las
+    líneas vacías se ignoran) y los valores de cada fila separados por comas,
+    punto y coma, espacios o tabulaciones.
+
+    Args:
+        text: Cadena de texto con la matriz
+
+    Returns:
+        Array numpy float64 de forma (filas, variables)
+
+    Raises:
+        ValueError: Si las filas no tienen la misma cantidad de valores o
+                    algún valor no puede ser convertido a número
+    """
+    filas = [
+        linea.replace(",", " ").replace(";", " ").split()
+        for linea in text.splitlines()
+        if linea.strip()
+    ]
+    if not filas:
+        return np.empty((0, 0))
+    variables = len(filas[0])
+    for i, fila in enumerate(filas, start=1):
+        if len(fila) != variables:
+            raise ValueError(
+                f"La fila {i} tiene {len(fila)} valores, se esperaban {variables}"
+            )
+    try:
+        return np.array(filas, dtype=float)
+    except ValueError:
+        for fila in filas:
+            for token in fila:
+                try:
+                    float(token)
+                except ValueError:
+                    raise ValueError(f"Valor inválido: {token}")
+        raise
+
+
+def calcular_columnas(xs, ys=None, familias=None):
+    """
+    Calcula una sola vez las columnas que usan las familias aplicables.
+
+    Las TRANSFORMACIONES de ModelsApp (ln x, ln y, x², ...) se calculan solo
+    si alguna familia aplicable las usa, y todas las familias comparten el
+    mismo array (p. ej. ln y para Exponencial y Potencial).
+
+    Args:
+        xs: Lista o array de valores X, o un SharedDataset.SharedDataset con
+            X e y (ys None)
+        ys: Lista o array de valores y
+        familias: Clases de las familias a considerar (por defecto, todas
+                  las de ModelsApp.FAMILIAS)
+
+    Returns:
+        Tupla (columnas, aplicables): diccionario {nombre: array} con "x",
+        "y" y las transformaciones usadas, y lista de las clases de las
+        familias cuyo dominio se cumple
+
+    Raises:
+        ValueError: Si X e y no tienen la misma cantidad de valores
+    """
+    xs, ys = SharedDataset.as_arrays(xs, ys)
+    x = np.asarray(xs, dtype=float).ravel()
+    y = np.asarray(ys, dtype=float).ravel()
+    if x.size != y.size:
+        raise ValueError("Cantidad de X y y no coincide")
+    if familias is None:
+        familias = ModelsApp.FAMILIAS.values()
+    dominio = {"x": bool(np.all(x > 0)), "y": bool(np.all(y > 0))}
+    aplicables = [clase for clase in familias if clase.aplicable(dominio)]
+    columnas = {"x": x, "y": y}
+    for clase in aplicables:
+        for nombre in clase.transformaciones():
+            if nombre not in columnas:
+                columnas[nombre] = ModelsApp.TRANSFORMACIONES[nombre](columnas)
+    return columnas, aplicables
+
+
+def _suma_cuadrados_total(y):
+    """Suma de cuadrados de y respecto de su media (denominador de R²)."""
+    centrado = y - y.mean()
+    return float(np.dot(centrado, centrado))
+
+
+def _ajustar_familia(clase, columnas, sst, refinar=REFINAR_NO_LINEAL):
+    """
+    Ajusta una familia sobre las columnas compartidas.
+
+    Resuelve el ajuste lineal de OBJETIVO sobre BASE con np.linalg.lstsq,
+    centrando las columnas cuando BASE incluye la constante (igual que
+    LinearRegression de scikit-learn), convierte la solución con
+    desde_lineales() y, si la familia es REFINABLE y refinar es True, refina
+    los coeficientes con refinar_no_lineal. Las métricas se calculan con los
+    residuos en el espacio original de y.
+
+    Args:
+        clase: Clase de la familia (ver ModelsApp.ModeloAjustado)
+        columnas: Columnas retornadas por calcular_columnas
+        sst: Suma de cuadrados total de y
+        refinar: Refinar las familias REFINABLE
+
+    Returns:
+        Diccionario con los coeficientes, y_pred, mse, rmse y r2
+    """
+    with Profiling.timer(f"OperationsApp.ajustar.{clase.FAMILIA}", "fit"):
+        x, y = columnas["x"], columnas["y"]
+        objetivo = columnas[clase.OBJETIVO]
+        variables = [c for c in clase.BASE if c != "1"]
+        diseno = np.column_stack([columnas[c] for c in variables])
+        if "1" in clase.BASE:
+            medias = diseno.mean(axis=0)
+            media_objetivo = objetivo.mean()
+            pendientes = np.linalg.lstsq(
+                diseno - medias, objetivo - media_objetivo, rcond=None
+            )[0]
+            solucion = list(pendientes)
+            solucion.insert(
+                clase.BASE.index("1"), media_objetivo - np.dot(medias, pendientes)
+            )
+        else:
+            solucion = np.linalg.lstsq(diseno, objetivo, rcond=None)[0]
+        coefs = clase.desde_lineales(solucion)
+        if refinar and clase.REFINABLE:
+            coefs["a"], coefs["b"], _ = refinar_no_lineal(
+                _evaluador_no_lineal(clase.FAMILIA, x, y), coefs["a"], coefs["b"]
+            )
+        y_pred = clase(**coefs).predict(x)
+        residuo = y - y_pred
+        sse = float(np.dot(residuo, residuo))
+        return {**coefs, "y_pred": y_pred, **_metricas_desde_sse(sse, x.size, sst)}
+
+
+def _ajustar_una_familia(clave, X, y, refinar=False):
+    """Ajusta una sola familia registrada; None si no es aplicable."""
+    columnas, aplicables = calcular_columnas(X, y, [ModelsApp.FAMILIAS[clave]])
+    if not aplicables:
+        return None
+    sst = _suma_cuadrados_total(columnas["y"])
+    return _ajustar_familia(aplicables[0], columnas, sst, refinar)
+
+
+@Profiling.timed("fit")
 def calcular_regresion_lineal(X, y):
     """
-    Calcula la regresión lineal usando scikit-learn.
+    Calcula la regresión lineal por mínimos cuadrados.
     
     Args:
         X: Array numpy de valores X (shape: n x 1)
@@ -53,31 +260,22 @@ def calcular_regresion_lineal(X, y):
             - mse: Error cuadrático medio
             - rmse: Raíz del error cuadrático medio
     """
-    lr = LinearRegression()
-    lr.fit(X, y)
-    y_pred = lr.predict(X)
-    
-    mse = mean_squared_error(y, y_pred)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y, y_pred)
-    
-    return {
-        "intercept": lr.intercept_,
-        "coef": lr.coef_[0],
-        "y_pred": y_pred,
-        "mse": mse,
-        "rmse": rmse,
-        "r2": r2
-    }
+    return _ajustar_una_familia("Lineal", X, y)
 
 
-def calcular_regresion_exponencial(X, y):
+@Profiling.timed("fit")
+def calcular_regresion_exponencial(X, y, refinar=REFINAR_NO_LINEAL):
     """
     Calcula la regresión exponencial y = a * e^(bx) usando linealización.
+
+    La linealización minimiza el error en ln(y); con refinar, sus
+    coeficientes son el punto de partida de refinar_no_lineal, que minimiza
+    el error cuadrático en el espacio original de y.
     
     Args:
         X: Array numpy de valores X (shape: n x 1)
         y: Array numpy de valores y (shape: n)
+        refinar: Refinar los coeficientes con Levenberg-Marquardt
         
     Returns:
         Diccionario con:
@@ -89,38 +287,21 @@ def calcular_regresion_exponencial(X, y):
             - rmse: Raíz del error cuadrático medio
         None si algún valor de y es <= 0
     """
-    if np.any(y <= 0):
-        return None
-    
-    Y_log = np.log(y)
-    lr_exp = LinearRegression()
-    lr_exp.fit(X, Y_log)
-    
-    b = lr_exp.coef_[0]
-    a = np.exp(lr_exp.intercept_)
-    y_pred = a * np.exp(b * X.flatten())
-    
-    mse = mean_squared_error(y, y_pred)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y, y_pred)
-    
-    return {
-        "a": a,
-        "b": b,
-        "y_pred": y_pred,
-        "mse": mse,
-        "rmse": rmse,
-        "r2": r2
-    }
+    return _ajustar_una_familia("Exponencial", X, y, refinar)
 
 
-def calcular_regresion_potencial(X, y):
+@Profiling.timed("fit")
+def calcular_regresion_potencial(X, y, refinar=REFINAR_NO_LINEAL):
     """
     Calcula la regresión potencial y = a * x^b usando linealización.
+
+    Como en calcular_regresion_exponencial, con refinar los coeficientes
+    linealizados se refinan con refinar_no_lineal en el espacio original de y.
     
     Args:
         X: Array numpy de valores X (shape: n x 1)
         y: Array numpy de valores y (shape: n)
+        refinar: Refinar los coeficientes con Levenberg-Marquardt
         
     Returns:
         Diccionario con:
@@ -132,33 +313,10 @@ def calcular_regresion_potencial(X, y):
             - rmse: Raíz del error cuadrático medio
         None si algún valor de x o y es <= 0
     """
-    if np.any(X <= 0) or np.any(y <= 0):
-        return None
-    
-    X_log = np.log(X.flatten())
-    Y_log = np.log(y)
-    
-    lr_pot = LinearRegression()
-    lr_pot.fit(X_log.reshape(-1, 1), Y_log)
-    
-    b = lr_pot.coef_[0]
-    a = np.exp(lr_pot.intercept_)
-    y_pred = a * np.power(X.flatten(), b)
-    
-    mse = mean_squared_error(y, y_pred)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y, y_pred)
-    
-    return {
-        "a": a,
-        "b": b,
-        "y_pred": y_pred,
-        "mse": mse,
-        "rmse": rmse,
-        "r2": r2
-    }
+    return _ajustar_una_familia("Potencial", X, y, refinar)
 
 
+@Profiling.timed("fit")
 def calcular_regresion_logaritmica(X, y):
     """
     Calcula la regresión logarítmica y = a + b * ln(x).
@@ -177,31 +335,10 @@ def calcular_regresion_logaritmica(X, y):
             - rmse: Raíz del error cuadrático medio
         None si algún valor de x es <= 0
     """
-    if np.any(X <= 0):
-        return None
-    
-    X_log = np.log(X)
-    lr_log = LinearRegression()
-    lr_log.fit(X_log, y)
-    
-    a = lr_log.intercept_
-    b = lr_log.coef_[0]
-    y_pred = lr_log.predict(X_log)
-    
-    mse = mean_squared_error(y, y_pred)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y, y_pred)
-    
-    return {
-        "a": a,
-        "b": b,
-        "y_pred": y_pred,
-        "mse": mse,
-        "rmse": rmse,
-        "r2": r2
-    }
+    return _ajustar_una_familia("Logaritmica", X, y)
 
 
+@Profiling.timed("fit")
 def calcular_regresion_polinomial_grado2(X, y):
     """
     Calcula la regresión polinomial de grado 2: y = a + bx + cx².
@@ -220,66 +357,1645 @@ def calcular_regresion_polinomial_grado2(X, y):
             - mse: Error cuadrático medio
             - rmse: Raíz del error cuadrático medio
     """
-    X_flat = X.flatten()
-    X_poly = np.column_stack([np.ones_like(X_flat), X_flat, X_flat**2])
-    
-    lr_poly = LinearRegression(fit_intercept=False)
-    lr_poly.fit(X_poly, y)
-    
-    a = lr_poly.coef_[0]
-    b = lr_poly.coef_[1]
-    c = lr_poly.coef_[2]
-    y_pred = lr_poly.predict(X_poly)
-    
-    mse = mean_squared_error(y, y_pred)
-    rmse = np.sqrt(mse)
-    r2 = r2_score(y, y_pred)
-    
-    return {
-        "a": a,
-        "b": b,
-        "c": c,
-        "y_pred": y_pred,
-        "mse": mse,
-        "rmse": rmse,
-        "r2": r2
-    }
+    return _ajustar_una_familia("Polinomial_2", X, y)
 
 
-def calcular_todos_modelos(xs, ys):
+@Profiling.timed("fit")
+def calcular_todos_modelos(
+    xs, ys=None, precision="float64", refinar=REFINAR_NO_LINEAL, hilos=None
+):
     """
-    Calcula todos los modelos de regresión disponibles.
+    Calcula todos los modelos de regresión registrados en ModelsApp.FAMILIAS.
+
+    Las columnas transformadas se calculan una sola vez (calcular_columnas)
+    y solo se ajustan las familias aplicables; con al menos
+    MIN_PUNTOS_PARALELO puntos, cada familia se ajusta en su propio hilo.
     
     Args:
-        xs: Lista de valores X
+        xs: Lista de valores X, o un SharedDataset.SharedDataset con X e y
+            (ys None): en un proceso del pool, sus arrays no se copian
         ys: Lista de valores y
+        precision: "float64" (por defecto) o "float32" para guardar los datos
+                   y las predicciones en float32, con la mitad de memoria
+                   (ver calcular_todos_modelos_float32)
+        refinar: Refinar Exponencial y Potencial en el espacio original de y
+                 (ver refinar_no_lineal)
+        hilos: Hilos para ajustar familias en paralelo (None: uno por
+               familia aplicable, hasta la cantidad de núcleos; 1: secuencial)
         
     Returns:
-        Diccionario con los resultados de cada modelo:
-            - "linear_sklearn": Resultados de regresión lineal
-            - "exponential": Resultados de regresión exponencial (o None si no es aplicable)
-            - "power": Resultados de regresión potencial (o None si no es aplicable)
-            - "logarithmic": Resultados de regresión logarítmica (o None si no es aplicable)
-            - "polynomial_2": Resultados de regresión polinomial grado 2
+        Diccionario {familia: resultados} con una clave por familia
+        registrada ("Lineal", "Exponencial", "Potencial", "Logaritmica",
+        "Polinomial_2", ...); None en las familias no aplicables
+
+    Raises:
+        ValueError: Si la precisión no es una de PRECISIONES o X e y no
+                    tienen la misma cantidad de valores
     """
-    X = np.array(xs).reshape(-1, 1)
-    y = np.array(ys)
-    
+    if precision not in PRECISIONES:
+        raise ValueError(f"Precisión desconocida: {precision}")
+    xs, ys = SharedDataset.as_arrays(xs, ys)
+    if precision == "float32":
+        return calcular_todos_modelos_float32(xs, ys, refinar=refinar)
+
+    # asarray no copia si xs/ys ya son arrays float (p. ej. vistas binarias)
+    columnas, aplicables = calcular_columnas(xs, ys)
+    sst = _suma_cuadrados_total(columnas["y"])
+
+    def ajustar(clase):
+        return _ajustar_familia(clase, columnas, sst, refinar)
+
+    if hilos is None:
+        hilos = min(len(aplicables), os.cpu_count() or 1)
+    if hilos > 1 and len(aplicables) > 1 and columnas["x"].size >= MIN_PUNTOS_PARALELO:
+        with ThreadPoolExecutor(hilos) as pool:
+            ajustes = list(pool.map(ajustar, aplicables))
+    else:
+        ajustes = [ajustar(clase) for clase in aplicables]
+    ajustados = {clase.FAMILIA: r for clase, r in zip(aplicables, ajustes)}
+    return {clave: ajustados.get(clave) for clave in ModelsApp.FAMILIAS}
+
+
+# Probabilidades de los cuantiles guardados en el resumen de cada modelo
+CUANTILES_RESUMEN = (0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1.0)
+
+# Cantidad máxima de puntos de la muestra de reservorio del resumen
+TAMANO_MUESTRA_RESUMEN = 10000
+
+
+# Claves fijas de las sumas de las columnas de las familias incluidas (x, y,
+# x², ln x, ln y), por par de columnas desplazadas ordenado alfabéticamente.
+# Las columnas de otras familias registradas usan las claves de _clave_suma
+SUMAS_ESTADISTICOS = {
+    ("1", "1"): "n",
+    ("1", "x"): "sx",
+    ("1", "y"): "sy",
+    ("x", "x"): "sxx",
+    ("x", "y"): "sxy",
+    ("y", "y"): "syy",
+    ("1", "x2"): "sx2",
+    ("x", "x2"): "sxx2",
+    ("x2", "x2"): "sx2x2",
+    ("x2", "y"): "sx2y",
+    ("1", "ly"): "sly",
+    ("ly", "ly"): "slyly",
+    ("ly", "x"): "sxly",
+    ("1", "lx"): "slx",
+    ("lx", "lx"): "slxlx",
+    ("lx", "y"): "slxy",
+    ("lx", "ly"): "slxly",
+}
+
+# Clave del desplazamiento de cada columna en los estadísticos suficientes:
+# las sumas son de (columna - desplazamiento), con el desplazamiento cerca de
+# la media para que no se cancelen (sin la clave, el desplazamiento es 0)
+DESPLAZAMIENTOS = {"x": "cx", "y": "cy", "x2": "cx2", "lx": "clx", "ly": "cly"}
+
+# Claves de los estadísticos guardados antes de desplazar las columnas, con
+# la clave actual de la misma suma (desplazamientos 0)
+_CLAVES_ANTERIORES = {"sx3": "sxx2", "sx4": "sx2x2"}
+
+
+def _clave_suma(u, v):
+    """Clave de la suma de u·v ("1" es la constante) en los estadísticos."""
+    par = tuple(sorted((u, v)))
+    if par in SUMAS_ESTADISTICOS:
+        return SUMAS_ESTADISTICOS[par]
+    return f"s_{par[1]}" if par[0] == "1" else f"s_{par[0]}_{par[1]}"
+
+
+def _clave_desplazamiento(columna):
+    """Clave del desplazamiento de una columna en los estadísticos."""
+    return DESPLAZAMIENTOS.get(columna, f"c_{columna}")
+
+
+def _suma(stats, u, v):
+    """Suma de u·v en los estadísticos, o None si no está disponible."""
+    return stats.get(_clave_suma(u, v))
+
+
+def columnas_estadisticos(familias=None):
+    """
+    Columnas de los estadísticos suficientes: x, y y las columnas de BASE y
+    OBJETIVO de las familias, en orden de registro.
+
+    Args:
+        familias: Clases de las familias (por defecto, ModelsApp.FAMILIAS)
+    """
+    if familias is None:
+        familias = ModelsApp.FAMILIAS.values()
+    columnas = ["x", "y"]
+    for clase in familias:
+        for c in clase.BASE + (clase.OBJETIVO,):
+            if c != "1" and c not in columnas:
+                columnas.append(c)
+    return columnas
+
+
+def pares_estadisticos(familias=None):
+    """
+    Pares de columnas (ver SUMAS_ESTADISTICOS) cuyas sumas resuelven las
+    familias: los productos de las columnas de cada una, la suma de cada
+    columna y las de y (SST).
+
+    Args:
+        familias: Clases de las familias (por defecto, ModelsApp.FAMILIAS)
+
+    Returns:
+        Lista de pares (u, v) ordenados, sin ("1", "1")
+    """
+    if familias is None:
+        familias = ModelsApp.FAMILIAS.values()
+    pares = {("1", "y"), ("y", "y")}
+    for clase in familias:
+        nombres = {"1", *clase.BASE, clase.OBJETIVO}
+        pares.update(tuple(sorted((u, v))) for u in nombres for v in nombres)
+    pares.update(("1", c) for c in columnas_estadisticos(familias))
+    pares.discard(("1", "1"))
+    orden = {c: i for i, c in enumerate(["1"] + columnas_estadisticos())}
+    return sorted(pares, key=lambda par: (orden.get(par[0]), orden.get(par[1])))
+
+
+def especificacion_sql(familias=None):
+    """
+    Expresiones SQL de los estadísticos y errores de las familias, para
+    calcularlos dentro de SQLite (ver Queries.get_sufficient_stats).
+
+    Cada columna usa su expresión de ModelsApp.TRANSFORMACIONES_SQL. Las
+    familias REFINABLE (a·e^(b·u)) dan su base u para los errores en el
+    espacio original de y (ver Queries.get_model_sse).
+
+    Args:
+        familias: Clases de las familias (por defecto, ModelsApp.FAMILIAS)
+
+    Returns:
+        Diccionario con "columnas" ({columna: (expresión sobre {x} e {y},
+        clave del desplazamiento)}), "sumas" ({clave: (u, v)}) y "bases"
+        ({familia: expresión de u}); None si alguna columna no tiene
+        expresión SQL o
+        una familia que no ajusta y no es REFINABLE (su error no se puede
+        agregar en SQL)
+    """
+    if familias is None:
+        familias = list(ModelsApp.FAMILIAS.values())
+    expresiones = {"x": "{x}", "y": "{y}", **ModelsApp.TRANSFORMACIONES_SQL}
+    columnas = columnas_estadisticos(familias)
+    if any(c not in expresiones for c in columnas):
+        return None
+    if any(c.OBJETIVO != "y" and not c.REFINABLE for c in familias):
+        return None
+    return {
+        "columnas": {c: (expresiones[c], _clave_desplazamiento(c)) for c in columnas},
+        "sumas": {_clave_suma(u, v): (u, v) for u, v in pares_estadisticos(familias)},
+        "bases": {
+            c.FAMILIA: expresiones[c.BASE[1]] for c in familias if c.REFINABLE
+        },
+    }
+
+
+def calcular_estadisticos_suficientes(xs, ys=None):
+    """
+    Calcula los estadísticos suficientes (sumas) de todos los modelos.
+
+    Las columnas son las de las familias registradas (ver
+    columnas_estadisticos) y cada una se desplaza por su media antes de
+    sumar (ver DESPLAZAMIENTOS), así que las sumas de productos no pierden
+    precisión cuando los valores son grandes respecto de su dispersión.
+    Solo se incluyen las columnas de las familias cuyo dominio se cumple
+    (ver calcular_columnas), de modo que la ausencia de una clave indica que
+    el modelo correspondiente no es aplicable.
+
+    Args:
+        xs: Lista o array de valores X, o un SharedDataset.SharedDataset con
+            X e y (ys None)
+        ys: Lista o array de valores y
+
+    Returns:
+        Diccionario con n, min_x, min_y, el desplazamiento de cada columna
+        (cx, cy, cx2, ...) y las sumas de pares_estadisticos sobre las
+        columnas desplazadas
+    """
+    columnas, aplicables = calcular_columnas(xs, ys)
+    x, y = columnas["x"], columnas["y"]
+    stats = {
+        "n": int(x.size),
+        "min_x": float(x.min()) if x.size else math.inf,
+        "min_y": float(y.min()) if y.size else math.inf,
+    }
+    desplazadas = {}
+    for nombre in columnas_estadisticos(aplicables):
+        valores = columnas[nombre]
+        desplazamiento = float(valores.mean()) if x.size else 0.0
+        stats[_clave_desplazamiento(nombre)] = desplazamiento
+        desplazadas[nombre] = valores - desplazamiento
+    for u, v in pares_estadisticos(aplicables):
+        if u == "1":
+            stats[_clave_suma(u, v)] = float(desplazadas[v].sum())
+        else:
+            stats[_clave_suma(u, v)] = float(np.dot(desplazadas[u], desplazadas[v]))
+    return stats
+
+
+def _columnas_presentes(stats):
+    """Columnas registradas con desplazamiento en los estadísticos."""
+    return [c for c in columnas_estadisticos() if _clave_desplazamiento(c) in stats]
+
+
+def _media(stats, columna):
+    """Media de una columna a partir de su desplazamiento y su suma."""
+    desplazamiento = stats.get(_clave_desplazamiento(columna), 0.0)
+    return desplazamiento + _suma(stats, "1", columna) / max(stats["n"], 1)
+
+
+def _dominio(stats):
+    """
+    Dominio de los datos ({"x": bool, "y": bool}, ver aplicable) según los
+    mínimos; los estadísticos guardados sin mínimos lo indican con las
+    sumas en ln que incluyen.
+    """
+    if "min_x" in stats:
+        return {"x": stats["min_x"] > 0, "y": stats["min_y"] > 0}
+    return {"x": "slx" in stats, "y": "sly" in stats}
+
+
+def _desplazar(stats, desplazamientos):
+    """
+    Expresa los estadísticos con otros desplazamientos por columna.
+
+    Si u = u' + d, con d la diferencia de desplazamientos, cada suma se
+    corrige como Σu = Σu' + n·d y Σuv = Σu'v' + d_u·Σv' + d_v·Σu' +
+    n·d_u·d_v; las columnas sin desplazamiento nuevo conservan el suyo.
+
+    Args:
+        stats: Estadísticos (ver calcular_estadisticos_suficientes)
+        desplazamientos: Diccionario {columna: desplazamiento nuevo}
+
+    Returns:
+        Diccionario con las mismas sumas y los desplazamientos nuevos
+    """
+    n = stats["n"]
+    anteriores = {
+        c: stats[_clave_desplazamiento(c)] for c in _columnas_presentes(stats)
+    }
+    d = {c: anteriores[c] - desplazamientos.get(c, anteriores[c]) for c in anteriores}
+    resultado = dict(stats)
+    for u in anteriores:
+        resultado[_clave_suma("1", u)] = stats[_clave_suma("1", u)] + n * d[u]
+        resultado[_clave_desplazamiento(u)] = anteriores[u] - d[u]
+        for v in anteriores:
+            clave = _clave_suma(u, v)
+            if u > v or clave not in stats:
+                continue
+            resultado[clave] = (
+                stats[clave]
+                + d[u] * _suma(stats, "1", v)
+                + d[v] * _suma(stats, "1", u)
+                + n * d[u] * d[v]
+            )
+    return resultado
+
+
+def _recentrar(partes):
+    """
+    Lleva los estadísticos de varios bloques a desplazamientos comunes: la
+    media de cada columna en la unión (combinación de Chan), para que las
+    sumas de la unión sigan centradas aunque las medias de los bloques
+    difieran.
+
+    Returns:
+        Lista con los estadísticos de cada bloque, solo con las claves
+        presentes en todos los bloques
+    """
+    claves = set.intersection(*(set(p) for p in partes))
+    partes = [{k: p[k] for k in claves} for p in partes]
+    n = sum(p["n"] for p in partes)
+    medias = {
+        c: math.fsum(
+            p["n"] * p[_clave_desplazamiento(c)] + _suma(p, "1", c) for p in partes
+        )
+        / max(n, 1)
+        for c in _columnas_presentes(partes[0])
+    }
+    return [_desplazar(p, medias) for p in partes]
+
+
+def _unir(partes, sumar):
+    """
+    Estadísticos de la unión de bloques ya recentrados: los desplazamientos
+    son comunes, los mínimos se combinan con min y el resto con sumar.
+    """
+    desplazamientos = {_clave_desplazamiento(c) for c in _columnas_presentes(partes[0])}
+    stats = {}
+    for k in partes[0]:
+        if k in desplazamientos:
+            stats[k] = partes[0][k]
+        elif k in ("min_x", "min_y"):
+            stats[k] = min(p[k] for p in partes)
+        else:
+            stats[k] = sumar(p[k] for p in partes)
+    stats["n"] = sum(p["n"] for p in partes)
+    return stats
+
+
+def combinar_estadisticos(stats_a, stats_b):
+    """
+    Combina los estadísticos suficientes de dos bloques de datos.
+
+    Las sumas de ambos se llevan a la media de la unión antes de sumarlas
+    (ver _recentrar). Solo se conservan las claves presentes en ambos
+    bloques: si un bloque no cumple el dominio de un modelo, tampoco lo
+    cumple la unión.
+
+    Args:
+        stats_a: Estadísticos del primer bloque
+        stats_b: Estadísticos del segundo bloque
+
+    Returns:
+        Diccionario con los estadísticos de la unión de ambos bloques
+    """
+    return _unir(_recentrar([stats_a, stats_b]), sum)
+
+
+def sumar_estadisticos(partes):
+    """
+    Suma los estadísticos suficientes de varios bloques con math.fsum.
+
+    Los bloques se llevan primero a desplazamientos comunes (ver
+    _recentrar). fsum redondea la suma exacta, así que el error de acumular
+    muchos bloques no crece con la cantidad de datos. Como en
+    combinar_estadisticos, solo se conservan las claves presentes en todos
+    los bloques.
+
+    Args:
+        partes: Iterable de estadísticos (ver calcular_estadisticos_suficientes)
+
+    Returns:
+        Diccionario con los estadísticos de la unión de los bloques
+    """
+    return _unir(_recentrar(list(partes)), math.fsum)
+
+
+def _r2_desde_sse(sse, sst):
+    """R² a partir de las sumas de cuadrados, con la convención de sklearn."""
+    if sst == 0:
+        return 1.0 if sse == 0 else 0.0
+    return 1.0 - sse / sst
+
+
+def _metricas_desde_sse(sse, n, sst):
+    """Diccionario con mse, rmse y r2 a partir de la suma de errores al cuadrado."""
+    sse = max(float(sse), 0.0)
+    mse = sse / n
+    return {"mse": mse, "rmse": float(np.sqrt(mse)), "r2": _r2_desde_sse(sse, sst)}
+
+
+def _solucion_desde_estadisticos(clase, stats):
+    """
+    Resuelve el ajuste lineal de una familia a partir de las sumas.
+
+    Con la constante en BASE, las ecuaciones normales se centran restando las
+    medias (como en el ajuste sobre los datos), de modo que X constante da
+    pendiente 0 en lugar de un sistema singular. Como las sumas ya están
+    desplazadas cerca de la media, centrarlas no cancela cifras.
+
+    Returns:
+        Tupla (solucion, sse) con un valor por columna de BASE y la suma de
+        errores al cuadrado de OBJETIVO; None si falta alguna suma
+    """
+    base = clase.BASE
+    variables = [c for c in base if c != "1"]
+    nombres = variables + [clase.OBJETIVO]
+    if "1" not in base:
+        # Sin constante, las ecuaciones normales usan las sumas sin desplazar
+        stats = _desplazar(stats, dict.fromkeys(nombres, 0.0))
+    productos = [[_suma(stats, u, v) for v in nombres] for u in nombres]
+    sumas = [_suma(stats, "1", c) for c in nombres]
+    if None in sumas or any(None in fila for fila in productos):
+        return None
+    productos, sumas = np.array(productos, dtype=float), np.array(sumas, dtype=float)
+    if "1" in base:
+        productos -= np.outer(sumas, sumas) / stats["n"]
+    rhs = productos[:-1, -1]
+    pendientes = np.linalg.lstsq(productos[:-1, :-1], rhs, rcond=None)[0]
+    sse = productos[-1, -1] - float(np.dot(pendientes, rhs))
+    if sse < len(nombres) * np.finfo(float).eps * productos[-1, -1]:
+        # Por debajo del error de redondeo de la resta: ajuste exacto
+        sse = 0.0
+    if "1" not in base:
+        return pendientes, sse
+    medias = [_media(stats, c) for c in nombres]
+    solucion = np.empty(len(base))
+    solucion[[base.index(c) for c in variables]] = pendientes
+    solucion[base.index("1")] = medias[-1] - np.dot(medias[:-1], pendientes)
+    return solucion, sse
+
+
+def _normalizar_estadisticos(stats):
+    """
+    Estadísticos con las claves actuales: los guardados antes de desplazar
+    las columnas (sumas sin desplazar, con sx3 y sx4) se traducen a ellas.
+    """
+    if "sx2" in stats or "sxx" not in stats:
+        return stats
+    stats = {_CLAVES_ANTERIORES.get(k, k): v for k, v in stats.items()}
+    stats["sx2"] = stats["sxx"]
+    return stats
+
+
+@Profiling.timed("fit")
+def calcular_modelos_desde_estadisticos(stats, sse_fn=None, refinar_fn=None):
+    """
+    Calcula coeficientes y métricas de todos los modelos sin recorrer los datos.
+
+    Cada familia de ModelsApp.FAMILIAS se resuelve con las sumas de sus
+    columnas (ver pares_estadisticos); las que no cumplen el dominio de los
+    datos (ver _dominio) quedan en None. Las familias con OBJETIVO "y"
+    (Lineal, Logarítmica, Polinomial_2) son exactas a partir de las sumas.
+    Las demás (Exponencial, Potencial) obtienen sus coeficientes de las sumas
+    en espacio logarítmico, pero sus métricas en el espacio original de y
+    requieren la suma de errores al cuadrado, que se obtiene de
+    sse_fn(clave, coeficientes). Sin sse_fn, sus métricas quedan en None.
+    Con refinar_fn, los coeficientes linealizados de las familias REFINABLE
+    se reemplazan por los refinados que retorna (ver refinar_no_lineal) y
+    sse_fn no se usa.
+
+    Args:
+        stats: Estadísticos suficientes (ver calcular_estadisticos_suficientes;
+               también se aceptan los de resúmenes guardados sin desplazar)
+        sse_fn: Función opcional (clave, coeficientes) -> suma de errores al cuadrado
+        refinar_fn: Función opcional (clave, coeficientes) ->
+                    (coeficientes refinados, suma de errores al cuadrado)
+
+    Returns:
+        Diccionario con las mismas claves que calcular_todos_modelos, sin y_pred
+
+    Raises:
+        ValueError: Si falta alguna suma de una familia aplicable (p. ej.
+                    estadísticos calculados antes de registrar la familia)
+    """
+    stats = _normalizar_estadisticos(stats)
+    n = stats["n"]
+    sst = stats["syy"] - stats["sy"] ** 2 / n
+    dominio = _dominio(stats)
     resultados = {}
-    
-    # Calcular regresión lineal
-    resultados["Lineal"] = calcular_regresion_lineal(X, y)
-    
-    # Calcular regresión exponencial
-    resultados["Exponencial"] = calcular_regresion_exponencial(X, y)
-    
-    # Calcular regresión potencial
-    resultados["Potencial"] = calcular_regresion_potencial(X, y)
-    
-    # Calcular regresión logarítmica
-    resultados["Logaritmica"] = calcular_regresion_logaritmica(X, y)
-    
-    # Calcular regresión polinomial de grado 2
-    resultados["Polinomial_2"] = calcular_regresion_polinomial_grado2(X, y)
-    
+    for clave, clase in ModelsApp.FAMILIAS.items():
+        if not clase.aplicable(dominio):
+            resultados[clave] = None
+            continue
+        resuelto = _solucion_desde_estadisticos(clase, stats)
+        if resuelto is None:
+            raise ValueError(f"Los estadísticos no incluyen las sumas de {clave}")
+        solucion, sse_lineal = resuelto
+        coefs = clase.desde_lineales(solucion)
+        if clase.OBJETIVO == "y":
+            sse = sse_lineal
+        elif refinar_fn is not None and clase.REFINABLE:
+            coefs, sse = refinar_fn(clave, coefs)
+        elif sse_fn is not None:
+            sse = sse_fn(clave, coefs)
+        else:
+            resultados[clave] = {**coefs, "mse": None, "rmse": None, "r2": None}
+            continue
+        resultados[clave] = {**coefs, **_metricas_desde_sse(sse, n, sst)}
     return resultados
+
+
+def _resolver_lote(A, b):
+    """
+    Resuelve A[i]·β[i] = b[i] para una pila de sistemas pequeños simétricos.
+
+    Cada sistema se escala por su diagonal y se resuelve en un solo
+    np.linalg.solve vectorizado; los que quedan singulares o casi (columnas
+    constantes en la ventana) usan la pseudoinversa, igual que lstsq en el
+    ajuste sobre los datos.
+
+    Args:
+        A: Array (m, k, k)
+        b: Array (m, k)
+
+    Returns:
+        Array (m, k) con las soluciones
+    """
+    k = A.shape[-1]
+    if k == 1:
+        # Una sola variable: pendiente 0 si es constante en la ventana
+        divisor = A[:, 0, :]
+        return np.divide(b, divisor, out=np.zeros_like(b), where=divisor > 0)
+    escala = np.sqrt(np.einsum("...ii->...i", A))
+    escala[~(escala > 0)] = 1.0
+    A = A / (escala[:, :, None] * escala[:, None, :])
+    b = b / escala
+    singular = ~(np.abs(np.linalg.det(A)) > 1e-10)
+    regulares = np.where(singular[:, None, None], np.eye(k), A)
+    beta = np.linalg.solve(regulares, b[:, :, None])[:, :, 0]
+    if singular.any():
+        beta[singular] = (np.linalg.pinv(A[singular]) @ b[singular][:, :, None])[
+            :, :, 0
+        ]
+    return beta / escala
+
+
+@Profiling.timed("fit")
+def calcular_modelos_ventana(xs, ys, ventana, paso=1, familias=None):
+    """
+    Ajusta las familias sobre ventanas deslizantes de la serie.
+
+    La ventana i cubre los puntos [i·paso, i·paso + ventana). Las sumas de
+    cada producto de columnas salen de sumas acumuladas, de modo que la suma
+    de una ventana es la resta de dos valores acumulados y cuesta O(1) sin
+    importar su tamaño. Para que las restas no pierdan precisión, la serie
+    se divide en segmentos de ventana puntos: cada columna se desplaza por
+    la media de su segmento y las sumas acumuladas se reinician en cada
+    segmento. Una ventana abarca a lo sumo dos segmentos; la parte del
+    segundo se lleva al desplazamiento del primero con la diferencia de sus
+    medias. Las ecuaciones normales centradas de todas las ventanas se
+    resuelven juntas (ver _resolver_lote).
+
+    El R² se calcula en el espacio del ajuste lineal (OBJETIVO): es exacto
+    para Lineal, Logarítmica y Polinomial_2, mientras que para Exponencial y
+    Potencial es el R² de ln y, sin refinamiento no lineal (el error en el
+    espacio original de y no se puede obtener de sumas acumuladas).
+
+    Args:
+        xs: Lista o array de valores X
+        ys: Lista o array de valores y
+        ventana: Cantidad de puntos de cada ventana
+        paso: Puntos entre el inicio de una ventana y el de la siguiente
+        familias: Claves de las familias a ajustar (por defecto, todas las de
+                  ModelsApp.FAMILIAS)
+
+    Returns:
+        Diccionario {clave: {coeficiente: array, ..., "r2": array}} con un
+        valor por ventana (nan en las ventanas fuera del dominio de la
+        familia), o None para las familias sin ninguna ventana válida
+
+    Raises:
+        ValueError: Si X e y no tienen la misma cantidad de valores o la
+                    ventana o el paso no son válidos
+    """
+    x = np.asarray(xs, dtype=float).ravel()
+    y = np.asarray(ys, dtype=float).ravel()
+    if x.size != y.size:
+        raise ValueError("Cantidad de X y y no coincide")
+    if not 2 <= ventana <= x.size or paso < 1:
+        raise ValueError("La ventana debe tener entre 2 y n puntos y el paso ser >= 1")
+    if familias is None:
+        familias = list(ModelsApp.FAMILIAS)
+    n = x.size
+    inicios = np.arange(0, n - ventana + 1, paso)
+    segmento, desfase = np.divmod(inicios, ventana)
+    segmentos = -(-n // ventana)
+
+    columnas = {"x": x, "y": y}
+    desplazadas, invalidos, medias, deltas, partes, sumas = {}, {}, {}, {}, {}, {}
+
+    def columna(nombre):
+        # Columna (segmentos, ventana) desplazada por la media de cada
+        # segmento, con 0 donde no es finita
+        if nombre not in desplazadas:
+            if nombre not in columnas:
+                with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                    columnas[nombre] = ModelsApp.TRANSFORMACIONES[nombre](columnas)
+            valores = np.full(segmentos * ventana, np.nan)
+            valores[:n] = columnas[nombre]
+            valores = valores.reshape(segmentos, ventana)
+            finitos = np.isfinite(valores)
+            valores = np.where(finitos, valores, 0.0)
+            cuenta = finitos.sum(axis=1)
+            media = np.zeros(segmentos + 1)
+            np.divide(valores.sum(axis=1), cuenta, out=media[:-1], where=cuenta > 0)
+            invalidos[nombre] = ~finitos.ravel()[:n]
+            medias[nombre] = media
+            desplazadas[nombre] = np.where(finitos, valores - media[:-1, None], 0.0)
+        return desplazadas[nombre]
+
+    def parte(*nombres):
+        # Suma del producto en la parte de cada ventana dentro de su primer
+        # segmento y en la del siguiente, en los desplazamientos de cada uno
+        clave = tuple(sorted(nombres))
+        if clave not in partes:
+            producto = columna(clave[0])
+            for nombre in clave[1:]:
+                producto = producto * columna(nombre)
+            total = np.zeros((segmentos + 1, ventana + 1))
+            np.cumsum(producto, axis=1, out=total[:-1, 1:])
+            partes[clave] = (
+                total[segmento, ventana] - total[segmento, desfase],
+                total[segmento + 1, desfase],
+            )
+        return partes[clave]
+
+    def delta(nombre):
+        # Diferencia entre la media del segmento siguiente y la del primero
+        if nombre not in deltas:
+            deltas[nombre] = medias[nombre][segmento + 1] - medias[nombre][segmento]
+        return deltas[nombre]
+
+    def suma(*nombres):
+        # Suma por ventana del producto, desplazada por las medias del
+        # primer segmento de la ventana
+        clave = tuple(sorted(nombres))
+        if clave not in sumas:
+            primera, segunda = parte(*clave)
+            if len(clave) == 1:
+                sumas[clave] = primera + segunda + desfase * delta(clave[0])
+            else:
+                u, v = clave
+                du, dv = delta(u), delta(v)
+                sumas[clave] = (
+                    primera
+                    + segunda
+                    + du * parte(v)[1]
+                    + dv * parte(u)[1]
+                    + desfase * du * dv
+                )
+        return sumas[clave]
+
+    resultados = {}
+    with Profiling.timer("OperationsApp.calcular_modelos_ventana", "fit"):
+        for clave in familias:
+            clase = ModelsApp.FAMILIAS[clave]
+            variables = [c for c in clase.BASE if c != "1"]
+            nombres = variables + [clase.OBJETIVO]
+            fuera = np.zeros(n, dtype=bool)
+            for nombre in nombres:
+                columna(nombre)
+                fuera |= invalidos[nombre]
+            fuera_total = np.concatenate(([0], np.cumsum(fuera)))
+            validas = fuera_total[inicios + ventana] == fuera_total[inicios]
+            if not validas.any():
+                resultados[clave] = None
+                continue
+
+            # Ecuaciones normales centradas (sin centrar si BASE no tiene la
+            # constante) de todas las ventanas
+            base = {c: medias[c][segmento] for c in nombres}
+            k = len(nombres)
+            gram = np.empty((inicios.size, k, k))
+            for i, u in enumerate(nombres):
+                for j, v in enumerate(nombres[: i + 1]):
+                    if "1" in clase.BASE:
+                        producto = suma(u, v) - suma(u) * suma(v) / ventana
+                    else:
+                        producto = (
+                            suma(u, v)
+                            + base[u] * suma(v)
+                            + base[v] * suma(u)
+                            + ventana * base[u] * base[v]
+                        )
+                    gram[:, i, j] = gram[:, j, i] = producto
+            gram[~validas] = np.eye(k)
+            pendientes = _resolver_lote(gram[:, :-1, :-1], gram[:, :-1, -1])
+            sse = gram[:, -1, -1] - np.einsum("ij,ij->i", pendientes, gram[:, :-1, -1])
+
+            solucion = [pendientes[:, j] for j in range(len(variables))]
+            if "1" in clase.BASE:
+                media = {c: base[c] + suma(c) / ventana for c in nombres}
+                constante = media[clase.OBJETIVO] - sum(
+                    media[c] * pendientes[:, j] for j, c in enumerate(variables)
+                )
+                solucion.insert(clase.BASE.index("1"), constante)
+            coefs = clase.desde_lineales(solucion)
+
+            objetivo = clase.OBJETIVO
+            sst = suma(objetivo, objetivo) - suma(objetivo) ** 2 / ventana
+            sse = np.maximum(sse, 0.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r2 = np.where(sst > 0, 1.0 - sse / sst, np.where(sse > 0, 0.0, 1.0))
+            resultados[clave] = {
+                nombre: np.where(validas, valores, np.nan)
+                for nombre, valores in {**coefs, "r2": r2}.items()
+            }
+    return resultados
+
+
+def muestra_reservorio(xs, ys, tamano=TAMANO_MUESTRA_RESUMEN, semilla=0,
+                       muestra=None, n_visto=0):
+    """
+    Muestra uniforme de tamaño fijo (algoritmo R de reservorio), vectorizada.
+
+    Permite continuar una muestra previa con datos nuevos (p. ej. al agregar
+    puntos al final) sin volver a recorrer los datos anteriores.
+
+    Args:
+        xs: Valores X nuevos
+        ys: Valores y nuevos
+        tamano: Tamaño máximo de la muestra
+        semilla: Semilla del generador aleatorio (reproducible)
+        muestra: Tupla (xs_muestra, ys_muestra) previa o None
+        n_visto: Cantidad de puntos ya procesados por la muestra previa
+
+    Returns:
+        Tupla (xs_muestra, ys_muestra) como arrays numpy
+    """
+    x = np.asarray(xs, dtype=float).ravel()
+    y = np.asarray(ys, dtype=float).ravel()
+    if muestra is None:
+        mx, my = np.empty(0), np.empty(0)
+    else:
+        mx = np.array(muestra[0], dtype=float)
+        my = np.array(muestra[1], dtype=float)
+
+    # Llenar primero los huecos libres del reservorio
+    libres = max(tamano - mx.size, 0)
+    mx = np.concatenate([mx, x[:libres]])
+    my = np.concatenate([my, y[:libres]])
+    x, y = x[libres:], y[libres:]
+    if x.size == 0:
+        return mx, my
+
+    rng = np.random.default_rng(semilla + n_visto)
+    indices_globales = np.arange(x.size) + n_visto + libres
+    j = rng.integers(0, indices_globales + 1)
+    reemplaza = j < tamano
+    j, origen = j[reemplaza], np.nonzero(reemplaza)[0]
+    # Si un hueco se reemplaza varias veces, gana el último punto
+    j_inv, ultimo = np.unique(j[::-1], return_index=True)
+    origen = origen[::-1][ultimo]
+    mx[j_inv] = x[origen]
+    my[j_inv] = y[origen]
+    return mx, my
+
+
+@Profiling.timed("summary")
+def calcular_resumen(xs, ys, tamano_muestra=TAMANO_MUESTRA_RESUMEN, semilla=0):
+    """
+    Calcula un resumen compacto de un conjunto de datos para guardarlo junto al modelo.
+
+    Incluye estadísticos suficientes, mínimos/máximos, cuantiles y una muestra
+    de reservorio. Todos los valores son tipos nativos (serializables a JSON).
+
+    Args:
+        xs: Lista o array de valores X
+        ys: Lista o array de valores y
+        tamano_muestra: Tamaño máximo de la muestra de reservorio
+        semilla: Semilla de la muestra
+
+    Returns:
+        Diccionario con n, estadisticos, cuantiles, x, y y muestra
+    """
+    x = np.asarray(xs, dtype=float).ravel()
+    y = np.asarray(ys, dtype=float).ravel()
+    mx, my = muestra_reservorio(x, y, tamano_muestra, semilla)
+
+    def _resumen_eje(v):
+        return {
+            "min": float(v.min()),
+            "max": float(v.max()),
+            "cuantiles": [float(q) for q in np.quantile(v, CUANTILES_RESUMEN)],
+        }
+
+    return {
+        "n": int(x.size),
+        "estadisticos": calcular_estadisticos_suficientes(x, y),
+        "cuantiles": list(CUANTILES_RESUMEN),
+        "x": _resumen_eje(x),
+        "y": _resumen_eje(y),
+        "muestra": {"x": mx.tolist(), "y": my.tolist()},
+    }
+
+
+def calcular_modelos_desde_resumen(resumen, refinar=REFINAR_NO_LINEAL):
+    """
+    Métricas rápidas de todos los modelos a partir del resumen guardado.
+
+    Los coeficientes son exactos. Las métricas de Exponencial y Potencial se
+    estiman sobre la muestra de reservorio (escalada a n puntos); con
+    refinar, sus coeficientes también se refinan sobre la muestra.
+
+    Args:
+        resumen: Diccionario retornado por calcular_resumen
+        refinar: Refinar Exponencial y Potencial (ver refinar_no_lineal)
+
+    Returns:
+        Diccionario con las mismas claves que calcular_todos_modelos, sin y_pred
+    """
+    mx = np.asarray(resumen["muestra"]["x"], dtype=float)
+    my = np.asarray(resumen["muestra"]["y"], dtype=float)
+    escala = resumen["n"] / max(mx.size, 1)
+    if refinar and mx.size:
+        return calcular_modelos_desde_estadisticos(
+            resumen["estadisticos"], refinar_fn=_refinador_sobre_datos(mx, my, escala)
+        )
+    return calcular_modelos_desde_estadisticos(
+        resumen["estadisticos"], _sse_sobre_datos(mx, my, escala)
+    )
+
+
+@Profiling.timed("fit")
+def calcular_modelos_incremental(stats, xs, ys, inicio, refinar=REFINAR_NO_LINEAL):
+    """
+    Actualiza un ajuste previo cuando solo se agregaron puntos al final.
+
+    Los estadísticos de los puntos xs[inicio:], ys[inicio:] se combinan con
+    los del ajuste previo (ver combinar_estadisticos), así que coeficientes y
+    métricas de Lineal, Logarítmica y Polinomial_2 solo recorren los puntos
+    nuevos y coinciden con un ajuste completo aunque y sea grande. Las métricas
+    de Exponencial y Potencial se evalúan sobre todos los datos (sus errores
+    dependen de los coeficientes nuevos), con una pasada vectorizada, o con
+    refinar_no_lineal sobre todos los datos si refinar es True.
+
+    Args:
+        stats: Estadísticos de los primeros inicio puntos
+        xs: Array con todos los valores X (los previos y los nuevos)
+        ys: Array con todos los valores y
+        inicio: Cantidad de puntos ya incluidos en stats
+        refinar: Refinar Exponencial y Potencial (ver refinar_no_lineal)
+
+    Returns:
+        Tupla (stats, resultados): estadísticos de todos los puntos y
+        resultados con las mismas claves que calcular_todos_modelos, sin y_pred
+    """
+    x = np.asarray(xs, dtype=float)
+    y = np.asarray(ys, dtype=float)
+    nuevos = calcular_estadisticos_suficientes(x[inicio:], y[inicio:])
+    stats = combinar_estadisticos(stats, nuevos)
+    if refinar:
+        return stats, calcular_modelos_desde_estadisticos(
+            stats, refinar_fn=_refinador_sobre_datos(x, y)
+        )
+    return stats, calcular_modelos_desde_estadisticos(stats, _sse_sobre_datos(x, y))
+
+
+def _sse_sobre_datos(x, y, escala=1.0):
+    """
+    Función sse_fn (ver calcular_modelos_desde_estadisticos) que evalúa la
+    suma de errores al cuadrado de una familia sobre x, y.
+    """
+
+    def _sse(clave, coefs):
+        pred = ModelsApp.FAMILIAS[clave](**coefs).predict(x)
+        return float(np.sum((y - pred) ** 2)) * escala
+
+    return _sse
+
+
+def _pasos_levenberg_marquardt(a, b, max_iter, tol):
+    """
+    Pasos de Levenberg-Marquardt de un modelo y ≈ a·g(x; b).
+
+    Generador: produce los coeficientes (a, b) a evaluar y recibe con send()
+    sus sumas (ver Queries.get_nonlinear_sums). Con u = ∂ln(g)/∂b, el
+    jacobiano de la predicción es [g, a·u·g], así que J'J y J'r se arman con
+    esas seis sumas sin formar J. Un paso se acepta si baja la suma de
+    errores; si no, se aumenta el amortiguamiento. Termina al converger (paso
+    relativo menor que tol, error nulo o un paso rechazado por una diferencia
+    del orden del redondeo), al agotar max_iter o si el amortiguamiento crece
+    sin lograr bajar el error.
+    """
+    sumas = yield a, b
+    amortiguamiento = 1e-3
+    for _ in range(max_iter):
+        sse, sgg, sugg, suugg, sgr, sugr = sumas
+        if not all(map(math.isfinite, sumas)) or sse == 0:
+            return
+        jtj = np.array([[sgg, a * sugg], [a * sugg, a * a * suugg]])
+        jtr = np.array([sgr, a * sugr])
+        try:
+            paso = np.linalg.solve(
+                jtj + amortiguamiento * np.diag(np.diag(jtj)), jtr
+            )
+        except np.linalg.LinAlgError:
+            paso = np.array([np.nan, np.nan])
+        nuevas = None
+        if np.all(np.isfinite(paso)):
+            nuevas = yield a + paso[0], b + paso[1]
+        if (
+            nuevas is not None
+            and all(map(math.isfinite, nuevas))
+            and nuevas[0] < sse
+        ):
+            a, b, sumas = a + paso[0], b + paso[1], nuevas
+            amortiguamiento = max(amortiguamiento / 10, 1e-12)
+            if abs(paso[0]) <= tol * abs(a) and abs(paso[1]) <= tol * (abs(b) + tol):
+                return
+        elif nuevas is not None and nuevas[0] - sse <= 1e-12 * sse:
+            return
+        else:
+            amortiguamiento *= 10
+            if amortiguamiento > 1e12:
+                return
+
+
+def refinar_no_lineal_lote(
+    iniciales,
+    evaluar_lote,
+    max_iter=MAX_ITER_REFINAMIENTO,
+    tol=TOL_REFINAMIENTO,
+    tiempo_max=TIEMPO_MAX_REFINAMIENTO,
+):
+    """
+    Refina varios ajustes y ≈ a·g(x; b) a la vez con Levenberg-Marquardt.
+
+    Todos los ajustes avanzan en paralelo: en cada ronda se evalúan juntos
+    los coeficientes pedidos por cada uno, de modo que evaluar_lote puede
+    resolverlos con un solo recorrido de los datos (p. ej. una consulta).
+    Al agotar tiempo_max se conserva el mejor punto evaluado de cada ajuste,
+    que nunca es peor que el inicial.
+
+    Args:
+        iniciales: Diccionario {clave: (a, b)} con los puntos de partida
+        evaluar_lote: Función {clave: (a, b)} -> {clave: sumas}, con las
+                      sumas de Queries.get_nonlinear_sums
+        max_iter: Máximo de iteraciones de cada ajuste
+        tol: Tolerancia relativa del paso para detenerse
+        tiempo_max: Segundos máximos del refinamiento (None: sin límite)
+
+    Returns:
+        Diccionario {clave: (a, b, sse)}
+    """
+    limite = None if tiempo_max is None else time.perf_counter() + tiempo_max
+    pasos = {
+        clave: _pasos_levenberg_marquardt(a, b, max_iter, tol)
+        for clave, (a, b) in iniciales.items()
+    }
+    pedidos = {clave: next(p) for clave, p in pasos.items()}
+    mejores = {}
+    evaluaciones = 0
+    while pedidos:
+        sumas = evaluar_lote(pedidos)
+        evaluaciones += 1
+        siguientes = {}
+        for clave, (a, b) in pedidos.items():
+            sse = sumas[clave][0]
+            if clave not in mejores or sse < mejores[clave][2]:
+                mejores[clave] = (float(a), float(b), float(sse))
+            try:
+                siguientes[clave] = pasos[clave].send(sumas[clave])
+            except StopIteration:
+                pass
+        pedidos = siguientes
+        if limite is not None and time.perf_counter() > limite:
+            break
+    Profiling.count("OperationsApp.evaluaciones_refinamiento", evaluaciones)
+    return mejores
+
+
+def refinar_no_lineal(
+    evaluar,
+    a,
+    b,
+    max_iter=MAX_ITER_REFINAMIENTO,
+    tol=TOL_REFINAMIENTO,
+    tiempo_max=TIEMPO_MAX_REFINAMIENTO,
+):
+    """
+    Refina un ajuste y ≈ a·g(x; b) minimizando el error cuadrático en y.
+
+    Exponencial (g = e^(b·x)) y Potencial (g = x^b) se ajustan linealizando
+    con ln(y), lo que minimiza el error relativo y no el error cuadrático
+    que reportan mse y rmse. Partiendo de esos coeficientes, unas pocas
+    iteraciones de Gauss-Newton amortiguado (Levenberg-Marquardt) con el
+    jacobiano analítico llegan al mínimo del error en el espacio original.
+
+    Args:
+        evaluar: Función (a, b) -> sumas (ver Queries.get_nonlinear_sums),
+                 p. ej. _evaluador_no_lineal o una consulta SQL
+        a: Coeficiente a inicial
+        b: Coeficiente b inicial
+        max_iter: Máximo de iteraciones
+        tol: Tolerancia relativa del paso para detenerse
+        tiempo_max: Segundos máximos del refinamiento (None: sin límite)
+
+    Returns:
+        Tupla (a, b, sse) con los coeficientes refinados y su suma de errores
+        al cuadrado
+    """
+    return refinar_no_lineal_lote(
+        {None: (a, b)},
+        lambda pedidos: {None: evaluar(*pedidos[None])},
+        max_iter,
+        tol,
+        tiempo_max,
+    )[None]
+
+
+def _evaluador_no_lineal(clave, x, y, tamano_bloque=TAMANO_BLOQUE_REFINAMIENTO):
+    """
+    Función evaluar de refinar_no_lineal sobre arrays en memoria.
+
+    Recorre los datos por bloques de tamano_bloque elementos (los temporales
+    float64 no superan un bloque, aunque x e y sean float32) y suma los
+    bloques con math.fsum. La columna u = BASE[1] de la familia (x en
+    Exponencial, ln x en Potencial) se calcula una sola vez.
+    """
+    u_total = np.ravel(x)
+    columna = ModelsApp.FAMILIAS[clave].BASE[1]
+    if columna != "x":
+        x64 = np.asarray(u_total, dtype=float)
+        u_total = ModelsApp.TRANSFORMACIONES[columna]({"x": x64})
+    y = np.ravel(y)
+    bloques = [
+        (i, min(i + tamano_bloque, y.size)) for i in range(0, y.size, tamano_bloque)
+    ]
+
+    def evaluar(a, b):
+        totales = []
+        with np.errstate(over="ignore", invalid="ignore"):
+            for i, j in bloques:
+                u = np.asarray(u_total[i:j], dtype=float)
+                g = np.exp(b * u)
+                r = y[i:j] - a * g
+                ug = u * g
+                totales.append(
+                    (
+                        np.dot(r, r),
+                        np.dot(g, g),
+                        np.dot(ug, g),
+                        np.dot(ug, ug),
+                        np.dot(g, r),
+                        np.dot(ug, r),
+                    )
+                )
+        return tuple(math.fsum(float(t[k]) for t in totales) for k in range(6))
+
+    return evaluar
+
+
+def _refinador_sobre_datos(x, y, escala=1.0):
+    """
+    Función refinar_fn (ver calcular_modelos_desde_estadisticos) que refina
+    Exponencial y Potencial sobre x, y con refinar_no_lineal.
+    """
+
+    def _refinar(clave, coefs):
+        a, b, sse = refinar_no_lineal(
+            _evaluador_no_lineal(clave, x, y), coefs["a"], coefs["b"]
+        )
+        return {"a": a, "b": b}, sse * escala
+
+    return _refinar
+
+
+def cargar_arrays_modelo(model_id, dtype=float):
+    """
+    Carga los valores X e y de un modelo guardado leyendo la base por bloques.
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        dtype: Tipo de los arrays (np.float32 usa la mitad de memoria)
+
+    Returns:
+        Tupla (xs, ys) de arrays numpy (vacíos si el modelo no existe)
+    """
+    return tuple(
+        np.concatenate(
+            [np.empty(0, dtype=dtype)]
+            + [
+                np.array(b, dtype=dtype)
+                for b in Queries.iter_model_values(model_id, columna)
+            ]
+        )
+        for columna in Queries.PAYLOAD_COLUMNS
+    )
+
+
+@Profiling.timed("fit")
+def calcular_modelos_en_bd(model_id, refinar=REFINAR_NO_LINEAL):
+    """
+    Calcula todos los modelos de un modelo guardado sin traer sus datos.
+
+    Para modelos en la tabla de puntos, los estadísticos suficientes y los
+    errores de las familias REFINABLE se agregan dentro de SQLite con las
+    expresiones de especificacion_sql (con refinar, cada iteración de
+    refinar_no_lineal es una consulta). Los modelos guardados como texto, o
+    todos si alguna familia registrada no se puede expresar en SQL, se leen
+    por bloques y se resumen en numpy. Los resultados coinciden con
+    calcular_todos_modelos, sin y_pred.
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        refinar: Refinar Exponencial y Potencial (ver refinar_no_lineal)
+
+    Returns:
+        Diccionario con los resultados de cada modelo o None si no existe
+    """
+    spec = especificacion_sql()
+    stats = None
+    if spec is not None:
+        stats = Queries.get_sufficient_stats(model_id, spec["columnas"], spec["sumas"])
+    if stats is not None and refinar:
+
+        def _refinar(clave, c):
+            a, b, sse = refinar_no_lineal(
+                lambda a, b: Queries.get_nonlinear_sums(
+                    model_id, spec["bases"][clave], a, b
+                ),
+                c["a"],
+                c["b"],
+            )
+            return {"a": a, "b": b}, sse
+
+        return calcular_modelos_desde_estadisticos(stats, refinar_fn=_refinar)
+    if stats is not None:
+        return calcular_modelos_desde_estadisticos(
+            stats,
+            lambda clave, c: Queries.get_model_sse(
+                model_id, spec["bases"][clave], c["a"], c["b"]
+            ),
+        )
+    xs, ys = cargar_arrays_modelo(model_id)
+    if xs.size == 0:
+        return None
+    if refinar:
+        return calcular_modelos_desde_estadisticos(
+            calcular_estadisticos_suficientes(xs, ys),
+            refinar_fn=_refinador_sobre_datos(xs, ys),
+        )
+    return calcular_modelos_desde_estadisticos(
+        calcular_estadisticos_suficientes(xs, ys), _sse_sobre_datos(xs, ys)
+    )
+
+
+@Profiling.timed("fit")
+def calcular_todos_modelos_en_bd(refinar=REFINAR_NO_LINEAL):
+    """
+    Calcula todos los modelos de todos los modelos guardados.
+
+    Los modelos de la tabla de puntos se resuelven con dos recorridos de la
+    tabla dentro de SQLite (estadísticos y errores de las familias
+    REFINABLE); los guardados como texto con calcular_modelos_en_bd. Con
+    refinar, los modelos no lineales de todos los modelos se refinan juntos
+    (refinar_no_lineal_lote) y cada iteración es un recorrido de la tabla.
+    Si alguna familia registrada no se puede expresar en SQL (ver
+    especificacion_sql), todos los modelos se resuelven con
+    calcular_modelos_en_bd.
+
+    Args:
+        refinar: Refinar Exponencial y Potencial (ver refinar_no_lineal)
+
+    Returns:
+        Diccionario {model_id: resultados}
+    """
+    spec = especificacion_sql()
+    todos = {}
+    if spec is not None:
+        todos = Queries.get_all_sufficient_stats(spec["columnas"], spec["sumas"])
+    parciales = {
+        mid: calcular_modelos_desde_estadisticos(s) for mid, s in todos.items()
+    }
+    iniciales = {
+        (mid, clave): (r[clave]["a"], r[clave]["b"])
+        for mid, r in parciales.items()
+        for clave in (spec["bases"] if spec is not None else ())
+        if r[clave] is not None
+    }
+
+    resultados = {}
+    if refinar:
+        refinados = refinar_no_lineal_lote(
+            iniciales,
+            lambda pedidos: Queries.get_all_nonlinear_sums(
+                ((mid, clave, a, b) for (mid, clave), (a, b) in pedidos.items()),
+                spec["bases"],
+            ),
+        )
+        for mid, stats in todos.items():
+            resultados[mid] = calcular_modelos_desde_estadisticos(
+                stats,
+                refinar_fn=lambda clave, _, mid=mid: (
+                    dict(zip("ab", refinados[(mid, clave)][:2])),
+                    refinados[(mid, clave)][2],
+                ),
+            )
+    elif todos:
+        sses = Queries.get_all_sse(
+            ((mid, clave, a, b) for (mid, clave), (a, b) in iniciales.items()),
+            spec["bases"],
+        )
+        for mid, stats in todos.items():
+            resultados[mid] = calcular_modelos_desde_estadisticos(
+                stats, lambda clave, _, mid=mid: sses[(mid, clave)]
+            )
+    for mid, _ in Queries.search_models(""):
+        if mid not in resultados:
+            resultados[mid] = calcular_modelos_en_bd(mid, refinar)
+    return resultados
+
+
+def codificar_resultados(resultados):
+    """
+    Codifica los resultados de calcular_todos_modelos en el formato binario.
+
+    Los coeficientes y métricas van en los metadatos JSON; cada y_pred es una
+    columna float64 del buffer, sin pasar por texto.
+
+    Args:
+        resultados: Diccionario retornado por calcular_todos_modelos
+
+    Returns:
+        Buffer bytes en el formato de BinaryFormat
+    """
+    return b"".join(codificar_resultados_partes(resultados))
+
+
+def codificar_resultados_partes(resultados):
+    """
+    Igual que codificar_resultados pero retorna la lista de buffers de
+    BinaryFormat.encode_parts, sin copiar las columnas y_pred.
+
+    Args:
+        resultados: Diccionario retornado por calcular_todos_modelos
+
+    Returns:
+        Lista de buffers (cabecera y una columna por modelo aplicable)
+    """
+    meta, columnas = {}, []
+    for clave, r in resultados.items():
+        if r is None:
+            meta[clave] = None
+            continue
+        meta[clave] = {k: float(v) for k, v in r.items() if k != "y_pred"}
+        if "y_pred" in r:
+            meta[clave]["columna"] = len(columnas)
+            columnas.append(r["y_pred"])
+    return BinaryFormat.encode_parts(columnas, meta)
+
+
+def decodificar_resultados(buffer):
+    """
+    Decodifica un buffer generado por codificar_resultados.
+
+    Args:
+        buffer: Buffer en el formato de BinaryFormat
+
+    Returns:
+        Diccionario con la misma forma que calcular_todos_modelos; cada y_pred
+        es una vista numpy de solo lectura sobre el buffer
+
+    Raises:
+        ValueError: Si el buffer no tiene el formato esperado
+    """
+    columnas, meta = BinaryFormat.decode(buffer)
+    if not isinstance(meta, dict):
+        raise ValueError("El buffer no contiene resultados de regresión")
+    resultados = {}
+    for clave, r in meta.items():
+        if r is None:
+            resultados[clave] = None
+            continue
+        r = dict(r)
+        if "columna" in r:
+            r["y_pred"] = columnas[r.pop("columna")]
+        resultados[clave] = r
+    return resultados
+
+
+def calcular_todos_modelos_binario(datos):
+    """
+    Calcula todos los modelos de un conjunto (x, y) en formato binario.
+
+    Args:
+        datos: Buffer de dos columnas (ver BinaryFormat.encode_xy)
+
+    Returns:
+        Buffer con los resultados (ver codificar_resultados)
+
+    Raises:
+        ValueError: Si el buffer no es válido o las columnas están vacías
+    """
+    xs, ys = BinaryFormat.decode_xy(datos)
+    if xs.size == 0:
+        raise ValueError("Se requieren datos en X e y")
+    return codificar_resultados(calcular_todos_modelos(xs, ys))
+
+
+@Profiling.timed("fit")
+def calcular_todos_modelos_float32(
+    xs, ys, tamano_bloque=TAMANO_BLOQUE_FLOAT32, refinar=REFINAR_NO_LINEAL
+):
+    """
+    Calcula todos los modelos guardando datos y predicciones en float32.
+
+    Los datos se convierten una sola vez a float32 y se recorren por bloques
+    de tamano_bloque elementos: cada bloque se convierte a float64 para
+    acumular los estadísticos y los errores, y los totales de los bloques se
+    suman con math.fsum. La memoria por punto es la mitad que en float64 y
+    los temporales float64 no superan un bloque.
+
+    Cotas de error respecto de calcular_todos_modelos en float64:
+        - Redondeo de la entrada: cada valor cambia como mucho 2^-24
+          (~6e-8) en términos relativos; esta es la única pérdida propia del
+          modo float32.
+        - Acumulación: error relativo de cada suma del orden de
+          log2(tamano_bloque) * 1.1e-16, independiente de la cantidad de datos.
+        - Coeficientes: error relativo de orden κ * 6e-8, donde κ es el número
+          de condición de las ecuaciones normales (para Lineal,
+          κ ≈ 1 + (media(x) / desvío(x))^2). Con |media(x)| / desvío(x)
+          mayor que ~1e3 conviene usar float64.
+        - mse, rmse y r2 se calculan con los residuos de cada bloque (no con
+          las sumas), con error relativo de orden 1e-7 si el ajuste está
+          bien condicionado.
+        - y_pred se evalúa en float64 y se redondea a float32 (2^-24 relativo).
+
+    Args:
+        xs: Lista o array de valores X
+        ys: Lista o array de valores y
+        tamano_bloque: Elementos por bloque
+        refinar: Refinar Exponencial y Potencial (ver refinar_no_lineal); las
+                 sumas de cada iteración también se acumulan por bloques
+
+    Returns:
+        Diccionario con las mismas claves que calcular_todos_modelos; cada
+        y_pred es un array float32
+    """
+    x = np.asarray(xs, dtype=np.float32).ravel()
+    y = np.asarray(ys, dtype=np.float32).ravel()
+    n = x.size
+    bloques = [(i, min(i + tamano_bloque, n)) for i in range(0, n, tamano_bloque)]
+
+    stats = sumar_estadisticos(
+        calcular_estadisticos_suficientes(x[i:j], y[i:j]) for i, j in bloques
+    )
+    # Los errores de cada familia se calculan abajo sobre los residuos
+    resultados = calcular_modelos_desde_estadisticos(stats, lambda *_: 0.0)
+
+    media_y = _media(stats, "y")
+    sst = math.fsum(
+        float(np.sum(np.square(y[i:j] - media_y, dtype=float))) for i, j in bloques
+    )
+    for clave, r in resultados.items():
+        if r is None:
+            continue
+        if refinar and ModelsApp.FAMILIAS[clave].REFINABLE:
+            r["a"], r["b"], _ = refinar_no_lineal(
+                _evaluador_no_lineal(clave, x, y, tamano_bloque), r["a"], r["b"]
+            )
+        modelo = ModelsApp.modelo_desde_resultado(clave, r)
+        y_pred = np.empty(n, dtype=np.float32)
+        sse = []
+        for i, j in bloques:
+            pred = modelo.predict(x[i:j])
+            y_pred[i:j] = pred
+            residuo = y[i:j] - pred
+            sse.append(float(np.dot(residuo, residuo)))
+        r.update(_metricas_desde_sse(math.fsum(sse), n, sst))
+        r["y_pred"] = y_pred
+    return resultados
+
+
+def _mapear_acotado(funcion, elementos, hilos):
+    """
+    Aplica funcion a cada elemento en un pool de hilos y retorna los
+    resultados en orden, con a lo sumo 2 * hilos elementos en curso (los
+    bloques leídos de la base no se cargan todos antes de procesarlos).
+    """
+    if hilos <= 1:
+        yield from map(funcion, elementos)
+        return
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        pendientes = collections.deque()
+        for elemento in elementos:
+            pendientes.append(pool.submit(funcion, elemento))
+            if len(pendientes) >= 2 * hilos:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+def _gram_bloque(bloque, desplazamiento):
+    """
+    Cantidad de filas, sumas y matriz de Gram de [X, y] - desplazamiento en
+    un bloque (el producto de matrices libera el GIL).
+    """
+    X, y = bloque
+    Z = np.column_stack((X, y)) - desplazamiento
+    return Z.shape[0], Z.sum(axis=0), Z.T @ Z
+
+
+def _r_bloque(bloque, desplazamiento, intercepto):
+    """
+    Factor R de la QR de [1, X, y] (sin la constante si intercepto es False)
+    en un bloque, más la cantidad de filas y las sumas de y y de y² respecto
+    del desplazamiento de y (para la suma de cuadrados total).
+    """
+    X, y = bloque
+    yc = y - desplazamiento[-1]
+    columnas = [X - desplazamiento[:-1] if intercepto else X, yc if intercepto else y]
+    if intercepto:
+        columnas.insert(0, np.ones(y.size))
+    R = np.linalg.qr(np.column_stack(columnas), mode="r")
+    return y.size, float(yc.sum()), float(np.dot(yc, yc)), R
+
+
+def _resolver_cholesky(A, b):
+    """
+    Resuelve A·β = b con A simétrica semidefinida positiva.
+
+    A se escala por su diagonal antes de la factorización de Cholesky para
+    que variables de magnitudes muy distintas no empeoren el condicionamiento;
+    si A no es definida positiva (variables constantes o colineales) se usa
+    la solución de mínima norma de np.linalg.lstsq.
+    """
+    escala = np.sqrt(np.diag(A))
+    escala[escala == 0] = 1.0
+    A = A / np.outer(escala, escala)
+    b = b / escala
+    try:
+        L = np.linalg.cholesky(A)
+    except np.linalg.LinAlgError:
+        L = None
+    # Con diagonal unitaria, un pivote de L cercano a cero indica una
+    # variable casi colineal con las anteriores
+    if L is None or np.diag(L).min() < np.sqrt(np.finfo(float).eps):
+        return np.linalg.lstsq(A, b, rcond=None)[0] / escala
+    return np.linalg.solve(L.T, np.linalg.solve(L, b)) / escala
+
+
+def ajustar_regresion_multiple(bloques, intercepto=True, metodo="cholesky", hilos=None):
+    """
+    Ajusta y = intercepto + X·β por mínimos cuadrados recorriendo los datos
+    por bloques, sin tener nunca todos los datos en una sola matriz.
+
+    Cada bloque se procesa en un pool de hilos y aporta una parte que se
+    suma (o combina) en orden, de modo que el resultado no depende de la
+    cantidad de hilos. Todas las columnas se desplazan por la media del
+    primer bloque para que las sumas no pierdan precisión con datos lejos
+    del origen.
+
+    Métodos:
+        - "cholesky": acumula la matriz de Gram de [X, y] (p + 1 columnas) y
+          resuelve las ecuaciones normales centradas con Cholesky. Es el más
+          rápido (un producto de matrices por bloque), pero el error de β
+          crece con el cuadrado del número de condición de X.
+        - "qr": QR por bloques (TSQR): cada bloque aporta el factor R de
+          [1, X, y], que se combina con el acumulado con otra QR de sus
+          filas apiladas. β sale del sistema triangular y la suma de errores
+          al cuadrado, del último elemento de R, con el error de β
+          proporcional al número de condición.
+
+    Args:
+        bloques: Iterable de tuplas (X, y) con X de forma (filas, variables)
+        intercepto: Ajustar también el término independiente
+        metodo: "cholesky" o "qr"
+        hilos: Hilos del pool (None: uno por núcleo)
+
+    Returns:
+        Diccionario con intercept, coef (array de p valores), n, mse, rmse
+        y r2 (mismas claves que calcular_regresion_lineal)
+
+    Raises:
+        ValueError: Si el método no es válido o no hay datos
+    """
+    if metodo not in METODOS_MULTIPLE:
+        raise ValueError(f"Método no soportado: {metodo}")
+    bloques = iter(bloques)
+    primero = next(bloques, None)
+    if primero is None or len(primero[1]) == 0:
+        raise ValueError("Se requieren datos en X e y")
+    X0, y0 = primero
+    desplazamiento = np.append(np.mean(X0, axis=0), np.mean(y0))
+    if hilos is None:
+        hilos = os.cpu_count() or 1
+    bloques = itertools.chain([primero], bloques)
+    p = desplazamiento.size - 1
+
+    with Profiling.timer(f"OperationsApp.regresion_multiple.{metodo}", "fit"):
+        if metodo == "cholesky":
+            n, sumas, gram = 0, np.zeros(p + 1), np.zeros((p + 1, p + 1))
+            for k, s, g in _mapear_acotado(
+                lambda b: _gram_bloque(b, desplazamiento), bloques, hilos
+            ):
+                n, sumas, gram = n + k, sumas + s, gram + g
+            # Matriz de dispersión centrada en la media
+            dispersion = gram - np.outer(sumas, sumas) / n
+            if not intercepto:
+                # Gram de los datos sin desplazar
+                gram = (
+                    gram
+                    + np.outer(desplazamiento, sumas)
+                    + np.outer(sumas, desplazamiento)
+                    + n * np.outer(desplazamiento, desplazamiento)
+                )
+            A = dispersion if intercepto else gram
+            beta = _resolver_cholesky(A[:p, :p], A[:p, p])
+            sse = A[p, p] - np.dot(beta, A[:p, p])
+            sst = dispersion[p, p]
+            media = desplazamiento + sumas / n
+            constante = media[p] - np.dot(media[:p], beta) if intercepto else 0.0
+        else:
+            n, suma_y, suma_y2, R = 0, 0.0, 0.0, None
+            for k, s, q, r in _mapear_acotado(
+                lambda b: _r_bloque(b, desplazamiento, intercepto), bloques, hilos
+            ):
+                n, suma_y, suma_y2 = n + k, suma_y + s, suma_y2 + q
+                R = r if R is None else np.linalg.qr(np.vstack((R, r)), mode="r")
+            m = R.shape[1] - 1
+            if R.shape[0] < R.shape[1]:
+                R = np.vstack((R, np.zeros((R.shape[1] - R.shape[0], R.shape[1]))))
+            # lstsq da la solución de mínima norma si X no tiene rango
+            # completo; entonces el sistema triangular también deja residuo
+            solucion = np.linalg.lstsq(R[:m, :m], R[:m, m], rcond=None)[0]
+            residuo = R[:m, :m] @ solucion - R[:m, m]
+            sse = R[m, m] ** 2 + np.dot(residuo, residuo)
+            sst = suma_y2 - suma_y**2 / n
+            if intercepto:
+                beta = solucion[1:]
+                constante = (
+                    desplazamiento[p] + solucion[0] - np.dot(desplazamiento[:p], beta)
+                )
+            else:
+                beta, constante = solucion, 0.0
+    return {
+        "intercept": float(constante),
+        "coef": np.asarray(beta, dtype=float),
+        "n": n,
+        **_metricas_desde_sse(sse, n, max(float(sst), 0.0)),
+    }
+
+
+def predecir_multiple(resultado, X):
+    """
+    Predicción de un ajuste de ajustar_regresion_multiple.
+
+    Args:
+        resultado: Diccionario con intercept y coef
+        X: Array de forma (filas, variables)
+
+    Returns:
+        Array numpy con las predicciones
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(-1, 1)
+    return X @ resultado["coef"] + resultado["intercept"]
+
+
+@Profiling.timed("fit")
+def calcular_regresion_multiple(
+    X,
+    y=None,
+    intercepto=True,
+    metodo="cholesky",
+    tamano_bloque=TAMANO_BLOQUE_MULTIPLE,
+    hilos=None,
+    incluir_pred=True,
+):
+    """
+    Regresión lineal múltiple sobre arrays en memoria (ver
+    ajustar_regresion_multiple). Los bloques son vistas de X, sin copias.
+
+    Args:
+        X: Array de forma (n, variables); un array 1-D es una sola variable.
+           También un SharedDataset.SharedDataset con X e y (y None)
+        y: Array de n valores
+        intercepto: Ajustar también el término independiente
+        metodo: "cholesky" o "qr"
+        tamano_bloque: Filas por bloque
+        hilos: Hilos del pool (None: uno por núcleo)
+        incluir_pred: Incluir y_pred en el resultado
+
+    Returns:
+        Diccionario de ajustar_regresion_multiple, más y_pred si
+        incluir_pred es True
+
+    Raises:
+        ValueError: Si X e y no tienen la misma cantidad de filas o no hay datos
+    """
+    X, y = SharedDataset.as_arrays(X, y)
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X.reshape(-1, 1)
+    y = np.asarray(y, dtype=float).ravel()
+    if X.ndim != 2 or X.shape[0] != y.size:
+        raise ValueError("Cantidad de filas de X y y no coincide")
+    bloques = (
+        (X[i : i + tamano_bloque], y[i : i + tamano_bloque])
+        for i in range(0, y.size, tamano_bloque)
+    )
+    resultado = ajustar_regresion_multiple(bloques, intercepto, metodo, hilos)
+    if incluir_pred:
+        resultado["y_pred"] = predecir_multiple(resultado, X)
+    return resultado
+
+
+@Profiling.timed("fit")
+def calcular_regresion_multiple_en_bd(
+    model_id,
+    intercepto=True,
+    metodo="cholesky",
+    tamano_bloque=TAMANO_BLOQUE_MULTIPLE,
+    hilos=None,
+):
+    """
+    Regresión lineal múltiple de un modelo guardado, leyendo X e y de la base
+    por bloques de filas (ver Queries.iter_model_rows) mientras los bloques
+    anteriores se procesan.
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        intercepto: Ajustar también el término independiente
+        metodo: "cholesky" o "qr"
+        tamano_bloque: Filas por bloque
+        hilos: Hilos del pool (None: uno por núcleo)
+
+    Returns:
+        Diccionario de ajustar_regresion_multiple o None si el modelo no existe
+    """
+    bloques = Queries.iter_model_rows(model_id, tamano_bloque)
+    primero = next(bloques, None)
+    if primero is None:
+        return None
+    return ajustar_regresion_multiple(
+        itertools.chain([primero], bloques), intercepto, metodo, hilos
+    )
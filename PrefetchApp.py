@@ -0,0 +1,289 @@
+"""
+Precarga de modelos guardados para recorrerlos en orden (por ejemplo los
+resultados de Queries.search_models, uno por uno).
+
+Precargador lee y decodifica en segundo plano los `profundidad` modelos
+siguientes al actual y, opcionalmente, los ajusta de forma especulativa con
+OperationsApp.calcular_todos_modelos, dentro de un tope de memoria. Así,
+pasar al siguiente modelo no espera a la base de datos ni al ajuste.
+
+Uso:
+    ids = [model_id for model_id, _ in Queries.search_models("ventas")]
+    with PrefetchApp.Precargador(ids, profundidad=4) as precarga:
+        for modelo in precarga:
+            modelo["x"], modelo["y"], modelo["resultados"]
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+import BinaryFormat
+import OperationsApp
+import Profiling
+import Queries
+
+# Modelos por delante del actual que se cargan en segundo plano
+PROFUNDIDAD = 3
+
+# Memoria máxima de los modelos en el buffer (datos y predicciones)
+MAX_BYTES = 256 << 20
+
+# Hilos que cargan y ajustan en segundo plano
+HILOS = 2
+
+
+@Profiling.timed("prefetch")
+def cargar_modelo(model_id, ajustar=True):
+    """
+    Lee, decodifica y opcionalmente ajusta un modelo guardado.
+
+    Args:
+        model_id: ID del modelo en la base de datos
+        ajustar: Calcular también todos los modelos (solo con X de una columna)
+
+    Returns:
+        dict con "id", "x", "y" (arrays), "resultados" (None sin ajuste) y
+        "bytes" (memoria de los arrays); None si el modelo no existe
+
+    Raises:
+        ValueError: Si X e y no tienen la misma cantidad de valores
+    """
+    xy = Queries.get_model_xy_binary(model_id)
+    if xy is None:
+        return None
+    columnas_x = BinaryFormat.decode(xy[0])[0]
+    ys = BinaryFormat.decode(xy[1])[0][0]
+    xs = columnas_x[0] if len(columnas_x) == 1 else np.column_stack(columnas_x)
+    resultados = None
+    if ajustar and xs.ndim == 1:
+        # Un hilo por modelo: varios modelos se ajustan a la vez en el pool
+        resultados = OperationsApp.calcular_todos_modelos(xs, ys, hilos=1)
+    tamano = xs.nbytes + ys.nbytes
+    for r in (resultados or {}).values():
+        if r is not None:
+            tamano += getattr(r.get("y_pred"), "nbytes", 0)
+    return {
+        "id": model_id,
+        "x": xs,
+        "y": ys,
+        "resultados": resultados,
+        "bytes": tamano,
+    }
+
+
+class Precargador:
+    """
+    Recorre una lista ordenada de modelos con precarga en segundo plano.
+
+    El buffer guarda el modelo anterior, el actual y hasta `profundidad`
+    siguientes; los que quedan fuera de esa ventana se descartan (las
+    cargas que aún no empezaron se cancelan). No se programan más cargas
+    mientras los modelos en memoria, más una estimación de los que están
+    cargando, alcancen max_bytes; al moverse, los más lejanos se descartan
+    hasta volver bajo el tope (el actual se conserva siempre).
+
+    Args:
+        ids: IDs de los modelos en el orden de recorrido
+        profundidad: Modelos siguientes a precargar (0 desactiva la precarga)
+        max_bytes: Tope de memoria del buffer
+        ajustar: Ajustar cada modelo de forma especulativa al precargarlo
+        hilos: Hilos de carga en segundo plano
+
+    Raises:
+        ValueError: Si profundidad es negativa o hilos es menor que 1
+    """
+
+    def __init__(
+        self,
+        ids,
+        profundidad=PROFUNDIDAD,
+        max_bytes=MAX_BYTES,
+        ajustar=True,
+        hilos=HILOS,
+    ):
+        if profundidad < 0:
+            raise ValueError("La profundidad no puede ser negativa")
+        if hilos < 1:
+            raise ValueError("Se necesita al menos un hilo")
+        self.ids = list(ids)
+        self.profundidad = profundidad
+        self.max_bytes = max_bytes
+        self.ajustar = ajustar
+        self.posicion = -1
+        self.aciertos = 0
+        self.esperas = 0
+        self.fallos = 0
+        self._futuros = {}
+        self._excluidos = set()
+        self._cerrado = False
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(hilos, thread_name_prefix="precarga")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        """Recorre los modelos desde el siguiente al actual hasta el final."""
+        while self.posicion + 1 < len(self.ids):
+            yield self.siguiente()
+
+    def cerrar(self):
+        """Cancela las cargas pendientes y espera las que están en curso."""
+        with self._lock:
+            self._cerrado = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._futuros.clear()
+
+    def siguiente(self):
+        """Avanza al siguiente modelo (ver obtener)."""
+        return self.obtener(self.posicion + 1)
+
+    def anterior(self):
+        """Retrocede al modelo anterior (ver obtener)."""
+        return self.obtener(self.posicion - 1)
+
+    def obtener(self, posicion):
+        """
+        Retorna el modelo de esa posición, que pasa a ser el actual, y
+        programa la precarga de los siguientes.
+
+        Returns:
+            dict de cargar_modelo, o None si el modelo ya no existe
+
+        Raises:
+            IndexError: Si la posición está fuera de la lista
+            ValueError: Si los datos guardados no se pueden ajustar
+        """
+        if not 0 <= posicion < len(self.ids):
+            raise IndexError(f"Posición fuera de rango: {posicion}")
+        with self._lock:
+            self.posicion = posicion
+            self._excluidos.clear()
+            futuro = self._futuros.get(posicion)
+            if futuro is not None and not futuro.done() and futuro.cancel():
+                # Seguía en cola detrás de otras cargas: se carga aquí mismo
+                futuro = None
+            self._descartar()
+            self._programar()
+        if futuro is None:
+            self.fallos += 1
+            futuro = Future()
+            try:
+                futuro.set_result(cargar_modelo(self.ids[posicion], self.ajustar))
+            except Exception as e:
+                futuro.set_exception(e)
+            with self._lock:
+                if self.posicion == posicion:
+                    self._futuros[posicion] = futuro
+        elif futuro.done():
+            self.aciertos += 1
+        else:
+            self.esperas += 1
+        return futuro.result()
+
+    def esperar_precarga(self):
+        """
+        Bloquea hasta que terminen las cargas programadas, incluidas las que
+        se programan al terminar otras.
+        """
+        while True:
+            with self._lock:
+                pendientes = [f for f in self._futuros.values() if not f.done()]
+            if not pendientes:
+                return
+            for futuro in pendientes:
+                if not futuro.cancelled():
+                    futuro.exception()
+
+    def bytes_en_memoria(self):
+        """Memoria de los modelos ya cargados en el buffer."""
+        with self._lock:
+            return sum(self._tamanos())
+
+    def estadisticas(self):
+        """
+        Retorna:
+            dict con aciertos (listos al pedirlos), esperas (aún cargando),
+            fallos (cargados al pedirlos), precargados y bytes
+        """
+        with self._lock:
+            tamanos = self._tamanos()
+            return {
+                "aciertos": self.aciertos,
+                "esperas": self.esperas,
+                "fallos": self.fallos,
+                "precargados": len(tamanos),
+                "bytes": sum(tamanos),
+            }
+
+    # ------------------------------------------------------------------
+    # Buffer (con self._lock tomado)
+    # ------------------------------------------------------------------
+    def _tamanos(self):
+        """Bytes de los modelos ya cargados sin error."""
+        tamanos = []
+        for futuro in self._futuros.values():
+            if futuro.done() and not futuro.cancelled() and not futuro.exception():
+                modelo = futuro.result()
+                tamanos.append(modelo["bytes"] if modelo else 0)
+        return tamanos
+
+    def _descartar(self):
+        """Saca del buffer lo que quedó fuera de la ventana o sobre el tope."""
+        inicio = self.posicion - 1
+        fin = self.posicion + self.profundidad
+        for p in [p for p in self._futuros if not inicio <= p <= fin]:
+            self._futuros.pop(p).cancel()
+        lejanos = sorted(
+            (p for p in self._futuros if p != self.posicion),
+            key=lambda p: (abs(p - self.posicion), p < self.posicion),
+        )
+        while lejanos and sum(self._tamanos()) > self.max_bytes:
+            p = lejanos.pop()
+            self._futuros.pop(p).cancel()
+            # No se vuelve a cargar hasta el próximo movimiento
+            self._excluidos.add(p)
+
+    def _programar(self):
+        """
+        Programa las cargas siguientes que, según el tamaño promedio de los
+        modelos ya cargados, entran en el tope. Sin ningún tamaño conocido
+        se carga uno a la vez para medirlo.
+        """
+        if self._cerrado:
+            return
+        tamanos = self._tamanos()
+        cargando = sum(1 for f in self._futuros.values() if not f.done())
+        if not tamanos and cargando:
+            return
+        promedio = sum(tamanos) / len(tamanos) if tamanos else 0
+        usados = sum(tamanos) + cargando * promedio
+        fin = min(len(self.ids), self.posicion + 1 + self.profundidad)
+        for p in range(self.posicion + 1, fin):
+            if p in self._futuros or p in self._excluidos:
+                continue
+            if usados + promedio > self.max_bytes:
+                break
+            futuro = self._executor.submit(cargar_modelo, self.ids[p], self.ajustar)
+            self._futuros[p] = futuro
+            futuro.add_done_callback(self._al_cargar)
+            if not tamanos:
+                break
+            usados += promedio
+
+    def _al_cargar(self, futuro):
+        """Con el tamaño de una carga nueva se ajusta el buffer y se sigue."""
+        if futuro.cancelled():
+            return
+        with self._lock:
+            self._descartar()
+            self._programar()
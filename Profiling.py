@@ -0,0 +1,250 @@
+"""
+Lightweight, runtime-switchable timing and counting instrumentation.
+
+Stages of the pipeline (parsing, each regression, plotting, every Queries
+call) are wrapped with timed() or timer(). While profiling is disabled the
+wrappers only check a module flag, so instrumented code runs at full speed;
+once enable() is called every call records a complete event (name, category,
+start, duration, thread) in a bounded buffer.
+
+The recorded data can be summarized per stage (summary()), shown in the GUI
+performance panel, or written to disk as plain JSON (export_json()) or as a
+Chrome trace (export_chrome_trace(), viewable in chrome://tracing or Perfetto).
+
+Set the environment variable LRM_PROFILE=1 to enable profiling at startup.
+"""
+
+import collections
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Maximum number of events kept; the oldest are discarded first
+MAX_EVENTS = 100_000
+
+_enabled = os.environ.get("LRM_PROFILE", "") not in ("", "0")
+_events = collections.deque(maxlen=MAX_EVENTS)
+_counters = collections.Counter()
+_lock = threading.Lock()
+_origin_ns = time.perf_counter_ns()
+
+
+def enable() -> None:
+    """Start recording events and counters."""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording; already recorded data is kept until reset()."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Discard all recorded events and counters."""
+    with _lock:
+        _events.clear()
+        _counters.clear()
+
+
+def _record(name: str, category: str, start_ns: int, duration_ns: int) -> None:
+    _events.append((name, category, start_ns, duration_ns, threading.get_ident()))
+
+
+@contextmanager
+def _timing(name: str, category: str) -> Iterator[None]:
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, category, start, time.perf_counter_ns() - start)
+
+
+class _NullTimer:
+    """Shared no-op context manager returned while profiling is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str, category: str = "app"):
+    """
+    Context manager that records the duration of its block as one event.
+    Returns a shared no-op context manager when profiling is disabled.
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _timing(name, category)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add n to a named counter (no-op when profiling is disabled)."""
+    if _enabled:
+        with _lock:
+            _counters[name] += n
+
+
+def _timed_generator(func: Callable, name: str, category: str) -> Callable:
+    """
+    Wrap a generator function: the time spent inside the generator (not in
+    the consumer) is accumulated and recorded as one event when it finishes.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return (yield from func(*args, **kwargs))
+        generator = func(*args, **kwargs)
+        start = time.perf_counter_ns()
+        busy = 0
+        try:
+            while True:
+                step = time.perf_counter_ns()
+                try:
+                    value = next(generator)
+                except StopIteration as stop:
+                    busy += time.perf_counter_ns() - step
+                    return stop.value
+                busy += time.perf_counter_ns() - step
+                yield value
+        finally:
+            generator.close()
+            _record(name, category, start, busy)
+
+    return wrapper
+
+
+def timed(category: str = "app", name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording one event per call of the decorated function.
+    The event name defaults to "module.function". Generator functions are
+    measured over their whole iteration (see _timed_generator).
+    """
+
+    def decorator(func: Callable) -> Callable:
+        label = name or f"{func.__module__}.{func.__qualname__}"
+        if inspect.isgeneratorfunction(func):
+            return _timed_generator(func, label, category)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(label, category, start, time.perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def events() -> List[Dict[str, Any]]:
+    """
+    Recorded events, oldest first, as dicts with name, category, start_ms
+    (relative to module import), duration_ms and thread.
+    """
+    return [
+        {
+            "name": name,
+            "category": category,
+            "start_ms": (start - _origin_ns) / 1e6,
+            "duration_ms": duration / 1e6,
+            "thread": thread,
+        }
+        for name, category, start, duration, thread in list(_events)
+    ]
+
+
+def counters() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def summary() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-name aggregate of the recorded events:
+    {name: {category, count, total_ms, mean_ms, max_ms}}, slowest total first.
+    """
+    totals = {}
+    for name, category, _, duration, _ in list(_events):
+        entry = totals.setdefault(
+            name, {"category": category, "count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        ms = duration / 1e6
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+    for entry in totals.values():
+        entry["mean_ms"] = entry["total_ms"] / entry["count"]
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+
+def export_json(path: str) -> None:
+    """Write the summary, counters and raw events to a JSON file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"summary": summary(), "counters": counters(), "events": events()}, f
+        )
+
+
+def export_chrome_trace(path: str) -> None:
+    """
+    Write the recorded events in the Chrome Trace Event format (complete "X"
+    events in microseconds, plus the final counter values as "C" events).
+    """
+    pid = os.getpid()
+    trace = [
+        {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - _origin_ns) / 1e3,
+            "dur": duration / 1e3,
+            "pid": pid,
+            "tid": thread,
+        }
+        for name, category, start, duration, thread in list(_events)
+    ]
+    now = (time.perf_counter_ns() - _origin_ns) / 1e3
+    trace += [
+        {"name": name, "ph": "C", "ts": now, "pid": pid, "args": {"value": value}}
+        for name, value in counters().items()
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+__all__ = [
+    "MAX_EVENTS",
+    "enable",
+    "disable",
+    "is_enabled",
+    "reset",
+    "timer",
+    "count",
+    "timed",
+    "events",
+    "counters",
+    "summary",
+    "export_json",
+    "export_chrome_trace",
+]
@@ -1,44 +1,440 @@
+import itertools
+import json
+import math
 import os
+import re
 import sqlite3
-from typing import List, Tuple, Optional, Union, Sequence
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional, Union, Sequence
+
+import numpy as np
+
+import BinaryFormat
+import Compression
+import Profiling
 
 # Absolute path to the SQLite database file (adjust if needed)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "regressionModel.db")
 
+# Columns holding the x/y payload, the only ones chunked readers may access
+PAYLOAD_COLUMNS = ("x", "y")
+
+# Separators accepted between stored values (same as OperationsApp.parse_numbers)
+_SEPARATORS = re.compile(r"[,;\s]+")
+
+# Database paths whose schema has already been brought up to date
+_SCHEMA_READY = set()
+
+
+def _add_column(
+    conn: sqlite3.Connection, table: str, column: str, decl: str
+) -> None:
+    """
+    Add a column to a table unless it already exists (databases created from
+    an up-to-date regressionModel.sql already have it).
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def _migration_base(conn: sqlite3.Connection) -> None:
+    """Schema version 1: the original regression_model table."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS regression_model (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            model_name VARCHAR(100) NOT NULL,
+            x TEXT NOT NULL,
+            y TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _migration_summary(conn: sqlite3.Connection) -> None:
+    """Schema version 2: compact JSON summary stored alongside x and y."""
+    _add_column(conn, "regression_model", "summary", "TEXT")
+
+
+def _migration_points(conn: sqlite3.Connection) -> None:
+    """
+    Schema version 3: optional normalized storage, one row per point,
+    clustered by (model_id, idx) so range reads are sequential.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS regression_point (
+            model_id INTEGER NOT NULL REFERENCES regression_model(id),
+            idx INTEGER NOT NULL,
+            x REAL NOT NULL,
+            y REAL NOT NULL,
+            PRIMARY KEY (model_id, idx)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def _migration_fitted(conn: sqlite3.Connection) -> None:
+    """
+    Schema version 4: coefficients and metrics of fitted models, one row per
+    (model, family), so saved models can be scored without refitting.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fitted_model (
+            model_id INTEGER NOT NULL REFERENCES regression_model(id),
+            family TEXT NOT NULL,
+            coefficients TEXT NOT NULL,
+            metrics TEXT,
+            PRIMARY KEY (model_id, family)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+# Timestamp stored in created_at / updated_at (UTC, ISO 8601 with milliseconds)
+_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+_CATALOG_TABLE = f"""
+    CREATE TABLE {{name}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        model_name VARCHAR(100) NOT NULL,
+        model_name_lower VARCHAR(100) NOT NULL,
+        n_points INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT ({_NOW_SQL}),
+        updated_at TEXT NOT NULL DEFAULT ({_NOW_SQL}),
+        summary TEXT
+    )
+"""
+
+
+def _count_values(payload: Union[str, bytes, None]) -> int:
+    """
+    Number of values in a stored payload: the row count of a binary format
+    buffer or the number of tokens of a text payload.
+    """
+    if payload is None:
+        return 0
+    if Compression.is_compressed(payload):
+        return Compression.read_header(payload)[3]
+    if BinaryFormat.is_binary(payload):
+        return BinaryFormat.read_header(payload)[2]
+    if isinstance(payload, bytes):
+        payload = payload.decode("latin-1")
+    return sum(1 for token in _SEPARATORS.split(payload.strip()) if token)
+
+
+def _migration_catalog(conn: sqlite3.Connection) -> None:
+    """
+    Schema version 5: regression_model keeps only the catalog (name, its
+    lowercase form, point count, timestamps and summary) so searches and
+    listings scan small rows through covering indexes, and the x/y payloads
+    move to regression_payload, one row per model keyed by its id (a rowid
+    alias, so incremental blob I/O still addresses the model id).
+    The table is rebuilt in one transaction; the AUTOINCREMENT sequence is
+    preserved so deleted ids are never reused.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(regression_model)")}
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS regression_payload (
+            model_id INTEGER PRIMARY KEY REFERENCES regression_model(id),
+            x BLOB NOT NULL,
+            y BLOB NOT NULL
+        )
+        """
+    )
+    if "x" in columns:
+        conn.create_function("lrm_count_values", 1, _count_values, deterministic=True)
+        conn.create_function("lrm_lower", 1, str.lower, deterministic=True)
+        row = conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'regression_model'"
+        ).fetchone()
+        seq = row[0] if row else 0
+        conn.execute(_CATALOG_TABLE.format(name="regression_model_v5"))
+        conn.execute(
+            "INSERT INTO regression_payload (model_id, x, y) "
+            "SELECT id, x, y FROM regression_model"
+        )
+        conn.execute(
+            """
+            INSERT INTO regression_model_v5
+                (id, model_name, model_name_lower, n_points, summary)
+            SELECT m.id, m.model_name, lrm_lower(m.model_name),
+                CASE WHEN m.y = '' THEN (
+                    SELECT COUNT(*) FROM regression_point p WHERE p.model_id = m.id
+                ) ELSE lrm_count_values(m.y) END,
+                m.summary
+            FROM regression_model m
+            """
+        )
+        conn.execute("DROP TABLE regression_model")
+        conn.execute("ALTER TABLE regression_model_v5 RENAME TO regression_model")
+        max_id = conn.execute("SELECT MAX(id) FROM regression_model").fetchone()[0]
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'regression_model'")
+        if max(seq, max_id or 0):
+            conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) "
+                "VALUES ('regression_model', ?)",
+                (max(seq, max_id or 0),),
+            )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS regression_model_by_name "
+        "ON regression_model (model_name_lower, model_name)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS regression_model_by_update "
+        "ON regression_model (updated_at, id, model_name, n_points)"
+    )
+
+
+# Ordered schema migrations; PRAGMA user_version stores how many were applied
+_MIGRATIONS = [
+    _migration_base,
+    _migration_summary,
+    _migration_points,
+    _migration_fitted,
+    _migration_catalog,
+]
+
+
+def _ensure_schema(conn: sqlite3.Connection) -> None:
+    """
+    Apply pending migrations in order, each one in its own transaction.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(_MIGRATIONS[version:], start=version + 1):
+        with conn:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+
+
+def _sql_ln(value: Optional[float]) -> Optional[float]:
+    """ln() for SQLite builds without math functions (NULL outside the domain)."""
+    return math.log(value) if value is not None and value > 0 else None
+
+
+def _sql_exp(value: Optional[float]) -> Optional[float]:
+    """exp() for SQLite builds without math functions."""
+    if value is None:
+        return None
+    try:
+        return math.exp(value)
+    except OverflowError:
+        return math.inf
+
+
+def _sql_power(base: Optional[float], exponent: Optional[float]) -> Optional[float]:
+    """power() for SQLite builds without math functions."""
+    if base is None or exponent is None:
+        return None
+    try:
+        return math.pow(base, exponent)
+    except (OverflowError, ValueError):
+        return None
+
+
+def _ensure_math_functions(conn: sqlite3.Connection) -> None:
+    """
+    Register ln/exp/power as deterministic UDFs when the SQLite library was
+    built without its math functions, so aggregation queries run everywhere.
+    """
+    try:
+        conn.execute("SELECT ln(1), exp(0), power(2, 2)").fetchone()
+    except sqlite3.OperationalError:
+        conn.create_function("ln", 1, _sql_ln, deterministic=True)
+        conn.create_function("exp", 1, _sql_exp, deterministic=True)
+        conn.create_function("power", 2, _sql_power, deterministic=True)
+
 
 def get_connection() -> sqlite3.Connection:
     """
     Create and return a SQLite3 connection to the regressionModel.db.
+    The schema is migrated to the latest version the first time a
+    database path is opened.
     """
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    _ensure_math_functions(conn)
+    if DB_PATH not in _SCHEMA_READY:
+        _ensure_schema(conn)
+        _SCHEMA_READY.add(DB_PATH)
+    return conn
+
+
+def migrate_database() -> Tuple[int, int]:
+    """
+    Bring DB_PATH to the latest schema version now instead of on first use.
+    Returns the (previous, current) schema versions.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        before = conn.execute("PRAGMA user_version").fetchone()[0]
+        _ensure_schema(conn)
+        _SCHEMA_READY.add(DB_PATH)
+        return before, conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def compact_database(
+    page_size: Optional[int] = None, incremental: bool = True
+) -> Tuple[int, int]:
+    """
+    Rebuild DB_PATH with VACUUM, reclaiming the pages freed by deleted or
+    rewritten payloads and storing the catalog and its indexes contiguously.
+    page_size (a power of two from 512 to 65536) is applied by the rebuild.
+    With incremental the file switches to auto_vacuum=INCREMENTAL so later
+    frees can be returned with PRAGMA incremental_vacuum, without a rebuild.
+    The copy keeps temporary data in memory with a larger page cache, and
+    ANALYZE refreshes the planner statistics afterwards.
+    Must not be called while another connection holds a transaction.
+    Returns the file size in bytes (before, after).
+    Raises ValueError for an invalid page_size.
+    """
+    if page_size is not None and (
+        not 512 <= page_size <= 65536 or page_size & (page_size - 1)
+    ):
+        raise ValueError("page_size must be a power of two from 512 to 65536.")
+    conn = get_connection()
+    try:
+        before = os.path.getsize(DB_PATH)
+        conn.isolation_level = None
+        if page_size is not None:
+            conn.execute(f"PRAGMA page_size = {int(page_size)}")
+        conn.execute(f"PRAGMA auto_vacuum = {'INCREMENTAL' if incremental else 'NONE'}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -65536")
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return before, os.path.getsize(DB_PATH)
 
 
 def _normalize_xy(value: Union[str, Sequence, int, float]) -> str:
     """
     Normalize x or y input to a comma-separated string representation.
     If it's already a string, returns as-is.
-    If it's a sequence (list/tuple), joins items by comma.
+    If it's a sequence (list/tuple) or a numpy array, joins items by comma.
     Otherwise casts to string directly.
     """
     if isinstance(value, str):
         return value.strip()
+    if BinaryFormat.is_binary(value):
+        columns = BinaryFormat.decode(value)[0]
+        if len(columns) > 1:
+            # Multi-feature x: one row per line (see OperationsApp.parse_matrix)
+            return "\n".join(
+                ",".join(str(v) for v in row) for row in np.column_stack(columns)
+            )
+        value = columns[0]
+    if hasattr(value, "tolist"):
+        value = value.tolist()
     if isinstance(value, Sequence) and not isinstance(value, (bytes, bytearray)):
         return ",".join(str(v) for v in value)
     return str(value)
 
 
+def _payload(value, codec: Optional[str] = None) -> Union[str, bytes]:
+    """
+    Value stored in the x/y columns: binary format buffers (see BinaryFormat)
+    are kept as BLOBs, 2-D numpy arrays (one row per observation, one column
+    per feature) are encoded as multi-column BLOBs and anything else is
+    normalized to text.
+    With a codec (see Compression.CODECS) the values are stored as a
+    compressed BLOB instead, whatever the input form; "none" is the same as
+    no codec.
+    """
+    if codec not in (None, "none"):
+        if Compression.is_compressed(value):
+            value = Compression.decompress(value)
+        if not BinaryFormat.is_binary(value):
+            if isinstance(value, np.ndarray) and value.ndim == 2:
+                value = BinaryFormat.encode(list(value.T))
+            else:
+                value = BinaryFormat.encode([_to_values(value)])
+        return Compression.compress(value, codec)
+    if Compression.is_compressed(value) or BinaryFormat.is_binary(value):
+        return bytes(value)
+    if isinstance(value, np.ndarray) and value.ndim == 2:
+        return BinaryFormat.encode(list(value.T))
+    return _normalize_xy(value)
+
+
+def _to_values(value: Union[str, Sequence, int, float]) -> List[float]:
+    """
+    Convert x or y input (text with the usual separators, a binary format
+    buffer, or any iterable of numbers) to a list of floats for the points
+    table.
+    Raises ValueError for multi-feature x, which the points table cannot hold.
+    """
+    if isinstance(value, str):
+        return _to_floats(_SEPARATORS.split(value.strip()))
+    if BinaryFormat.is_binary(value):
+        columns = BinaryFormat.decode(value)[0]
+        if len(columns) > 1:
+            raise ValueError("The points table stores a single x column.")
+        return columns[0].tolist()
+    if isinstance(value, np.ndarray) and value.ndim == 2:
+        if value.shape[1] > 1:
+            raise ValueError("The points table stores a single x column.")
+        return value.ravel().tolist()
+    if isinstance(value, (int, float)):
+        return [float(value)]
+    return [float(v) for v in value]
+
+
+def _has_points(conn: sqlite3.Connection, model_id: int) -> bool:
+    """
+    True if the model is stored in the normalized regression_point table.
+    """
+    query = "SELECT 1 FROM regression_point WHERE model_id = ? LIMIT 1"
+    return conn.execute(query, (model_id,)).fetchone() is not None
+
+
+def _insert_points(
+    conn: sqlite3.Connection, model_id: int, xs: List[float], ys: List[float]
+) -> None:
+    """
+    Bulk insert the points of a model; the caller owns the transaction.
+    """
+    if len(xs) != len(ys):
+        raise ValueError("x and y must have the same number of values.")
+    conn.executemany(
+        "INSERT INTO regression_point (model_id, idx, x, y) VALUES (?, ?, ?, ?)",
+        zip(itertools.repeat(model_id), itertools.count(), xs, ys),
+    )
+    Profiling.count("Queries.points_written", len(xs))
+
+
+def _dump_summary(summary: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Serialize a model summary (see OperationsApp.calcular_resumen) to JSON.
+    """
+    if summary is None:
+        return None
+    return json.dumps(summary, separators=(",", ":"))
+
+
+@Profiling.timed("db")
 def search_models(name_fragment: str) -> List[Tuple[int, str]]:
     """
     Search models whose name partially matches name_fragment.
     Returns a list of (id, model_name).
     Uses case-insensitive LIKE and sorts by closest length difference first.
+    The match runs on the precomputed model_name_lower column, so the scan
+    only reads the (model_name_lower, model_name) covering index.
     """
-    fragment = f"%{name_fragment.strip()}%"
+    fragment = f"%{name_fragment.strip().lower()}%"
     query = """
         SELECT id, model_name
         FROM regression_model
-        WHERE LOWER(model_name) LIKE LOWER(?)
+        WHERE model_name_lower LIKE ?
         ORDER BY ABS(LENGTH(model_name) - ?), model_name ASC
     """
     conn = get_connection()
@@ -49,94 +445,1220 @@ def search_models(name_fragment: str) -> List[Tuple[int, str]]:
         conn.close()
 
 
+@Profiling.timed("db")
+def list_models(
+    limit: Optional[int] = None, offset: int = 0
+) -> List[Tuple[int, str, int, str]]:
+    """
+    List saved models, most recently updated first, as
+    (id, model_name, n_points, updated_at) tuples.
+    Only the catalog is read, through its (updated_at, id, model_name,
+    n_points) covering index; no payload is touched.
+    """
+    query = """
+        SELECT id, model_name, n_points, updated_at
+        FROM regression_model
+        ORDER BY updated_at DESC, id DESC
+        LIMIT ? OFFSET ?
+    """
+    conn = get_connection()
+    try:
+        return conn.execute(
+            query, (-1 if limit is None else limit, offset)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def _points_xy(
+    conn: sqlite3.Connection, model_id: int, binary: bool
+) -> Union[Tuple[str, str], Tuple[bytes, bytes]]:
+    """(x, y) of a points-stored model as text or as binary format buffers."""
+    points = conn.execute(
+        "SELECT x, y FROM regression_point WHERE model_id = ? ORDER BY idx",
+        (model_id,),
+    ).fetchall()
+    if binary:
+        values = np.array(points, dtype=float).reshape(-1, 2)
+        return BinaryFormat.encode([values[:, 0]]), BinaryFormat.encode(
+            [values[:, 1]]
+        )
+    return _normalize_xy([p[0] for p in points]), _normalize_xy(
+        [p[1] for p in points]
+    )
+
+
+def _stored_xy(
+    conn: sqlite3.Connection, model_id: int, row: Optional[tuple], binary: bool
+) -> Optional[tuple]:
+    """
+    (x, y) of a model from its regression_payload row, as returned by
+    get_model_xy_by_id (binary=False) or get_model_xy_binary (binary=True).
+    Compressed payloads are decompressed (see Compression).
+    """
+    if not row:
+        return None
+    if _has_points(conn, model_id):
+        return _points_xy(conn, model_id, binary)
+    row = tuple(
+        Compression.decompress(v) if Compression.is_compressed(v) else v for v in row
+    )
+    if binary:
+        # Each column is encoded only if it was stored as text
+        return tuple(
+            v if isinstance(v, bytes) else BinaryFormat.encode([_to_values(v)])
+            for v in row
+        )
+    if isinstance(row[0], bytes):
+        # Binary payloads are returned as text for compatibility
+        return _normalize_xy(row[0]), _normalize_xy(row[1])
+    return tuple(row)
+
+
+@Profiling.timed("db")
 def get_model_xy_by_id(model_id: int) -> Optional[Tuple[str, str]]:
     """
     Given a model id, return (x, y) as stored strings.
+    Models kept in the points table are returned as comma-separated text too.
     Returns None if not found.
     """
     query = """
         SELECT x, y
+        FROM regression_payload
+        WHERE model_id = ?
+        LIMIT 1
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(query, (model_id,)).fetchone()
+        return _stored_xy(conn, model_id, row, False)
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_model_xy_binary(model_id: int) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Given a model id, return (x, y) as binary format buffers (see
+    BinaryFormat). Binary-stored payloads are returned exactly as read from
+    the database (x may hold several feature columns); text and
+    points-stored columns are encoded on the fly.
+    Returns None if not found.
+    """
+    query = "SELECT x, y FROM regression_payload WHERE model_id = ? LIMIT 1"
+    conn = get_connection()
+    try:
+        row = conn.execute(query, (model_id,)).fetchone()
+        return _stored_xy(conn, model_id, row, True)
+    finally:
+        conn.close()
+
+
+# Ids bound per IN (...) query, well below SQLITE_MAX_VARIABLE_NUMBER
+_IDS_PER_QUERY = 500
+
+
+@Profiling.timed("db")
+def get_models_xy(
+    model_ids: Iterable[int], binary: bool = False
+) -> List[Optional[tuple]]:
+    """
+    Batched get_model_xy_by_id (or get_model_xy_binary with binary=True):
+    the payloads of all ids are read on one connection with one
+    IN (...) query per _IDS_PER_QUERY ids.
+    Returns a list aligned with model_ids (None for missing models).
+    """
+    ids = list(model_ids)
+    conn = get_connection()
+    try:
+        rows = {}
+        for start in range(0, len(ids), _IDS_PER_QUERY):
+            chunk = ids[start : start + _IDS_PER_QUERY]
+            marks = ", ".join("?" * len(chunk))
+            rows.update(
+                (r[0], r[1:])
+                for r in conn.execute(
+                    "SELECT model_id, x, y FROM regression_payload "
+                    f"WHERE model_id IN ({marks})",
+                    chunk,
+                )
+            )
+        return [_stored_xy(conn, i, rows.get(i), binary) for i in ids]
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_points_range(
+    model_id: int, start: int, stop: int
+) -> List[Tuple[int, float, float]]:
+    """
+    Return the points with start <= idx < stop of a model stored in the
+    points table, as (idx, x, y) ordered by idx.
+    Returns an empty list for text-stored models or an empty range.
+    """
+    query = """
+        SELECT idx, x, y
+        FROM regression_point
+        WHERE model_id = ? AND idx >= ? AND idx < ?
+        ORDER BY idx
+    """
+    conn = get_connection()
+    try:
+        return conn.execute(query, (model_id, start, stop)).fetchall()
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_model_n_points(model_id: int) -> Optional[int]:
+    """
+    Number of observations of a model, read from the catalog (no payload
+    is touched). Returns None if the model does not exist.
+    """
+    query = "SELECT n_points FROM regression_model WHERE id = ?"
+    conn = get_connection()
+    try:
+        row = conn.execute(query, (model_id,)).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_model_point_count(model_id: int) -> int:
+    """
+    Number of points of a model stored in the points table
+    (0 for text-stored or missing models).
+    """
+    query = "SELECT COUNT(*) FROM regression_point WHERE model_id = ?"
+    conn = get_connection()
+    try:
+        return conn.execute(query, (model_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_model_summary_by_id(model_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Given a model id, return its stored summary as a dict.
+    Returns None if the model does not exist or has no summary yet.
+    Only the summary column is selected; the x/y payload is not transferred.
+    """
+    query = """
+        SELECT summary
         FROM regression_model
         WHERE id = ?
         LIMIT 1
     """
     conn = get_connection()
     try:
-        cur = conn.execute(query, (model_id,))
-        row = cur.fetchone()
-        return row if row else None
+        row = conn.execute(query, (model_id,)).fetchone()
+        if not row or row[0] is None:
+            return None
+        return json.loads(row[0])
     finally:
         conn.close()
 
 
-def insert_model(model_name: str, x, y) -> int:
+@Profiling.timed("db")
+def update_model_summary(model_id: int, summary: Optional[Dict[str, Any]]) -> bool:
     """
-    Insert a new regression model row with model_name, x, y.
-    Returns inserted row id.
-    Raises RuntimeError if lastrowid is unexpectedly None.
+    Store (or clear, with None) the summary of an existing row by id.
+    Returns True if a row was actually updated.
     """
-    x_str = _normalize_xy(x)
-    y_str = _normalize_xy(y)
     query = """
-        INSERT INTO regression_model (model_name, x, y)
-        VALUES (?, ?, ?)
+        UPDATE regression_model
+        SET summary = ?
+        WHERE id = ?
     """
     conn = get_connection()
     try:
-        cur = conn.execute(query, (str(model_name), x_str, y_str))
+        cur = conn.execute(query, (_dump_summary(summary), model_id))
         conn.commit()
+        return cur.rowcount > 0
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_model_payload_size(model_id: int) -> Optional[Tuple[int, int]]:
+    """
+    Given a model id, return the stored size in bytes of (x, y) without
+    reading the payload (incremental blob handles only read the cell header).
+    For models in the points table this is 8 bytes (one REAL) per value.
+    Returns None if not found.
+    """
+    conn = get_connection()
+    try:
+        if _has_points(conn, model_id):
+            count = conn.execute(
+                "SELECT COUNT(*) FROM regression_point WHERE model_id = ?",
+                (model_id,),
+            ).fetchone()[0]
+            return 8 * count, 8 * count
+        if hasattr(conn, "blobopen"):
+            try:
+                sizes = []
+                for column in PAYLOAD_COLUMNS:
+                    with conn.blobopen(
+                        "regression_payload", column, model_id, readonly=True
+                    ) as blob:
+                        sizes.append(len(blob))
+                return sizes[0], sizes[1]
+            except sqlite3.OperationalError:
+                return None
+        row = conn.execute(
+            "SELECT length(CAST(x AS BLOB)), length(CAST(y AS BLOB)) "
+            "FROM regression_payload WHERE model_id = ?",
+            (model_id,),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+    finally:
+        conn.close()
+
+
+def _read_payload_chunks(
+    conn: sqlite3.Connection, model_id: int, column: str, chunk_size: int
+) -> Iterator[bytes]:
+    """
+    Yield the stored payload of one column in pieces of about chunk_size bytes.
+    Uses incremental blob I/O when available and substr() reads otherwise.
+    """
+    if hasattr(conn, "blobopen"):
+        try:
+            blob = conn.blobopen("regression_payload", column, model_id, readonly=True)
+        except sqlite3.OperationalError:
+            return
+        with blob:
+            while True:
+                data = blob.read(chunk_size)
+                if not data:
+                    return
+                Profiling.count("Queries.payload_bytes_read", len(data))
+                yield data
+    else:
+        start = 1
+        query = f"""
+            SELECT substr(CAST({column} AS BLOB), ?, ?)
+            FROM regression_payload
+            WHERE model_id = ?
+        """
+        while True:
+            row = conn.execute(query, (start, chunk_size, model_id)).fetchone()
+            if not row or not row[0]:
+                return
+            Profiling.count("Queries.payload_bytes_read", len(row[0]))
+            yield row[0]
+            start += chunk_size
+
+
+def _iter_binary_values(chunks: Iterator[bytes]) -> Iterator[List[float]]:
+    """
+    Stream the values of a single-column binary format payload, chunk by
+    chunk, carrying over values split across two chunks.
+    """
+    pending = b""
+    header = None
+    for data in chunks:
+        pending += data
+        if header is None:
+            try:
+                header = BinaryFormat.read_header(pending)
+            except ValueError:
+                if len(pending) < BinaryFormat.HEADER_SIZE:
+                    continue
+                raise
+            if len(pending) < header[3]:
+                header = None
+                continue
+            pending = pending[header[3] :]
+            dtype, remaining = header[0], header[2] * header[0].itemsize
+        usable = min(len(pending) - len(pending) % dtype.itemsize, remaining)
+        if usable:
+            yield np.frombuffer(pending[:usable], dtype=dtype).tolist()
+            pending = pending[usable:]
+            remaining -= usable
+
+
+@Profiling.timed("db")
+def iter_model_values(
+    model_id: int, column: str, chunk_size: int = 1 << 16
+) -> Iterator[List[float]]:
+    """
+    Stream the values of the x or y payload of a model as lists of floats.
+    The payload is read in chunks of chunk_size bytes; a number split across
+    two chunks is carried over, so the full text is never held in memory.
+    Binary payloads (see BinaryFormat) are streamed the same way, and
+    compressed ones (see Compression) one decompressed chunk at a time.
+    Models in the points table are read as idx ranges of chunk_size / 8 rows.
+    Yields nothing if the model does not exist.
+    Raises ValueError for an unknown column or a non-numeric value.
+    """
+    if column not in PAYLOAD_COLUMNS:
+        raise ValueError(f"Unknown payload column: {column}")
+    conn = get_connection()
+    reader = None
+    try:
+        if _has_points(conn, model_id):
+            rows = max(chunk_size // 8, 1)
+            query = f"""
+                SELECT {column}
+                FROM regression_point
+                WHERE model_id = ? AND idx >= ? AND idx < ?
+                ORDER BY idx
+            """
+            for start in itertools.count(0, rows):
+                values = [
+                    r[0] for r in conn.execute(query, (model_id, start, start + rows))
+                ]
+                if not values:
+                    return
+                yield values
+        reader = _read_payload_chunks(conn, model_id, column, chunk_size)
+        first = next(reader, None)
+        if first is None:
+            return
+        chunks = itertools.chain([first], reader)
+        if first[:4] == Compression.MAGIC:
+            for block in Compression.iter_decode(chunks):
+                yield block.tolist()
+            return
+        if first[:4] == BinaryFormat.MAGIC:
+            yield from _iter_binary_values(chunks)
+            return
+        pending = ""
+        for chunk in chunks:
+            tokens = _SEPARATORS.split(pending + chunk.decode("latin-1"))
+            # The last token may continue in the next chunk
+            pending = tokens.pop()
+            yield _to_floats(tokens)
+        tail = _to_floats([pending])
+        if tail:
+            yield tail
+    finally:
+        if reader is not None:
+            # Release the blob handle before its connection
+            reader.close()
+        conn.close()
+
+
+def _to_floats(tokens: List[str]) -> List[float]:
+    """
+    Convert non-empty tokens to floats, raising ValueError on invalid values.
+    """
+    values = []
+    for token in tokens:
+        if token:
+            try:
+                values.append(float(token))
+            except ValueError:
+                raise ValueError(f"Invalid value: {token}")
+    return values
+
+
+def _read_column_rows(
+    blob, header: Tuple[np.dtype, int, int, int], column: int, start: int, count: int
+) -> np.ndarray:
+    """
+    Read rows [start, start + count) of one column of a binary payload
+    through an open blob handle, seeking straight to them.
+    """
+    dtype, _, rows, offset = header
+    blob.seek(offset + (column * rows + start) * dtype.itemsize)
+    data = blob.read(count * dtype.itemsize)
+    if len(data) != count * dtype.itemsize:
+        raise ValueError("Truncated binary format buffer.")
+    Profiling.count("Queries.payload_bytes_read", len(data))
+    return np.frombuffer(data, dtype=dtype)
+
+
+def _iter_row_blocks(values: Iterator[List[float]], rows: int) -> Iterator[np.ndarray]:
+    """
+    Regroup streamed values (see iter_model_values) into float64 arrays of
+    exactly rows values; only the last one may be shorter.
+    """
+    pending = np.empty(0)
+    for chunk in values:
+        pending = np.concatenate((pending, chunk))
+        while pending.size >= rows:
+            yield pending[:rows]
+            pending = pending[rows:]
+    if pending.size:
+        yield pending
+
+
+@Profiling.timed("db")
+def iter_model_rows(
+    model_id: int, rows: int = 1 << 14
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream a model as (X, y) blocks of at most rows observations, X being a
+    (rows, features) float64 array (one column for single-feature models).
+    Binary x payloads are read with incremental blob I/O, seeking to the
+    rows of each feature column (to the chunks holding them when
+    compressed); y and text or points-stored x are streamed with
+    iter_model_values, so memory stays bounded by the block size.
+    Without blobopen a binary x is decoded once and then sliced.
+    Yields nothing if the model does not exist.
+    Raises ValueError if x and y hold a different number of rows.
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(
+            "SELECT typeof(x) = 'blob' FROM regression_payload WHERE model_id = ?",
+            (model_id,),
+        ).fetchone()
+        if row is None:
+            return
+        y_blocks = _iter_row_blocks(iter_model_values(model_id, "y", rows * 8), rows)
+        if row[0] and hasattr(conn, "blobopen"):
+            with conn.blobopen(
+                "regression_payload", "x", model_id, readonly=True
+            ) as bx:
+                if bx.read(4) == Compression.MAGIC:
+                    reader = Compression.Reader(bx)
+                    x_blocks = (
+                        reader.read_rows(start, rows).astype(float)
+                        for start in range(0, reader.rows, rows)
+                    )
+                else:
+                    bx.seek(0)
+                    header = BinaryFormat.read_header(
+                        bx.read(BinaryFormat.HEADER_SIZE)
+                    )
+                    _, features, total, _ = header
+                    x_blocks = (
+                        np.column_stack(
+                            [
+                                _read_column_rows(bx, header, column, start, count)
+                                for column in range(features)
+                            ]
+                        ).astype(float)
+                        for start in range(0, total, rows)
+                        for count in [min(rows, total - start)]
+                    )
+                yield from _pair_blocks(x_blocks, y_blocks)
+            return
+    finally:
+        conn.close()
+    if row[0]:
+        X = np.column_stack(BinaryFormat.decode(get_model_xy_binary(model_id)[0])[0])
+        x_blocks = (X[i : i + rows].astype(float) for i in range(0, X.shape[0], rows))
+    else:
+        x_blocks = (
+            block.reshape(-1, 1)
+            for block in _iter_row_blocks(
+                iter_model_values(model_id, "x", rows * 8), rows
+            )
+        )
+    yield from _pair_blocks(x_blocks, y_blocks)
+
+
+def _pair_blocks(
+    x_blocks: Iterator[np.ndarray], y_blocks: Iterator[np.ndarray]
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Zip x and y row blocks, raising ValueError when their lengths differ.
+    """
+    for X, y in itertools.zip_longest(x_blocks, y_blocks):
+        if X is None or y is None or X.shape[0] != y.size:
+            raise ValueError("x and y must have the same number of values.")
+        yield X, y
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Unit of work: yield a connection holding the write lock (BEGIN IMMEDIATE)
+    and commit once on exit, or roll back if an exception escapes.
+    Pass the connection as conn= to the write functions to group them.
+    """
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _write_connection(
+    conn: Optional[sqlite3.Connection],
+) -> Iterator[sqlite3.Connection]:
+    """
+    Yield the caller's connection (the caller owns the transaction) or a new
+    transaction() when conn is None.
+    """
+    if conn is not None:
+        yield conn
+    else:
+        with transaction() as own:
+            yield own
+
+
+def _model_row(
+    model_name: str,
+    x,
+    y,
+    summary: Optional[Dict[str, Any]],
+    store_points: bool,
+    codec: Optional[str] = None,
+) -> Tuple[tuple, tuple, Optional[Tuple[List[float], List[float]]]]:
+    """
+    Parameters of one model for the catalog INSERT and the payload INSERT
+    (without the id), plus its (xs, ys) values when stored in the points
+    table; points-stored models keep an empty payload.
+    """
+    name, summary = str(model_name), _dump_summary(summary)
+    if store_points:
+        xs, ys = _to_values(x), _to_values(y)
+        return (name, name.lower(), len(ys), summary), ("", ""), (xs, ys)
+    px, py = _payload(x, codec), _payload(y, codec)
+    return (name, name.lower(), _count_values(py), summary), (px, py), None
+
+
+_INSERT_MODEL = """
+    INSERT INTO regression_model (model_name, model_name_lower, n_points, summary)
+    VALUES (?, ?, ?, ?)
+"""
+
+_INSERT_PAYLOAD = """
+    INSERT INTO regression_payload (model_id, x, y)
+    VALUES (?, ?, ?)
+"""
+
+
+@Profiling.timed("db")
+def insert_model(
+    model_name: str,
+    x,
+    y,
+    summary: Optional[Dict[str, Any]] = None,
+    store_points: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+    codec: Optional[str] = None,
+) -> int:
+    """
+    Insert a new regression model row with model_name, x, y and an optional
+    summary (see OperationsApp.calcular_resumen). x and y given as binary
+    format buffers (see BinaryFormat) are stored as BLOBs without text encoding.
+    With store_points=True the values go to the regression_point table
+    (bulk executemany in the same transaction) and x/y are left empty.
+    Otherwise codec (see Compression.CODECS) stores x/y compressed, trading
+    CPU on every read and write for a smaller database.
+    With conn (see transaction()) the insert joins the caller's transaction.
+    Returns inserted row id.
+    Raises RuntimeError if lastrowid is unexpectedly None.
+    Raises ValueError for an unknown codec.
+    """
+    catalog, payload, points = _model_row(
+        model_name, x, y, summary, store_points, codec
+    )
+    with _write_connection(conn) as c:
+        cur = c.execute(_INSERT_MODEL, catalog)
         rowid = cur.lastrowid
         if rowid is None:
             raise RuntimeError("Failed to retrieve lastrowid after insert.")
+        c.execute(_INSERT_PAYLOAD, (rowid,) + payload)
+        if points is not None:
+            _insert_points(c, rowid, *points)
         return rowid
-    finally:
-        conn.close()
 
 
-def update_model_xy(model_id: int, x, y) -> bool:
+@Profiling.timed("db")
+def insert_models(
+    models: Iterable[Sequence],
+    store_points: bool = False,
+    conn: Optional[sqlite3.Connection] = None,
+    codec: Optional[str] = None,
+) -> List[int]:
+    """
+    Bulk insert models given as (model_name, x, y) or
+    (model_name, x, y, summary) tuples with executemany (catalog, then
+    payloads) in one transaction (one commit for the whole batch).
+    codec applies to every model (see insert_model).
+    Ids are assigned consecutively while the write lock is held, so they are
+    derived from the AUTOINCREMENT sequence instead of one query per row.
+    Returns the inserted ids in input order.
+    Raises RuntimeError if the assigned ids are not the expected ones.
+    """
+    rows = [
+        _model_row(
+            m[0], m[1], m[2], m[3] if len(m) > 3 else None, store_points, codec
+        )
+        for m in models
+    ]
+    if not rows:
+        return []
+    with _write_connection(conn) as c:
+        if not c.in_transaction:
+            c.execute("BEGIN IMMEDIATE")
+        row = c.execute(
+            "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence "
+            "WHERE name = 'regression_model'), 0), "
+            "COALESCE((SELECT MAX(id) FROM regression_model), 0))"
+        ).fetchone()
+        first_id = row[0] + 1
+        c.executemany(_INSERT_MODEL, (r[0] for r in rows))
+        last_id = c.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'regression_model'"
+        ).fetchone()[0]
+        ids = list(range(first_id, first_id + len(rows)))
+        if last_id != ids[-1]:
+            raise RuntimeError("Unexpected ids assigned during bulk insert.")
+        c.executemany(
+            _INSERT_PAYLOAD, ((i,) + r[1] for i, r in zip(ids, rows))
+        )
+        for model_id, (_, _, points) in zip(ids, rows):
+            if points is not None:
+                _insert_points(c, model_id, *points)
+        return ids
+
+
+_UPDATE_MODEL = f"""
+    UPDATE regression_model
+    SET n_points = ?, summary = ?, updated_at = {_NOW_SQL}
+    WHERE id = ?
+"""
+
+_UPDATE_PAYLOAD = """
+    UPDATE regression_payload
+    SET x = ?, y = ?
+    WHERE model_id = ?
+"""
+
+
+@Profiling.timed("db")
+def update_model_xy(
+    model_id: int,
+    x,
+    y,
+    summary: Optional[Dict[str, Any]] = None,
+    conn: Optional[sqlite3.Connection] = None,
+    codec: Optional[str] = None,
+) -> bool:
     """
     Update x and y of an existing row by id.
+    Models in the points table are updated by diff: only changed points are
+    rewritten, new ones appended and surplus ones deleted.
+    The stored summary is replaced by the given one; when omitted it is
+    cleared so that a stale summary is never served.
+    Without codec the payload keeps its current compression (see
+    insert_model); codec="none" stores it uncompressed.
+    With conn (see transaction()) the update joins the caller's transaction.
     Returns True if a row was actually updated.
     """
-    x_str = _normalize_xy(x)
-    y_str = _normalize_xy(y)
-    query = """
-        UPDATE regression_model
-        SET x = ?, y = ?
-        WHERE id = ?
+    return update_models([(model_id, x, y, summary)], conn=conn, codec=codec) > 0
+
+
+@Profiling.timed("db")
+def update_models(
+    models: Iterable[Sequence],
+    conn: Optional[sqlite3.Connection] = None,
+    codec: Optional[str] = None,
+) -> int:
+    """
+    Bulk update models given as (model_id, x, y) or
+    (model_id, x, y, summary) tuples inside one transaction. Text-stored
+    models are written with a single executemany; points-stored models are
+    updated by diff (see update_model_xy, also for codec).
+    Returns the number of models actually updated.
+    """
+    models = list(models)
+    updated = 0
+    with _write_connection(conn) as c:
+        catalog_rows, payload_rows = [], []
+        for m in models:
+            model_id, x, y = m[0], m[1], m[2]
+            summary = _dump_summary(m[3] if len(m) > 3 else None)
+            if _has_points(c, model_id):
+                xs, ys = _to_values(x), _to_values(y)
+                _apply_points_diff(c, model_id, xs, ys)
+                catalog_rows.append((len(ys), summary, model_id))
+            else:
+                keep = _stored_codec(c, model_id) if codec is None else codec
+                px, py = _payload(x, keep), _payload(y, keep)
+                payload_rows.append((px, py, model_id))
+                catalog_rows.append((_count_values(py), summary, model_id))
+        if payload_rows:
+            c.executemany(_UPDATE_PAYLOAD, payload_rows)
+        if catalog_rows:
+            updated += c.executemany(_UPDATE_MODEL, catalog_rows).rowcount
+        # Fitted coefficients no longer match the new data
+        c.executemany(
+            "DELETE FROM fitted_model WHERE model_id = ?", ((m[0],) for m in models)
+        )
+    return updated
+
+
+def _stored_codec(conn: sqlite3.Connection, model_id: int) -> Optional[str]:
+    """Codec of a stored payload (None if uncompressed), from its first bytes."""
+    row = conn.execute(
+        "SELECT substr(y, 1, 6) FROM regression_payload WHERE model_id = ?",
+        (model_id,),
+    ).fetchone()
+    return Compression.codec_of(row[0]) if row else None
+
+
+def _apply_points_diff(
+    conn: sqlite3.Connection, model_id: int, xs: List[float], ys: List[float]
+) -> None:
+    """
+    Bring the stored points of a model to (xs, ys) touching only the rows
+    that differ; the caller owns the transaction.
+    """
+    if len(xs) != len(ys):
+        raise ValueError("x and y must have the same number of values.")
+    stored = conn.execute(
+        "SELECT x, y FROM regression_point WHERE model_id = ? ORDER BY idx",
+        (model_id,),
+    ).fetchall()
+    common = min(len(stored), len(xs))
+    changed = [
+        (xs[i], ys[i], model_id, i)
+        for i in range(common)
+        if stored[i][0] != xs[i] or stored[i][1] != ys[i]
+    ]
+    conn.executemany(
+        "UPDATE regression_point SET x = ?, y = ? WHERE model_id = ? AND idx = ?",
+        changed,
+    )
+    if len(xs) > common:
+        conn.executemany(
+            "INSERT INTO regression_point (model_id, idx, x, y) VALUES (?, ?, ?, ?)",
+            ((model_id, i, xs[i], ys[i]) for i in range(common, len(xs))),
+        )
+    elif len(stored) > common:
+        conn.execute(
+            "DELETE FROM regression_point WHERE model_id = ? AND idx >= ?",
+            (model_id, common),
+        )
+
+
+@Profiling.timed("db")
+def update_points(
+    model_id: int, points: Iterable[Tuple[int, float, float]]
+) -> int:
+    """
+    Partially update a model stored in the points table with (idx, x, y)
+    tuples, in a single transaction. The summary and fitted models are
+    cleared since they no longer match the data.
+    Returns the number of points actually updated.
     """
     conn = get_connection()
     try:
-        cur = conn.execute(query, (x_str, y_str, model_id))
+        cur = conn.executemany(
+            "UPDATE regression_point SET x = ?, y = ? WHERE model_id = ? AND idx = ?",
+            ((x, y, model_id, idx) for idx, x, y in points),
+        )
+        updated = cur.rowcount
+        if updated:
+            conn.execute(
+                "UPDATE regression_model "
+                f"SET summary = NULL, updated_at = {_NOW_SQL} WHERE id = ?",
+                (model_id,),
+            )
+            conn.execute("DELETE FROM fitted_model WHERE model_id = ?", (model_id,))
         conn.commit()
-        return cur.rowcount > 0
+        return updated
     finally:
         conn.close()
 
 
-def delete_model(model_id: int) -> bool:
+@Profiling.timed("db")
+def delete_model(model_id: int, conn: Optional[sqlite3.Connection] = None) -> bool:
     """
-    Delete a model from the database by id.
+    Delete a model (and its points, if any) from the database by id.
+    With conn (see transaction()) the delete joins the caller's transaction.
     Returns True if a row was actually deleted.
     """
-    query = """
-        DELETE FROM regression_model
-        WHERE id = ?
+    return delete_models([model_id], conn=conn) > 0
+
+
+@Profiling.timed("db")
+def delete_models(
+    model_ids: Iterable[int], conn: Optional[sqlite3.Connection] = None
+) -> int:
+    """
+    Bulk delete models (with their points and fitted models) by id with
+    executemany inside one transaction.
+    Returns the number of models actually deleted.
+    """
+    params = [(model_id,) for model_id in model_ids]
+    with _write_connection(conn) as c:
+        c.executemany("DELETE FROM regression_point WHERE model_id = ?", params)
+        c.executemany("DELETE FROM fitted_model WHERE model_id = ?", params)
+        c.executemany("DELETE FROM regression_payload WHERE model_id = ?", params)
+        cur = c.executemany("DELETE FROM regression_model WHERE id = ?", params)
+        return cur.rowcount
+
+
+@Profiling.timed("db")
+def save_fitted_models(
+    model_id: int,
+    fitted: Iterable[Tuple[str, Dict[str, float], Optional[Dict[str, float]]]],
+    conn: Optional[sqlite3.Connection] = None,
+) -> int:
+    """
+    Replace the fitted models of a saved model with (family, coefficients,
+    metrics) tuples; coefficients and metrics are stored as JSON.
+    Returns the number of fitted models written.
+    """
+    rows = [
+        (
+            model_id,
+            family,
+            json.dumps(coefficients),
+            json.dumps(metrics) if metrics is not None else None,
+        )
+        for family, coefficients, metrics in fitted
+    ]
+    with _write_connection(conn) as c:
+        c.execute("DELETE FROM fitted_model WHERE model_id = ?", (model_id,))
+        c.executemany(
+            """
+            INSERT INTO fitted_model (model_id, family, coefficients, metrics)
+            VALUES (?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return len(rows)
+
+
+@Profiling.timed("db")
+def get_fitted_models(model_id: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Fitted models of a saved model as
+    {family: {"coefficients": {...}, "metrics": {...} or None}}.
+    Empty if the model has not been fitted (or its data changed since).
     """
     conn = get_connection()
     try:
-        cur = conn.execute(query, (model_id,))
-        conn.commit()
-        return cur.rowcount > 0
+        rows = conn.execute(
+            """
+            SELECT family, coefficients, metrics
+            FROM fitted_model
+            WHERE model_id = ?
+            """,
+            (model_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        family: {
+            "coefficients": json.loads(coefficients),
+            "metrics": json.loads(metrics) if metrics else None,
+        }
+        for family, coefficients, metrics in rows
+    }
+
+
+# Sufficient statistics are described by the caller (see
+# OperationsApp.especificacion_sql): columns maps each column name to its SQL
+# expression over {x} and {y} and the key of its shift, and sums maps each
+# sum key to its pair of columns ("1" is the constant). Nonlinear families
+# predict a * exp(b * u), with u given by an SQL expression over {x} and {y}.
+
+
+def _stats_shifts_sql(columns: Dict[str, Tuple[str, str]], where: str) -> str:
+    """
+    Subquery with the mean of every column of each model, the shifts of its
+    sufficient statistics.
+    """
+    means = ", ".join(
+        f'AVG({expr.format(x="x", y="y")}) AS "{shift}"'
+        for expr, shift in columns.values()
+    )
+    return f"""
+        SELECT model_id, {means}
+        FROM regression_point
+        {where}
+        GROUP BY model_id
+    """
+
+
+def _stats_columns(
+    columns: Dict[str, Tuple[str, str]], sums: Dict[str, Tuple[str, str]]
+) -> List[Tuple[str, str]]:
+    """
+    (key, aggregate) pairs over regression_point joined with its shifts, with
+    the keys of OperationsApp.calcular_estadisticos_suficientes plus the
+    count of points where each column is defined.
+    """
+    shifted = {
+        name: f'({expr.format(x="p.x", y="p.y")} - c."{shift}")'
+        for name, (expr, shift) in columns.items()
+    }
+    aggregates = [("n", "COUNT(*)"), ("min_x", "MIN(p.x)"), ("min_y", "MIN(p.y)")]
+    for name, (expr, shift) in columns.items():
+        aggregates.append((shift, f'c."{shift}"'))
+        aggregates.append((("count", name), f"COUNT({shifted[name]})"))
+    for key, (u, v) in sums.items():
+        term = shifted[v] if u == "1" else f"{shifted[u]} * {shifted[v]}"
+        aggregates.append((key, f"TOTAL({term})"))
+    return aggregates
+
+
+def _stats_from_row(
+    aggregates: List[Tuple[str, str]],
+    columns: Dict[str, Tuple[str, str]],
+    sums: Dict[str, Tuple[str, str]],
+    row: Sequence,
+) -> Optional[Dict[str, float]]:
+    """
+    Build a sufficient statistics dict from a _stats_columns row, dropping
+    the shift and sums of every column that is not defined in all the points
+    (ln of a value <= 0).
+    """
+    values = dict(zip((key for key, _ in aggregates), row))
+    if not values["n"]:
+        return None
+    undefined = {
+        name for name in columns if values.pop(("count", name)) < values["n"]
+    }
+    for name in undefined:
+        del values[columns[name][1]]
+    for key, pair in sums.items():
+        if undefined.intersection(pair):
+            del values[key]
+    return values
+
+
+@Profiling.timed("db")
+def get_sufficient_stats(
+    model_id: int,
+    columns: Dict[str, Tuple[str, str]],
+    sums: Dict[str, Tuple[str, str]],
+) -> Optional[Dict[str, float]]:
+    """
+    Compute the regression sufficient statistics of a model inside SQLite
+    with plain SQL aggregates, without transferring its points. A first
+    pass gets the column means and the sums are taken around them, so they
+    keep their precision for large values.
+    Returns None for text-stored or missing models.
+    """
+    aggregates = _stats_columns(columns, sums)
+    query = f"""
+        SELECT {", ".join(expr for _, expr in aggregates)}
+        FROM regression_point AS p
+        JOIN ({_stats_shifts_sql(columns, "WHERE model_id = :model_id")}) AS c
+            ON c.model_id = p.model_id
+        WHERE p.model_id = :model_id
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(query, {"model_id": model_id}).fetchone()
+        return _stats_from_row(aggregates, columns, sums, row)
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_all_sufficient_stats(
+    columns: Dict[str, Tuple[str, str]], sums: Dict[str, Tuple[str, str]]
+) -> Dict[int, Dict[str, float]]:
+    """
+    Sufficient statistics of every model in the points table: a first
+    GROUP BY pass over regression_point gets the column means of each model
+    and a second one the sums around them.
+    Returns a dict {model_id: stats}; text-stored models are not included.
+    """
+    aggregates = _stats_columns(columns, sums)
+    query = f"""
+        SELECT p.model_id, {", ".join(expr for _, expr in aggregates)}
+        FROM regression_point AS p
+        JOIN ({_stats_shifts_sql(columns, "")}) AS c ON c.model_id = p.model_id
+        GROUP BY p.model_id
+    """
+    conn = get_connection()
+    try:
+        return {
+            row[0]: _stats_from_row(aggregates, columns, sums, row[1:])
+            for row in conn.execute(query)
+        }
+    finally:
+        conn.close()
+
+
+def _squared_error_sql(basis: str, a: str, b: str, x: str, y: str) -> str:
+    """
+    SQL expression of the squared error of one point for a nonlinear family
+    with basis u (prediction a * exp(b * u)).
+    """
+    prediction = f"{a} * exp({b} * {basis.format(x=x, y=y)})"
+    return f"({y} - {prediction}) * ({y} - {prediction})"
+
+
+def _nonlinear_sums_sql(basis: str, a: str, b: str, x: str, y: str) -> str:
+    """
+    SQL select list of the six sums of a Levenberg-Marquardt step (see
+    get_nonlinear_sums) for a nonlinear family with basis u.
+    """
+    u = f"({basis.format(x=x, y=y)})"
+    g = f"exp({b} * {u})"
+    r = f"({y} - {a} * {g})"
+    terms = (
+        f"{r} * {r}",
+        f"{g} * {g}",
+        f"{u} * {g} * {g}",
+        f"{u} * {u} * {g} * {g}",
+        f"{g} * {r}",
+        f"{u} * {g} * {r}",
+    )
+    return ", ".join(f"TOTAL({term})" for term in terms)
+
+
+@Profiling.timed("db")
+def get_model_sse(model_id: int, basis: str, a: float, b: float) -> float:
+    """
+    Sum of squared errors in the original y space of a nonlinear family
+    with basis u (prediction a * exp(b * u)), computed inside SQLite.
+    """
+    query = f"""
+        SELECT TOTAL({_squared_error_sql(basis, ":a", ":b", "x", "y")})
+        FROM regression_point
+        WHERE model_id = :model_id
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(query, {"model_id": model_id, "a": a, "b": b}).fetchone()
+        return row[0]
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_all_sse(
+    coefficients: Iterable[Tuple[int, str, float, float]], bases: Dict[str, str]
+) -> Dict[Tuple[int, str], float]:
+    """
+    Sums of squared errors of many (model_id, family, a, b) at once, with
+    the basis of each family in bases: the coefficients go to a temporary
+    table joined with regression_point, so the whole table is scanned once
+    per family.
+    Returns a dict {(model_id, family): sse}.
+    """
+    conn = get_connection()
+    try:
+        conn.execute(
+            "CREATE TEMP TABLE sse_coefficients "
+            "(model_id INTEGER, family TEXT, a REAL, b REAL)"
+        )
+        conn.executemany(
+            "INSERT INTO sse_coefficients VALUES (?, ?, ?, ?)", coefficients
+        )
+        result = {}
+        for family, basis in bases.items():
+            error = _squared_error_sql(basis, "c.a", "c.b", "p.x", "p.y")
+            query = f"""
+                SELECT c.model_id, TOTAL({error})
+                FROM sse_coefficients AS c
+                JOIN regression_point AS p ON p.model_id = c.model_id
+                WHERE c.family = ?
+                GROUP BY c.model_id
+            """
+            for model_id, sse in conn.execute(query, (family,)):
+                result[(model_id, family)] = sse
+        return result
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_nonlinear_sums(
+    model_id: int, basis: str, a: float, b: float
+) -> Tuple[float, ...]:
+    """
+    Sums of one Levenberg-Marquardt step of a nonlinear family at (a, b),
+    computed inside SQLite in a single scan. With the prediction a * g,
+    g = exp(b * u) for the basis u and residual r = y - a * g, returns
+    (sum r², sum g², sum u·g², sum u²·g², sum g·r, sum u·g·r).
+    """
+    query = f"""
+        SELECT {_nonlinear_sums_sql(basis, ":a", ":b", "x", "y")}
+        FROM regression_point
+        WHERE model_id = :model_id
+    """
+    conn = get_connection()
+    try:
+        row = conn.execute(query, {"model_id": model_id, "a": a, "b": b}).fetchone()
+        return tuple(row)
+    finally:
+        conn.close()
+
+
+@Profiling.timed("db")
+def get_all_nonlinear_sums(
+    coefficients: Iterable[Tuple[int, str, float, float]], bases: Dict[str, str]
+) -> Dict[Tuple[int, str], Tuple[float, ...]]:
+    """
+    get_nonlinear_sums of many (model_id, family, a, b) at once, with the
+    same temporary-table join as get_all_sse.
+    Returns a dict {(model_id, family): sums}.
+    """
+    conn = get_connection()
+    try:
+        conn.execute(
+            "CREATE TEMP TABLE nonlinear_coefficients "
+            "(model_id INTEGER, family TEXT, a REAL, b REAL)"
+        )
+        conn.executemany(
+            "INSERT INTO nonlinear_coefficients VALUES (?, ?, ?, ?)", coefficients
+        )
+        result = {}
+        for family, basis in bases.items():
+            sums = _nonlinear_sums_sql(basis, "c.a", "c.b", "p.x", "p.y")
+            query = f"""
+                SELECT c.model_id, {sums}
+                FROM nonlinear_coefficients AS c
+                JOIN regression_point AS p ON p.model_id = c.model_id
+                WHERE c.family = ?
+                GROUP BY c.model_id
+            """
+            for row in conn.execute(query, (family,)):
+                result[(row[0], family)] = tuple(row[1:])
+        return result
     finally:
         conn.close()
 
 
 __all__ = [
     "get_connection",
+    "transaction",
+    "migrate_database",
+    "compact_database",
     "search_models",
+    "list_models",
     "get_model_xy_by_id",
+    "get_model_xy_binary",
+    "get_models_xy",
+    "get_model_summary_by_id",
+    "update_model_summary",
+    "get_model_payload_size",
+    "iter_model_values",
+    "iter_model_rows",
+    "get_points_range",
+    "get_model_n_points",
+    "get_model_point_count",
+    "update_points",
+    "get_sufficient_stats",
+    "get_all_sufficient_stats",
+    "get_model_sse",
+    "get_all_sse",
+    "get_nonlinear_sums",
+    "get_all_nonlinear_sums",
     "insert_model",
+    "insert_models",
     "update_model_xy",
+    "update_models",
     "delete_model",
+    "delete_models",
+    "save_fitted_models",
+    "get_fitted_models",
 ]
\ No newline at end of file
@@ -0,0 +1,757 @@
+"""
+Servicio HTTP local (sin dependencias externas) para ajustar modelos y
+administrar los modelos guardados sin pasar por la interfaz Tkinter.
+
+Endpoints (JSON):
+- POST   /fit                {"x": [...], "y": [...]} -> calcular_todos_modelos
+- GET    /models?q=texto     -> [{"id", "model_name"}]
+- POST   /models             {"model_name", "x", "y", "store_points"?, "codec"?}
+                             -> {"id"} (codec: ver Compression.CODECS)
+- GET    /models/{id}        -> {"id", "x", "y"} (texto almacenado)
+- PUT    /models/{id}        {"x", "y"} -> {"updated"}
+- DELETE /models/{id}        -> {"deleted"}
+- GET    /models/{id}/fit    -> ajuste dentro de SQLite (calcular_modelos_en_bd)
+- POST   /models/{id}/predict  {"family", "x"} -> {"family", "y"} con el modelo
+                             ajustado guardado (ver ModelsApp), sin reajustar
+- GET    /metrics            -> percentiles de latencia por ruta y estado de la cola
+
+Formato binario (Content-Type: application/octet-stream, ver BinaryFormat):
+- POST   /fit                cuerpo encode_xy(x, y) -> codificar_resultados
+- POST   /models?model_name=nombre[&store_points=1][&codec=xor]
+                             cuerpo encode_xy(x, y)
+- PUT    /models/{id}        cuerpo encode_xy(x, y)
+- GET    /models/{id}?format=binary  -> buffer de dos columnas (x, y)
+- POST   /models/{id}/predict?family=Lineal  cuerpo encode([x]) -> encode([y])
+
+Los ajustes se ejecutan en un pool de procesos. Las peticiones pequeñas que
+llegan casi a la vez se agrupan en un solo envío al pool, y cuando hay
+demasiados ajustes en curso el servicio responde 503 (contrapresión). Los
+datos de las peticiones grandes pasan al proceso en memoria compartida
+(ver SharedDataset), sin serializarlos.
+
+Ejecución:
+    python3 ServiceApp.py --port 8000
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+import AsyncQueries
+import BinaryFormat
+import Compression
+import ModelsApp
+import OperationsApp
+import Queries
+import SharedDataset
+
+# Tamaño máximo aceptado para el cuerpo de una petición (bytes)
+MAX_CUERPO = 256 * 1024 * 1024
+
+# Cantidad de latencias recientes que se conservan por ruta
+MUESTRAS_LATENCIA = 10000
+
+# Content-Type de los cuerpos en formato binario
+TIPO_BINARIO = "application/octet-stream"
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde al cliente con el código HTTP indicado."""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def serializar_resultados(resultados, incluir_pred=False):
+    """
+    Convierte los resultados de calcular_todos_modelos a tipos nativos de JSON.
+
+    Args:
+        resultados: Diccionario retornado por calcular_todos_modelos
+        incluir_pred: Si es True se incluye y_pred como lista
+
+    Returns:
+        Diccionario serializable con json.dumps
+    """
+    salida = {}
+    for clave, r in resultados.items():
+        if r is None:
+            salida[clave] = None
+            continue
+        salida[clave] = {
+            k: (v.tolist() if isinstance(v, np.ndarray) else float(v))
+            for k, v in r.items()
+            if k != "y_pred" or incluir_pred
+        }
+    return salida
+
+
+def ajustar_lote(peticiones):
+    """
+    Ajusta un lote de conjuntos de datos (se ejecuta en un proceso del pool).
+
+    Args:
+        peticiones: Lista de tuplas (xs, ys, incluir_pred, binario); xs
+                    puede ser un SharedDataset (con ys None), que se libera
+                    al terminar
+
+    Returns:
+        Lista de resultados serializados (bytes de codificar_resultados si la
+        petición es binaria), o {"error": mensaje, "estado": código} por
+        petición fallida: 400 si los datos no son válidos (ValueError) y 500
+        para cualquier otro error
+    """
+    salida = []
+    for xs, ys, incluir_pred, binario in peticiones:
+        try:
+            resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+            if binario:
+                salida.append(OperationsApp.codificar_resultados(resultados))
+            else:
+                salida.append(serializar_resultados(resultados, incluir_pred))
+        except Exception as e:
+            # LinAlgError hereda de ValueError pero no es un error del cliente
+            cliente = isinstance(e, ValueError) and not isinstance(
+                e, np.linalg.LinAlgError
+            )
+            salida.append({"error": str(e), "estado": 400 if cliente else 500})
+        finally:
+            if isinstance(xs, SharedDataset.SharedDataset):
+                xs.release()
+    return salida
+
+
+def validar_xy(xs, ys):
+    """
+    Aplica las mismas validaciones que la interfaz antes de ajustar.
+
+    Raises:
+        ErrorHTTP: 400 si las longitudes no coinciden o hay menos de 2 pares
+    """
+    if len(xs) != len(ys):
+        raise ErrorHTTP(400, "Cantidad de X y y no coincide.")
+    if len(xs) < 2:
+        raise ErrorHTTP(400, "Se requieren al menos 2 pares.")
+
+
+def _validar_finitos(*columnas):
+    """
+    Rechaza NaN e infinitos (JSON, texto y formato binario los admiten).
+
+    Raises:
+        ErrorHTTP: 400 si algún valor no es finito
+    """
+    for valores in columnas:
+        if not np.isfinite(np.asarray(valores, dtype=float)).all():
+            raise ErrorHTTP(400, "Solo se admiten números finitos.")
+
+
+def _leer_valores(valor):
+    """
+    Acepta listas de números o texto con los separadores de parse_numbers.
+
+    Raises:
+        ErrorHTTP: 400 si no es una lista o texto, o algún valor no es un
+                   número finito
+    """
+    if not isinstance(valor, (str, list)):
+        raise ErrorHTTP(400, "x e y deben ser listas o texto.")
+    try:
+        if isinstance(valor, str):
+            valores = OperationsApp.parse_numbers(valor)
+        else:
+            valores = [float(v) for v in valor]
+    except (TypeError, ValueError) as e:
+        raise ErrorHTTP(400, f"Valores inválidos: {e}")
+    _validar_finitos(valores)
+    return valores
+
+
+def _leer_codec(codec):
+    """
+    Valida el códec de compresión pedido para guardar un modelo.
+
+    Raises:
+        ErrorHTTP: 400 si no es uno de Compression.CODECS (ni "none")
+    """
+    if codec in (None, "", "none"):
+        return None
+    if codec not in Compression.CODECS:
+        raise ErrorHTTP(400, f"Códec desconocido: {codec}")
+    return codec
+
+
+def _leer_binario(cuerpo):
+    """Decodifica un cuerpo binario de dos columnas en vistas (xs, ys)."""
+    try:
+        xs, ys = BinaryFormat.decode_xy(cuerpo)
+    except ValueError as e:
+        raise ErrorHTTP(400, f"Cuerpo binario inválido: {e}")
+    validar_xy(xs, ys)
+    _validar_finitos(xs, ys)
+    return xs, ys
+
+
+class RegistroLatencias:
+    """
+    Conserva las latencias recientes por ruta y calcula sus percentiles.
+    """
+
+    def __init__(self, muestras=MUESTRAS_LATENCIA):
+        self._latencias = collections.defaultdict(
+            lambda: collections.deque(maxlen=muestras)
+        )
+        self._totales = collections.Counter()
+
+    def registrar(self, ruta, segundos):
+        self._latencias[ruta].append(segundos)
+        self._totales[ruta] += 1
+
+    def resumen(self):
+        """Diccionario {ruta: {count, p50_ms, p90_ms, p99_ms, max_ms}}."""
+        salida = {}
+        for ruta, valores in self._latencias.items():
+            ms = np.asarray(valores) * 1000.0
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            salida[ruta] = {
+                "count": self._totales[ruta],
+                "p50_ms": float(p50),
+                "p90_ms": float(p90),
+                "p99_ms": float(p99),
+                "max_ms": float(ms.max()),
+            }
+        return salida
+
+
+class ServicioAjuste:
+    """
+    Servidor HTTP asyncio sobre OperationsApp y Queries.
+
+    Args:
+        host: Interfaz de escucha (por defecto solo localhost)
+        port: Puerto (0 elige uno libre; ver atributo port tras iniciar)
+        workers: Procesos del pool de ajuste (None: uno por núcleo)
+        max_pendientes: Ajustes en curso a partir de los cuales se responde 503
+        tamano_lote: Cantidad de peticiones pequeñas que dispara un envío al pool
+        espera_lote: Segundos máximos que una petición pequeña espera a su lote
+        umbral_pequeno: Pares a partir de los cuales un ajuste no se agrupa
+        executor: Executor para los ajustes (por defecto un ProcessPoolExecutor)
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8000,
+        workers=None,
+        max_pendientes=64,
+        tamano_lote=32,
+        espera_lote=0.005,
+        umbral_pequeno=1000,
+        executor=None,
+    ):
+        self.host = host
+        self.port = port
+        self.max_pendientes = max_pendientes
+        self.tamano_lote = tamano_lote
+        self.espera_lote = espera_lote
+        self.umbral_pequeno = umbral_pequeno
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self._server = None
+        self._loop = None
+        self._hilo = None
+        self._lote = []
+        self._temporizador = None
+        self.en_vuelo = 0
+        self.rechazadas = 0
+        self.lotes_enviados = 0
+        self.latencias = RegistroLatencias()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    async def iniciar(self):
+        """Comienza a escuchar; actualiza self.port si se pidió el puerto 0."""
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(
+            self._atender_conexion, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def cerrar(self):
+        """Deja de aceptar conexiones y libera el pool de ajuste."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    async def servir(self):
+        """Inicia el servicio y atiende peticiones hasta ser cancelado."""
+        await self.iniciar()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.cerrar()
+
+    def iniciar_en_hilo(self):
+        """
+        Ejecuta el servicio en un hilo propio (útil para pruebas de carga en CI).
+        Retorna cuando el puerto ya está escuchando.
+        """
+        listo = threading.Event()
+
+        def _ejecutar():
+            self._loop = asyncio.new_event_loop()
+            # gather() y las tareas pendientes buscan el loop actual del hilo
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.iniciar())
+            listo.set()
+            self._loop.run_forever()
+            pendientes = asyncio.all_tasks(self._loop)
+            for tarea in pendientes:
+                tarea.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*pendientes, return_exceptions=True)
+            )
+            self._loop.run_until_complete(self.cerrar())
+            self._loop.close()
+
+        self._hilo = threading.Thread(target=_ejecutar, daemon=True)
+        self._hilo.start()
+        listo.wait()
+        return self
+
+    def detener(self):
+        """Detiene un servicio iniciado con iniciar_en_hilo."""
+        if self._hilo is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._hilo.join()
+            self._hilo = None
+
+    # ------------------------------------------------------------------
+    # Ajustes con agrupación y contrapresión
+    # ------------------------------------------------------------------
+    async def ajustar(self, xs, ys, incluir_pred=False, binario=False):
+        """
+        Ajusta todos los modelos en el pool, agrupando las peticiones pequeñas.
+        Con binario=True retorna los bytes de OperationsApp.codificar_resultados.
+
+        Raises:
+            ErrorHTTP: 503 si ya hay max_pendientes ajustes en curso
+        """
+        if self.en_vuelo >= self.max_pendientes:
+            self.rechazadas += 1
+            raise ErrorHTTP(503, "Servicio saturado, reintente más tarde.")
+        self.en_vuelo += 1
+        try:
+            if len(xs) <= self.umbral_pequeno:
+                futuro = self._loop.create_future()
+                self._lote.append((xs, ys, incluir_pred, binario, futuro))
+                if len(self._lote) >= self.tamano_lote:
+                    self._despachar_lote()
+                elif self._temporizador is None:
+                    self._temporizador = self._loop.call_later(
+                        self.espera_lote, self._despachar_lote
+                    )
+                resultado = await futuro
+            else:
+                self.lotes_enviados += 1
+                resultado = await self._ajustar_grande(xs, ys, incluir_pred, binario)
+        finally:
+            self.en_vuelo -= 1
+        if isinstance(resultado, dict) and "error" in resultado:
+            raise ErrorHTTP(resultado["estado"], resultado["error"])
+        return resultado
+
+    async def _ajustar_grande(self, xs, ys, incluir_pred, binario):
+        """
+        Envía un ajuste grande al pool. Con un pool de procesos los datos
+        se copian una vez a memoria compartida y el proceso los usa sin
+        copiarlos; se liberan al recibir el resultado.
+        """
+        if not isinstance(self._executor, ProcessPoolExecutor):
+            peticion = (xs, ys, incluir_pred, binario)
+            return (
+                await self._loop.run_in_executor(
+                    self._executor, ajustar_lote, [peticion]
+                )
+            )[0]
+        try:
+            datos = SharedDataset.SharedDataset(xs, ys)
+        except (TypeError, ValueError) as e:
+            raise ErrorHTTP(400, str(e))
+        try:
+            return (
+                await self._loop.run_in_executor(
+                    self._executor, ajustar_lote, [(datos, None, incluir_pred, binario)]
+                )
+            )[0]
+        finally:
+            datos.release()
+
+    def _despachar_lote(self):
+        """Envía al pool las peticiones pequeñas acumuladas como un solo lote."""
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        lote, self._lote = self._lote, []
+        if not lote:
+            return
+        self.lotes_enviados += 1
+        tarea = self._loop.run_in_executor(
+            self._executor, ajustar_lote, [peticion[:4] for peticion in lote]
+        )
+
+        def _completar(t):
+            error = t.exception()
+            resultados = [None] * len(lote) if error else t.result()
+            for peticion, resultado in zip(lote, resultados):
+                futuro = peticion[4]
+                if futuro.done():
+                    continue
+                if error:
+                    futuro.set_exception(error)
+                else:
+                    futuro.set_result(resultado)
+
+        tarea.add_done_callback(_completar)
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    async def _atender_conexion(self, reader, writer):
+        """Atiende peticiones HTTP/1.1 (keep-alive) de una conexión."""
+        try:
+            while True:
+                try:
+                    peticion = await self._leer_peticion(reader)
+                except ErrorHTTP as e:
+                    # Petición ilegible: se responde el error y se cierra
+                    datos = json.dumps({"error": str(e)}).encode()
+                    writer.writelines(
+                        self._respuesta(e.estado, "application/json", datos, True)
+                    )
+                    await writer.drain()
+                    break
+                if peticion is None:
+                    break
+                metodo, ruta, consulta, cabeceras, cuerpo = peticion
+                inicio = time.perf_counter()
+                plantilla = ruta
+                try:
+                    plantilla, estado, tipo, datos = await self._despachar(
+                        metodo, ruta, consulta, cabeceras, cuerpo
+                    )
+                except ErrorHTTP as e:
+                    estado, tipo = e.estado, "application/json"
+                    datos = json.dumps({"error": str(e)}).encode()
+                except Exception as e:
+                    estado, tipo = 500, "application/json"
+                    datos = json.dumps({"error": str(e)}).encode()
+                cerrar = cabeceras.get("connection", "").lower() == "close"
+                writer.writelines(self._respuesta(estado, tipo, datos, cerrar))
+                await writer.drain()
+                self.latencias.registrar(
+                    f"{metodo} {plantilla}", time.perf_counter() - inicio
+                )
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _leer_peticion(self, reader):
+        """
+        Lee una petición; retorna None si el cliente cerró la conexión.
+
+        Raises:
+            ErrorHTTP: 400 si la línea de petición o Content-Length no son
+                       válidos, 413 si el cuerpo supera MAX_CUERPO
+        """
+        linea = await reader.readline()
+        if not linea.strip():
+            return None
+        try:
+            metodo, objetivo, _ = linea.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ErrorHTTP(400, "Línea de petición inválida.")
+        cabeceras = {}
+        while True:
+            linea = await reader.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            clave, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[clave.strip().lower()] = valor.strip()
+        try:
+            largo = int(cabeceras.get("content-length", 0))
+        except ValueError:
+            largo = -1
+        if largo < 0:
+            raise ErrorHTTP(400, "Content-Length inválido.")
+        if largo > MAX_CUERPO:
+            raise ErrorHTTP(413, "Cuerpo demasiado grande.")
+        cuerpo = await reader.readexactly(largo) if largo else b""
+        partes = urlsplit(objetivo)
+        return metodo.upper(), partes.path, parse_qs(partes.query), cabeceras, cuerpo
+
+    @staticmethod
+    def _respuesta(estado, tipo, datos, cerrar=False):
+        """
+        Construye la respuesta HTTP como lista de buffers para writelines.
+        datos puede ser bytes o una secuencia de buffers (columnas binarias),
+        que se envían sin concatenarlos.
+        """
+        partes = [datos] if isinstance(datos, (bytes, bytearray)) else list(datos)
+        cabecera = (
+            f"HTTP/1.1 {estado} {HTTPStatus(estado).phrase}\r\n"
+            f"Content-Type: {tipo}\r\n"
+            f"Content-Length: {sum(len(p) for p in partes)}\r\n"
+            f"Connection: {'close' if cerrar else 'keep-alive'}\r\n"
+        )
+        if estado == 503:
+            cabecera += "Retry-After: 1\r\n"
+        return [cabecera.encode("latin-1") + b"\r\n"] + partes
+
+    @staticmethod
+    def _json(cuerpo):
+        """
+        Decodifica un cuerpo JSON (vacío equivale a {}).
+
+        Raises:
+            ErrorHTTP: 400 si no es JSON válido o no es un objeto
+        """
+        try:
+            datos = json.loads(cuerpo or b"{}")
+        except ValueError:
+            raise ErrorHTTP(400, "JSON inválido.")
+        if not isinstance(datos, dict):
+            raise ErrorHTTP(400, "El cuerpo JSON debe ser un objeto.")
+        return datos
+
+    async def _despachar(self, metodo, ruta, consulta, cabeceras, cuerpo):
+        """
+        Resuelve la ruta y ejecuta el endpoint.
+
+        Returns:
+            Tupla (plantilla_ruta, estado, content_type, cuerpo_bytes)
+        """
+        partes = [p for p in ruta.split("/") if p]
+        binario = cabeceras.get("content-type", "").startswith(TIPO_BINARIO)
+        if partes == ["fit"] and metodo == "POST" and binario:
+            xs, ys = _leer_binario(cuerpo)
+            resultado = await self.ajustar(xs, ys, binario=True)
+            return "/fit", 200, TIPO_BINARIO, resultado
+
+        if partes == ["fit"] and metodo == "POST":
+            datos = self._json(cuerpo)
+            xs = _leer_valores(datos.get("x", []))
+            ys = _leer_valores(datos.get("y", []))
+            validar_xy(xs, ys)
+            resultado = await self.ajustar(xs, ys, bool(datos.get("pred")))
+            return "/fit", 200, "application/json", json.dumps(resultado).encode()
+
+        if partes == ["metrics"] and metodo == "GET":
+            metricas = {
+                "latency": self.latencias.resumen(),
+                "in_flight": self.en_vuelo,
+                "queued": len(self._lote),
+                "rejected": self.rechazadas,
+                "batches": self.lotes_enviados,
+            }
+            return "/metrics", 200, "application/json", json.dumps(metricas).encode()
+
+        if partes and partes[0] == "models":
+            plantilla, estado, datos = await self._modelos(
+                metodo, partes, consulta, cuerpo, binario
+            )
+            if isinstance(datos, tuple):
+                return plantilla, estado, TIPO_BINARIO, datos
+            return plantilla, estado, "application/json", json.dumps(datos).encode()
+
+        raise ErrorHTTP(404, f"Ruta no encontrada: {metodo} {ruta}")
+
+    async def _modelos(self, metodo, partes, consulta, cuerpo, binario=False):
+        """
+        Endpoints CRUD sobre Queries, sin bloquear el loop: las consultas van
+        al hilo de base de datos de AsyncQueries (las lecturas simultáneas de
+        datos se agrupan) y las que además calculan corren en hilos.
+        Retorna (plantilla, estado, datos); datos es un objeto JSON o, para
+        respuestas binarias, una tupla de buffers de BinaryFormat.encode_parts.
+        """
+        if len(partes) == 1:
+            if metodo == "GET":
+                fragmento = consulta.get("q", [""])[0]
+                filas = await AsyncQueries.search_models(fragmento)
+                return "/models", 200, [{"id": i, "model_name": n} for i, n in filas]
+            if metodo == "POST" and binario:
+                nombre = consulta.get("model_name", [""])[0]
+                if not nombre.strip():
+                    raise ErrorHTTP(400, "El nombre del modelo no puede estar vacío.")
+                xs, ys = _leer_binario(cuerpo)
+                nuevo = await asyncio.to_thread(
+                    _guardar_modelo,
+                    nombre,
+                    xs,
+                    ys,
+                    consulta.get("store_points", ["0"])[0] not in ("", "0"),
+                    True,
+                    _leer_codec(consulta.get("codec", [None])[0]),
+                )
+                return "/models", 201, {"id": nuevo}
+            if metodo == "POST":
+                datos = self._json(cuerpo)
+                if not str(datos.get("model_name", "")).strip():
+                    raise ErrorHTTP(400, "El nombre del modelo no puede estar vacío.")
+                xs = _leer_valores(datos.get("x", []))
+                ys = _leer_valores(datos.get("y", []))
+                validar_xy(xs, ys)
+                nuevo = await asyncio.to_thread(
+                    _guardar_modelo,
+                    datos["model_name"],
+                    xs,
+                    ys,
+                    bool(datos.get("store_points")),
+                    False,
+                    _leer_codec(datos.get("codec")),
+                )
+                return "/models", 201, {"id": nuevo}
+
+        try:
+            model_id = int(partes[1])
+        except (IndexError, ValueError):
+            raise ErrorHTTP(404, "ID de modelo inválido.")
+
+        if len(partes) == 3 and partes[2] == "fit" and metodo == "GET":
+            resultados = await asyncio.to_thread(
+                OperationsApp.calcular_modelos_en_bd, model_id
+            )
+            if resultados is None:
+                raise ErrorHTTP(404, f"Modelo ID {model_id} no encontrado.")
+            return "/models/{id}/fit", 200, serializar_resultados(resultados)
+
+        if len(partes) == 3 and partes[2] == "predict" and metodo == "POST":
+            if binario:
+                familia = consulta.get("family", ["Lineal"])[0]
+                try:
+                    columnas, _ = BinaryFormat.decode(cuerpo)
+                except ValueError as e:
+                    raise ErrorHTTP(400, f"Cuerpo binario inválido: {e}")
+                if len(columnas) != 1:
+                    raise ErrorHTTP(400, "Se espera una sola columna de X.")
+                xs = columnas[0]
+                _validar_finitos(xs)
+            else:
+                datos = self._json(cuerpo)
+                familia = datos.get("family", "Lineal")
+                xs = _leer_valores(datos.get("x", []))
+            ys = await asyncio.to_thread(_predecir, model_id, familia, xs)
+            if binario:
+                return (
+                    "/models/{id}/predict",
+                    200,
+                    tuple(BinaryFormat.encode_parts([ys])),
+                )
+            return "/models/{id}/predict", 200, {"family": familia, "y": ys.tolist()}
+
+        if len(partes) == 2:
+            if metodo == "GET" and consulta.get("format") == ["binary"]:
+                xy = await AsyncQueries.get_model_xy_binary(model_id)
+                if xy is None:
+                    raise ErrorHTTP(404, f"Modelo ID {model_id} no encontrado.")
+                columnas = [BinaryFormat.decode(c)[0][0] for c in xy]
+                return "/models/{id}", 200, tuple(BinaryFormat.encode_parts(columnas))
+            if metodo == "GET":
+                xy = await AsyncQueries.get_model_xy_by_id(model_id)
+                if xy is None:
+                    raise ErrorHTTP(404, f"Modelo ID {model_id} no encontrado.")
+                return "/models/{id}", 200, {"id": model_id, "x": xy[0], "y": xy[1]}
+            if metodo == "PUT":
+                if binario:
+                    xs, ys = _leer_binario(cuerpo)
+                else:
+                    datos = self._json(cuerpo)
+                    xs = _leer_valores(datos.get("x", []))
+                    ys = _leer_valores(datos.get("y", []))
+                    validar_xy(xs, ys)
+                ok = await asyncio.to_thread(
+                    _actualizar_modelo, model_id, xs, ys, binario
+                )
+                return "/models/{id}", 200 if ok else 404, {"updated": ok}
+            if metodo == "DELETE":
+                ok = await AsyncQueries.delete_model(model_id)
+                return "/models/{id}", 200 if ok else 404, {"deleted": ok}
+
+        raise ErrorHTTP(404, f"Ruta no encontrada: {metodo} /{'/'.join(partes)}")
+
+
+def _predecir(model_id, familia, xs):
+    """
+    Predice con el modelo ajustado guardado (lo ajusta y guarda si falta).
+
+    Raises:
+        ErrorHTTP: 404 si el modelo no existe, 400 si la familia no es aplicable
+    """
+    modelos = ModelsApp.cargar_modelos_ajustados(model_id)
+    if not modelos:
+        raise ErrorHTTP(404, f"Modelo ID {model_id} no encontrado.")
+    if familia not in modelos:
+        raise ErrorHTTP(400, f"Familia no aplicable a este modelo: {familia}")
+    return modelos[familia].predict(xs)
+
+
+def _columnas_binarias(xs, ys):
+    """x e y como buffers de una columna, que Queries guarda como BLOB."""
+    return BinaryFormat.encode([xs]), BinaryFormat.encode([ys])
+
+
+def _guardar_modelo(model_name, xs, ys, store_points, binario=False, codec=None):
+    """
+    Guarda un modelo nuevo con su resumen, igual que el botón "Guardar".
+    Con binario=True los valores se guardan como BLOB en vez de texto y con
+    codec, comprimidos (ver Compression).
+    """
+    resumen = OperationsApp.calcular_resumen(xs, ys)
+    if binario and not store_points:
+        xs, ys = _columnas_binarias(xs, ys)
+    return Queries.insert_model(
+        model_name, xs, ys, resumen, store_points=store_points, codec=codec
+    )
+
+
+def _actualizar_modelo(model_id, xs, ys, binario=False):
+    """Actualiza un modelo y su resumen, igual que el botón "Editar"."""
+    resumen = OperationsApp.calcular_resumen(xs, ys)
+    if binario:
+        xs, ys = _columnas_binarias(xs, ys)
+    return Queries.update_model_xy(model_id, xs, ys, resumen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio HTTP de ajuste de modelos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pendientes", type=int, default=64)
+    args = parser.parse_args()
+
+    servicio = ServicioAjuste(
+        args.host, args.port, args.workers, max_pendientes=args.max_pendientes
+    )
+    print(f"Escuchando en http://{args.host}:{args.port}")
+    try:
+        asyncio.run(servicio.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
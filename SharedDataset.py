@@ -0,0 +1,226 @@
+"""
+Shared-memory x/y datasets for worker processes.
+
+A SharedDataset copies x and y once into a multiprocessing.shared_memory
+block. Pickling it (as ProcessPoolExecutor does with task arguments) sends
+only the block name and the array shapes; unpickling in a worker attaches
+to the same block, so the worker's x and y are views of the owner's memory
+instead of copies. The fitting functions in OperationsApp accept a dataset
+in place of xs:
+
+    with SharedDataset.SharedDataset(xs, ys) as datos:
+        futuro = pool.submit(OperationsApp.calcular_todos_modelos, datos)
+        resultados = futuro.result()
+
+The owner must outlive the tasks (wait for their results inside the with
+block): a task unpickled after the block is unlinked cannot attach to it.
+
+Lifetime is reference counted. The creating process owns the block and
+starts with one reference; retain() adds one and release() drops one, and
+the block is unlinked when the count reaches zero. Workers keep one mapping
+per block, shared by the tasks that hold it at the same time. The mapping is
+dropped when its last attached copy is released, or when the last task
+holding it ends (the worker only keeps a weak reference). A task therefore
+does not need to release the dataset it receives. A finalizer unlinks blocks
+whose owner is garbage collected without releasing them.
+"""
+
+import threading
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# Mappings of blocks attached in this process, by block name. The references
+# are weak: a mapping that no task holds any more is unmapped by its finalizer
+_attached: "weakref.WeakValueDictionary[str, SharedDataset]" = (
+    weakref.WeakValueDictionary()
+)
+_attached_lock = threading.Lock()
+
+
+def _tracker_pid() -> Optional[int]:
+    """Pid of the resource tracker this process reports to, if started."""
+    return getattr(resource_tracker._resource_tracker, "_pid", None)
+
+
+def _open_block(name: str, owner_tracker: Optional[int]) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without taking over its cleanup.
+
+    Python 3.13+ can skip the resource tracker. Older versions always
+    register the block; a worker forked before the owner started its
+    tracker reports to a tracker of its own, which would unlink the block
+    when the worker exits, so the registration is withdrawn there. With the
+    owner's tracker the registration is a no-op and must stay.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    if _tracker_pid() != owner_tracker:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _close_block(shm: shared_memory.SharedMemory, unlink: bool) -> None:
+    """Unmap a block (and unlink it when owned), tolerating live views."""
+    try:
+        shm.close()
+    except BufferError:
+        # Arrays still reference the mapping; it is unmapped when they go
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedDataset:
+    """
+    x (1-D, or 2-D with one row per observation) and y (1-D) columns stored
+    in one shared memory block.
+
+    Raises:
+        ValueError: If y is not 1-D, x is not 1-D or 2-D, or they hold a
+                    different number of observations
+    """
+
+    def __init__(self, xs, ys, dtype=np.float64):
+        x = np.asarray(xs, dtype=dtype)
+        y = np.asarray(ys, dtype=dtype)
+        if y.ndim != 1 or x.ndim not in (1, 2):
+            raise ValueError("x must be 1-D or 2-D and y must be 1-D.")
+        if x.shape[0] != y.size:
+            raise ValueError("x and y must hold the same number of observations.")
+        shm = shared_memory.SharedMemory(create=True, size=max(x.nbytes + y.nbytes, 1))
+        self._setup(shm, x.shape, y.shape, x.dtype, owner=True, tracker=_tracker_pid())
+        self.x[...] = x
+        self.y[...] = y
+
+    def _setup(self, shm, x_shape, y_shape, dtype, owner, tracker) -> None:
+        self._shm = shm
+        self._owner = owner
+        self._tracker = tracker
+        self._refs = 1
+        self._lock = threading.Lock()
+        self.dtype = np.dtype(dtype)
+        self.x = np.ndarray(x_shape, self.dtype, buffer=shm.buf)
+        self.y = np.ndarray(y_shape, self.dtype, buffer=shm.buf, offset=self.x.nbytes)
+        self._finalizer = weakref.finalize(self, _close_block, shm, owner)
+
+    @classmethod
+    def _attach(cls, name, x_shape, y_shape, dtype, tracker) -> "SharedDataset":
+        """Unpickle: reuse this process' mapping of the block or attach."""
+        with _attached_lock:
+            dataset = _attached.get(name)
+            if dataset is not None:
+                try:
+                    return dataset.retain()
+                except ValueError:
+                    # Its last copy is being released: map the block again
+                    pass
+            dataset = cls.__new__(cls)
+            dataset._setup(
+                _open_block(name, tracker),
+                x_shape,
+                y_shape,
+                dtype,
+                owner=False,
+                tracker=tracker,
+            )
+            _attached[name] = dataset
+            return dataset
+
+    def __reduce__(self):
+        if self.released:
+            raise ValueError("Cannot pickle a released SharedDataset.")
+        return (
+            SharedDataset._attach,
+            (self.name, self.x.shape, self.y.shape, self.dtype.str, self._tracker),
+        )
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block."""
+        return self._shm.name
+
+    @property
+    def owner(self) -> bool:
+        """True in the process that created (and will unlink) the block."""
+        return self._owner
+
+    @property
+    def released(self) -> bool:
+        return self._refs == 0
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self.released else self.x.nbytes + self.y.nbytes
+
+    def __len__(self) -> int:
+        return 0 if self.released else self.y.size
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Allow xs, ys = dataset."""
+        return iter((self.x, self.y))
+
+    def __enter__(self) -> "SharedDataset":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.release()
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(x, y) views of the shared block."""
+        if self.released:
+            raise ValueError("SharedDataset already released.")
+        return self.x, self.y
+
+    def retain(self) -> "SharedDataset":
+        """
+        Add a reference (e.g. for each task still using the dataset).
+        Raises ValueError if the dataset was already released.
+        """
+        with self._lock:
+            if self._refs == 0:
+                raise ValueError("SharedDataset already released.")
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        """
+        Drop a reference. At zero the views are dropped and the block is
+        unmapped, and unlinked by its owner. Extra calls are ignored.
+        """
+        with self._lock:
+            if self._refs == 0:
+                return
+            self._refs -= 1
+            if self._refs:
+                return
+            self.x = self.y = None
+        if not self._owner:
+            with _attached_lock:
+                if _attached.get(self.name) is self:
+                    del _attached[self.name]
+        self._finalizer()
+
+
+def as_arrays(xs, ys=None):
+    """
+    Return (x, y) from either a SharedDataset (with ys None) or xs and ys.
+
+    Raises:
+        ValueError: If a dataset is given together with ys
+    """
+    if isinstance(xs, SharedDataset):
+        if ys is not None:
+            raise ValueError("Pass either a SharedDataset or xs and ys.")
+        return xs.arrays()
+    return xs, ys
+
+
+__all__ = ["SharedDataset", "as_arrays"]
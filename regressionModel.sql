@@ -1,6 +1,39 @@
+-- Catalog: small rows for searching and listing, payloads live apart
 CREATE TABLE regression_model (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     model_name VARCHAR(100) NOT NULL,
-    x TEXT NOT NULL,
-    y TEXT NOT NULL
-);
\ No newline at end of file
+    model_name_lower VARCHAR(100) NOT NULL,
+    n_points INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    summary TEXT
+);
+
+-- Covering indexes: search by name and listing by last update
+CREATE INDEX regression_model_by_name
+    ON regression_model (model_name_lower, model_name);
+CREATE INDEX regression_model_by_update
+    ON regression_model (updated_at, id, model_name, n_points);
+
+-- x/y payloads (text or binary format BLOBs), one row per model
+CREATE TABLE regression_payload (
+    model_id INTEGER PRIMARY KEY REFERENCES regression_model(id),
+    x BLOB NOT NULL,
+    y BLOB NOT NULL
+);
+
+CREATE TABLE regression_point (
+    model_id INTEGER NOT NULL REFERENCES regression_model(id),
+    idx INTEGER NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    PRIMARY KEY (model_id, idx)
+) WITHOUT ROWID;
+
+CREATE TABLE fitted_model (
+    model_id INTEGER NOT NULL REFERENCES regression_model(id),
+    family TEXT NOT NULL,
+    coefficients TEXT NOT NULL,
+    metrics TEXT,
+    PRIMARY KEY (model_id, family)
+) WITHOUT ROWID;
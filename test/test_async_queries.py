@@ -0,0 +1,197 @@
+"""
+Pruebas de AsyncQueries (API asyncio sobre el hilo de base de datos).
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import AsyncQueries
+import Profiling
+import Queries
+
+
+def _usar_db_temporal():
+    """Redirige Queries a una base de datos temporal vacía."""
+    Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+
+
+def test_lecturas_agrupadas():
+    """Prueba que las lecturas simultáneas coinciden con Queries y se agrupan."""
+    print("Testing batched async reads...")
+    original = Queries.DB_PATH
+    estado = Profiling.is_enabled()
+    try:
+        _usar_db_temporal()
+        ids = Queries.insert_models(
+            (f"modelo {i}", [1.0, 2.0, float(i)], [3.0, 4.0, float(i)])
+            for i in range(40)
+        )
+        puntos = Queries.insert_model("puntos", [1, 2], [3, 4], store_points=True)
+        pedidos = ids + [puntos, 99999]
+        Profiling.reset()
+        Profiling.enable()
+
+        async def leer():
+            texto = await asyncio.gather(
+                *(AsyncQueries.get_model_xy_by_id(i) for i in pedidos)
+            )
+            binario = await asyncio.gather(
+                *(AsyncQueries.get_model_xy_binary(i) for i in pedidos)
+            )
+            return texto, binario
+
+        texto, binario = asyncio.run(leer())
+        assert texto == [Queries.get_model_xy_by_id(i) for i in pedidos]
+        assert binario == [Queries.get_model_xy_binary(i) for i in pedidos]
+        assert texto[-1] is None and binario[-1] is None
+        assert Profiling.counters().get("AsyncQueries.batched_reads", 0) > 0
+        assert Queries.get_models_xy([]) == []
+    finally:
+        Queries.DB_PATH = original
+        if not estado:
+            Profiling.disable()
+    print("✓ batched async read tests passed")
+
+
+def test_escrituras_y_errores():
+    """Prueba el orden de escrituras y lecturas y la propagación de errores."""
+    print("\nTesting async writes and errors...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+
+        async def flujo():
+            model_id = await AsyncQueries.insert_model("nuevo", [1, 2, 3], [2, 4, 6])
+            # La cola respeta el orden: la lectura ve la actualización previa
+            actualizar = AsyncQueries.update_model_xy(model_id, [1, 2], [5, 6])
+            leer = AsyncQueries.get_model_xy_by_id(model_id)
+            ok, xy = await asyncio.gather(actualizar, leer)
+            encontrados = await AsyncQueries.search_models("NUEVO")
+            try:
+                await AsyncQueries.insert_model("malo", [1, 2], [1], store_points=True)
+                assert False, "Expected ValueError for mismatched lengths"
+            except ValueError:
+                pass
+            borrado = await AsyncQueries.delete_model(model_id)
+            return model_id, ok, xy, encontrados, borrado
+
+        model_id, ok, xy, encontrados, borrado = asyncio.run(flujo())
+        assert ok and xy == ("1,2", "5,6")
+        assert encontrados == [(model_id, "nuevo")]
+        assert borrado and Queries.get_model_xy_by_id(model_id) is None
+
+        # El hilo se detiene y vuelve a iniciarse en otro event loop
+        AsyncQueries.shutdown()
+        assert asyncio.run(AsyncQueries.list_models()) == []
+    finally:
+        Queries.DB_PATH = original
+    print("✓ async write and error tests passed")
+
+
+def test_lectura_anticipada():
+    """Prueba iter_models_xy: orden, profundidad y cancelación."""
+    print("\nTesting iter_models_xy...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        ids = Queries.insert_models(
+            (f"m{i}", [float(i)], [float(2 * i)]) for i in range(10)
+        )
+        pedidos = list(reversed(ids)) + [12345]
+
+        async def recorrer(profundidad):
+            return [
+                par
+                async for par in AsyncQueries.iter_models_xy(pedidos, depth=profundidad)
+            ]
+
+        for profundidad in (1, 3, 50):
+            leidos = asyncio.run(recorrer(profundidad))
+            assert [i for i, _ in leidos] == pedidos
+            assert [xy for _, xy in leidos] == [
+                Queries.get_model_xy_by_id(i) for i in pedidos
+            ]
+
+        async def cortar():
+            async for model_id, _ in AsyncQueries.iter_models_xy(ids, depth=4):
+                if model_id == ids[1]:
+                    break
+            return await AsyncQueries.get_model_xy_by_id(ids[0])
+
+        assert asyncio.run(cortar()) == ("0.0", "0.0")
+        try:
+            asyncio.run(recorrer(0))
+            assert False, "Expected ValueError for depth 0"
+        except ValueError:
+            pass
+    finally:
+        Queries.DB_PATH = original
+    print("✓ iter_models_xy tests passed")
+
+
+def test_bucle_cerrado():
+    """Prueba que el hilo sigue sirviendo cuando el bucle de un pedido se cerró."""
+    print("\nTesting requests from closed event loops...")
+    hilo = AsyncQueries.DatabaseThread()
+
+    def lenta(valor):
+        time.sleep(0.2)
+        return valor
+
+    async def abandonar():
+        try:
+            await asyncio.wait_for(hilo.submit(lenta, 1), 0.05)
+            assert False, "Expected a timeout"
+        except asyncio.TimeoutError:
+            pass
+
+    async def pedir(valor):
+        return await asyncio.wait_for(hilo.submit(lenta, valor), 5)
+
+    try:
+        # El bucle termina antes que la consulta: su resultado se descarta
+        asyncio.run(abandonar())
+        time.sleep(0.3)
+        assert asyncio.run(pedir(2)) == 2
+
+        # Un error fuera de las consultas falla ese lote, no el hilo
+        servir = hilo._serve
+
+        def fallar(lote):
+            hilo._serve = servir
+            raise RuntimeError("lote roto")
+
+        hilo._serve = fallar
+        try:
+            asyncio.run(pedir(3))
+            assert False, "Expected RuntimeError from the failed batch"
+        except RuntimeError as e:
+            assert "lote roto" in str(e)
+        assert asyncio.run(pedir(4)) == 4
+    finally:
+        hilo.close()
+    print("✓ closed event loop tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running AsyncQueries tests...")
+    print("=" * 60)
+
+    test_lecturas_agrupadas()
+    test_escrituras_y_errores()
+    test_lectura_anticipada()
+    test_bucle_cerrado()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,104 @@
+"""
+Pruebas del formato binario de datos y resultados.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import BinaryFormat
+import OperationsApp
+
+
+def test_codificar_decodificar():
+    """Prueba la ida y vuelta de columnas, metadatos y tipos."""
+    print("Testing BinaryFormat encode/decode...")
+    xs = np.linspace(0.5, 10.0, 1001)
+    ys = 3.0 * xs - 1.0
+    buffer = BinaryFormat.encode_xy(xs, ys)
+    assert BinaryFormat.is_binary(buffer)
+    assert not BinaryFormat.is_binary("1,2,3")
+    assert len(buffer) == BinaryFormat.HEADER_SIZE + 2 * 8 * xs.size
+
+    dx, dy = BinaryFormat.decode_xy(buffer)
+    assert np.array_equal(dx, xs) and np.array_equal(dy, ys)
+    # Las columnas son vistas sobre el buffer, no copias
+    assert not dx.flags.owndata and not dx.flags.writeable
+
+    columnas, meta = BinaryFormat.decode(
+        BinaryFormat.encode([xs], {"nombre": "prueba"}, dtype="<f4")
+    )
+    assert meta == {"nombre": "prueba"}
+    assert columnas[0].dtype == np.float32
+    assert np.allclose(columnas[0], xs)
+
+    # encode_parts no copia columnas que ya son float64 contiguas
+    partes = BinaryFormat.encode_parts([xs])
+    assert np.shares_memory(np.frombuffer(partes[1]), xs)
+
+    columnas, meta = BinaryFormat.decode(BinaryFormat.encode([[]]))
+    assert columnas[0].size == 0 and meta is None
+
+    for malo in (b"LRMB", b"XXXX" + bytes(20), buffer[:-8]):
+        try:
+            BinaryFormat.decode(malo)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    try:
+        BinaryFormat.encode([[1.0, 2.0], [1.0]])
+        assert False, "Expected ValueError for columns of different length"
+    except ValueError:
+        pass
+    print("✓ BinaryFormat encode/decode tests passed")
+
+
+def test_resultados_binarios():
+    """Prueba que los resultados binarios coinciden con calcular_todos_modelos."""
+    print("\nTesting binary results...")
+    xs = [1.0, 2.0, 3.0, 4.0, 5.0]
+    ys = [2.7, 7.4, 20.1, 54.6, 148.4]
+    esperado = OperationsApp.calcular_todos_modelos(xs, ys)
+    obtenido = OperationsApp.decodificar_resultados(
+        OperationsApp.calcular_todos_modelos_binario(BinaryFormat.encode_xy(xs, ys))
+    )
+    assert obtenido.keys() == esperado.keys()
+    for clave, r in esperado.items():
+        assert obtenido[clave].keys() == r.keys()
+        for k, v in r.items():
+            assert np.allclose(obtenido[clave][k], v), (clave, k)
+
+    # Familias no aplicables se conservan como None
+    obtenido = OperationsApp.decodificar_resultados(
+        OperationsApp.codificar_resultados(
+            OperationsApp.calcular_todos_modelos([-1.0, 1.0, 2.0], [1.0, -2.0, 3.0])
+        )
+    )
+    assert obtenido["Exponencial"] is None and obtenido["Potencial"] is None
+
+    try:
+        OperationsApp.calcular_todos_modelos_binario(BinaryFormat.encode_xy([], []))
+        assert False, "Expected ValueError for empty data"
+    except ValueError:
+        pass
+    print("✓ binary results tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running BinaryFormat tests...")
+    print("=" * 60)
+
+    test_codificar_decodificar()
+    test_resultados_binarios()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
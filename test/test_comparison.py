@@ -0,0 +1,108 @@
+"""
+Pruebas de la comparación de varios modelos guardados.
+"""
+
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ComparisonApp
+import OperationsApp
+import Queries
+
+
+def _series():
+    xs = np.linspace(0.5, 8.0, 300)
+    return [
+        (xs, 2.0 + 3.0 * xs + np.sin(5 * xs)),
+        (xs, 1.2 * np.exp(0.35 * xs)),
+        (xs, 4.0 - 0.5 * xs + 0.2 * xs**2),
+    ]
+
+
+def test_reducir_puntos():
+    """Prueba la reducción de series conservando mínimos y máximos."""
+    print("Testing series downsampling...")
+    rng = np.random.default_rng(3)
+    xs = rng.uniform(0, 10, 5000)
+    ys = np.sin(xs) + rng.normal(0, 0.1, xs.size)
+    rx, ry = ComparisonApp.reducir_puntos(xs, ys, 200)
+    assert rx.size <= 200 and rx.size == ry.size
+    assert np.all(np.diff(rx) >= 0)
+    assert ry.min() == ys.min() and ry.max() == ys.max()
+
+    # Series pequeñas solo se ordenan
+    rx, ry = ComparisonApp.reducir_puntos([3, 1, 2], [30, 10, 20], 200)
+    assert rx.tolist() == [1.0, 2.0, 3.0] and ry.tolist() == [10.0, 20.0, 30.0]
+    print("✓ series downsampling tests passed")
+
+
+def test_comparar_modelos():
+    """Prueba el ajuste paralelo de varios modelos guardados."""
+    print("\nTesting parallel model comparison...")
+    original = Queries.DB_PATH
+    try:
+        Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+        series = _series()
+        ids = [
+            Queries.insert_model(f"serie {i}", xs, ys, store_points=i % 2 == 0)
+            for i, (xs, ys) in enumerate(series)
+        ]
+        pedidos = [ids[2], 99999, ids[0], ids[1]]
+
+        with ThreadPoolExecutor(2) as pool:
+            en_hilos = ComparisonApp.comparar_modelos(pedidos, executor=pool)
+        en_procesos = ComparisonApp.comparar_modelos(pedidos, workers=2)
+        assert en_hilos[1] is None and en_procesos[1] is None
+        assert [c["id"] for c in en_procesos if c] == [ids[2], ids[0], ids[1]]
+
+        for comparacion, (xs, ys) in zip(
+            [en_procesos[2], en_procesos[3], en_procesos[0]], series
+        ):
+            assert comparacion["n"] == xs.size
+            assert comparacion["x_min"] == xs.min()
+            assert comparacion["x_max"] == xs.max()
+            esperado = OperationsApp.calcular_todos_modelos(xs, ys)
+            for familia, r in esperado.items():
+                obtenido = comparacion["resultados"][familia]
+                if r is None:
+                    assert obtenido is None
+                    continue
+                # Un ajuste exacto deja solo ruido de redondeo en el RMSE
+                assert np.isclose(
+                    obtenido["rmse"], r["rmse"], rtol=1e-7, atol=1e-5
+                ), familia
+            assert len(comparacion["muestra"][0]) <= ComparisonApp.MAX_PUNTOS_SERIE
+
+        assert ComparisonApp.mejor_familia(en_procesos[3]["resultados"]) == (
+            "Exponencial"
+        )
+        assert ComparisonApp.mejor_familia({"Lineal": None}) is None
+        x_grid, y = ComparisonApp.curva(en_procesos[3], "Exponencial", 50)
+        assert x_grid.size == 50 and np.allclose(y, 1.2 * np.exp(0.35 * x_grid))
+        assert ComparisonApp.comparar_modelos([]) == []
+    finally:
+        Queries.DB_PATH = original
+    print("✓ parallel model comparison tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running ComparisonApp tests...")
+    print("=" * 60)
+
+    test_reducir_puntos()
+    test_comparar_modelos()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,129 @@
+"""
+Pruebas de la compresión de payloads (Compression).
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import BinaryFormat
+import Compression
+
+
+def _columnas(n=10_001, dtype="<f8"):
+    rng = np.random.default_rng(5)
+    suave = np.linspace(0.5, 9.0, n)
+    ruido = rng.normal(size=n)
+    ruido[[3, 5, 7]] = [np.nan, np.inf, -0.0]
+    return [suave.astype(dtype), ruido.astype(dtype)]
+
+
+def _iguales(a, b):
+    """Igualdad bit a bit (nan, -0.0 e inf incluidos)."""
+    return a.dtype == b.dtype and np.array_equal(a.view(np.uint8), b.view(np.uint8))
+
+
+def test_codecs_sin_perdida():
+    """Prueba que cada códec reproduce los valores bit a bit."""
+    print("Testing lossless codecs...")
+    for dtype in ("<f8", "<f4"):
+        columnas = _columnas(dtype=dtype)
+        for codec in Compression.CODECS:
+            datos = Compression.compress_columns(
+                columnas, codec, {"origen": codec}, dtype, chunk_rows=1000
+            )
+            assert Compression.is_compressed(datos)
+            assert Compression.codec_of(datos[:6]) == codec
+            obtenidas, meta = Compression.decode(datos)
+            assert meta == {"origen": codec}
+            assert all(_iguales(a, b) for a, b in zip(obtenidas, columnas)), codec
+
+            # Desde y hacia el formato binario sin comprimir
+            buffer = BinaryFormat.encode(columnas, {"k": 1}, dtype)
+            comprimido = Compression.compress(buffer, codec)
+            assert Compression.decompress(comprimido) == buffer
+    vacio, _ = Compression.decode(Compression.compress_columns([[]], "delta"))
+    assert vacio[0].size == 0
+    assert Compression.codec_of(BinaryFormat.encode([[1.0]])) is None
+    print("✓ lossless codec tests passed")
+
+
+def test_lectura_por_bloques():
+    """Prueba la decodificación por partes, por filas y en arrays propios."""
+    print("\nTesting streamed and random-access decoding...")
+    columnas = _columnas()
+    datos = Compression.compress_columns(columnas, "xor", chunk_rows=777)
+
+    # Partes pequeñas que cortan la cabecera, la tabla y los bloques
+    partes = (datos[i : i + 100] for i in range(0, len(datos), 100))
+    bloques = list(Compression.iter_decode(partes))
+    assert max(b.size for b in bloques) == 777
+    assert _iguales(np.concatenate(bloques), np.concatenate(columnas))
+
+    lector = Compression.Reader(io.BytesIO(datos))
+    filas = [lector.read_rows(inicio, 500) for inicio in range(0, lector.rows, 500)]
+    esperado = np.column_stack(columnas)
+    assert np.array_equal(np.concatenate(filas), esperado, equal_nan=True)
+    assert lector.read_rows(lector.rows - 2, 10).shape == (2, 2)
+
+    destino = [np.empty(columnas[0].size) for _ in columnas]
+    obtenidas, _ = Compression.decode(datos, out=destino)
+    assert obtenidas[1] is destino[1] and _iguales(destino[1], columnas[1])
+    try:
+        Compression.decode(datos, out=[np.empty(3), np.empty(3)])
+        assert False, "Expected ValueError for a wrong out array"
+    except ValueError:
+        pass
+    print("✓ streamed and random-access decoding tests passed")
+
+
+def test_errores_y_tasas():
+    """Prueba errores de formato y el benchmark de tasas por códec."""
+    print("\nTesting errors and the codec benchmark...")
+    datos = Compression.compress_columns(_columnas(), "zlib")
+    for malo in (b"LRMZ", datos[:40], b"XXXX" + datos[4:]):
+        try:
+            Compression.decode(malo)
+            assert False, "Expected ValueError for a malformed payload"
+        except ValueError:
+            pass
+    try:
+        list(Compression.iter_decode([datos[:-10]]))
+        assert False, "Expected ValueError for a truncated payload"
+    except ValueError:
+        pass
+    try:
+        Compression.compress_columns([[1.0]], "zip")
+        assert False, "Expected ValueError for an unknown codec"
+    except ValueError:
+        pass
+
+    informe = Compression.benchmark(Compression.sample_datasets(20_000), repeats=1)
+    assert set(informe) == {"x_grid", "smooth", "noisy", "counts"}
+    # Una grilla uniforme es el caso ideal de delta
+    grilla = informe["x_grid"]
+    assert grilla["delta"]["ratio"] > 10 * grilla["zlib"]["ratio"]
+    assert all(r["decompress_mb_s"] > 0 for r in grilla.values())
+    print("✓ error and benchmark tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running Compression tests...")
+    print("=" * 60)
+
+    test_codecs_sin_perdida()
+    test_lectura_por_bloques()
+    test_errores_y_tasas()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
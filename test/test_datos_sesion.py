@@ -0,0 +1,177 @@
+"""
+Pruebas de los datos de sesión de la interfaz (parseo único y seguimiento
+de cambios) con widgets de texto simulados, sin necesidad de pantalla.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import AppGUI
+import OperationsApp
+import Profiling
+
+
+class _TextoSimulado:
+    """Imita la parte de tk.Text que usa DatosSesion."""
+
+    def __init__(self, texto=""):
+        self.texto = texto
+        self._callback = None
+
+    def get(self, inicio, fin):
+        return self.texto
+
+    def edit_modified(self, valor=None):
+        pass
+
+    def bind(self, evento, callback, add=None):
+        self._callback = callback
+
+    def escribir(self, texto):
+        self.texto = texto
+        self._callback(type("Evento", (), {"widget": self})())
+
+
+class _TablaSimulada:
+    activa = False
+    version = 0
+
+
+def _sesion(x, y):
+    txt_x, txt_y = _TextoSimulado(x), _TextoSimulado(y)
+    return AppGUI.DatosSesion(txt_x, txt_y, _TablaSimulada()), txt_x, txt_y
+
+
+def test_sufijo_agregado():
+    """Prueba la detección de valores agregados al final."""
+    print("Testing append detection...")
+    huella = AppGUI._huella("1, 2, 3")
+    assert AppGUI._sufijo_agregado("1, 2, 3, 4", huella) == ", 4"
+    assert AppGUI._sufijo_agregado("1, 2, 3\n4", huella) == "\n4"
+    assert AppGUI._sufijo_agregado("1, 2, 3", huella) == ""
+    # "3" -> "34" cambia el último valor
+    assert AppGUI._sufijo_agregado("1, 2, 34", huella) is None
+    assert AppGUI._sufijo_agregado("1, 5, 3, 4", huella) is None
+    assert AppGUI._sufijo_agregado("1, 2", huella) is None
+    assert AppGUI._sufijo_agregado("7 8", AppGUI._huella("")) == "7 8"
+    print("✓ append detection tests passed")
+
+
+def test_parseo_y_cambios():
+    """Prueba que solo se vuelve a parsear lo que cambió."""
+    print("\nTesting DatosSesion change tracking...")
+    datos, txt_x, txt_y = _sesion("1 2 3", "2 4 6")
+    xs, ys = datos.arrays()
+    assert xs.tolist() == [1.0, 2.0, 3.0] and not xs.flags.writeable
+    version = datos.version
+
+    # Sin eventos de modificación se retornan los mismos arrays
+    assert datos.arrays()[0] is xs
+
+    # Un evento sin cambio real de contenido no vuelve a parsear
+    txt_x.escribir("1 2 3")
+    assert datos.arrays()[0] is xs and datos.version == version
+
+    # Agregar al final solo parsea lo nuevo
+    txt_x.escribir("1 2 3, 4")
+    txt_y.escribir("2 4 6\n8")
+    xs2, ys2 = datos.arrays()
+    assert xs2.tolist() == [1.0, 2.0, 3.0, 4.0] and ys2.tolist()[-1] == 8.0
+    assert datos.version == version + 1
+
+    # Un cambio en el medio vuelve a parsear todo
+    txt_x.escribir("1 5 3 4")
+    assert datos.arrays()[0].tolist() == [1.0, 5.0, 3.0, 4.0]
+
+    try:
+        txt_y.escribir("2 4 abc")
+        datos.arrays()
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("✓ DatosSesion change tracking tests passed")
+
+
+def test_modelos_reutilizados_e_incrementales():
+    """Prueba la reutilización y la actualización incremental de los ajustes."""
+    print("\nTesting result reuse and incremental updates...")
+    estado = Profiling.is_enabled()
+    try:
+        Profiling.reset()
+        Profiling.enable()
+        xs = np.linspace(1.0, 5.0, 30)
+        ys = 1.5 * np.exp(0.3 * xs)
+        texto = lambda v: ", ".join(f"{x:.17g}" for x in v)
+        datos, txt_x, txt_y = _sesion(texto(xs[:20]), texto(ys[:20]))
+
+        primero = datos.modelos()
+        assert datos.modelos() is primero
+        assert Profiling.counters()["AppGUI.modelos_reutilizados"] == 1
+
+        txt_x.escribir(texto(xs[:20]) + ", " + texto(xs[20:]))
+        txt_y.escribir(texto(ys[:20]) + "\n" + texto(ys[20:]))
+        incremental = datos.modelos()
+        assert Profiling.counters()["AppGUI.modelos_incrementales"] == 1
+        completo = OperationsApp.calcular_todos_modelos(xs, ys)
+        for clave, r in completo.items():
+            for k, v in r.items():
+                if k != "y_pred":
+                    assert np.isclose(incremental[clave][k], v, rtol=1e-7), (clave, k)
+
+        # Un cambio que no es un agregado recalcula desde cero
+        txt_y.escribir(texto(-ys))
+        assert datos.modelos()["Exponencial"] is None
+        assert Profiling.counters()["AppGUI.modelos_incrementales"] == 1
+    finally:
+        Profiling.reset()
+        if not estado:
+            Profiling.disable()
+    print("✓ result reuse and incremental update tests passed")
+
+
+def test_incremental_con_valores_grandes():
+    """Prueba que agregar puntos da las mismas métricas que recalcular con y grande."""
+    print("\nTesting incremental updates on offset data...")
+    rng = np.random.default_rng(3)
+    xs = np.linspace(0.1, 10, 2000)
+    ys = 1e6 + 3 + 0.5 * xs + rng.normal(0, 0.1, xs.size)
+    # El último agregado se aleja de la media de los primeros puntos
+    ys[1800:] += 50.0
+    texto = lambda v: ", ".join(f"{x:.17g}" for x in v)
+    datos, txt_x, txt_y = _sesion(texto(xs[:1500]), texto(ys[:1500]))
+    datos.modelos()
+    for fin in (1800, 2000):
+        txt_x.escribir(texto(xs[:fin]))
+        txt_y.escribir(texto(ys[:fin]))
+        incremental = datos.modelos()
+        completo = OperationsApp.calcular_todos_modelos(xs[:fin], ys[:fin])
+        for clave in ("Lineal", "Logaritmica", "Polinomial_2"):
+            for k, v in completo[clave].items():
+                if k != "y_pred":
+                    assert np.isclose(incremental[clave][k], v, rtol=1e-7), (
+                        fin, clave, k, incremental[clave][k], v
+                    )
+    print("✓ incremental updates on offset data tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running DatosSesion tests...")
+    print("=" * 60)
+
+    test_sufijo_agregado()
+    test_parseo_y_cambios()
+    test_modelos_reutilizados_e_incrementales()
+    test_incremental_con_valores_grandes()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
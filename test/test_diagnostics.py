@@ -0,0 +1,135 @@
+"""
+Pruebas del diagnóstico de residuos (DiagnosticsApp).
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import DiagnosticsApp
+import ModelsApp
+import OperationsApp
+
+
+def _datos(n=400, desplazamiento=0.0):
+    rng = np.random.default_rng(7)
+    xs = np.linspace(1.0, 30.0, n) + desplazamiento
+    ys = 0.8 * xs + 3.0 + rng.normal(size=n)
+    ys[50] += 25.0  # un punto influyente
+    return xs, ys, OperationsApp.calcular_todos_modelos(xs, ys)
+
+
+def _directo(xs, ys, resultados, familia):
+    """Diagnósticos con la matriz sombrero explícita (referencia)."""
+    columnas, _ = OperationsApp.calcular_columnas(xs, ys)
+    columnas["1"] = np.ones(xs.size)
+    base = ModelsApp.FAMILIAS[familia].BASE
+    Q, _ = np.linalg.qr(np.column_stack([columnas[c] for c in base]))
+    h = (Q**2).sum(axis=1)
+    e = ys - resultados[familia]["y_pred"]
+    p = len(base)
+    s2 = np.dot(e, e) / (xs.size - p)
+    estandarizados = e / np.sqrt(s2 * (1 - h))
+    return {
+        "residuos": e,
+        "palanca": h,
+        "estandarizados": estandarizados,
+        "cook": estandarizados**2 * h / (p * (1 - h)),
+        "durbin_watson": np.sum(np.diff(e) ** 2) / np.dot(e, e),
+    }
+
+
+def test_coincide_con_matriz_sombrero():
+    """Prueba todos los diagnósticos contra el cálculo directo."""
+    print("Testing diagnostics against the explicit hat matrix...")
+    # Con X desplazada el diseño sin centrar estaría mal condicionado
+    for desplazamiento in (0.0, 1000.0):
+        xs, ys, resultados = _datos(desplazamiento=desplazamiento)
+        # Bloques que no dividen n: Durbin-Watson cruza los bordes
+        diagnosticos = DiagnosticsApp.Diagnosticos(xs, ys, resultados, 77)
+        assert diagnosticos.familias == list(ModelsApp.FAMILIAS)
+        for familia in diagnosticos.familias:
+            esperado = _directo(xs, ys, resultados, familia)
+            for item in DiagnosticsApp.ITEMS:
+                obtenido = diagnosticos.obtener(item, familia)
+                assert np.allclose(obtenido, esperado[item], rtol=1e-7), (
+                    familia,
+                    item,
+                )
+        resumen = diagnosticos.resumen()["Lineal"]
+        assert resumen["influyentes"] >= 1
+        cook = diagnosticos.obtener("cook", "Lineal")
+        assert int(np.argmax(cook)) == 50 and resumen["cook_max"] == cook[50]
+    print("✓ hat matrix comparison tests passed")
+
+
+def test_calculo_perezoso():
+    """Prueba que solo se calcula lo pedido y que no hace falta y_pred."""
+    print("\nTesting lazy diagnostics...")
+    xs, ys, resultados = _datos()
+    diagnosticos = DiagnosticsApp.Diagnosticos(xs, ys, resultados)
+    assert diagnosticos.calculados() == []
+    dw = diagnosticos.obtener("durbin_watson", "Potencial")
+    assert isinstance(dw, float) and 0.0 < dw < 4.0
+    assert diagnosticos.calculados() == ["durbin_watson"]
+    diagnosticos.obtener("cook", "Lineal")
+    assert diagnosticos.calculados() == ["cook", "durbin_watson"]
+
+    # Resultados sin y_pred (p. ej. de la base): se predice por bloques
+    sin_prediccion = {
+        f: {k: v for k, v in r.items() if k != "y_pred"} for f, r in resultados.items()
+    }
+    otros = DiagnosticsApp.Diagnosticos(xs, ys, sin_prediccion, tamano_bloque=64)
+    otros.calcular()
+    for familia in otros.familias:
+        assert np.allclose(
+            otros.obtener("cook", familia), diagnosticos.obtener("cook", familia)
+        )
+        assert np.allclose(
+            otros.ajustados(familia), resultados[familia]["y_pred"], rtol=1e-12
+        )
+
+    for item, familia in (("curtosis", "Lineal"), ("cook", "Inexistente")):
+        try:
+            diagnosticos.obtener(item, familia)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    print("✓ lazy diagnostics tests passed")
+
+
+def test_familias_no_aplicables():
+    """Prueba calcular_diagnosticos con familias sin ajuste."""
+    print("\nTesting diagnostics with non-applicable families...")
+    xs = np.linspace(-5.0, 5.0, 101)
+    ys = xs**2 - 2 * xs + 1
+    resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+    todos = DiagnosticsApp.calcular_diagnosticos(
+        xs, ys, resultados, ("residuos", "durbin_watson")
+    )
+    assert todos["Exponencial"] is None and todos["Logaritmica"] is None
+    assert set(todos["Lineal"]) == {"residuos", "durbin_watson"}
+    # El ajuste cuadrático es exacto: residuos nulos
+    assert np.abs(todos["Polinomial_2"]["residuos"]).max() < 1e-9
+    print("✓ non-applicable family tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running DiagnosticsApp tests...")
+    print("=" * 60)
+
+    test_coincide_con_matriz_sombrero()
+    test_calculo_perezoso()
+    test_familias_no_aplicables()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
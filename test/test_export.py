@@ -0,0 +1,213 @@
+"""
+Pruebas de la exportación de resultados (ExportApp).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ExportApp
+import OperationsApp
+import Queries
+
+
+def _datos(n=2501):
+    xs = np.linspace(1.0, 20.0, n)
+    ys = 1.5 * xs + 2.0 + np.sin(xs)
+    return xs, ys, OperationsApp.calcular_todos_modelos(xs, ys)
+
+
+def _esperado(xs, ys, resultados):
+    """Matriz completa que debería exportarse."""
+    columnas = [xs, ys]
+    for familia in ExportApp._familias(resultados):
+        y_pred = resultados[familia]["y_pred"]
+        columnas += [y_pred, ys - y_pred]
+    return np.column_stack(columnas)
+
+
+def _leer(ruta):
+    """Lee un archivo exportado como (columnas, metricas, matriz)."""
+    formato = ExportApp.formato_de_ruta(ruta)
+    if formato == "csv":
+        with open(ruta, encoding="utf-8") as f:
+            columnas = f.readline().strip().split(",")
+        datos = np.loadtxt(ruta, delimiter=",", skiprows=1, ndmin=2)
+        with open(ExportApp.ruta_metricas(ruta), encoding="utf-8") as f:
+            metricas = f.read()
+        return columnas, metricas, datos
+    if formato == "json":
+        with open(ruta, encoding="utf-8") as f:
+            contenido = json.load(f)
+        assert contenido["n"] == len(contenido["filas"])
+        datos = np.array(contenido["filas"], dtype=float).reshape(
+            -1, len(contenido["columnas"])
+        )
+        return contenido["columnas"], contenido["metricas"], datos
+    with np.load(ruta) as npz:
+        return (
+            npz["columnas"].tolist(),
+            json.loads(npz["metricas"].item()),
+            npz["datos"],
+        )
+
+
+def test_formatos():
+    """Prueba que cada formato contiene los datos, residuos y métricas."""
+    print("Testing CSV, JSON and NPZ exports...")
+    carpeta = tempfile.mkdtemp()
+    xs, ys, resultados = _datos()
+    esperado = _esperado(xs, ys, resultados)
+    for formato in ExportApp.FORMATOS:
+        ruta = os.path.join(carpeta, f"ajuste.{formato}")
+        avances = []
+        informe = ExportApp.exportar(
+            ruta,
+            xs,
+            ys,
+            resultados,
+            filas_por_bloque=1000,
+            progreso=lambda filas, total: avances.append((filas, total)),
+        )
+        assert informe["filas"] == xs.size and informe["formato"] == formato
+        assert avances == [(1000, 2501), (2000, 2501), (2501, 2501)]
+        columnas, metricas, datos = _leer(ruta)
+        assert columnas == ExportApp.columnas_exportadas(resultados)
+        assert columnas[:4] == ["x", "y", "y_pred_Lineal", "residuo_Lineal"]
+        # Sin pérdida: CSV y JSON usan la representación más corta exacta
+        assert np.array_equal(datos, esperado), formato
+        if formato == "csv":
+            assert metricas.splitlines()[0].startswith("familia,")
+            assert f"{resultados['Lineal']['r2']!r}" in metricas
+        else:
+            assert metricas["Lineal"]["r2"] == resultados["Lineal"]["r2"]
+    assert not [f for f in os.listdir(carpeta) if f.endswith(".tmp")]
+    print("✓ format export tests passed")
+
+
+def test_modelo_guardado():
+    """Prueba la exportación por bloques de un modelo guardado."""
+    print("\nTesting exports of stored models...")
+    original = Queries.DB_PATH
+    try:
+        carpeta = tempfile.mkdtemp()
+        Queries.DB_PATH = os.path.join(carpeta, "test.db")
+        xs, ys, resultados = _datos(1234)
+        model_id = Queries.insert_model("exportado", xs, ys, codec="xor")
+        ruta = os.path.join(carpeta, "modelo.npz")
+        informe = ExportApp.exportar_modelo(model_id, ruta, filas_por_bloque=100)
+        assert informe["filas"] == 1234
+        columnas, metricas, datos = _leer(ruta)
+        # Los ajustes salen de la base y las predicciones se calculan por bloque
+        assert np.allclose(datos, _esperado(xs, ys, resultados), atol=1e-9)
+        assert abs(metricas["Lineal"]["r2"] - resultados["Lineal"]["r2"]) < 1e-9
+
+        try:
+            ExportApp.exportar_modelo(99999, ruta)
+            assert False, "Expected ValueError for a missing model"
+        except ValueError:
+            pass
+        varias = Queries.insert_model("varias", np.column_stack([xs, xs]), ys)
+        try:
+            ExportApp.exportar_modelo(
+                varias, os.path.join(carpeta, "varias.csv"), resultados=resultados
+            )
+            assert False, "Expected ValueError for a multi-column X"
+        except ValueError:
+            pass
+        assert sorted(os.listdir(carpeta)) == ["modelo.npz", "test.db"]
+    finally:
+        Queries.DB_PATH = original
+    print("✓ stored model export tests passed")
+
+
+def test_segundo_plano_y_errores():
+    """Prueba la exportación en segundo plano, la cancelación y los errores."""
+    print("\nTesting background exports, cancellation and errors...")
+    carpeta = tempfile.mkdtemp()
+    xs, ys, resultados = _datos(5000)
+
+    exportacion = ExportApp.exportar_en_segundo_plano(
+        os.path.join(carpeta, "fondo.json"), xs, ys, resultados, filas_por_bloque=700
+    )
+    assert exportacion.resultado(timeout=30)["filas"] == 5000
+    assert exportacion.terminada() and exportacion.progreso() == (5000, 5000)
+
+    # La cancelación se atiende entre bloques y no deja archivos
+    listo = threading.Event()
+    cancelado = threading.Event()
+    obtenidos = []
+
+    def bloquear(filas, total):
+        listo.set()
+        cancelado.wait(5)
+
+    def exportar_cancelable():
+        obtenidos.append(
+            ExportApp.exportar(
+                os.path.join(carpeta, "cancelado.csv"),
+                xs,
+                ys,
+                resultados,
+                filas_por_bloque=100,
+                progreso=bloquear,
+                cancelado=cancelado,
+            )
+        )
+
+    hilo = threading.Thread(target=exportar_cancelable)
+    hilo.start()
+    listo.wait(5)
+    cancelado.set()
+    hilo.join()
+    assert obtenidos == [None]
+    assert sorted(os.listdir(carpeta)) == ["fondo.json"]
+
+    # nan e inf se exportan como null en JSON
+    ys_inf = ys.copy()
+    ys_inf[3] = np.inf
+    ruta = os.path.join(carpeta, "inf.json")
+    ExportApp.exportar(ruta, xs, ys_inf, resultados)
+    with open(ruta, encoding="utf-8") as f:
+        fila = json.load(f)["filas"][3]
+    assert fila[1] is None and fila[3] is None
+
+    for ruta, x in (("malo.txt", xs), ("malo.csv", xs[:10])):
+        try:
+            ExportApp.exportar(os.path.join(carpeta, ruta), x, ys, resultados)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    fallida = ExportApp.exportar_en_segundo_plano(
+        os.path.join(carpeta, "no", "existe.npz"), xs, ys, resultados
+    )
+    try:
+        fallida.resultado(timeout=30)
+        assert False, "Expected OSError for a missing folder"
+    except OSError:
+        pass
+    print("✓ background export and error tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running ExportApp tests...")
+    print("=" * 60)
+
+    test_formatos()
+    test_modelo_guardado()
+    test_segundo_plano_y_errores()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
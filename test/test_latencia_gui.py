@@ -0,0 +1,322 @@
+"""
+Pruebas de regresión de latencia de los callbacks de la interfaz (calcular
+modelos, mostrar la gráfica y buscar en la base) con datos y bases de datos
+sintéticos.
+
+Necesitan una pantalla: usan la de DISPLAY o, si no hay, inician Xvfb cuando
+está instalado; sin ninguna de las dos se omiten. La ventana principal queda
+oculta (withdraw) y los cuadros de diálogo se reemplazan por uno que solo
+registra el mensaje, así que nada espera al usuario.
+
+Cada escenario se mide REPETICIONES veces, incluyendo el procesamiento de
+eventos pendientes (redibujos) con update(), y la mediana se compara con la
+línea base versionada en latencias_gui.json. Para que la línea base sirva en
+otras máquinas, guarda cada escenario en unidades de una carga de
+calibración fija (parseo y ajuste con numpy, ver _calibrar) que se mide en
+la misma ejecución: falla si la mediana supera
+base * calibración * (1 + TOLERANCIA) + MARGEN_S. Un escenario sin línea base
+también falla; con LRM_ACTUALIZAR_LATENCIAS=1 se graba (completa) en lugar
+de comparar, y el archivo se versiona junto con el cambio que la modifica.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import AppGUI
+import Profiling
+import Queries
+
+# Archivo versionado con la línea base (latencia de cada escenario dividida
+# por la de la carga de calibración)
+RUTA_BASE = os.environ.get(
+    "LRM_LATENCIAS_BASE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "latencias_gui.json"),
+)
+
+# Aumento relativo tolerado sobre la línea base y margen absoluto para que
+# las mediciones de pocos milisegundos no fallen por ruido
+TOLERANCIA = float(os.environ.get("LRM_TOLERANCIA_LATENCIA", "0.5"))
+MARGEN_S = 0.05
+
+REPETICIONES = 5
+
+# Pares de datos de los escenarios de cálculo y gráfica
+TAMANOS = (1_000, 50_000)
+
+# Modelos de la base sintética de búsqueda
+MODELOS_BD = 500
+
+# Pares de datos de la carga de calibración
+TAMANO_CALIBRACION = 20_000
+
+_DIALOGOS = ("showinfo", "showwarning", "showerror", "askyesno")
+
+_xvfb = None
+
+
+def _iniciar_xvfb():
+    """Inicia Xvfb en un display libre; False si no está instalado o no arranca."""
+    global _xvfb
+    ejecutable = shutil.which("Xvfb")
+    if ejecutable is None:
+        return False
+    for numero in range(99, 120):
+        if os.path.exists(f"/tmp/.X{numero}-lock"):
+            continue
+        proceso = subprocess.Popen(
+            [
+                ejecutable,
+                f":{numero}",
+                "-screen",
+                "0",
+                "1280x1024x24",
+                "-nolisten",
+                "tcp",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        os.environ["DISPLAY"] = f":{numero}"
+        for _ in range(50):
+            if proceso.poll() is not None:
+                break
+            try:
+                tk.Tk().destroy()
+            except tk.TclError:
+                time.sleep(0.1)
+                continue
+            _xvfb = proceso
+            atexit.register(proceso.terminate)
+            return True
+        proceso.kill()
+    os.environ.pop("DISPLAY", None)
+    return False
+
+
+def _raiz():
+    """Ventana principal oculta; omite la prueba si no hay pantalla."""
+    try:
+        raiz = tk.Tk()
+    except tk.TclError:
+        if _xvfb is not None or not _iniciar_xvfb():
+            raise unittest.SkipTest("sin pantalla ni Xvfb")
+        raiz = tk.Tk()
+    raiz.withdraw()
+    return raiz
+
+
+@contextlib.contextmanager
+def _interfaz():
+    """
+    Interfaz completa sobre una base temporal, con los diálogos reemplazados.
+    Retorna (raiz, componentes, mensajes).
+    """
+    raiz = _raiz()
+    mensajes = []
+    originales = {n: getattr(AppGUI.messagebox, n) for n in _DIALOGOS}
+    original_db = Queries.DB_PATH
+    try:
+        for nombre in _DIALOGOS:
+            setattr(
+                AppGUI.messagebox,
+                nombre,
+                lambda titulo, mensaje, nombre=nombre, **_: mensajes.append(
+                    (nombre, mensaje)
+                )
+                or nombre == "askyesno",
+            )
+        Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+        componentes = AppGUI.inicializar_interfaz(raiz)
+        raiz.update()
+        yield raiz, componentes, mensajes
+    finally:
+        Queries.DB_PATH = original_db
+        for nombre, funcion in originales.items():
+            setattr(AppGUI.messagebox, nombre, funcion)
+        raiz.destroy()
+
+
+def _texto(valores):
+    return ", ".join(f"{v:.10g}" for v in valores)
+
+
+def _cargar_datos(componentes, n):
+    """Escribe n pares sintéticos en los campos X e y."""
+    xs = np.linspace(0.5, 20.0, n)
+    ys = 1.5 * np.exp(0.12 * xs) + np.sin(3 * xs)
+    for campo, valores in (("txt_x", xs), ("txt_y", ys)):
+        componentes[campo].delete("1.0", tk.END)
+        componentes[campo].insert("1.0", _texto(valores))
+
+
+def _medir(raiz, accion, preparar=None):
+    """Mediana en segundos de accion() más los eventos que deja pendientes."""
+    tiempos = []
+    for _ in range(REPETICIONES):
+        if preparar is not None:
+            preparar()
+        raiz.update()
+        inicio = time.perf_counter()
+        accion()
+        raiz.update()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+_calibracion = None
+
+
+def _calibrar():
+    """
+    Mediana en segundos de la carga de calibración: formatear, parsear y
+    ajustar TAMANO_CALIBRACION pares, el mismo tipo de trabajo (Python y
+    numpy) que los escenarios. Se mide una vez por ejecución.
+    """
+    global _calibracion
+    if _calibracion is None:
+        xs = np.linspace(0.5, 20.0, TAMANO_CALIBRACION)
+        texto = _texto(1.5 * np.exp(0.12 * xs))
+        diseno = np.column_stack([np.ones_like(xs), xs, xs * xs])
+        tiempos = []
+        for _ in range(REPETICIONES):
+            inicio = time.perf_counter()
+            ys = np.array([float(v) for v in texto.split(",")])
+            np.linalg.lstsq(diseno, np.log(ys), rcond=None)
+            _texto(ys)
+            tiempos.append(time.perf_counter() - inicio)
+        _calibracion = statistics.median(tiempos)
+    return _calibracion
+
+
+def _comparar_con_base(medidas):
+    """
+    Compara las medianas con la línea base (en unidades de _calibrar), o la
+    graba con LRM_ACTUALIZAR_LATENCIAS=1. Falla si algún escenario no tiene
+    línea base.
+    """
+    calibracion = _calibrar()
+    print(f"  calibración: {calibracion * 1000:.1f} ms")
+    base = {}
+    if os.path.exists(RUTA_BASE):
+        with open(RUTA_BASE, encoding="utf-8") as f:
+            base = json.load(f).get("escenarios", {})
+    if os.environ.get("LRM_ACTUALIZAR_LATENCIAS") == "1":
+        base.update({k: v / calibracion for k, v in medidas.items()})
+        with open(RUTA_BASE, "w", encoding="utf-8") as f:
+            json.dump({"escenarios": base}, f, indent=2, sort_keys=True)
+        print(f"  Línea base grabada en {RUTA_BASE}: {', '.join(sorted(medidas))}")
+        return
+    faltantes = sorted(k for k in medidas if k not in base)
+    assert not faltantes, (
+        f"Sin línea base en {RUTA_BASE} para: {', '.join(faltantes)}. "
+        "Grabarla con LRM_ACTUALIZAR_LATENCIAS=1 y versionar el archivo."
+    )
+
+    lentos = []
+    for escenario, medida in medidas.items():
+        limite = base[escenario] * calibracion * (1 + TOLERANCIA) + MARGEN_S
+        print(f"  {escenario}: {medida * 1000:.1f} ms (límite {limite * 1000:.1f} ms)")
+        if medida > limite:
+            lentos.append(
+                f"{escenario}: {medida * 1000:.1f} ms > {limite * 1000:.1f} ms "
+                f"(base {base[escenario]:.2f} × calibración)"
+            )
+    if lentos:
+        # Las etapas más costosas de Profiling ayudan a ubicar la regresión
+        etapas = [
+            f"  {k}: {v['total_ms']:.1f} ms"
+            for k, v in list(Profiling.summary().items())[:8]
+        ]
+        lineas = ["Latencia sobre la línea base:"] + lentos + ["Etapas:"] + etapas
+        assert False, "\n  ".join(lineas)
+
+
+@contextlib.contextmanager
+def _perfilado():
+    """Activa Profiling para detallar las etapas si una medición falla."""
+    estado = Profiling.is_enabled()
+    Profiling.reset()
+    Profiling.enable()
+    try:
+        yield
+    finally:
+        if not estado:
+            Profiling.disable()
+
+
+def test_latencia_calcular_y_graficar():
+    """Mide calcular modelos y mostrar la gráfica con datos sintéticos."""
+    print("Testing calculate/plot latency...")
+    with _interfaz() as (raiz, ui, mensajes), _perfilado():
+        medidas = {}
+        for n in TAMANOS:
+            _cargar_datos(ui, n)
+            # Invalidar fuerza a volver a parsear y ajustar en cada repetición
+            medidas[f"calcular_{n}"] = _medir(
+                raiz, ui["calcular_callback"], ui["datos_sesion"].invalidar
+            )
+            assert not [m for m in mensajes if m[0] == "showerror"], mensajes
+            assert ui["resultados"]["Exponencial"] is not None
+            for metodo in ("Lineal", "Polinomial_2"):
+                ui["metodo_seleccionado"].set(metodo)
+                medidas[f"graficar_{metodo}_{n}"] = _medir(
+                    raiz, ui["graficar_callback"]
+                )
+            assert not [m for m in mensajes if m[0] == "showerror"], mensajes
+        _comparar_con_base(medidas)
+    print("✓ calculate/plot latency tests passed")
+
+
+def test_latencia_busqueda():
+    """Mide la búsqueda de modelos sobre una base sintética."""
+    print("\nTesting search latency...")
+    with _interfaz() as (raiz, ui, mensajes), _perfilado():
+        Queries.insert_models(
+            (f"modelo {i}", [1.0, 2.0, 3.0], [2.0, 4.0, 6.5]) for i in range(MODELOS_BD)
+        )
+        entrada = ui["entry_search"]
+        medidas = {}
+        for texto in ("modelo", "modelo 1"):
+            entrada.delete(0, tk.END)
+            entrada.insert(0, texto)
+            medidas[f"buscar_{texto.replace(' ', '_')}_{MODELOS_BD}"] = _medir(
+                raiz, ui["buscar_callback"]
+            )
+        assert not mensajes, mensajes
+        _comparar_con_base(medidas)
+    print("✓ search latency tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running GUI latency tests...")
+    print("=" * 60)
+
+    try:
+        test_latencia_calcular_y_graficar()
+        test_latencia_busqueda()
+    except unittest.SkipTest as e:
+        print(f"Se omiten las pruebas de latencia: {e}")
+        return
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
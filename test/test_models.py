@@ -0,0 +1,305 @@
+"""
+Pruebas de los modelos ajustados y su predicción por lotes.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ModelsApp
+import OperationsApp
+import Queries
+
+
+def _datos():
+    xs = np.linspace(0.5, 5.0, 40)
+    ys = 1.5 * np.exp(0.4 * xs) + np.sin(7 * xs) * 0.05
+    return xs, ys
+
+
+def test_predict_coincide_con_ajuste():
+    """Prueba que predict reproduce y_pred de cada familia."""
+    print("Testing ModelsApp predict...")
+    xs, ys = _datos()
+    resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+    modelos = ModelsApp.modelos_desde_resultados(resultados)
+    assert set(modelos) == set(ModelsApp.FAMILIAS)
+    for familia, modelo in modelos.items():
+        assert np.allclose(modelo.predict(xs), resultados[familia]["y_pred"]), familia
+        assert np.isclose(modelo.metricas["rmse"], resultados[familia]["rmse"])
+
+    # Bloques pequeños, varios hilos, out= y formas arbitrarias
+    grande = np.linspace(0.1, 10.0, 10_001).reshape(73, 137)
+    for modelo in modelos.values():
+        esperado = modelo.predict(grande)
+        assert esperado.shape == grande.shape
+        out = np.empty_like(grande)
+        obtenido = modelo.predict(grande, out=out, tamano_bloque=1000, hilos=4)
+        assert obtenido is out
+        assert np.allclose(obtenido, esperado)
+    try:
+        modelos["Lineal"].predict(grande, out=np.empty(5))
+        assert False, "Expected ValueError for a wrong out buffer"
+    except ValueError:
+        pass
+
+    # Fuera del dominio se obtiene nan
+    assert np.isnan(modelos["Logaritmica"].predict([-1.0, 0.0])).all()
+    assert np.isnan(modelos["Potencial"].predict([-1.0])).all()
+    print("✓ predict tests passed")
+
+
+def test_formulas_y_serializacion():
+    """Prueba fórmulas, a_dict y la reconstrucción de modelos."""
+    print("\nTesting formulas and serialization...")
+    modelo = ModelsApp.ModeloPolinomial2(a=1.0, b=-2.0, c=0.5)
+    assert modelo.formula(decimales=2) == "y = 1.00 + -2.00x + 0.50x²"
+    assert modelo.formula() == "y = 1.000000 + -2.000000x + 0.500000x²"
+    assert np.allclose(modelo.predict([0.0, 2.0]), [1.0, -1.0])
+
+    copia = ModelsApp.modelo_desde_dict(modelo.a_dict())
+    assert isinstance(copia, ModelsApp.ModeloPolinomial2)
+    assert copia.coeficientes == modelo.coeficientes
+    for malo in ({"familia": "Cubica", "coeficientes": {}}, {"familia": "Lineal"}):
+        try:
+            ModelsApp.modelo_desde_dict({"coeficientes": {"a": 1.0}, **malo})
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    print("✓ formulas and serialization tests passed")
+
+
+def test_modelos_en_bd():
+    """Prueba guardar, cargar e invalidar modelos ajustados en la base."""
+    print("\nTesting fitted models in the database...")
+    original = Queries.DB_PATH
+    try:
+        Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+        xs, ys = _datos()
+        model_id = Queries.insert_model("ajustado", xs, ys)
+        assert Queries.get_fitted_models(model_id) == {}
+        assert ModelsApp.cargar_modelos_ajustados(model_id, False) == {}
+
+        # La primera carga ajusta y guarda; la siguiente lee la tabla
+        modelos = ModelsApp.cargar_modelos_ajustados(model_id)
+        guardados = Queries.get_fitted_models(model_id)
+        assert set(guardados) == set(modelos) == set(ModelsApp.FAMILIAS)
+        leidos = ModelsApp.cargar_modelos_ajustados(model_id, False)
+        for familia, modelo in modelos.items():
+            assert leidos[familia].coeficientes == modelo.coeficientes
+            assert leidos[familia].metricas == modelo.metricas
+        esperado = OperationsApp.calcular_todos_modelos(xs, ys)["Exponencial"]
+        assert np.allclose(leidos["Exponencial"].predict(xs), esperado["y_pred"])
+
+        # Cambiar los datos invalida los modelos guardados
+        Queries.update_model_xy(model_id, xs, -ys)
+        assert Queries.get_fitted_models(model_id) == {}
+        assert "Exponencial" not in ModelsApp.cargar_modelos_ajustados(model_id)
+        Queries.delete_model(model_id)
+        assert Queries.get_fitted_models(model_id) == {}
+        assert ModelsApp.cargar_modelos_ajustados(model_id) == {}
+    finally:
+        Queries.DB_PATH = original
+    print("✓ fitted models in the database tests passed")
+
+
+def _comparar(esperados, obtenidos, familias=None, rtol=1e-6):
+    """Compara coeficientes y métricas de las familias (sin y_pred)."""
+    for clave in familias or esperados:
+        if esperados[clave] is None:
+            assert obtenidos[clave] is None, clave
+            continue
+        for k, v in esperados[clave].items():
+            if k != "y_pred":
+                assert np.isclose(obtenidos[clave][k], v, rtol=rtol), (clave, k)
+
+
+def test_registro_de_familias():
+    """Prueba que una familia registrada se ajusta sin cambiar el motor."""
+    print("\nTesting the model family registry...")
+    ModelsApp.TRANSFORMACIONES["ix"] = lambda c: 1.0 / c["x"]
+
+    @ModelsApp.registrar_familia
+    class ModeloReciproco(ModelsApp.ModeloAjustado):
+        """y = a + b / x"""
+
+        FAMILIA = "Reciproca"
+        COEFICIENTES = ("a", "b")
+        ETIQUETA = "Recíproca"
+        POSITIVOS = ("x",)
+        BASE = ("1", "ix")
+
+        def _evaluar(self, x, out):
+            np.divide(self.b, x, out=out)
+            out += self.a
+
+        def formula(self, decimales=6):
+            return f"y = {self.a:.{decimales}f} + {self.b:.{decimales}f}/x"
+
+    try:
+        xs = np.linspace(0.5, 5.0, 50)
+        ys = 2.0 + 3.0 / xs
+        columnas, aplicables = OperationsApp.calcular_columnas(xs, ys)
+        assert set(columnas) == {"x", "y", "x2", "lx", "ly", "ix"}
+        assert ModeloReciproco in aplicables
+
+        resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+        assert list(resultados) == list(ModelsApp.FAMILIAS)
+        r = resultados["Reciproca"]
+        assert np.isclose(r["a"], 2.0) and np.isclose(r["b"], 3.0)
+        assert np.allclose(r["y_pred"], ys) and np.isclose(r["r2"], 1.0)
+
+        negativos = OperationsApp.calcular_todos_modelos(-xs, ys)
+        assert negativos["Reciproca"] is None
+        assert ModeloReciproco.advertencia() == (
+            "Recíproca (todos los x deben ser > 0)"
+        )
+        # Los estadísticos suficientes incluyen las sumas de 1/x
+        stats = OperationsApp.calcular_estadisticos_suficientes(xs, ys)
+        rapidos = OperationsApp.calcular_modelos_desde_estadisticos(stats)
+        _comparar(resultados, rapidos, ("Reciproca",))
+        # Estadísticos de antes de registrar la familia: faltan sus sumas
+        anteriores = {k: v for k, v in stats.items() if "ix" not in k}
+        try:
+            OperationsApp.calcular_modelos_desde_estadisticos(anteriores)
+            assert False, "Expected ValueError for missing sums"
+        except ValueError as e:
+            assert "Reciproca" in str(e)
+
+        # Sin expresión SQL de 1/x, la base de datos ajusta sobre los datos
+        assert OperationsApp.especificacion_sql() is None
+        original = Queries.DB_PATH
+        try:
+            Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+            model_id = Queries.insert_model("reciproca", xs, ys, store_points=True)
+            _comparar(resultados, OperationsApp.calcular_modelos_en_bd(model_id))
+            todos = OperationsApp.calcular_todos_modelos_en_bd()
+            _comparar(resultados, todos[model_id])
+        finally:
+            Queries.DB_PATH = original
+    finally:
+        ModelsApp.FAMILIAS.pop("Reciproca", None)
+        ModelsApp.TRANSFORMACIONES.pop("ix", None)
+
+    try:
+        ModelsApp.registrar_familia(
+            type("ModeloInvalido", (ModeloReciproco,), {"FAMILIA": "Invalida"})
+        )
+        assert False, "Expected ValueError for an unknown column"
+    except ValueError:
+        pass
+    assert "Invalida" not in ModelsApp.FAMILIAS
+
+    # Sin _evaluar() ni formula() la familia no se registra ni se instancia
+    incompleta = type(
+        "ModeloIncompleto",
+        (ModelsApp.ModeloAjustado,),
+        {"FAMILIA": "Incompleta", "COEFICIENTES": ("a",), "BASE": ("1",)},
+    )
+    try:
+        ModelsApp.registrar_familia(incompleta)
+        assert False, "Expected ValueError for a family without formula()"
+    except ValueError as e:
+        assert "formula" in str(e) and "_evaluar" in str(e)
+    assert "Incompleta" not in ModelsApp.FAMILIAS
+    try:
+        incompleta(a=1.0)
+        assert False, "Expected TypeError for an abstract family"
+    except TypeError:
+        pass
+    print("✓ model family registry tests passed")
+
+
+def test_familia_registrada_sin_recorrer_datos():
+    """
+    Prueba que una familia con columnas nuevas en BASE se ajusta igual desde
+    los estadísticos, en float32, de forma incremental y dentro de SQLite.
+    """
+    print("\nTesting a registered family from sufficient statistics...")
+
+    @ModelsApp.registrar_familia
+    class ModeloLogLineal(ModelsApp.ModeloAjustado):
+        """y = a + b·x + c·ln(x)"""
+
+        FAMILIA = "LogLineal"
+        COEFICIENTES = ("a", "b", "c")
+        POSITIVOS = ("x",)
+        BASE = ("1", "x", "lx")
+
+        def _evaluar(self, x, out):
+            np.log(x, out=out)
+            out *= self.c
+            out += self.a + self.b * x
+
+        def formula(self, decimales=6):
+            return (
+                f"y = {self.a:.{decimales}f} + {self.b:.{decimales}f}x"
+                f" + {self.c:.{decimales}f}ln(x)"
+            )
+
+    original = Queries.DB_PATH
+    try:
+        rng = np.random.default_rng(3)
+        xs = np.linspace(0.5, 8.0, 400)
+        ys = 1.0 + 0.5 * xs + 2.0 * np.log(xs) + rng.normal(0, 0.1, xs.size)
+        esperados = OperationsApp.calcular_todos_modelos(xs, ys, refinar=False)
+        r = esperados["LogLineal"]
+        assert np.isclose(r["c"], 2.0, atol=0.1) and r["r2"] > 0.99
+
+        stats = OperationsApp.calcular_estadisticos_suficientes(xs, ys)
+        assert "s_lx_x" in stats
+        _comparar(
+            esperados,
+            OperationsApp.calcular_modelos_desde_estadisticos(
+                stats, OperationsApp._sse_sobre_datos(xs, ys)
+            ),
+        )
+        mitad = OperationsApp.calcular_estadisticos_suficientes(xs[:150], ys[:150])
+        _, incremental = OperationsApp.calcular_modelos_incremental(
+            mitad, xs, ys, 150, refinar=False
+        )
+        _comparar(esperados, incremental)
+        float32 = OperationsApp.calcular_todos_modelos_float32(
+            xs, ys, tamano_bloque=64, refinar=False
+        )
+        _comparar(esperados, float32, ("LogLineal",), rtol=1e-4)
+
+        # Dentro de SQLite, con las sumas generadas desde el registro
+        assert "s_lx_x" in OperationsApp.especificacion_sql()["sumas"]
+        Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+        model_id = Queries.insert_model("loglineal", xs, ys, store_points=True)
+        negativo = Queries.insert_model("negativo", -xs, ys, store_points=True)
+        _comparar(
+            esperados, OperationsApp.calcular_modelos_en_bd(model_id, refinar=False)
+        )
+        todos = OperationsApp.calcular_todos_modelos_en_bd(refinar=False)
+        _comparar(esperados, todos[model_id])
+        assert todos[negativo]["LogLineal"] is None
+    finally:
+        Queries.DB_PATH = original
+        ModelsApp.FAMILIAS.pop("LogLineal", None)
+    print("✓ registered family from sufficient statistics tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running ModelsApp tests...")
+    print("=" * 60)
+
+    test_predict_coincide_con_ajuste()
+    test_formulas_y_serializacion()
+    test_modelos_en_bd()
+    test_registro_de_familias()
+    test_familia_registrada_sin_recorrer_datos()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
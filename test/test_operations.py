@@ -7,6 +7,7 @@ import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ModelsApp
 import OperationsApp
 
 
@@ -33,6 +34,32 @@ def test_parse_numbers():
     print("✓ parse_numbers tests passed")
 
 
+def test_parse_array():
+    """Prueba el parseo directo a array y el ajuste sobre arrays compartidos."""
+    print("\nTesting parse_array...")
+
+    for texto in ("1, 2, 3, 4", "1 2 3 4", "1\n2\n3\n4", "1, 2\n3 4", "1;2 ,3\t4"):
+        result = OperationsApp.parse_array(texto)
+        assert result.dtype == np.float64
+        assert result.tolist() == OperationsApp.parse_numbers(texto)
+    assert OperationsApp.parse_array("  \n").size == 0
+    try:
+        OperationsApp.parse_array("1, 2, abc")
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        assert "abc" in str(e)
+
+    # Los arrays de la sesión son de solo lectura y se ajustan sin copiarlos
+    xs = OperationsApp.parse_array("1 2 3 4 5")
+    ys = OperationsApp.parse_array("2.7 7.4 20.1 54.6 148.4")
+    xs.setflags(write=False)
+    ys.setflags(write=False)
+    resultados = OperationsApp.calcular_todos_modelos(xs, ys)
+    assert resultados["Exponencial"] is not None
+    assert xs.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    print("✓ parse_array tests passed")
+
+
 def test_regresion_lineal():
     """Prueba la función de regresión lineal."""
     print("\nTesting calcular_regresion_lineal...")
@@ -213,6 +240,337 @@ def test_calcular_todos_modelos():
     print("✓ calcular_todos_modelos tests passed")
 
 
+def test_modelos_desde_estadisticos():
+    """Prueba que el ajuste desde estadísticos suficientes coincide con los datos."""
+    print("\nTesting calcular_modelos_desde_estadisticos...")
+
+    rng = np.random.default_rng(1)
+    xs = np.linspace(1, 10, 200)
+    ys = 3.0 * np.exp(0.2 * xs) + rng.normal(0, 0.5, xs.size)
+
+    # Sin refinamiento, Exponencial y Potencial son los ajustes linealizados
+    completos = OperationsApp.calcular_todos_modelos(xs, ys, refinar=False)
+    stats = OperationsApp.calcular_estadisticos_suficientes(xs, ys)
+
+    def sse_exacto(clave, coefs):
+        if clave == "Exponencial":
+            pred = coefs["a"] * np.exp(coefs["b"] * xs)
+        else:
+            pred = coefs["a"] * np.power(xs, coefs["b"])
+        return float(np.sum((ys - pred) ** 2))
+
+    rapidos = OperationsApp.calcular_modelos_desde_estadisticos(stats, sse_exacto)
+    for clave, r in completos.items():
+        for k, v in r.items():
+            if k == "y_pred":
+                continue
+            assert np.isclose(rapidos[clave][k], v, rtol=1e-6), (
+                f"{clave}.{k}: expected {v}, got {rapidos[clave][k]}"
+            )
+
+    # Combinar bloques equivale a calcular sobre la unión
+    combinados = OperationsApp.combinar_estadisticos(
+        OperationsApp.calcular_estadisticos_suficientes(xs[:50], ys[:50]),
+        OperationsApp.calcular_estadisticos_suficientes(xs[50:], ys[50:]),
+    )
+    for k, v in stats.items():
+        assert np.isclose(combinados[k], v), f"Combined {k} differs"
+
+    # Valores grandes de y: las sumas desplazadas conservan la precisión
+    xs_off = np.linspace(0.1, 10, 2000)
+    ys_off = 1e6 + 3 + 0.5 * xs_off + rng.normal(0, 0.1, xs_off.size)
+    completos_off = OperationsApp.calcular_todos_modelos(xs_off, ys_off)
+    rapidos_off = OperationsApp.calcular_modelos_desde_estadisticos(
+        OperationsApp.calcular_estadisticos_suficientes(xs_off, ys_off)
+    )
+    for clave in ("Lineal", "Logaritmica", "Polinomial_2"):
+        for k in ("mse", "r2"):
+            assert np.isclose(
+                rapidos_off[clave][k], completos_off[clave][k], rtol=1e-6
+            ), f"{clave}.{k} with offset y"
+
+    # Estadísticos guardados antes de desplazar las columnas (sumas crudas)
+    x2 = xs * xs
+    anteriores = {
+        "n": xs.size, "sx": xs.sum(), "sy": ys.sum(), "sxx": x2.sum(),
+        "sxy": xs @ ys, "syy": ys @ ys, "sx3": x2 @ xs, "sx4": x2 @ x2,
+        "sx2y": x2 @ ys,
+    }
+    legado = OperationsApp.calcular_modelos_desde_estadisticos(anteriores)
+    for clave in ("Lineal", "Polinomial_2"):
+        for k, v in legado[clave].items():
+            assert np.isclose(v, completos[clave][k], rtol=1e-6), f"{clave}.{k}"
+    assert legado["Logaritmica"] is None
+
+    # Sin dominio válido las claves en ln desaparecen
+    stats_neg = OperationsApp.calcular_estadisticos_suficientes([-1, 2, 3], [1, 2, 3])
+    assert "slx" not in stats_neg and "sly" in stats_neg
+    rapidos_neg = OperationsApp.calcular_modelos_desde_estadisticos(stats_neg)
+    assert rapidos_neg["Logaritmica"] is None and rapidos_neg["Potencial"] is None
+    assert rapidos_neg["Exponencial"]["mse"] is None
+    print("✓ calcular_modelos_desde_estadisticos tests passed")
+
+
+def test_calcular_resumen():
+    """Prueba el resumen compacto con muestra de reservorio."""
+    print("\nTesting calcular_resumen...")
+
+    xs = np.arange(1, 25001, dtype=float)
+    ys = 2.0 + 0.5 * xs
+    resumen = OperationsApp.calcular_resumen(xs, ys, tamano_muestra=1000)
+
+    assert resumen["n"] == 25000
+    assert resumen["x"]["min"] == 1.0 and resumen["x"]["max"] == 25000.0
+    assert len(resumen["muestra"]["x"]) == 1000
+    # La muestra conserva los pares (x, y)
+    mx = np.array(resumen["muestra"]["x"])
+    my = np.array(resumen["muestra"]["y"])
+    assert np.allclose(my, 2.0 + 0.5 * mx)
+    assert np.unique(mx).size == 1000, "Reservoir sample has duplicates"
+
+    # Continuar el reservorio equivale a muestrear sin repetir datos
+    parcial = OperationsApp.muestra_reservorio(xs[:5000], ys[:5000], 1000)
+    continuada = OperationsApp.muestra_reservorio(
+        xs[5000:], ys[5000:], 1000, muestra=parcial, n_visto=5000
+    )
+    assert continuada[0].size == 1000 and np.unique(continuada[0]).size == 1000
+
+    rapidos = OperationsApp.calcular_modelos_desde_resumen(resumen)
+    assert abs(rapidos["Lineal"]["intercept"] - 2.0) < 1e-6
+    assert abs(rapidos["Lineal"]["coef"] - 0.5) < 1e-9
+    assert rapidos["Exponencial"]["rmse"] is not None
+    print("✓ calcular_resumen tests passed")
+
+
+def test_precision_float32():
+    """Prueba el modo float32 contra el camino float64 y sus cotas de error."""
+    print("\nTesting float32 precision mode...")
+
+    rng = np.random.default_rng(1)
+    xs = rng.uniform(0.5, 10.0, 50_000)
+    ys = 2.0 * np.exp(0.2 * xs) * (1 + 0.05 * rng.standard_normal(xs.size))
+    esperado = OperationsApp.calcular_todos_modelos(xs, ys)
+    # Bloques pequeños para ejercitar la acumulación entre bloques
+    obtenido = OperationsApp.calcular_todos_modelos_float32(xs, ys, tamano_bloque=999)
+    assert obtenido.keys() == esperado.keys()
+    for clave, r in esperado.items():
+        assert obtenido[clave]["y_pred"].dtype == np.float32
+        escala = np.abs(r["y_pred"]).max()
+        assert np.allclose(obtenido[clave]["y_pred"], r["y_pred"], atol=1e-6 * escala)
+        for k, v in r.items():
+            if k != "y_pred":
+                assert np.isclose(obtenido[clave][k], v, rtol=1e-6, atol=1e-9), k
+
+    por_parametro = OperationsApp.calcular_todos_modelos(xs, ys, precision="float32")
+    assert np.isclose(por_parametro["Lineal"]["coef"], esperado["Lineal"]["coef"])
+    try:
+        OperationsApp.calcular_todos_modelos(xs, ys, precision="float16")
+        assert False, "Expected ValueError for unknown precision"
+    except ValueError:
+        pass
+
+    # Los dominios se respetan igual que en float64
+    r = OperationsApp.calcular_todos_modelos([-1, 1, 2], [1, -2, 3], "float32")
+    assert r["Exponencial"] is None and r["Potencial"] is None
+
+    # fsum entre bloques: el resultado no depende de cómo se dividen los datos
+    partes = [
+        OperationsApp.calcular_estadisticos_suficientes(xs[i:j], ys[i:j])
+        for i, j in zip(range(0, xs.size, 1000), range(1000, xs.size + 1000, 1000))
+    ]
+    total = OperationsApp.sumar_estadisticos(partes)
+    directo = OperationsApp.calcular_estadisticos_suficientes(xs, ys)
+    assert total.keys() == directo.keys() and total["n"] == xs.size
+    for k in directo:
+        assert np.isclose(total[k], directo[k], rtol=1e-12)
+    print("✓ float32 precision mode tests passed")
+
+
+def test_refinamiento_no_lineal():
+    """Prueba el refinamiento Levenberg-Marquardt de Exponencial y Potencial."""
+    print("\nTesting nonlinear least-squares refinement...")
+
+    rng = np.random.default_rng(5)
+    xs = rng.uniform(0.5, 8.0, 5000)
+    ys = 2.0 * np.exp(0.3 * xs) + 0.5 + rng.normal(0, 0.3, xs.size)
+    X = xs.reshape(-1, 1)
+    for funcion, clave in (
+        (OperationsApp.calcular_regresion_exponencial, "Exponencial"),
+        (OperationsApp.calcular_regresion_potencial, "Potencial"),
+    ):
+        lineal = funcion(X, ys, refinar=False)
+        refinado = funcion(X, ys)
+        assert refinado["mse"] < lineal["mse"], clave
+        # En el mínimo el gradiente J'r es nulo
+        sse, _, _, _, sgr, sugr = OperationsApp._evaluador_no_lineal(
+            clave, xs, ys
+        )(refinado["a"], refinado["b"])
+        assert np.isclose(sse / xs.size, refinado["mse"])
+        escala = np.sqrt(sse * np.dot(refinado["y_pred"], refinado["y_pred"]))
+        assert abs(sgr) < 1e-6 * escala and abs(sugr) < 1e-6 * escala, clave
+
+        # Sin iteraciones o sin tiempo se conserva el punto de partida
+        evaluar = OperationsApp._evaluador_no_lineal(clave, xs, ys)
+        for limites in ({"max_iter": 0}, {"tiempo_max": 0}):
+            a, b, sse = OperationsApp.refinar_no_lineal(
+                evaluar, lineal["a"], lineal["b"], **limites
+            )
+            assert (a, b) == (lineal["a"], lineal["b"])
+            assert np.isclose(sse / xs.size, lineal["mse"])
+
+    # El lote da lo mismo que cada ajuste por separado
+    iniciales = {"exp": (1.0, 0.2), "pot": (1.0, 1.0)}
+    evaluadores = {
+        "exp": OperationsApp._evaluador_no_lineal("Exponencial", xs, ys),
+        "pot": OperationsApp._evaluador_no_lineal("Potencial", xs, ys),
+    }
+    lote = OperationsApp.refinar_no_lineal_lote(
+        iniciales, lambda p: {k: evaluadores[k](*ab) for k, ab in p.items()}
+    )
+    for k, (a, b) in iniciales.items():
+        assert lote[k] == OperationsApp.refinar_no_lineal(evaluadores[k], a, b)
+    print("✓ nonlinear least-squares refinement tests passed")
+
+
+def test_familias_en_paralelo():
+    """Prueba que ajustar las familias en varios hilos da lo mismo."""
+    print("\nTesting parallel family fitting...")
+
+    rng = np.random.default_rng(9)
+    xs = rng.uniform(0.5, 10.0, OperationsApp.MIN_PUNTOS_PARALELO + 10)
+    ys = 1.5 * xs**1.2 + rng.normal(0, 0.1, xs.size) + 1.0
+    secuencial = OperationsApp.calcular_todos_modelos(xs, ys, hilos=1)
+    paralelo = OperationsApp.calcular_todos_modelos(xs, ys, hilos=3)
+    assert list(paralelo) == list(secuencial)
+    for clave, r in secuencial.items():
+        for k, v in r.items():
+            assert np.allclose(paralelo[clave][k], v, rtol=1e-12), (clave, k)
+    print("✓ parallel family fitting tests passed")
+
+
+def test_parse_matrix():
+    """Prueba el parseo de matrices de X con varias variables."""
+    print("\nTesting parse_matrix...")
+    X = OperationsApp.parse_matrix("1, 2, 3\n\n4;5\t6\n  7 8 9  \n")
+    assert X.shape == (3, 3) and X[1].tolist() == [4.0, 5.0, 6.0]
+    assert OperationsApp.parse_matrix("  \n").shape == (0, 0)
+    for malo in ("1 2\n3", "1 2\n3 abc"):
+        try:
+            OperationsApp.parse_matrix(malo)
+            assert False, "Expected ValueError"
+        except ValueError as e:
+            print(f"  ✓ {e}")
+    print("✓ parse_matrix tests passed")
+
+
+def test_regresion_multiple():
+    """Prueba la regresión múltiple por bloques con Cholesky y QR."""
+    print("\nTesting multiple regression...")
+    rng = np.random.default_rng(4)
+    n, p = 5000, 12
+    # Variables de escalas muy distintas y lejos del origen
+    X = rng.normal(size=(n, p)) * np.logspace(-2, 3, p) + 500.0
+    beta = rng.normal(size=p)
+    y = 7.0 + X @ beta + rng.normal(0, 0.5, n)
+    diseno = np.column_stack([np.ones(n), X])
+    esperado = np.linalg.lstsq(diseno, y, rcond=None)[0]
+    sin_constante = np.linalg.lstsq(X, y, rcond=None)[0]
+
+    for metodo in OperationsApp.METODOS_MULTIPLE:
+        for hilos in (1, 3):
+            r = OperationsApp.calcular_regresion_multiple(
+                X, y, metodo=metodo, tamano_bloque=700, hilos=hilos
+            )
+            assert np.isclose(r["intercept"], esperado[0], rtol=1e-8), metodo
+            assert np.allclose(r["coef"], esperado[1:], rtol=1e-8), metodo
+            residuo = y - r["y_pred"]
+            assert np.isclose(r["mse"], np.mean(residuo**2), rtol=1e-8)
+            assert np.isclose(r["r2"], 1 - residuo @ residuo / np.var(y) / n)
+            assert r["n"] == n
+
+            r = OperationsApp.calcular_regresion_multiple(
+                X, y, intercepto=False, metodo=metodo, tamano_bloque=999
+            )
+            assert r["intercept"] == 0.0
+            assert np.allclose(r["coef"], sin_constante, rtol=1e-6), metodo
+
+    # Con una sola variable coincide con la regresión lineal simple
+    xs = np.linspace(1, 10, 50)
+    ys = 2.0 + 3.0 * xs + np.sin(xs)
+    simple = OperationsApp.calcular_regresion_lineal(xs.reshape(-1, 1), ys)
+    multiple = OperationsApp.calcular_regresion_multiple(xs, ys, tamano_bloque=7)
+    assert np.isclose(multiple["intercept"], simple["intercept"])
+    assert np.isclose(multiple["coef"][0], simple["coef"])
+    assert np.isclose(multiple["rmse"], simple["rmse"])
+
+    # Una variable constante o repetida no rompe la resolución
+    colineal = np.column_stack([xs, 2 * xs, np.ones(xs.size)])
+    for metodo in OperationsApp.METODOS_MULTIPLE:
+        r = OperationsApp.calcular_regresion_multiple(colineal, ys, metodo=metodo)
+        assert np.isclose(r["rmse"], simple["rmse"]), metodo
+
+    for args, kwargs in (
+        ((X, y[:-1]), {}),
+        ((X, y), {"metodo": "svd"}),
+        ((np.empty((0, 2)), []), {}),
+    ):
+        try:
+            OperationsApp.calcular_regresion_multiple(*args, **kwargs)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    print("✓ multiple regression tests passed")
+
+
+def test_modelos_ventana():
+    """Prueba los ajustes por ventana deslizante contra ajustes directos."""
+    print("\nTesting rolling-window fits...")
+    rng = np.random.default_rng(6)
+    n, ventana = 3000, 250
+    xs = np.cumsum(rng.uniform(0.001, 0.02, n)) + 0.5
+    ys = 1.5 * np.exp(0.3 * xs) + np.sin(5 * xs) + rng.normal(0, 0.05, n)
+    # Algunos y negativos dejan ventanas fuera del dominio de ln y
+    ys[1000:1010] = -1.0
+
+    for paso in (1, 37):
+        resultados = OperationsApp.calcular_modelos_ventana(xs, ys, ventana, paso)
+        inicios = np.arange(0, n - ventana + 1, paso)
+        for inicio in inicios[:: max(len(inicios) // 12, 1)]:
+            tramo = slice(inicio, inicio + ventana)
+            directo = OperationsApp.calcular_todos_modelos(
+                xs[tramo], ys[tramo], refinar=False
+            )
+            i = inicio // paso
+            for clave, r in resultados.items():
+                assert r["r2"].shape == inicios.shape
+                if directo[clave] is None:
+                    assert np.isnan(r["r2"][i]), (clave, inicio)
+                    continue
+                for coef, valor in directo[clave].items():
+                    if coef in r and coef != "r2":
+                        assert np.isclose(r[coef][i], valor, rtol=1e-8), (clave, coef)
+                if ModelsApp.FAMILIAS[clave].OBJETIVO == "y":
+                    assert np.isclose(r["r2"][i], directo[clave]["r2"], rtol=1e-8)
+
+    # Ventanas con x constante dan pendiente 0, como el ajuste directo
+    constante = OperationsApp.calcular_modelos_ventana(
+        np.ones(10), np.arange(10.0), 4, familias=["Lineal"]
+    )["Lineal"]
+    assert np.allclose(constante["coef"], 0.0)
+    assert np.allclose(constante["intercept"], np.arange(7) + 1.5)
+    assert OperationsApp.calcular_modelos_ventana(
+        -xs, ys, ventana, familias=["Potencial"]
+    ) == {"Potencial": None}
+
+    for args in ((xs, ys[:-1], 10), (xs, ys, 1), (xs, ys, n + 1), (xs, ys, 10, 0)):
+        try:
+            OperationsApp.calcular_modelos_ventana(*args)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+    print("✓ rolling-window fit tests passed")
+
+
 def run_all_tests():
     """Ejecuta todas las pruebas."""
     print("=" * 60)
@@ -220,12 +578,21 @@ def run_all_tests():
     print("=" * 60)
     
     test_parse_numbers()
+    test_parse_array()
     test_regresion_lineal()
     test_regresion_exponencial()
     test_regresion_potencial()
     test_regresion_logaritmica()
     test_regresion_polinomial_grado2()
     test_calcular_todos_modelos()
+    test_modelos_desde_estadisticos()
+    test_calcular_resumen()
+    test_precision_float32()
+    test_refinamiento_no_lineal()
+    test_familias_en_paralelo()
+    test_parse_matrix()
+    test_regresion_multiple()
+    test_modelos_ventana()
     
     print("\n" + "=" * 60)
     print("All tests passed! ✓")
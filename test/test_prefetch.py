@@ -0,0 +1,134 @@
+"""
+Pruebas de la precarga de modelos guardados (PrefetchApp).
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import OperationsApp
+import PrefetchApp
+import Queries
+
+
+def _modelos(cantidad=6, n=500):
+    """Guarda modelos sintéticos en una base temporal; retorna sus ids y datos."""
+    Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+    xs = np.linspace(0.5, 5.0, n)
+    datos = [(xs, 1.5 * np.exp(0.2 * i * xs) + i) for i in range(cantidad)]
+    ids = [
+        Queries.insert_model(f"m{i}", x, y, store_points=i % 2 == 1)
+        for i, (x, y) in enumerate(datos)
+    ]
+    return ids, datos
+
+
+def test_recorrido_con_precarga():
+    """Prueba que la precarga entrega los mismos datos y ajustes en orden."""
+    print("Testing prefetched traversal...")
+    original = Queries.DB_PATH
+    try:
+        ids, datos = _modelos()
+        with PrefetchApp.Precargador(ids + [99999], profundidad=2) as precarga:
+            modelos = list(precarga)
+            assert len(precarga) == len(ids) + 1
+        assert modelos[-1] is None
+        for modelo, model_id, (xs, ys) in zip(modelos, ids, datos):
+            assert modelo["id"] == model_id
+            assert np.array_equal(modelo["x"], xs) and np.array_equal(modelo["y"], ys)
+            esperado = OperationsApp.calcular_todos_modelos(xs, ys)
+            for familia, r in esperado.items():
+                assert np.isclose(modelo["resultados"][familia]["rmse"], r["rmse"])
+
+        # Sin ajuste especulativo solo se cargan los datos
+        with PrefetchApp.Precargador(ids, ajustar=False) as precarga:
+            assert precarga.obtener(3)["resultados"] is None
+            assert precarga.anterior()["id"] == ids[2]
+            try:
+                precarga.obtener(len(ids))
+                assert False, "Expected IndexError"
+            except IndexError:
+                pass
+    finally:
+        Queries.DB_PATH = original
+    print("✓ prefetched traversal tests passed")
+
+
+def test_aciertos_y_tope_de_memoria():
+    """Prueba los aciertos de la precarga, la profundidad y el tope de memoria."""
+    print("\nTesting prefetch hits, depth and memory cap...")
+    original = Queries.DB_PATH
+    try:
+        ids, _ = _modelos()
+        with PrefetchApp.Precargador(ids, profundidad=2) as precarga:
+            precarga.obtener(0)
+            precarga.esperar_precarga()
+            assert precarga.estadisticas()["precargados"] == 3
+            precarga.siguiente()
+            precarga.siguiente()
+            estadisticas = precarga.estadisticas()
+            assert estadisticas["aciertos"] == 2 and estadisticas["fallos"] == 1
+
+        with PrefetchApp.Precargador(ids, profundidad=0) as precarga:
+            list(precarga)
+            assert precarga.estadisticas()["fallos"] == len(ids)
+
+        # Con un tope menor que un modelo solo queda el actual en memoria
+        with PrefetchApp.Precargador(ids, profundidad=4, max_bytes=1000) as precarga:
+            actual = precarga.obtener(0)
+            precarga.esperar_precarga()
+            estadisticas = precarga.estadisticas()
+            assert estadisticas["precargados"] == 1
+            assert estadisticas["bytes"] == actual["bytes"] > 1000
+
+        try:
+            PrefetchApp.Precargador(ids, profundidad=-1)
+            assert False, "Expected ValueError for a negative depth"
+        except ValueError:
+            pass
+    finally:
+        Queries.DB_PATH = original
+    print("✓ prefetch hits, depth and memory cap tests passed")
+
+
+def test_errores_de_carga():
+    """Prueba que un modelo con datos inválidos no detiene el recorrido."""
+    print("\nTesting prefetch errors...")
+    original = Queries.DB_PATH
+    try:
+        ids, _ = _modelos(cantidad=2)
+        malo = Queries.insert_model("malo", "1, 2, 3", "4, 5")
+        with PrefetchApp.Precargador([ids[0], malo, ids[1]]) as precarga:
+            precarga.obtener(0)
+            precarga.esperar_precarga()
+            try:
+                precarga.siguiente()
+                assert False, "Expected ValueError for mismatched lengths"
+            except ValueError:
+                pass
+            assert precarga.siguiente()["id"] == ids[1]
+    finally:
+        Queries.DB_PATH = original
+    print("✓ prefetch error tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running PrefetchApp tests...")
+    print("=" * 60)
+
+    test_recorrido_con_precarga()
+    test_aciertos_y_tope_de_memoria()
+    test_errores_de_carga()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
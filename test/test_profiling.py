@@ -0,0 +1,120 @@
+"""
+Pruebas de la instrumentación de tiempos por etapa.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ModelsApp
+import OperationsApp
+import Profiling
+import Queries
+
+
+def test_activar_desactivar():
+    """Prueba que solo se registran eventos con el perfilado activo."""
+    print("Testing Profiling enable/disable...")
+    estado = Profiling.is_enabled()
+    try:
+        Profiling.disable()
+        Profiling.reset()
+        OperationsApp.parse_numbers("1, 2, 3")
+        with Profiling.timer("bloque"):
+            pass
+        Profiling.count("contador")
+        assert Profiling.events() == [] and Profiling.counters() == {}
+
+        Profiling.enable()
+        assert OperationsApp.parse_numbers("1, 2, 3") == [1.0, 2.0, 3.0]
+        with Profiling.timer("bloque", "prueba"):
+            pass
+        Profiling.count("contador", 2)
+        Profiling.count("contador")
+        nombres = [e["name"] for e in Profiling.events()]
+        assert nombres == ["OperationsApp.parse_numbers", "bloque"]
+        assert Profiling.counters() == {"contador": 3}
+
+        # Las excepciones se propagan y el evento se registra igual
+        try:
+            OperationsApp.parse_numbers("1, a")
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+        resumen = Profiling.summary()
+        assert resumen["OperationsApp.parse_numbers"]["count"] == 2
+        assert resumen["bloque"]["category"] == "prueba"
+    finally:
+        Profiling.reset()
+        if not estado:
+            Profiling.disable()
+    print("✓ enable/disable tests passed")
+
+
+def test_etapas_y_exportacion():
+    """Prueba los eventos de ajuste y consultas y su exportación."""
+    print("\nTesting pipeline stages and exports...")
+    estado = Profiling.is_enabled()
+    original = Queries.DB_PATH
+    tmp = tempfile.mkdtemp()
+    try:
+        Queries.DB_PATH = os.path.join(tmp, "test.db")
+        Profiling.reset()
+        Profiling.enable()
+        OperationsApp.calcular_todos_modelos([1, 2, 3, 4], [2.0, 4.1, 5.9, 8.2])
+        model_id = Queries.insert_model("perf", "1,2,3", "4,5,6")
+        valores = [v for b in Queries.iter_model_values(model_id, "x", 2) for v in b]
+        assert valores == [1.0, 2.0, 3.0]
+
+        resumen = Profiling.summary()
+        for familia in ModelsApp.FAMILIAS:
+            nombre = f"OperationsApp.ajustar.{familia}"
+            assert (
+                resumen[nombre]["count"] == 1 and resumen[nombre]["category"] == "fit"
+            )
+        assert resumen["Queries.insert_model"]["category"] == "db"
+        # Un generador se registra como un solo evento al terminar
+        assert resumen["Queries.iter_model_values"]["count"] == 1
+        assert Profiling.counters()["Queries.payload_bytes_read"] == len("1,2,3")
+
+        ruta_json = os.path.join(tmp, "perf.json")
+        Profiling.export_json(ruta_json)
+        with open(ruta_json, encoding="utf-8") as f:
+            datos = json.load(f)
+        assert datos["summary"].keys() == resumen.keys()
+        assert len(datos["events"]) == len(Profiling.events())
+
+        ruta_traza = os.path.join(tmp, "trace.json")
+        Profiling.export_chrome_trace(ruta_traza)
+        with open(ruta_traza, encoding="utf-8") as f:
+            traza = json.load(f)["traceEvents"]
+        completos = [e for e in traza if e["ph"] == "X"]
+        assert len(completos) == len(Profiling.events())
+        assert all(e["dur"] >= 0 and "tid" in e for e in completos)
+        assert any(e["ph"] == "C" for e in traza)
+    finally:
+        Queries.DB_PATH = original
+        Profiling.reset()
+        if not estado:
+            Profiling.disable()
+    print("✓ pipeline stages and export tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running Profiling tests...")
+    print("=" * 60)
+
+    test_activar_desactivar()
+    test_etapas_y_exportacion()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
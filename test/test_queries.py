@@ -0,0 +1,546 @@
+"""
+Pruebas de Queries sobre una base de datos SQLite temporal.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import BinaryFormat
+import Compression
+import OperationsApp
+import Queries
+
+
+def _usar_db_temporal():
+    """Redirige Queries a una base de datos temporal vacía."""
+    tmp = tempfile.mkdtemp()
+    Queries.DB_PATH = os.path.join(tmp, "test.db")
+    return Queries.DB_PATH
+
+
+def test_crud_y_resumen():
+    """Prueba insertar, leer, actualizar y eliminar con resumen."""
+    print("Testing CRUD with summaries...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        xs = [1.0, 2.0, 3.0, 4.0]
+        ys = [2.0, 4.1, 5.9, 8.2]
+        resumen = OperationsApp.calcular_resumen(xs, ys)
+
+        model_id = Queries.insert_model("prueba", xs, ys, resumen)
+        assert Queries.search_models("prue") == [(model_id, "prueba")]
+        assert Queries.get_model_xy_by_id(model_id) == (
+            "1.0,2.0,3.0,4.0",
+            "2.0,4.1,5.9,8.2",
+        )
+
+        guardado = Queries.get_model_summary_by_id(model_id)
+        assert guardado["n"] == 4
+        assert guardado["estadisticos"] == resumen["estadisticos"]
+
+        # Actualizar sin resumen limpia el resumen anterior
+        assert Queries.update_model_xy(model_id, "1,2", "3,4")
+        assert Queries.get_model_summary_by_id(model_id) is None
+        nuevo = OperationsApp.calcular_resumen([1, 2], [3, 4])
+        assert Queries.update_model_summary(model_id, nuevo)
+        assert Queries.get_model_summary_by_id(model_id)["n"] == 2
+
+        assert Queries.delete_model(model_id)
+        assert Queries.get_model_xy_by_id(model_id) is None
+        assert Queries.get_model_summary_by_id(model_id) is None
+    finally:
+        Queries.DB_PATH = original
+    print("✓ CRUD with summaries tests passed")
+
+
+def test_migracion_esquema_antiguo():
+    """Prueba que una base de datos con el esquema original se migra."""
+    print("\nTesting schema migration...")
+    original = Queries.DB_PATH
+    try:
+        path = _usar_db_temporal()
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE regression_model (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "model_name VARCHAR(100) NOT NULL, x TEXT NOT NULL, y TEXT NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO regression_model (model_name, x, y) VALUES ('a', '1,2', '3,4')"
+        )
+        conn.execute(
+            "INSERT INTO regression_model (model_name, x, y) "
+            "VALUES ('Borrado', '1', '2')"
+        )
+        conn.execute("DELETE FROM regression_model WHERE id = 2")
+        conn.commit()
+        conn.close()
+
+        assert Queries.get_model_summary_by_id(1) is None
+        assert Queries.get_model_xy_by_id(1) == ("1,2", "3,4")
+        conn = Queries.get_connection()
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+        assert version == len(Queries._MIGRATIONS)
+
+        # El catálogo migrado tiene las columnas derivadas y no reutiliza ids
+        assert [m[:3] for m in Queries.list_models()] == [(1, "a", 2)]
+        assert Queries.insert_model("b", [1], [2]) == 3
+    finally:
+        Queries.DB_PATH = original
+    print("✓ schema migration tests passed")
+
+
+def test_lectura_por_bloques():
+    """Prueba la lectura por bloques del payload de un modelo."""
+    print("\nTesting iter_model_values...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        xs = [i * 0.25 for i in range(5000)]
+        model_id = Queries.insert_model("grande", xs, "1; 2\n3 , 4")
+
+        # Bloques pequeños obligan a partir números entre lecturas
+        leidos = [v for b in Queries.iter_model_values(model_id, "x", 7) for v in b]
+        assert leidos == xs
+        leidos = [v for b in Queries.iter_model_values(model_id, "y", 3) for v in b]
+        assert leidos == [1.0, 2.0, 3.0, 4.0]
+
+        tam_x, tam_y = Queries.get_model_payload_size(model_id)
+        assert tam_x == len(Queries.get_model_xy_by_id(model_id)[0])
+        assert tam_y == len("1; 2\n3 , 4")
+        assert Queries.get_model_payload_size(model_id + 1) is None
+        assert list(Queries.iter_model_values(model_id + 1, "x")) == []
+
+        try:
+            list(Queries.iter_model_values(model_id, "model_name"))
+            assert False, "Expected ValueError for unknown column"
+        except ValueError:
+            pass
+    finally:
+        Queries.DB_PATH = original
+    print("✓ iter_model_values tests passed")
+
+
+def test_tabla_de_puntos():
+    """Prueba el almacenamiento normalizado en regression_point."""
+    print("\nTesting points table storage...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        xs = [float(i) for i in range(1000)]
+        ys = [2.0 * v + 1.0 for v in xs]
+        model_id = Queries.insert_model("puntos", xs, ys, store_points=True)
+
+        assert Queries.get_model_point_count(model_id) == 1000
+        assert Queries.get_points_range(model_id, 10, 13) == [
+            (10, 10.0, 21.0),
+            (11, 11.0, 23.0),
+            (12, 12.0, 25.0),
+        ]
+        x_str, y_str = Queries.get_model_xy_by_id(model_id)
+        assert x_str.split(",")[:3] == ["0.0", "1.0", "2.0"]
+        leidos = [v for b in Queries.iter_model_values(model_id, "y", 80) for v in b]
+        assert leidos == ys
+
+        # Actualización por diferencias: cambiar, truncar y agregar puntos
+        nuevos_x = xs[:500] + [-1.0]
+        nuevos_y = ys[:500] + [-1.0]
+        nuevos_y[3] = 99.0
+        assert Queries.update_model_xy(model_id, nuevos_x, nuevos_y)
+        assert Queries.get_model_point_count(model_id) == 501
+        assert Queries.get_points_range(model_id, 3, 4) == [(3, 3.0, 99.0)]
+        assert Queries.get_points_range(model_id, 500, 600) == [(500, -1.0, -1.0)]
+
+        assert Queries.update_points(model_id, [(0, 5.0, 6.0)]) == 1
+        assert Queries.get_points_range(model_id, 0, 1) == [(0, 5.0, 6.0)]
+
+        assert Queries.delete_model(model_id)
+        assert Queries.get_model_point_count(model_id) == 0
+    finally:
+        Queries.DB_PATH = original
+    print("✓ points table storage tests passed")
+
+
+def _comparar_resultados(esperados, obtenidos):
+    """Compara resultados completos con los calculados sin y_pred."""
+    for clave, r in esperados.items():
+        if r is None:
+            assert obtenidos[clave] is None, f"{clave} should be None"
+            continue
+        for k, v in r.items():
+            if k != "y_pred":
+                assert np.isclose(
+                    obtenidos[clave][k], v, rtol=1e-6
+                ), f"{clave}.{k}: expected {v}, got {obtenidos[clave][k]}"
+
+
+def test_estadisticos_en_sql():
+    """Prueba que el ajuste dentro de SQLite coincide con calcular_todos_modelos."""
+    print("\nTesting SQL-side sufficient statistics...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        rng = np.random.default_rng(7)
+        xs = np.linspace(0.5, 8, 300)
+        ys = 1.5 * np.power(xs, 1.3) + rng.normal(0, 0.2, xs.size)
+        xs_neg = np.linspace(-3, 3, 50)
+        ys_neg = xs_neg**2 + 1
+        # y grande respecto de su dispersión: las sumas crudas se cancelarían
+        xs_off = np.linspace(0.1, 10, 2000)
+        ys_off = 1e6 + 3 + 0.5 * xs_off + rng.normal(0, 0.1, xs_off.size)
+
+        id_puntos = Queries.insert_model("puntos", xs, ys, store_points=True)
+        id_neg = Queries.insert_model("negativos", xs_neg, ys_neg, store_points=True)
+        id_texto = Queries.insert_model("texto", xs, ys)
+        id_off = Queries.insert_model("desplazado", xs_off, ys_off, store_points=True)
+
+        esperados = OperationsApp.calcular_todos_modelos(xs, ys)
+        esperados_neg = OperationsApp.calcular_todos_modelos(xs_neg, ys_neg)
+        esperados_off = OperationsApp.calcular_todos_modelos(xs_off, ys_off)
+
+        spec = OperationsApp.especificacion_sql()
+        columnas, sumas = spec["columnas"], spec["sumas"]
+        stats = Queries.get_sufficient_stats(id_puntos, columnas, sumas)
+        assert stats["n"] == 300 and "slxly" in stats
+        directos = OperationsApp.calcular_estadisticos_suficientes(xs, ys)
+        assert set(stats) == set(directos)
+        assert all(np.isclose(stats[k], directos[k], atol=1e-9) for k in stats)
+        assert Queries.get_sufficient_stats(id_texto, columnas, sumas) is None
+        assert "slx" not in Queries.get_sufficient_stats(id_neg, columnas, sumas)
+
+        # Sumas del refinamiento no lineal calculadas dentro de SQLite
+        for clave, base in spec["bases"].items():
+            en_sql = Queries.get_nonlinear_sums(id_puntos, base, 1.4, 1.2)
+            en_numpy = OperationsApp._evaluador_no_lineal(clave, xs, ys)(1.4, 1.2)
+            assert np.allclose(en_sql, en_numpy, rtol=1e-9), clave
+
+        _comparar_resultados(esperados, OperationsApp.calcular_modelos_en_bd(id_puntos))
+        _comparar_resultados(esperados, OperationsApp.calcular_modelos_en_bd(id_texto))
+        _comparar_resultados(
+            esperados_off, OperationsApp.calcular_modelos_en_bd(id_off)
+        )
+
+        todos = OperationsApp.calcular_todos_modelos_en_bd()
+        assert set(todos) == {id_puntos, id_neg, id_texto, id_off}
+        _comparar_resultados(esperados_off, todos[id_off])
+        _comparar_resultados(esperados, todos[id_puntos])
+        _comparar_resultados(esperados_neg, todos[id_neg])
+        _comparar_resultados(esperados, todos[id_texto])
+        assert OperationsApp.calcular_modelos_en_bd(id_off + 1) is None
+    finally:
+        Queries.DB_PATH = original
+    print("✓ SQL-side sufficient statistics tests passed")
+
+
+def test_escrituras_por_lotes():
+    """Prueba las variantes masivas y la unidad de trabajo transaction()."""
+    print("\nTesting bulk writes and transactions...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        primero = Queries.insert_model("previo", "1,2", "3,4")
+        Queries.delete_model(primero)
+
+        ids = Queries.insert_models(
+            [(f"lote{i}", [i, i + 1], [2 * i, 2 * i + 1]) for i in range(100)]
+        )
+        # AUTOINCREMENT no reutiliza el id eliminado
+        assert ids == list(range(primero + 1, primero + 101))
+        assert Queries.get_model_xy_by_id(ids[5]) == ("5,6", "10,11")
+
+        ids_puntos = Queries.insert_models(
+            [("p1", [1, 2, 3], [4, 5, 6], {"n": 3}), ("p2", "7 8", "9 10")],
+            store_points=True,
+        )
+        assert Queries.get_points_range(ids_puntos[1], 0, 5) == [
+            (0, 7.0, 9.0),
+            (1, 8.0, 10.0),
+        ]
+        assert Queries.get_model_summary_by_id(ids_puntos[0]) == {"n": 3}
+
+        assert (
+            Queries.update_models(
+                [
+                    (ids[0], "0,0", "0,0"),
+                    (ids_puntos[1], [7, 8], [1, 1]),
+                    (-1, "1", "1"),
+                ]
+            )
+            == 2
+        )
+        assert Queries.get_model_xy_by_id(ids[0]) == ("0,0", "0,0")
+        assert Queries.get_points_range(ids_puntos[1], 1, 2) == [(1, 8.0, 1.0)]
+
+        assert Queries.delete_models(ids[:10] + [-1]) == 10
+        assert Queries.get_model_xy_by_id(ids[0]) is None
+
+        # Unidad de trabajo: todo o nada
+        with Queries.transaction() as conn:
+            nuevo = Queries.insert_model("tx", "1,2", "3,4", conn=conn)
+            Queries.update_model_xy(nuevo, "5,6", "7,8", conn=conn)
+        assert Queries.get_model_xy_by_id(nuevo) == ("5,6", "7,8")
+        try:
+            with Queries.transaction() as conn:
+                Queries.delete_model(nuevo, conn=conn)
+                Queries.insert_models([("tx2", "1", "2")], conn=conn)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert Queries.get_model_xy_by_id(nuevo) == ("5,6", "7,8")
+        assert Queries.search_models("tx2") == []
+    finally:
+        Queries.DB_PATH = original
+    print("✓ bulk writes and transactions tests passed")
+
+
+def test_payload_binario():
+    """Prueba guardar x/y en formato binario y leerlos por bloques."""
+    print("\nTesting binary payloads...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        xs = np.linspace(0.1, 50.0, 3001)
+        ys = np.sqrt(xs)
+        model_id = Queries.insert_model(
+            "binario", BinaryFormat.encode([xs]), BinaryFormat.encode([ys])
+        )
+        # Bloques que no son múltiplos de 8 parten valores y la cabecera
+        for tam in (5, 4096):
+            leidos = [
+                v for b in Queries.iter_model_values(model_id, "x", tam) for v in b
+            ]
+            assert leidos == xs.tolist()
+        x_leido, y_leido = OperationsApp.cargar_arrays_modelo(model_id)
+        assert np.array_equal(y_leido, ys)
+
+        bx, by = Queries.get_model_xy_binary(model_id)
+        assert bx == BinaryFormat.encode([xs])
+        texto_x, _ = Queries.get_model_xy_by_id(model_id)
+        assert OperationsApp.parse_numbers(texto_x) == xs.tolist()
+
+        # Modelos de texto y de la tabla de puntos se codifican al leer
+        texto = Queries.insert_model("texto", "1,2,3", "4,5,6")
+        puntos = Queries.insert_model(
+            "puntos", BinaryFormat.encode([xs]), ys, store_points=True
+        )
+        bx, by = Queries.get_model_xy_binary(texto)
+        assert BinaryFormat.decode(by)[0][0].tolist() == [4.0, 5.0, 6.0]
+        bx, _ = Queries.get_model_xy_binary(puntos)
+        assert np.array_equal(BinaryFormat.decode(bx)[0][0], xs)
+        assert Queries.get_model_xy_binary(puntos + 1) is None
+
+        # Los ajustes dentro de SQLite leen el BLOB igual que el texto
+        _comparar_resultados(
+            OperationsApp.calcular_todos_modelos(xs, ys),
+            OperationsApp.calcular_modelos_en_bd(model_id),
+        )
+    finally:
+        Queries.DB_PATH = original
+    print("✓ binary payload tests passed")
+
+
+def test_x_con_varias_variables():
+    """Prueba guardar X de varias variables y leerlo por bloques de filas."""
+    print("\nTesting multi-feature x storage...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        rng = np.random.default_rng(2)
+        X = rng.uniform(-5, 5, (2500, 4))
+        y = 1.0 + X @ [0.5, -2.0, 3.0, 0.25] + rng.normal(0, 0.1, 2500)
+        model_id = Queries.insert_model("multiple", X, y)
+
+        bloques = list(Queries.iter_model_rows(model_id, 1000))
+        assert [b[0].shape for b in bloques] == [(1000, 4), (1000, 4), (500, 4)]
+        assert np.array_equal(np.vstack([b[0] for b in bloques]), X)
+        assert np.array_equal(np.concatenate([b[1] for b in bloques]), y)
+        texto_x, _ = Queries.get_model_xy_by_id(model_id)
+        assert np.array_equal(OperationsApp.parse_matrix(texto_x), X)
+
+        # Modelos de una variable guardados como texto o en la tabla de puntos
+        texto = Queries.insert_model("texto", "1,2,3", "4,5,6")
+        puntos = Queries.insert_model("puntos", [1, 2, 3], [4, 5, 6], store_points=True)
+        for otro in (texto, puntos):
+            ((Xb, yb),) = Queries.iter_model_rows(otro)
+            assert Xb.tolist() == [[1.0], [2.0], [3.0]] and yb.tolist() == [4, 5, 6]
+        assert list(Queries.iter_model_rows(puntos + 1)) == []
+        try:
+            Queries.insert_model("sin puntos", X, y, store_points=True)
+            assert False, "Expected ValueError"
+        except ValueError:
+            pass
+
+        for metodo in OperationsApp.METODOS_MULTIPLE:
+            esperado = OperationsApp.calcular_regresion_multiple(X, y, metodo=metodo)
+            en_bd = OperationsApp.calcular_regresion_multiple_en_bd(
+                model_id, metodo=metodo, tamano_bloque=300, hilos=2
+            )
+            assert np.isclose(en_bd["intercept"], esperado["intercept"])
+            assert np.allclose(en_bd["coef"], esperado["coef"])
+            assert np.isclose(en_bd["rmse"], esperado["rmse"])
+        assert OperationsApp.calcular_regresion_multiple_en_bd(puntos + 1) is None
+    finally:
+        Queries.DB_PATH = original
+    print("✓ multi-feature x storage tests passed")
+
+
+def test_catalogo_e_indices():
+    """Prueba el catálogo, sus índices de cobertura y la compactación."""
+    print("\nTesting catalog columns, covering indexes and VACUUM...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        ids = Queries.insert_models(
+            [
+                ("Modelo Grande", list(range(3000)), list(range(3000))),
+                ("otro MODELO", BinaryFormat.encode([[1.0, 2.0]]), [3.0, 4.0]),
+            ]
+        )
+        puntos = Queries.insert_model("puntos", [1, 2, 3], [4, 5, 6], store_points=True)
+        listado = Queries.list_models()
+        assert [(m[0], m[2]) for m in listado] == [
+            (puntos, 3),
+            (ids[1], 2),
+            (ids[0], 3000),
+        ]
+        assert Queries.list_models(limit=1, offset=1)[0][0] == ids[1]
+
+        # La búsqueda no distingue mayúsculas aunque compare model_name_lower
+        assert [m[0] for m in Queries.search_models("MODELO")] == [ids[1], ids[0]]
+        assert Queries.update_model_xy(ids[0], [1, 2], [3, 4])
+        assert {m[0]: m[2] for m in Queries.list_models()}[ids[0]] == 2
+
+        conn = Queries.get_connection()
+        try:
+            for query, params in (
+                (
+                    "SELECT id, model_name FROM regression_model "
+                    "WHERE model_name_lower LIKE ?",
+                    ("%a%",),
+                ),
+                (
+                    "SELECT id, model_name, n_points, updated_at FROM regression_model "
+                    "ORDER BY updated_at DESC, id DESC",
+                    (),
+                ),
+            ):
+                plan = " ".join(
+                    r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + query, params)
+                )
+                assert "COVERING INDEX" in plan, plan
+        finally:
+            conn.close()
+
+        assert Queries.delete_model(ids[0])
+        assert Queries.get_model_payload_size(ids[0]) is None
+        _, despues = Queries.compact_database(page_size=8192)
+        assert despues == os.path.getsize(Queries.DB_PATH)
+        conn = Queries.get_connection()
+        try:
+            assert conn.execute("PRAGMA page_size").fetchone()[0] == 8192
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        finally:
+            conn.close()
+        assert Queries.get_model_xy_by_id(ids[1]) == ("1.0,2.0", "3.0,4.0")
+        try:
+            Queries.compact_database(page_size=1000)
+            assert False, "Expected ValueError for an invalid page size"
+        except ValueError:
+            pass
+    finally:
+        Queries.DB_PATH = original
+    print("✓ catalog and VACUUM tests passed")
+
+
+def test_payload_comprimido():
+    """Prueba el guardado comprimido con cada códec y su lectura."""
+    print("\nTesting compressed payloads...")
+    original = Queries.DB_PATH
+    try:
+        _usar_db_temporal()
+        n = 5000
+        xs = np.linspace(0.0, 50.0, n)
+        ys = np.sin(xs) * 3.0 + 1.0
+        x2 = np.column_stack([xs, xs**2])
+        plano = Queries.insert_model(
+            "plano", BinaryFormat.encode([xs]), BinaryFormat.encode([ys])
+        )
+        tamano_plano = sum(Queries.get_model_payload_size(plano))
+        for codec in Compression.CODECS:
+            model_id = Queries.insert_model(codec, xs, ys, codec=codec)
+            assert Queries.get_model_xy_by_id(model_id) == (
+                Queries.get_model_xy_by_id(plano)
+            )
+            x_bin, y_bin = Queries.get_model_xy_binary(model_id)
+            assert BinaryFormat.decode(y_bin)[0][0].tobytes() == ys.tobytes()
+            valores = list(Queries.iter_model_values(model_id, "x", chunk_size=999))
+            assert np.array_equal(np.concatenate(valores), xs)
+            assert {m[0]: m[2] for m in Queries.list_models()}[model_id] == n
+        assert sum(Queries.get_model_payload_size(model_id)) < tamano_plano
+        delta = Queries.insert_model("delta", xs, ys, codec="delta")
+        assert sum(Queries.get_model_payload_size(delta)) < tamano_plano / 2
+
+        # X de dos columnas leída por bloques desde el blob comprimido
+        varias = Queries.insert_model("varias", x2, ys, codec="xor")
+        bloques = list(Queries.iter_model_rows(varias, rows=700))
+        assert np.array_equal(np.concatenate([b[0] for b in bloques]), x2)
+        assert np.array_equal(np.concatenate([b[1] for b in bloques]), ys)
+
+        # Las actualizaciones conservan el códec salvo que se indique otro
+        assert Queries.update_model_xy(delta, xs[:100], ys[:100])
+        x_bin, _ = Queries.get_model_xy_binary(delta)
+        conn = Queries.get_connection()
+        try:
+            assert Queries._stored_codec(conn, delta) == "delta"
+        finally:
+            conn.close()
+        assert BinaryFormat.decode(x_bin)[0][0].tolist() == xs[:100].tolist()
+        assert Queries.update_model_xy(delta, xs[:10], ys[:10], codec="none")
+        conn = Queries.get_connection()
+        try:
+            assert Queries._stored_codec(conn, delta) is None
+        finally:
+            conn.close()
+        assert Queries.get_model_xy_by_id(delta)[1].count(",") == 9
+        try:
+            Queries.insert_model("malo", xs, ys, codec="zip")
+            assert False, "Expected ValueError for an unknown codec"
+        except ValueError:
+            pass
+    finally:
+        Queries.DB_PATH = original
+    print("✓ compressed payload tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running Queries tests...")
+    print("=" * 60)
+
+    test_crud_y_resumen()
+    test_migracion_esquema_antiguo()
+    test_lectura_por_bloques()
+    test_tabla_de_puntos()
+    test_estadisticos_en_sql()
+    test_escrituras_por_lotes()
+    test_payload_binario()
+    test_x_con_varias_variables()
+    test_catalogo_e_indices()
+    test_payload_comprimido()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,299 @@
+"""
+Pruebas del servicio HTTP de ajuste sobre una base de datos temporal.
+"""
+
+import http.client
+import json
+import os
+import socket
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import BinaryFormat
+import OperationsApp
+import Queries
+import ServiceApp
+
+
+def _peticion(servicio, metodo, ruta, cuerpo=None):
+    """Envía una petición JSON y retorna (estado, respuesta decodificada)."""
+    conn = http.client.HTTPConnection("127.0.0.1", servicio.port, timeout=30)
+    try:
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+        conn.request(metodo, ruta, body=datos)
+        respuesta = conn.getresponse()
+        return respuesta.status, json.loads(respuesta.read())
+    finally:
+        conn.close()
+
+
+def _peticion_binaria(servicio, metodo, ruta, cuerpo=None):
+    """Envía un cuerpo binario y retorna (estado, bytes de la respuesta)."""
+    conn = http.client.HTTPConnection("127.0.0.1", servicio.port, timeout=30)
+    try:
+        cabeceras = {"Content-Type": ServiceApp.TIPO_BINARIO}
+        conn.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+        respuesta = conn.getresponse()
+        return respuesta.status, respuesta.read()
+    finally:
+        conn.close()
+
+
+def _peticion_cruda(servicio, datos):
+    """Envía bytes tal cual y retorna el código de estado de la respuesta."""
+    with socket.create_connection(("127.0.0.1", servicio.port), timeout=30) as conn:
+        conn.sendall(datos)
+        respuesta = b""
+        while b"\r\n" not in respuesta:
+            parte = conn.recv(4096)
+            if not parte:
+                break
+            respuesta += parte
+    return int(respuesta.split(b" ", 2)[1]) if respuesta else None
+
+
+def test_servicio():
+    """Prueba ajustes, CRUD, agrupación, contrapresión y métricas."""
+    print("Testing ServiceApp...")
+    original = Queries.DB_PATH
+    Queries.DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+    servicio = ServiceApp.ServicioAjuste(port=0, workers=2, espera_lote=0.02)
+    servicio.iniciar_en_hilo()
+    try:
+        xs = [1, 2, 3, 4, 5]
+        ys = [2.1, 4.2, 6.1, 8.2, 10.0]
+        esperado = OperationsApp.calcular_todos_modelos(xs, ys)
+
+        estado, r = _peticion(
+            servicio, "POST", "/fit", {"x": xs, "y": "2.1 4.2 6.1 8.2 10"}
+        )
+        assert estado == 200, r
+        for clave in esperado:
+            assert np.isclose(r[clave]["rmse"], esperado[clave]["rmse"])
+        assert "y_pred" not in r["Lineal"]
+
+        estado, r = _peticion(servicio, "POST", "/fit", {"x": [1, 2], "y": [1]})
+        assert estado == 400 and "no coincide" in r["error"]
+
+        # Errores en los datos del cliente: 400, no 500
+        for cuerpo in (
+            {"x": ["a", "b"], "y": [1, 2]},
+            {"x": "1,2,zz", "y": "1,2,3"},
+            {"x": [[1], 2], "y": [1, 2]},
+            {"x": 5, "y": [1]},
+            [1, 2],
+            {"x": [1, float("nan")], "y": [1, 2]},
+            {"x": [1, 2], "y": [1, float("inf")]},
+            {"x": "1,2,3", "y": "1,-inf,3"},
+        ):
+            estado, r = _peticion(servicio, "POST", "/fit", cuerpo)
+            assert estado == 400, (cuerpo, r)
+        estado, r = _peticion(
+            servicio, "POST", "/models", {"model_name": "m", "x": ["a"], "y": [1]}
+        )
+        assert estado == 400, r
+        estado, r = _peticion(servicio, "PUT", "/models/1", [1])
+        assert estado == 400, r
+        estado, r = _peticion(servicio, "POST", "/models/1/predict", {"x": "1,zz"})
+        assert estado == 400, r
+        estado, r = _peticion(servicio, "POST", "/models/1/predict", {"x": "1,nan"})
+        assert estado == 400 and "finitos" in r["error"], r
+
+        # Peticiones pequeñas concurrentes se agrupan en pocos lotes
+        lotes_previos = servicio.lotes_enviados
+        with ThreadPoolExecutor(16) as pool:
+            respuestas = list(
+                pool.map(
+                    lambda i: _peticion(servicio, "POST", "/fit", {"x": xs, "y": ys}),
+                    range(32),
+                )
+            )
+        assert all(estado == 200 for estado, _ in respuestas)
+        assert servicio.lotes_enviados - lotes_previos < 32
+
+        # CRUD
+        estado, r = _peticion(
+            servicio, "POST", "/models", {"model_name": "http", "x": xs, "y": ys}
+        )
+        assert estado == 201
+        model_id = r["id"]
+        estado, r = _peticion(servicio, "GET", "/models?q=htt")
+        assert r == [{"id": model_id, "model_name": "http"}]
+        estado, r = _peticion(servicio, "GET", f"/models/{model_id}/fit")
+        assert np.isclose(r["Lineal"]["coef"], esperado["Lineal"]["coef"])
+        estado, r = _peticion(
+            servicio, "PUT", f"/models/{model_id}", {"x": "1,2", "y": "3,4"}
+        )
+        assert r == {"updated": True}
+        estado, r = _peticion(servicio, "GET", f"/models/{model_id}")
+        assert r["x"] == "1.0,2.0"
+        estado, r = _peticion(servicio, "DELETE", f"/models/{model_id}")
+        assert r == {"deleted": True}
+        estado, r = _peticion(servicio, "GET", f"/models/{model_id}")
+        assert estado == 404
+
+        # Formato binario: ajuste, alta, lectura y edición
+        estado, r = _peticion_binaria(
+            servicio, "POST", "/fit", BinaryFormat.encode_xy(xs, ys)
+        )
+        assert estado == 200
+        r = OperationsApp.decodificar_resultados(r)
+        assert np.allclose(r["Lineal"]["y_pred"], esperado["Lineal"]["y_pred"])
+        estado, r = _peticion_binaria(servicio, "POST", "/fit", b"1,2,3")
+        assert estado == 400
+        estado, r = _peticion_binaria(
+            servicio, "POST", "/fit", BinaryFormat.encode_xy(xs, [np.nan] + ys[1:])
+        )
+        assert estado == 400 and b"finitos" in r
+
+        # Ajuste grande: los datos llegan al proceso en memoria compartida
+        grande_x = np.linspace(1.0, 50.0, 5000)
+        grande_y = 3.0 * grande_x + np.sin(grande_x)
+        estado, r = _peticion_binaria(
+            servicio, "POST", "/fit", BinaryFormat.encode_xy(grande_x, grande_y)
+        )
+        assert estado == 200
+        r = OperationsApp.decodificar_resultados(r)
+        local = OperationsApp.calcular_todos_modelos(grande_x, grande_y)
+        assert np.allclose(r["Lineal"]["y_pred"], local["Lineal"]["y_pred"])
+        estado, r = _peticion_binaria(
+            servicio, "POST", "/models?model_name=bin", BinaryFormat.encode_xy(xs, ys)
+        )
+        assert estado == 201
+        model_id = json.loads(r)["id"]
+        estado, r = _peticion_binaria(
+            servicio, "GET", f"/models/{model_id}?format=binary"
+        )
+        bx, by = BinaryFormat.decode_xy(r)
+        assert bx.tolist() == xs and by.tolist() == ys
+        estado, r = _peticion_binaria(
+            servicio, "PUT", f"/models/{model_id}", BinaryFormat.encode_xy(ys, xs)
+        )
+        assert json.loads(r) == {"updated": True}
+        estado, r = _peticion(servicio, "GET", f"/models/{model_id}")
+        assert OperationsApp.parse_numbers(r["y"]) == xs
+
+        # Alta comprimida (ver Compression) y códec desconocido
+        estado, r = _peticion_binaria(
+            servicio,
+            "POST",
+            "/models?model_name=comprimido&codec=xor",
+            BinaryFormat.encode_xy(xs, ys),
+        )
+        assert estado == 201
+        estado, r = _peticion_binaria(
+            servicio, "GET", f"/models/{json.loads(r)['id']}?format=binary"
+        )
+        assert BinaryFormat.decode_xy(r)[1].tolist() == ys
+        estado, r = _peticion(
+            servicio,
+            "POST",
+            "/models",
+            {"model_name": "malo", "x": xs, "y": ys, "codec": "zip"},
+        )
+        assert estado == 400, r
+
+        # Predicción con el modelo ajustado guardado
+        estado, r = _peticion(
+            servicio,
+            "POST",
+            f"/models/{model_id}/predict",
+            {"family": "Lineal", "x": [10, 20]},
+        )
+        assert estado == 200 and r["family"] == "Lineal"
+        lineal = OperationsApp.calcular_todos_modelos(ys, xs)["Lineal"]
+        assert np.allclose(
+            r["y"], [lineal["intercept"] + lineal["coef"] * x for x in (10, 20)]
+        )
+        estado, r = _peticion_binaria(
+            servicio,
+            "POST",
+            f"/models/{model_id}/predict?family=Lineal",
+            BinaryFormat.encode([[10.0, 20.0]]),
+        )
+        assert estado == 200 and BinaryFormat.decode(r)[0][0].size == 2
+        estado, r = _peticion(servicio, "POST", "/models/999999/predict", {"x": [1.0]})
+        assert estado == 404
+
+        # Peticiones HTTP mal formadas: se responde el error antes de cerrar
+        assert _peticion_cruda(servicio, b"GARBAGE\r\n\r\n") == 400
+        assert (
+            _peticion_cruda(
+                servicio, b"POST /fit HTTP/1.1\r\nContent-Length: abc\r\n\r\n"
+            )
+            == 400
+        )
+        grande = ServiceApp.MAX_CUERPO + 1
+        assert (
+            _peticion_cruda(
+                servicio,
+                f"POST /fit HTTP/1.1\r\nContent-Length: {grande}\r\n\r\n".encode(),
+            )
+            == 413
+        )
+
+        # Contrapresión: sin capacidad libre se responde 503
+        servicio.max_pendientes = 0
+        estado, r = _peticion(servicio, "POST", "/fit", {"x": xs, "y": ys})
+        assert estado == 503
+        servicio.max_pendientes = 64
+
+        estado, r = _peticion(servicio, "GET", "/metrics")
+        assert r["latency"]["POST /fit"]["count"] >= 36
+        assert r["rejected"] == 1
+        assert (
+            r["latency"]["POST /fit"]["p99_ms"] >= r["latency"]["POST /fit"]["p50_ms"]
+        )
+    finally:
+        servicio.detener()
+        Queries.DB_PATH = original
+
+    # Detener cierra el loop y libera el pool de procesos
+    assert servicio._loop.is_closed()
+    try:
+        servicio._executor.submit(int)
+        assert False, "Expected RuntimeError after shutdown"
+    except RuntimeError:
+        pass
+    print("✓ ServiceApp tests passed")
+
+
+def test_errores_del_servidor():
+    """Prueba que solo los errores de validación del ajuste responden 400."""
+    print("\nTesting ServiceApp error status codes...")
+    original = OperationsApp.calcular_todos_modelos
+    servicio = ServiceApp.ServicioAjuste(
+        port=0, executor=ThreadPoolExecutor(2), espera_lote=0.0
+    )
+    servicio.iniciar_en_hilo()
+    cuerpo = {"x": [1, 2, 3], "y": [2, 4, 6]}
+    try:
+        for error, esperado in (
+            (ValueError("datos fuera de dominio"), 400),
+            (RuntimeError("falla interna"), 500),
+            (MemoryError(), 500),
+            (np.linalg.LinAlgError("sistema singular"), 500),
+        ):
+
+            def _fallar(*_, error=error, **__):
+                raise error
+
+            OperationsApp.calcular_todos_modelos = _fallar
+            estado, r = _peticion(servicio, "POST", "/fit", cuerpo)
+            assert estado == esperado and "error" in r, (error, estado, r)
+        OperationsApp.calcular_todos_modelos = original
+        estado, _ = _peticion(servicio, "POST", "/fit", cuerpo)
+        assert estado == 200
+    finally:
+        OperationsApp.calcular_todos_modelos = original
+        servicio.detener()
+    print("✓ ServiceApp error status code tests passed")
+
+
+if __name__ == "__main__":
+    test_servicio()
+    test_errores_del_servidor()
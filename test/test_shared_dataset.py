@@ -0,0 +1,173 @@
+"""
+Pruebas de SharedDataset (datos en memoria compartida para procesos).
+"""
+
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import OperationsApp
+import SharedDataset
+
+
+def _duplicar_y(datos):
+    """Se ejecuta en otro proceso: escribe sobre el bloque compartido."""
+    try:
+        datos.y *= 2.0
+        return datos.owner, datos.name
+    finally:
+        datos.release()
+
+
+def _ajustar(datos):
+    """Se ejecuta en otro proceso: ajusta sin copiar los datos."""
+    try:
+        return OperationsApp.calcular_todos_modelos(datos, hilos=1)
+    finally:
+        datos.release()
+
+
+def _mapeado(nombre):
+    """
+    Se ejecuta en otro proceso: indica si el proceso conserva el conjunto o
+    el bloque mapeado.
+    """
+    with open("/proc/self/maps") as f:
+        return nombre in SharedDataset._attached or nombre in f.read()
+
+
+def _existe(nombre):
+    try:
+        shared_memory.SharedMemory(name=nombre).close()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def test_conteo_de_referencias():
+    """Prueba las vistas, la serialización y la liberación del bloque."""
+    print("Testing SharedDataset views and reference counting...")
+    xs = np.linspace(0.0, 1.0, 1000)
+    datos = SharedDataset.SharedDataset(xs, 2 * xs)
+    assert datos.owner and len(datos) == 1000 and datos.nbytes == 16000
+    x, y = datos
+    assert np.array_equal(x, xs) and np.array_equal(y, 2 * xs)
+
+    # Solo viaja el nombre del bloque: el pickle no depende de n
+    paquete = pickle.dumps(datos)
+    assert len(paquete) < 500
+    copia = pickle.loads(paquete)
+    assert not copia.owner and copia.name == datos.name
+    assert pickle.loads(paquete) is copia  # un solo mapeo por proceso
+    datos.x[0] = 42.0
+    assert copia.x[0] == 42.0
+    copia.release()
+    copia.release()
+    assert copia.released
+
+    assert datos.retain() is datos
+    datos.release()
+    assert _existe(datos.name)
+    nombre = datos.name
+    datos.release()
+    datos.release()  # liberaciones de más se ignoran
+    assert datos.released and not _existe(nombre)
+    for operacion in (datos.retain, datos.arrays, lambda: pickle.dumps(datos)):
+        try:
+            operacion()
+            assert False, "Expected ValueError on a released dataset"
+        except ValueError:
+            pass
+
+    # X de varias columnas; longitudes distintas
+    with SharedDataset.SharedDataset(np.ones((10, 3)), np.zeros(10)) as varias:
+        assert varias.x.shape == (10, 3)
+    try:
+        SharedDataset.SharedDataset([1.0, 2.0], [1.0])
+        assert False, "Expected ValueError for mismatched lengths"
+    except ValueError:
+        pass
+    print("✓ view and reference counting tests passed")
+
+
+def test_procesos():
+    """Prueba que los procesos usan el bloque sin copiarlo."""
+    print("\nTesting SharedDataset in worker processes...")
+    xs = np.linspace(1.0, 20.0, 50_000)
+    ys = 1.5 * xs + np.cos(xs)
+    local = OperationsApp.calcular_todos_modelos(xs, ys)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        with SharedDataset.SharedDataset(xs, ys) as datos:
+            # Lo que escribe el proceso se ve aquí: es la misma memoria
+            owner, nombre = pool.submit(_duplicar_y, datos).result()
+            assert not owner and nombre == datos.name
+            assert np.array_equal(datos.y, 2 * ys)
+            datos.y[...] = ys
+
+            remotos = list(pool.map(_ajustar, [datos] * 3))
+        for remoto in remotos:
+            for familia, r in local.items():
+                assert np.allclose(remoto[familia]["y_pred"], r["y_pred"])
+                assert abs(remoto[familia]["r2"] - r["r2"]) < 1e-12
+    assert not _existe(nombre)
+
+    # Las funciones de ajuste aceptan el conjunto en lugar de xs e ys
+    with SharedDataset.SharedDataset(xs, ys) as datos:
+        stats = OperationsApp.calcular_estadisticos_suficientes(datos)
+        assert stats == OperationsApp.calcular_estadisticos_suficientes(xs, ys)
+        multiple = OperationsApp.calcular_regresion_multiple(datos, incluir_pred=False)
+        assert np.isclose(multiple["intercept"], local["Lineal"]["intercept"])
+        assert np.allclose(multiple["coef"], [local["Lineal"]["coef"]])
+        try:
+            OperationsApp.calcular_todos_modelos(datos, ys)
+            assert False, "Expected ValueError for a dataset plus ys"
+        except ValueError:
+            pass
+    print("✓ worker process tests passed")
+
+
+def test_liberacion_en_procesos():
+    """
+    Prueba que el proceso deja de mapear el bloque al terminar una tarea que
+    no libera el conjunto.
+    """
+    print("\nTesting that workers unmap datasets when their tasks end...")
+    xs = np.linspace(1.0, 20.0, 10_000)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        # El proceso arranca antes de crear el bloque, así no hereda su mapeo
+        pool.submit(os.getpid).result()
+        with SharedDataset.SharedDataset(xs, 3 * xs) as datos:
+            nombre = datos.name
+            futuro = pool.submit(OperationsApp.calcular_todos_modelos, datos)
+            assert np.isclose(futuro.result()["Lineal"]["coef"], 3.0)
+            if os.path.exists("/proc/self/maps"):
+                assert not pool.submit(_mapeado, nombre).result()
+            # El bloque sigue disponible para tareas nuevas
+            remoto = pool.submit(OperationsApp.calcular_todos_modelos, datos).result()
+            assert np.isclose(remoto["Lineal"]["coef"], 3.0)
+        assert not _existe(nombre)
+    print("✓ worker release tests passed")
+
+
+def run_all_tests():
+    """Ejecuta todas las pruebas."""
+    print("=" * 60)
+    print("Running SharedDataset tests...")
+    print("=" * 60)
+
+    test_conteo_de_referencias()
+    test_procesos()
+    test_liberacion_en_procesos()
+
+    print("\n" + "=" * 60)
+    print("All tests passed! ✓")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_all_tests()